@@ -15,6 +15,8 @@ from pydantic import BaseModel
 # Service Layer
 from app.services.admin_service import admin_service
 from app.services.organization_service import organization_service
+from app.services import document_pipeline, case_deletion_service, law_file_catalog
+from app.core.db import connect_to_redis
 
 # Domain Models
 from app.models.user import UserInDB
@@ -113,4 +115,81 @@ async def delete_user(
     if not success:
         raise HTTPException(status_code=404, detail="User not found or delete failed.")
     
-    return None
\ No newline at end of file
+    return None
+@router.get("/pipeline")
+async def get_document_pipeline_overview(
+    current_admin: Annotated[UserInDB, Depends(get_current_admin_user)],
+    db: Database = Depends(get_db)
+):
+    """
+    Queue depth and in-flight/stale documents for every document pipeline stage.
+    """
+    def _overview():
+        try:
+            redis_client = connect_to_redis()
+        except Exception:
+            redis_client = None
+        return document_pipeline.pipeline_overview(db, redis_client)
+
+    return await asyncio.to_thread(_overview)
+
+@router.post("/pipeline/reap")
+async def reap_document_pipeline(
+    current_admin: Annotated[UserInDB, Depends(get_current_admin_user)],
+    db: Database = Depends(get_db)
+):
+    """
+    Runs the stale-pipeline reaper immediately instead of waiting for celery beat.
+    """
+    def _reap():
+        try:
+            redis_client = connect_to_redis()
+        except Exception:
+            redis_client = None
+        return document_pipeline.reap_stale_pipelines(db, redis_client)
+
+    return await asyncio.to_thread(_reap)
+
+@router.get("/case-deletions")
+async def get_case_deletions(
+    current_admin: Annotated[UserInDB, Depends(get_current_admin_user)],
+    db: Database = Depends(get_db)
+):
+    """
+    Tombstoned cases whose deletion job is pending, running or failed.
+    """
+    return await asyncio.to_thread(case_deletion_service.deletion_overview, db)
+
+@router.post("/case-deletions/{case_id}/retry")
+async def retry_case_deletion(
+    case_id: str,
+    current_admin: Annotated[UserInDB, Depends(get_current_admin_user)],
+    db: Database = Depends(get_db)
+):
+    """
+    Requeues a FAILED case deletion; finished phases are skipped.
+    """
+    if not ObjectId.is_valid(case_id):
+        raise HTTPException(status_code=400, detail="Invalid case ID")
+    result = await asyncio.to_thread(
+        db.cases.update_one,
+        {"_id": ObjectId(case_id), "deletion.state": "FAILED"},
+        {"$set": {"deletion.state": "PENDING", "deletion.attempts": 0}}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="No failed deletion for this case.")
+    if not await asyncio.to_thread(case_deletion_service.enqueue, case_id):
+        raise HTTPException(status_code=503, detail="Task queue unavailable.")
+    return {"status": "queued", "case_id": case_id}
+
+@router.get("/law-catalog")
+async def get_law_catalog_status(
+    current_admin: Annotated[UserInDB, Depends(get_current_admin_user)],
+    refresh: bool = False
+):
+    """
+    Entry counts and build time of the in-memory law PDF catalog; refresh=true rebuilds it now.
+    """
+    if refresh:
+        await asyncio.to_thread(law_file_catalog.refresh)
+    return law_file_catalog.stats()
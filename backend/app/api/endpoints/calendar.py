@@ -1,7 +1,9 @@
 # FILE: backend/app/api/endpoints/calendar.py
-# PHOENIX PROTOCOL - CALENDAR API V5.1 (VALIDATION FIX)
-from fastapi import APIRouter, Depends, status, HTTPException, Response
-from typing import List, Dict, Any
+# PHOENIX PROTOCOL - CALENDAR API V5.2 (WINDOWED EVENTS)
+from fastapi import APIRouter, Depends, status, HTTPException, Response, Query
+from fastapi.responses import JSONResponse
+from typing import List, Dict, Any, Optional
+from datetime import datetime
 from bson import ObjectId
 from bson.errors import InvalidId
 from pydantic import BaseModel
@@ -51,10 +53,23 @@ async def get_alerts_briefing(
 
 @router.get("/events", response_model=List[CalendarEventOut])
 async def get_all_user_events(
+    start: Optional[datetime] = Query(None, description="Fillimi i dritares (përfshirë)"),
+    end: Optional[datetime] = Query(None, description="Fundi i dritares (përjashtuar)"),
+    cursor: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=500),
     current_user: UserInDB = Depends(get_current_user),
     db: Database = Depends(get_db),
 ):
-    return await asyncio.to_thread(calendar_service.get_events_for_user, db=db, user_id=current_user.id)
+    """Without parameters returns the full list (legacy clients). The next page cursor is sent in X-Next-Cursor."""
+    events, next_cursor = await asyncio.to_thread(
+        calendar_service.get_events_for_user,
+        db=db, user_id=current_user.id, start=start, end=end, cursor=cursor, limit=limit
+    )
+    # Rows are already JSON-ready; returning the response directly skips response_model validation.
+    response = JSONResponse(content=events)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 @router.post("/events", response_model=CalendarEventOut, status_code=status.HTTP_201_CREATED)
 async def create_new_event(
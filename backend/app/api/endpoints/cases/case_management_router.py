@@ -1,7 +1,7 @@
 # FILE: app/api/endpoints/cases/case_management_router.py
 # PHOENIX PROTOCOL - CASE MANAGEMENT ROUTER V10.0 (FASTAPI COMPLIANT • ZERO ERRORS)
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from typing import List, Annotated
 from fastapi.responses import StreamingResponse, JSONResponse, Response
 from pymongo.database import Database
@@ -10,7 +10,7 @@ import logging
 from datetime import datetime, timezone
 from bson import ObjectId
 
-from app.services import case_service, storage_service
+from app.services import case_service, storage_service, case_deletion_service
 from app.models.case import CaseCreate, CaseOut
 from app.models.user import UserInDB
 from app.api.endpoints.dependencies import get_current_user, get_db
@@ -194,16 +194,20 @@ async def update_case_chat_history(
     )
     return {"status": "success", "message": "Chat history saved"}
 
-@router.delete("/{case_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{case_id}", status_code=status.HTTP_202_ACCEPTED)
 async def delete_case(
     case_id: str,
     current_user: Annotated[UserInDB, Depends(get_current_user)],
+    background_tasks: BackgroundTasks,
     db: Database = Depends(get_db)
 ):
-    await asyncio.to_thread(
+    queued = await asyncio.to_thread(
         case_service.delete_case_by_id,
         db=db,
         case_id=validate_object_id(case_id),
         owner=current_user
     )
-    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+    if not queued:
+        # Broker unreachable: run the job in-process; the reaper resumes it if this worker dies
+        background_tasks.add_task(case_deletion_service.run_case_deletion, db, case_id)
+    return {"status": "deleting", "case_id": case_id}
\ No newline at end of file
@@ -118,11 +118,14 @@ async def upload_document_for_case(
         mime_type=content_type
     )
 
-    from app.services.document_processing_service import orchestrate_document_processing_mongo
-    background_tasks.add_task(
-        orchestrate_document_processing_mongo,
-        str(doc.id)
-    )
+    from app.services import document_pipeline
+    if not await asyncio.to_thread(document_pipeline.start, db, str(doc.id), True):
+        # Broker unreachable: process in-process rather than leaving the document PENDING
+        from app.services.document_processing_service import orchestrate_document_processing_mongo
+        background_tasks.add_task(
+            orchestrate_document_processing_mongo,
+            str(doc.id)
+        )
 
     return DocumentOut.model_validate(doc)
 
@@ -11,7 +11,7 @@ import io
 import logging
 from datetime import datetime, timezone
 
-from app.services import storage_service
+from app.services import storage_service, document_text_service
 from app.services.ontology_service import ontology_service
 from app.services.graph_service import graph_service, normalize_text_to_albanian
 from app.models.user import UserInDB
@@ -127,6 +127,11 @@ async def rebuild_case_graph_endpoint(
             pass
         return {"status": "success", "case_id": case_id, "nodes": [], "edges": []}
 
+    # The inline extracted_text is only the first 15 000 chars; the graph gets each document's full text (up to a bucket)
+    for doc in docs:
+        if doc.get("text_index"):
+            doc["extracted_text"] = await asyncio.to_thread(document_text_service.read_document_text, db, doc, 75000)
+
     buckets = ontology_service.pack_documents_into_dynamic_buckets(docs, max_chars_per_bucket=75000)
     logger.info(f"⚡ {len(docs)} dokumente u paketuan në {len(buckets)} kërkesa dinamike...")
 
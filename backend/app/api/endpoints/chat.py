@@ -24,6 +24,8 @@ class ChatMessageRequest(BaseModel):
     document_ids: Optional[List[str]] = None
     jurisdiction: Optional[str] = 'ks'
     domain: Optional[str] = 'automatic'
+    # When true the stream starts with an `event: retrieval` frame carrying per-leg latencies
+    emit_events: bool = False
 
 class ChatFeedbackRequest(BaseModel):
     message_index: int
@@ -51,7 +53,8 @@ async def handle_chat_message(
             user_id=str(current_user.id),
             document_ids=chat_request.document_ids,
             jurisdiction=chat_request.jurisdiction,
-            domain=chat_request.domain
+            domain=chat_request.domain,
+            emit_events=chat_request.emit_events
         )
         
         # PHOENIX V31.0: Strict proxy-bypass headers to force chunk delivery
@@ -24,6 +24,8 @@ from app.models.archive import ArchiveItemOut
 from app.services.finance_service import FinanceService
 from app.services.archive_service import ArchiveService
 from app.services.report_service import generate_invoice_pdf, create_pdf_from_text
+from app.services.report_service.branding import get_branding_assets, to_context
+from app.services import invoice_export_service
 from app.services.ocr_service import extract_text_from_image_bytes
 from app.services.llm_service import extract_expense_details_from_text
 from app.api.endpoints.dependencies import get_current_user, get_db, get_current_active_user
@@ -36,6 +38,14 @@ class ArchiveForensicReportRequest(BaseModel):
     title: str
     content: str
 
+class InvoiceExportRequest(BaseModel):
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    statuses: Optional[List[str]] = None
+    case_id: Optional[str] = None
+    lang: str = "sq"
+    export_id: Optional[str] = None  # client-chosen id to match SSE progress events
+
 # --- PUBLIC TEST OCR ENDPOINT (NO AUTH) ---
 @router.post("/public-test-ocr")
 async def public_test_ocr(
@@ -198,6 +208,20 @@ def download_invoice_pdf(invoice_id: str, current_user: Annotated[UserInDB, Depe
     headers = {'Content-Disposition': f'inline; filename="{filename}"'}
     return StreamingResponse(pdf_buffer, media_type="application/pdf", headers=headers)
 
+@router.post("/invoices/export")
+async def export_invoices_zip(body: InvoiceExportRequest, current_user: Annotated[UserInDB, Depends(get_current_user)], db: Database = Depends(get_db)):
+    user_id = str(current_user.id)
+    query = invoice_export_service.build_filter(user_id, body.date_from, body.date_to, body.statuses, body.case_id)
+    invoices = await asyncio.to_thread(invoice_export_service.find_invoices, db, query)
+    if not invoices: raise HTTPException(status_code=404, detail="No invoices match the filter")
+    assets = await asyncio.to_thread(get_branding_assets, db, user_id)
+    filename = f"Faturat_{datetime.now().strftime('%Y%m%d_%H%M')}.zip"
+    return StreamingResponse(
+        invoice_export_service.stream_invoice_zip(invoices, to_context(assets), user_id, lang=body.lang or "sq", export_id=body.export_id),
+        media_type="application/zip",
+        headers={'Content-Disposition': f'attachment; filename="{filename}"', "X-Invoice-Count": str(len(invoices))}
+    )
+
 @router.post("/invoices/{invoice_id}/archive", response_model=ArchiveItemOut)
 async def archive_invoice(invoice_id: str, current_user: Annotated[UserInDB, Depends(get_current_user)], db: Database = Depends(get_db), case_id: Optional[str] = Query(None), lang: Optional[str] = Query("sq")):
     finance_service = FinanceService(db)
@@ -16,7 +16,7 @@ from datetime import datetime, timezone
 
 from app.models.user import UserInDB
 from app.services.ontology_service import ontology_service
-from app.services import storage_service
+from app.services import storage_service, document_text_service
 from app.api.endpoints.dependencies import get_current_user, get_db
 
 router = APIRouter()
@@ -107,16 +107,20 @@ def _rebuild_case_graph_background(case_id: str, owner_id: str, db_instance: Dat
             doc_name = doc.get("file_name") or doc.get("title") or "Dokument"
             doc_oid = ObjectId(doc_id)
             
-            chunks = list(db_instance.user_vectors.find({
-                "$or": [
-                    {"document_id": doc_id},
-                    {"document_id": doc_oid},
-                    {"case_id": case_id}
-                ]
-            }))
-
             text_content = ""
-            if chunks:
+            from_store = False
+            if doc.get("text_index"):
+                text_content = document_text_service.read_document_text(db_instance, doc)
+                from_store = bool(text_content)
+
+            if not text_content:
+                chunks = list(db_instance.user_vectors.find({
+                    "$or": [
+                        {"document_id": doc_id},
+                        {"document_id": doc_oid},
+                        {"case_id": case_id}
+                    ]
+                }))
                 chunk_texts = [
                     str(c.get("text") or c.get("content") or "")
                     for c in chunks if (c.get("text") or c.get("content"))
@@ -141,10 +145,9 @@ def _rebuild_case_graph_background(case_id: str, owner_id: str, db_instance: Dat
                         logger.error(f"❌ Storage fetch failed for doc {doc_id}: {err}")
 
             if text_content and len(text_content.strip()) > 30:
-                db_instance.documents.update_one(
-                    {"_id": doc_oid},
-                    {"$set": {"text_content": text_content, "extracted_text": text_content}}
-                )
+                if not from_store:
+                    # Full text goes to the paged store; the document keeps only the inline head
+                    document_text_service.store_document_text(db_instance, doc_id, text_content)
 
                 logger.info(f"🚀 Sending {len(text_content)} chars of OCR/text to DeepSeek ontology builder for doc {doc_id}...")
                 ontology_service.process_and_save_document_ontology(
@@ -1,13 +1,14 @@
 # FILE: backend/app/api/endpoints/laws_pkg/laws_query_router.py
-# PHOENIX PROTOCOL - LAWS QUERY ROUTER V70.0 (ROBUST ACRONYM RESOLVER & SAFE BOUNDS)
+# PHOENIX PROTOCOL - LAWS QUERY ROUTER V72.0 (ROBUST ACRONYM RESOLVER & SAFE BOUNDS • MATERIALIZED TITLES • ARTICLE INDEX)
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Set, List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+from typing import Set, List, Optional
+import asyncio
 import logging
-import os
 import re
 
-from app.services import vector_store_service, storage_service
+from app.services import vector_store_service, law_catalog_service, public_portal_service, article_index_service
 from app.api.endpoints.dependencies import get_current_user
 from app.api.endpoints.laws_pkg.laws_dictionary import _normalize_hallucinated_title, _natural_sort_key
 from app.api.endpoints.laws_pkg.laws_search_service import find_documents_by_title, find_law_documents, _generate_source_info
@@ -29,31 +30,23 @@ LAW_ACRONYMS = {
 }
 
 
-def _get_b2_filenames(prefix: str) -> List[str]:
-    """Helper to list PDF files from a specific Backblaze B2 directory prefix."""
-    filenames = []
-    try:
-        s3 = storage_service.get_s3_client()
-        bucket = storage_service.B2_BUCKET_NAME
-        b2_response = s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
-        for obj in b2_response.get('Contents', []):
-            key = obj.get('Key', '')
-            fname = os.path.basename(key)
-            if fname and fname.lower().endswith('.pdf'):
-                filenames.append(fname)
-    except Exception as e:
-        logger.warning(f"B2 list failed for prefix '{prefix}': {e}")
-    return filenames
-
-
 @router.get("/case-page")
-async def get_case_starting_page(law_title: str = Query(...), current_user = Depends(get_current_user)):
-    """Returns the exact starting page number for a selected court decision or statute."""
+async def get_case_starting_page(
+    law_title: str = Query(...),
+    article_number: Optional[str] = Query(None, description="Jump to this article of a statute"),
+    current_user = Depends(get_current_user)
+):
+    """Returns the exact starting page number for a selected court decision or statute (or one of its articles)."""
     try:
         from app.core.db import get_db_instance
         db = get_db_instance()
         clean_title = law_title.strip()
 
+        # Statutes: answered from the in-memory article index
+        page_val = await asyncio.to_thread(article_index_service.page_for, db, clean_title, article_number)
+        if page_val is not None:
+            return {"page": page_val, "page_number": page_val, "law_title": clean_title}
+
         doc = db.legal_knowledge_base.find_one(
             {"$or": [
                 {"law_title": clean_title},
@@ -76,38 +69,34 @@ async def get_case_starting_page(law_title: str = Query(...), current_user = Dep
 
 
 @router.get("/titles")
-async def get_law_titles(current_user = Depends(get_current_user)):
+async def get_law_titles(
+    request: Request,
+    q: Optional[str] = Query(None, description="Filter on title, file name or law number"),
+    category: Optional[str] = Query(None, pattern="^(statute|academic|caselaw)$"),
+    page: Optional[int] = Query(None, ge=1, description="Enables the paged response"),
+    limit: int = Query(50, ge=1, le=500),
+    current_user = Depends(get_current_user)
+):
+    """
+    Law library index served from the materialized 'law_catalog' (services/law_catalog_service.py).
+    Without page/q/category it returns the original grouped lists; otherwise one page of catalog rows.
+    """
     try:
         from app.core.db import get_db_instance
         db = get_db_instance()
-        
-        academic_db_sources = db.legal_knowledge_base.distinct("source", {"category": "academic"})
-        b2_academic = _get_b2_filenames("academic/")
-        
-        raw_academic_sources = set([
-            s.strip() for s in (academic_db_sources + b2_academic) 
-            if s and s.strip() and s.lower().endswith('.pdf')
-        ])
-        clean_academic = sorted(list(raw_academic_sources))
-
-        caselaw_db_titles = db.legal_knowledge_base.distinct("law_title", {"category": "caselaw"})
-        caselaw_db_sources = db.legal_knowledge_base.distinct("source", {"category": "caselaw"})
-        b2_caselaw = _get_b2_filenames("case_law/")
 
-        raw_caselaw = set([t.strip() for t in (caselaw_db_titles + caselaw_db_sources + b2_caselaw) if t and t.strip()])
-        clean_caselaw = sorted(list(raw_caselaw))
-
-        all_titles = db.legal_knowledge_base.distinct("law_title", {"category": {"$nin": ["academic", "caselaw"]}})
-        all_sources = db.legal_knowledge_base.distinct("source", {"category": {"$nin": ["academic", "caselaw"]}})
-        raw_statutes = [t.strip() for t in (all_titles + all_sources) if t and t.strip() and not t.lower().endswith('.pdf')]
-        clean_statutes = sorted(list(set(raw_statutes)))
-
-        return {
-            "statutes": clean_statutes,
-            "academic_manuals": clean_academic,
-            "case_law": clean_caselaw,
-            "all_titles": sorted(list(set(clean_statutes + clean_academic + clean_caselaw)))
-        }
+        paged = page is not None or q or category
+        if paged:
+            result = await asyncio.to_thread(law_catalog_service.query, db, q, category, page or 1, limit)
+            version = result["version"]
+        else:
+            version, result = await asyncio.to_thread(law_catalog_service.legacy_titles, db)
+
+        etag = law_catalog_service.etag_for(version, q, category, page, limit if paged else None)
+        headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+        if public_portal_service.etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(result, headers=headers)
     except Exception as e:
         logger.error(f"Error fetching law titles: {e}")
         raise HTTPException(status_code=500, detail=f"Error fetching titles: {str(e)}")
@@ -179,7 +168,7 @@ async def get_law_article(
             clean_law_title = LAW_ACRONYMS[clean_key]
 
         if clean_law_title.lower().startswith("neni") or clean_law_title == clean_art or clean_law_title == "Ligji përkatës":
-            fallback_doc = db.legal_knowledge_base.find_one({
+            fallback_doc = await asyncio.to_thread(db.legal_knowledge_base.find_one, {
                 "article_number": clean_art,
                 "category": {"$nin": ["academic", "caselaw"]}
             })
@@ -187,16 +176,17 @@ async def get_law_article(
                 clean_law_title = fallback_doc.get("law_title")
 
         try:
-            statute_docs, academic_doc, metadata = find_law_documents(db, clean_law_title, clean_art)
+            # Off the event loop: the article-map path can reload the map under a lock
+            statute_docs, academic_doc, metadata = await asyncio.to_thread(find_law_documents, db, clean_law_title, clean_art)
         except Exception as find_err:
             logger.warning(f"find_law_documents warning: {find_err}")
             statute_docs, academic_doc, metadata = [], None, {}
         
         if not statute_docs or len(statute_docs) == 0:
-            fallback_docs = list(db.legal_knowledge_base.find({
+            fallback_docs = await asyncio.to_thread(lambda: list(db.legal_knowledge_base.find({
                 "article_number": clean_art,
                 "category": {"$nin": ["academic", "caselaw"]}
-            }).limit(5))
+            }).limit(5)))
             if fallback_docs:
                 statute_docs = fallback_docs
 
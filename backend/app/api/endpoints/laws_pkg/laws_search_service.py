@@ -1,8 +1,22 @@
 # FILE: backend/app/api/endpoints/laws_pkg/laws_search_service.py
+# "Neni N of Law X" is first a point lookup in the article index (article_index_service). Title / article /
+# case-number lookups then go through the lexical index (lexical_index_service) when it has been built; the
+# $regex queries below remain as the fallback for a deployment without the index file.
 import re
-import os
 from typing import List, Optional, Tuple, Dict, Any
+from bson import ObjectId
 from app.api.endpoints.laws_pkg.laws_dictionary import _is_academic_file, _normalize_hallucinated_title, _strip_alpha
+from app.services import article_index_service, law_file_catalog, lexical_index_service
+
+ACADEMIC_CATEGORIES = ["academic", "caselaw"]
+
+
+def _docs_by_chunk_ids(db, chunk_ids: List[str], projection: Optional[dict] = None) -> List[dict]:
+    """Mongo documents for index hits, in hit order."""
+    ids = [ObjectId(c) if ObjectId.is_valid(c) else c for c in chunk_ids]
+    by_id = {str(d["_id"]): d for d in db.legal_knowledge_base.find({"_id": {"$in": ids}}, projection)}
+    return [by_id[c] for c in chunk_ids if c in by_id]
+
 
 def find_documents_by_title(db, raw_title: str, fields: Optional[dict] = None) -> List[dict]:
     title = raw_title.strip()
@@ -10,6 +24,14 @@ def find_documents_by_title(db, raw_title: str, fields: Optional[dict] = None) -
         return []
 
     projection = fields if fields else None
+    index = lexical_index_service.get_index()
+    if index is not None:
+        categories = ACADEMIC_CATEGORIES if _is_academic_file(title) else ["statute"]
+        hits = index.find_titles(title, limit=1, categories=categories)
+        if hits:
+            return list(db.legal_knowledge_base.find({"source": hits[0]["source"]}, projection).sort("chunk_index", 1).limit(100))
+        # A miss can be a source ingested after the last index build: the regex scan below still sees it
+
     stop_words = {"ligji", "kodi", "për", "per", "dhe", "i", "e", "të", "te", "së", "se", "nr", "nr.", "republikës", "republikes", "kosovës", "kosoves", "web", "pdf"}
     
     words = [re.escape(w) for w in re.findall(r'\w+', title) if len(w) >= 3 and w.lower() not in stop_words]
@@ -106,19 +128,26 @@ def find_law_documents(db, raw_law_title: str, raw_article_num: str) -> Tuple[Li
     mapped_title = _normalize_hallucinated_title(raw_law_title, str(raw_article_num))
     is_academic = _is_academic_file(raw_law_title) or _is_academic_file(mapped_title)
     clean_art = str(raw_article_num).replace('Neni', '').replace('neni', '').replace('.', '').strip()
-    
+    index = lexical_index_service.get_index()
+
     if is_academic:
         case_num_match = re.search(r'\d+', clean_art)
         if case_num_match:
             case_num = case_num_match.group(0)
             case_regex = f"LËNDA\\s+(?:NR\\.\\s*)?{case_num}\\b"
-            case_docs = list(db.legal_knowledge_base.find({
-                "$or": [
-                    {"text": {"$regex": case_regex, "$options": "i"}},
-                    {"article_number": {"$regex": f"{case_num}\\b", "$options": "i"}}
-                ],
-                "source": {"$regex": "AKADEMIA|Case_Law", "$options": "i"}
-            }).sort("chunk_index", 1).limit(10))
+            if index is not None:
+                # Both forms of the regex below: 'LËNDA NR. 123' and 'LËNDA 123'
+                hits = index.search(f'"lënda nr {case_num}" "lënda {case_num}"', limit=10, categories=ACADEMIC_CATEGORIES)
+                hits = hits or index.find_article(case_num, categories=ACADEMIC_CATEGORIES, limit=10)
+                case_docs = _docs_by_chunk_ids(db, [h["chunk_id"] for h in hits])
+            else:
+                case_docs = list(db.legal_knowledge_base.find({
+                    "$or": [
+                        {"text": {"$regex": case_regex, "$options": "i"}},
+                        {"article_number": {"$regex": f"{case_num}\\b", "$options": "i"}}
+                    ],
+                    "source": {"$regex": "AKADEMIA|Case_Law", "$options": "i"}
+                }).sort("chunk_index", 1).limit(10))
 
             if case_docs:
                 return case_docs, None, {
@@ -144,9 +173,28 @@ def find_law_documents(db, raw_law_title: str, raw_article_num: str) -> Tuple[Li
     }
 
     academic_regex = "AKADEMIA|Doracak|Udhezues|Udhëzues|Commentary|Case_Law|LËNDËSH|LENDESH"
+    if not is_academic:
+        # 'Neni 91.3' -> article 91 (the whole article is returned; the paragraph is cut by the caller)
+        article_key = re.sub(r'(?i)neni', '', str(raw_article_num)).strip().split('.')[0]
+        hit = article_index_service.lookup(db, mapped_title or raw_law_title, article_key)
+        if hit:
+            academic_doc = None
+            if index is not None:
+                academic_hits = index.find_article(article_key, categories=ACADEMIC_CATEGORIES, limit=1)
+                academic_doc = next(iter(_docs_by_chunk_ids(db, [h["chunk_id"] for h in academic_hits])), None)
+            return hit["docs"], academic_doc, {**metadata, "strategy_used": "article_index"}
+
     candidate_docs = find_documents_by_title(db, mapped_title if mapped_title else raw_law_title)
     
-    if candidate_docs:
+    if candidate_docs and index is not None:
+        hits = index.find_article(clean_art, sources=[candidate_docs[0].get("source", "")])
+        statute_docs = _docs_by_chunk_ids(db, [h["chunk_id"] for h in hits])
+        if statute_docs:
+            academic_hits = index.find_article(clean_art, categories=ACADEMIC_CATEGORIES, limit=1)
+            academic_doc = next(iter(_docs_by_chunk_ids(db, [h["chunk_id"] for h in academic_hits])), None)
+            return statute_docs, academic_doc, metadata
+
+    elif candidate_docs:
         matched_title = candidate_docs[0].get("law_title") or mapped_title
         statute_docs = list(db.legal_knowledge_base.find({
             "law_title": matched_title,
@@ -163,34 +211,8 @@ def find_law_documents(db, raw_law_title: str, raw_article_num: str) -> Tuple[Li
     return candidate_docs[:3] if candidate_docs else ([], None, metadata)
 
 def find_pdf_by_number_pair(requested_name: str) -> Optional[str]:
-    target_clean = _strip_alpha(requested_name)
-    
-    current_file = os.path.abspath(__file__)
-    endpoints_dir = os.path.dirname(current_file)
-    laws_pkg_dir = os.path.dirname(endpoints_dir)
-    api_dir = os.path.dirname(laws_pkg_dir)
-    app_dir = os.path.dirname(api_dir)
-    backend_dir = os.path.dirname(app_dir)
-    project_root = os.path.dirname(backend_dir)
-
-    search_dirs = [
-        os.path.join(project_root, "data", "laws", "ks"),
-        os.path.join(project_root, "data", "academic"),
-        os.path.join(project_root, "data", "laws"),
-        os.path.join(backend_dir, "data", "laws", "ks"),
-        os.path.join(backend_dir, "data", "academic"),
-        os.path.join(backend_dir, "data", "laws"),
-        "data/laws/ks",
-        "data/academic",
-        "data/laws"
-    ]
-
-    for search_dir in search_dirs:
-        if not os.path.exists(search_dir): continue
-        for root, _, files in os.walk(search_dir):
-            for f in files:
-                if not f.lower().endswith('.pdf'): continue
-                if _strip_alpha(f) == target_clean:
-                    return os.path.join(root, f)
-
-    return None
\ No newline at end of file
+    """Local path of the law/academic PDF whose alphanumeric key equals the requested name (catalog lookup)."""
+    entry = law_file_catalog.current().by_alpha.get(_strip_alpha(requested_name))
+    if entry and entry.path and entry.kind in ("laws", "academic"):
+        return entry.path
+    return None
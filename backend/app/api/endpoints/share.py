@@ -2,14 +2,14 @@
 # PHOENIX PROTOCOL - SMART SHARE ENDPOINT V3.1 (SAFE PUBLIC PORTAL API)
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse, JSONResponse, Response
 from pymongo.database import Database
 from typing import Optional
 from bson import ObjectId
 import logging
 
 from app.api.endpoints.dependencies import get_db
-from app.services import case_service, storage_service
+from app.services import case_service, storage_service, public_portal_service
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -27,16 +27,21 @@ async def get_landing_preview():
 @router.get("/public/{case_id}/timeline")
 async def get_public_case_timeline(
     case_id: str,
+    request: Request,
     db: Database = Depends(get_db)
 ):
     """
     Public endpoint for the Client Portal to fetch case timeline, shared documents, and basic metadata.
+    Served from the materialized snapshot with a strong ETag (304 on If-None-Match).
     """
     try:
-        case_data = case_service.get_public_case_events(db, case_id)
-        if not case_data:
+        snapshot = public_portal_service.get_snapshot(db, case_id)
+        if not snapshot:
             raise HTTPException(status_code=404, detail="Case not found or not public.")
-        return JSONResponse(case_data)
+        headers = {"ETag": snapshot["etag"], "Cache-Control": public_portal_service.PUBLIC_CACHE_CONTROL}
+        if public_portal_service.etag_matches(request.headers.get("if-none-match"), snapshot["etag"]):
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(snapshot["payload"], headers=headers)
     except HTTPException as he:
         raise he
     except Exception as e:
@@ -117,7 +122,8 @@ async def get_smart_share_preview(
     case_id: str, 
     db: Database = Depends(get_db)
 ):
-    case_data = case_service.get_public_case_events(db, case_id)
+    snapshot = public_portal_service.get_snapshot(db, case_id)
+    case_data = snapshot["payload"] if snapshot else None
     
     if not case_data:
         return f"""
@@ -181,4 +187,7 @@ async def get_smart_share_preview(
     </html>
     """
     
-    return HTMLResponse(content=html_content, status_code=200)
\ No newline at end of file
+    headers = {"ETag": snapshot["etag"], "Cache-Control": public_portal_service.PUBLIC_CACHE_CONTROL}
+    if public_portal_service.etag_matches(request.headers.get("if-none-match"), snapshot["etag"]):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content=html_content, status_code=200, headers=headers)
\ No newline at end of file
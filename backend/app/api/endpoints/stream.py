@@ -1,6 +1,8 @@
 # FILE: backend/app/api/endpoints/stream.py
-# PHOENIX PROTOCOL - ASYNCHRONOUS SSE IMPLEMENTATION V4.5 (Pylance Type Fix)
+# PHOENIX PROTOCOL - ASYNCHRONOUS SSE IMPLEMENTATION V5.0 (LOW-LATENCY PUB/SUB RELAY)
 # 1. FIX: Changed 'stream_id: Path(...)' to 'stream_id: str = Path(...)' to resolve the Pylance type annotation warning.
+# 2. PERF: Messages are relayed as soon as Redis delivers them. The fixed 0.5s sleep after every message capped
+#    token streams from Celery workers at two frames per second; pings are now sent only while the channel is idle.
 
 import asyncio
 import logging
@@ -15,6 +17,8 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+PING_INTERVAL = 1.0
+
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
 
@@ -78,17 +82,14 @@ async def event_generator(
         await pubsub.get_message(timeout=1.0)
         
         while True:
-            # Fetch message asynchronously without blocking the loop
-            message = await pubsub.get_message(timeout=1.0, ignore_subscribe_messages=True)
+            # Awaits up to PING_INTERVAL for the next message without blocking the loop
+            message = await pubsub.get_message(timeout=PING_INTERVAL, ignore_subscribe_messages=True)
             if message and message.get('type') == 'message':
                 yield f"event: update\ndata: {message['data']}\n\n"
             else:
-                # Force reverse proxy to flush response buffer immediately using a structured event
+                # Idle channel: force reverse proxy to flush response buffer using a structured event
                 yield "event: ping\ndata: {}\n\n"
             
-            # Non-blocking sleep prevents execution-loop starvation
-            await asyncio.sleep(0.5)
-            
     except asyncio.CancelledError:
         logger.info(f"SSE: Connection closed by client for channel: {channel}")
     except Exception as e:
@@ -12,6 +12,16 @@ redis_url = os.getenv("REDIS_URL", "redis://redis:6379/0")
 
 celery_app = Celery("tasks", broker=redis_url, backend=redis_url)
 
+# Every module that defines tasks; also imported by scripts/worker_smoke_test.py
+TASK_MODULES = [
+    'app.tasks.document_processing',
+    'app.tasks.deadline_extraction',
+    'app.tasks.chat_tasks',
+    'app.tasks.drafting_tasks',
+    'app.tasks.email_tasks',
+    'app.tasks.case_deletion',
+]
+
 def configure_celery_app():
     """
     This function applies the full configuration to the Celery app.
@@ -35,14 +45,11 @@ def configure_celery_app():
     # Load any additional task-related configuration from celery_config.py
     celery_app.config_from_object('app.celery_config')
 
+    # Registers worker_process_init/shutdown handlers (one Mongo/Redis/LLM client per forked process)
+    from .core import worker_context  # noqa: F401
+
     # Define the modules where tasks are located.
-    celery_app.autodiscover_tasks([
-        'app.tasks.document_processing',
-        'app.tasks.deadline_extraction',
-        'app.tasks.findings_extraction',
-        'app.tasks.chat_tasks',
-        'app.tasks.drafting_tasks',
-    ])
+    celery_app.autodiscover_tasks(TASK_MODULES)
     
     logging.getLogger(__name__).info("--- [Celery App] Celery application fully configured for worker. ---")
 
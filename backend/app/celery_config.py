@@ -1,11 +1,36 @@
 # File: app/celery_config.py
 # DEFINITIVE CELERY FIX: Centralized worker configuration.
+# Document pipeline stages run on their own queues. A worker started without -Q consumes every queue below.
+# Dedicated pools can be sized per stage, e.g.:
+#   celery -A app.worker.celery_app worker -Q doc_ocr -c 2
+#   celery -A app.worker.celery_app worker -Q doc_llm -c 8
+#   celery -A app.worker.celery_app beat          (runs the stale-pipeline reaper)
+
+from kombu import Queue
 
 # This is the list of all modules that the Celery WORKER should discover tasks from.
 # The backend/producer code will NOT import this file.
 include = [
     "app.tasks.document_processing",
-    "app.tasks.deadline_extraction"
+    "app.tasks.deadline_extraction",
+    "app.tasks.chat_tasks",
+    "app.tasks.drafting_tasks",
+    "app.tasks.email_tasks",
+    "app.tasks.case_deletion"
 ]
 
-task_track_started = True
\ No newline at end of file
+task_track_started = True
+
+task_default_queue = "celery"
+task_queues = [Queue("celery"), Queue("doc_io"), Queue("doc_cpu"), Queue("doc_ocr"), Queue("doc_llm")]
+
+beat_schedule = {
+    "reap-stale-document-pipelines": {
+        "task": "reap_stale_document_pipelines",
+        "schedule": 120.0,
+    },
+    "reap-stale-case-deletions": {
+        "task": "reap_stale_case_deletions",
+        "schedule": 300.0,
+    },
+}
\ No newline at end of file
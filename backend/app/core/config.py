@@ -34,6 +34,8 @@ class Settings(BaseSettings):
 
     OPENAI_API_KEY: str = ""
     OPENROUTER_API_KEY: str = ""
+    LLM_CACHE_ENABLED: bool = True
+    RAG_CONTEXT_TOKEN_BUDGET: int = 0  # 0 = use the per-model default in context_packer
 
     # B2 Storage
     B2_KEY_ID: str = ""
@@ -4,7 +4,10 @@
 # 2. STATUS: Clean, robust, and aligned with dependencies.py.
 
 import os
+import asyncio
 import logging
+import threading
+from typing import Any, Dict
 from pymongo import MongoClient
 from pymongo.database import Database
 import redis
@@ -16,6 +19,12 @@ logger = logging.getLogger(__name__)
 # --- GLOBAL CONNECTION POOLS ---
 _mongo_client = None
 _redis_client = None
+# Motor clients are bound to the loop they were created on: one client per live loop
+_motor_clients: Dict[asyncio.AbstractEventLoop, Any] = {}
+_motor_lock = threading.Lock()
+
+# Shared by the sync (pymongo) and async (motor) clients
+MONGO_POOL_SETTINGS = {"maxPoolSize": 50, "serverSelectionTimeoutMS": 5000}
 
 # --- MONGODB CONNECTION ---
 def connect_to_mongo() -> tuple[MongoClient, Database]:
@@ -25,7 +34,7 @@ def connect_to_mongo() -> tuple[MongoClient, Database]:
     if not uri: raise ValueError("DATABASE_URI missing.")
     try:
         if _mongo_client is None:
-            _mongo_client = MongoClient(uri, maxPoolSize=50, serverSelectionTimeoutMS=5000)
+            _mongo_client = MongoClient(uri, **MONGO_POOL_SETTINGS)
             _mongo_client.admin.command('ping')
         return _mongo_client, _mongo_client[db_name]
     except Exception as e:
@@ -37,6 +46,46 @@ def close_mongo_connections():
     if _mongo_client:
         _mongo_client.close()
         _mongo_client = None
+    with _motor_lock:
+        for client in _motor_clients.values():
+            client.close()
+        _motor_clients.clear()
+
+def reset_connections_after_fork():
+    """
+    Drops client references inherited from the parent process without closing them
+    (closing would tear down the parent's sockets). Called from Celery's worker_process_init.
+    """
+    global _mongo_client, _redis_client, _motor_clients
+    _mongo_client = None
+    _redis_client = None
+    _motor_clients = {}
+
+# --- ASYNC MONGODB (MOTOR) CONNECTION ---
+def get_async_db() -> Any:
+    """
+    Returns the Motor database for the running event loop.
+    Motor clients are bound to the loop they were created on, so each loop gets its own client
+    (e.g. asyncio.run inside Celery tasks) and the uvicorn loop's client is never touched.
+    Clients of loops that have since closed are closed and dropped here.
+    """
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    uri = settings.DATABASE_URI
+    db_name = settings.MONGO_DB_NAME or "advocatus_db"
+    if not uri: raise ValueError("DATABASE_URI missing.")
+
+    loop = asyncio.get_running_loop()
+    client = _motor_clients.get(loop)
+    if client is None:
+        with _motor_lock:
+            for dead in [l for l in _motor_clients if l.is_closed()]:
+                _motor_clients.pop(dead).close()
+            client = _motor_clients.get(loop)
+            if client is None:
+                client = AsyncIOMotorClient(uri, **MONGO_POOL_SETTINGS)
+                _motor_clients[loop] = client
+    return client[db_name]
 
 # --- REDIS CONNECTION ---
 def connect_to_redis() -> redis.Redis:
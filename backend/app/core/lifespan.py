@@ -4,6 +4,9 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import logging
 from .db import connect_to_mongo, connect_to_redis, close_mongo_connections, close_redis_connection
+from . import loop_monitor
+from app.services import public_portal_service, email_outbox, invoice_export_service, document_pipeline, document_text_service, case_deletion_service, law_file_catalog, law_catalog_service, article_index_service, ocr_engine_service
+from app.services.calendar_service import calendar_service
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +17,18 @@ async def lifespan(app: FastAPI):
     # 1. Mongo Handshake
     _, db_instance = connect_to_mongo()
     app.state.mongo_db = db_instance
+    public_portal_service.ensure_indexes(db_instance)
+    email_outbox.ensure_indexes(db_instance)
+    document_pipeline.ensure_indexes(db_instance)
+    document_text_service.ensure_indexes(db_instance)
+    case_deletion_service.ensure_indexes(db_instance)
+    law_catalog_service.ensure_indexes(db_instance)
+    article_index_service.ensure_indexes(db_instance)
+    ocr_engine_service.ensure_indexes(db_instance)
+    try:
+        calendar_service.ensure_indexes(db_instance)
+    except Exception as e:
+        logger.warning(f"Calendar index creation skipped: {e}")
     
     # 2. Redis Handshake
     try:
@@ -21,7 +36,18 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Redis skipped: {e}")
 
+    # 3. Event loop lag sampling (reported on /health)
+    loop_monitor.start()
+
+    # 4. Law PDF catalog (in-memory index for /laws/pdf, refreshed in the background) and /laws/titles warm-up
+    law_file_catalog.start()
+    law_catalog_service.start(db_instance)
+
     yield
     
+    await loop_monitor.stop()
+    law_file_catalog.stop()
+    invoice_export_service.shutdown_pool()
+    ocr_engine_service.shutdown_pool()
     close_mongo_connections()
     close_redis_connection()
\ No newline at end of file
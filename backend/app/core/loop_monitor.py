@@ -0,0 +1,59 @@
+# FILE: backend/app/core/loop_monitor.py
+# PHOENIX PROTOCOL - EVENT LOOP LAG MONITOR V1.0
+# 1. Measures how late the event loop wakes up a periodic sleeper (blocking calls show up as lag).
+# 2. Exposed through /health so lag can be compared before and after moving hot paths to Motor.
+
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+INTERVAL_SECONDS = 0.25
+WINDOW_SIZE = 240          # ~60 s of samples at the default interval
+WARN_LAG_MS = 200.0
+
+_samples: Deque[float] = deque(maxlen=WINDOW_SIZE)
+_task: Optional[asyncio.Task] = None
+
+
+async def _run(interval: float) -> None:
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag_ms = max(0.0, (time.perf_counter() - started - interval) * 1000)
+        _samples.append(lag_ms)
+        if lag_ms > WARN_LAG_MS:
+            logger.warning(f"⚠️ Event loop lag {lag_ms:.0f} ms")
+
+
+def start(interval: float = INTERVAL_SECONDS) -> None:
+    global _task
+    if _task is None or _task.done():
+        _task = asyncio.get_running_loop().create_task(_run(interval))
+
+
+async def stop() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+
+
+def snapshot() -> Dict[str, float]:
+    if not _samples:
+        return {"samples": 0, "avg_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(_samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return {
+        "samples": len(ordered),
+        "avg_ms": round(sum(ordered) / len(ordered), 2),
+        "p99_ms": round(p99, 2),
+        "max_ms": round(ordered[-1], 2),
+    }
@@ -0,0 +1,93 @@
+# FILE: backend/app/core/worker_context.py
+# PHOENIX PROTOCOL - CELERY WORKER BOOTSTRAP V1.0 (FORK-SAFE CONTEXT)
+# 1. worker_process_init: every forked child drops inherited sockets and opens ONE pooled
+#    Mongo client, ONE Redis client and ONE LLM HTTP client of its own.
+# 2. Tasks receive these through a WorkerContext (self.ctx on ContextTask) instead of importing globals.
+# 3. worker_process_shutdown closes them; get_worker_context() also works in solo/eager mode where no fork happens.
+
+import os
+import logging
+import threading
+from typing import Any, Optional
+
+from celery import Task
+from celery.signals import worker_process_init, worker_process_shutdown
+from pymongo import MongoClient
+from pymongo.database import Database
+import redis
+
+from app.core import db as core_db
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerContext:
+    """Lidhjet e ndara të një procesi punëtor: Mongo, Redis dhe klienti HTTP i LLM."""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        mongo_client, database = core_db.connect_to_mongo()
+        self.mongo_client: MongoClient = mongo_client
+        self.db: Database = database
+        self.redis: redis.Redis = core_db.connect_to_redis()
+        from app.services.llm.llm_client import _get_sync_client
+        self.llm: Any = _get_sync_client()
+
+    def close(self) -> None:
+        try:
+            core_db.close_mongo_connections()
+            core_db.close_redis_connection()
+        except Exception as e:
+            logger.warning(f"[Worker] Connection shutdown error: {e}")
+
+
+_context: Optional[WorkerContext] = None
+_lock = threading.Lock()
+
+
+def get_worker_context() -> WorkerContext:
+    global _context
+    if _context is None or _context.pid != os.getpid():
+        with _lock:
+            if _context is None or _context.pid != os.getpid():
+                if _context is not None:
+                    # Created in a parent process (e.g. connections opened before fork); never reuse those sockets
+                    _reset_inherited()
+                _context = WorkerContext()
+    return _context
+
+
+def _reset_inherited() -> None:
+    global _context
+    _context = None
+    core_db.reset_connections_after_fork()
+    from app.services.llm import llm_client
+    llm_client.reset_clients()
+
+
+@worker_process_init.connect
+def _init_worker_process(**_kwargs) -> None:
+    _reset_inherited()
+    try:
+        get_worker_context()
+        logger.info(f"[Worker] Process {os.getpid()} bootstrapped (Mongo, Redis, LLM client).")
+    except Exception as e:
+        # Tasks retry the bootstrap lazily through get_worker_context()
+        logger.error(f"[Worker] Process {os.getpid()} bootstrap failed: {e}")
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**_kwargs) -> None:
+    global _context
+    if _context is not None and _context.pid == os.getpid():
+        _context.close()
+    _context = None
+
+
+class ContextTask(Task):
+    """Base class for tasks: `self.ctx` is the per-process WorkerContext."""
+    abstract = True
+
+    @property
+    def ctx(self) -> WorkerContext:
+        return get_worker_context()
@@ -10,6 +10,7 @@ from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 
 from .core.lifespan import lifespan
 from .core.config import settings
+from .core import loop_monitor
 
 # Router Imports
 from .api.endpoints.auth import router as auth_router
@@ -100,7 +101,7 @@ app.include_router(api_v2_router)
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "version": "1.3.5"}
+    return {"status": "ok", "version": "1.3.5", "event_loop_lag": loop_monitor.snapshot()}
 
 # Static Files Mount
 FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "frontend", "dist")
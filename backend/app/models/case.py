@@ -17,6 +17,8 @@ class ChatMessage(BaseModel):
     role: str 
     content: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    # Context packing report (tokens used, passages dropped) for AI answers
+    packing_report: Optional[Dict[str, Any]] = None
 
 # Base Case Model
 class CaseBase(BaseModel):
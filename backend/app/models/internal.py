@@ -6,8 +6,8 @@ from typing import Optional
 
 class ChatBroadcast(BaseModel):
     """
-    Payload for broadcasting a chat message chunk from a Celery worker
-    to the main application via an internal HTTP call.
+    Payload for a chat message chunk published by a Celery worker on the
+    user's Redis channel (see services/realtime_publisher.py).
     """
     user_id: str
     case_id: str
@@ -9,6 +9,8 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 from openai import OpenAI
 
+from app.services.llm import llm_cache
+
 logger = logging.getLogger(__name__)
 
 # --- CONFIGURATION ---
@@ -66,18 +68,23 @@ class AlbanianMetadataExtractor:
         Përgjigju VETËM me JSON të pastër.
         """
 
-        try:
+        user_content = f"DOKUMENTI:\n{truncated_text}"
+
+        def _complete() -> str:
             response = self.client.chat.completions.create(
                 model=OPENROUTER_MODEL,
                 messages=[
                     {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"DOKUMENTI:\n{truncated_text}"}
+                    {"role": "user", "content": user_content}
                 ],
                 temperature=0.0,
                 response_format={"type": "json_object"}
             )
-            
-            content = response.choices[0].message.content
+            return response.choices[0].message.content or ""
+
+        try:
+            cache_key = llm_cache.make_cache_key(OPENROUTER_MODEL, system_prompt, user_content, 0.0, json_mode=True, prompt_version="metadata-v6")
+            content = llm_cache.cached_call_sync(cache_key, llm_cache.TTL_EXTRACTION, _complete)
             if content:
                 return json.loads(content)
                 
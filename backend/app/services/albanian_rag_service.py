@@ -6,10 +6,12 @@ import sys
 import asyncio
 import logging
 import re
+import json
 from typing import List, Optional, Dict, Any, AsyncGenerator, Tuple
 from bson import ObjectId
 from openai import AsyncOpenAI
 from app.core.config import settings
+from app.services import context_packer, document_text_service
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -18,6 +20,11 @@ API_KEY = settings.OPENROUTER_API_KEY or os.environ.get("OPENROUTER_API_KEY") or
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 OPENROUTER_MODEL = "deepseek/deepseek-chat" 
 LLM_TIMEOUT = 60
+# Documents the user explicitly selected get this much of their full text instead of the inline 15 000-char head
+FOCUS_DOCUMENT_CHARS = 60000
+
+# SSE frame announcing that retrieval finished (only emitted when the client opts in)
+RETRIEVAL_EVENT_PREFIX = "event: retrieval\ndata: "
 
 AI_DISCLAIMER = "\n\n---\n*Kjo analizë ligjore është gjeneruar nga Juristi AI bazuar në shkresat e administruara të fashikullit. Për përdorim profesional.*"
 
@@ -25,6 +32,8 @@ AI_DISCLAIMER = "\n\n---\n*Kjo analizë ligjore është gjeneruar nga Juristi AI
 class AlbanianRAGService:
     def __init__(self, db: Any):
         self.db = db
+        self.last_packing_report: Dict[str, Any] = {}
+        self.last_retrieval_report: Dict[str, Any] = {}
         
         if API_KEY:
             self.client = AsyncOpenAI(
@@ -77,58 +86,79 @@ class AlbanianRAGService:
             ""
         ).strip()
 
-    def _build_context(self, case_docs: List[Dict], global_docs: List[Dict], db_documents: List[Dict]) -> Tuple[str, str]:
+    async def _expand_focus_documents(self, db_documents: List[Dict], document_ids: Optional[List[str]]) -> None:
+        focus = set(document_ids or [])
+        if not focus or self.db is None:
+            return
+
+        async def expand(doc: Dict) -> None:
+            try:
+                doc["extracted_text"] = await asyncio.to_thread(
+                    document_text_service.read_document_text, self.db, doc, FOCUS_DOCUMENT_CHARS
+                )
+            except Exception as e:
+                logger.warning(f"[RAG] Full text unavailable for {doc.get('_id')}: {e}")
+
+        await asyncio.gather(*(expand(d) for d in db_documents if str(d.get("_id")) in focus and d.get("text_index")))
+
+    def _build_context(self, case_docs: List[Dict], global_docs: List[Dict], db_documents: List[Dict],
+                       document_ids: Optional[List[str]] = None) -> Tuple[str, str]:
         manifest_lines = ["\n<<< REGJISTRI ZYRTAR I SKEDARËVE TË FASHIKULLIT (PËR CITIM ME LINKE) >>>\n"]
+        doc_links: Dict[str, str] = {}
+        for idx, doc in enumerate(db_documents, 1):
+            doc_id = str(doc.get("_id", ""))
+            file_name = doc.get("file_name") or doc.get("title") or "Dokument.pdf"
+            doc_links[doc_id] = f"[{file_name}](/documents/{doc_id})"
+            manifest_lines.append(f"{idx}. {doc_links[doc_id]}")
+
+        # Paketimi sipas buxhetit të tokenëve: renditje, deduplikim dhe prerje para ndërtimit të prompt-it
+        candidates = context_packer.build_candidates(
+            case_docs, global_docs, db_documents, self._get_expanded_text, focus_document_ids=document_ids
+        )
+        packed = context_packer.pack(candidates, model=OPENROUTER_MODEL)
+        self.last_packing_report = packed["report"]
+        passages = packed["passages"]
+
+        doc_passages: Dict[str, List[Any]] = {}
+        for p in passages:
+            if p.kind == context_packer.KIND_DOCUMENT:
+                doc_passages.setdefault(p.doc_id, []).append(p)
+
         context = "\n<<< PËRMBAJTJA E PLOTË E PROVEVE DHE DOKUMENTEVE TË LËNDËS >>>\n"
-        
         if db_documents:
             for idx, doc in enumerate(db_documents, 1):
                 doc_id = str(doc.get("_id", ""))
-                file_name = doc.get("file_name") or doc.get("title") or "Dokument.pdf"
-                
-                doc_clickable_link = f"[{file_name}](/documents/{doc_id})"
-                manifest_lines.append(f"{idx}. {doc_clickable_link}")
-
-                raw_t = (
-                    doc.get("extracted_text") or 
-                    doc.get("text_content") or 
-                    doc.get("text") or 
-                    doc.get("content") or 
-                    doc.get("summary") or 
-                    ""
-                )
-                summ = doc.get("summary") or ""
-                if summ == "Sinteza...":
-                    summ = ""
-
-                if raw_t and summ:
-                    text_content = f"PËRMBLEDHJE: {summ}\nPËRMBAJTJA E TEKSTIT:\n{raw_t[:14000]}"
-                elif raw_t:
-                    text_content = f"PËRMBAJTJA E TEKSTIT:\n{raw_t[:16000]}"
-                elif summ:
-                    text_content = f"PËRMBLEDHJE: {summ}"
+                selected = sorted(doc_passages.get(doc_id, []), key=lambda p: p.segment)
+                summary = next((p.text for p in selected if p.segment < 0), "")
+                segments = [p.text for p in selected if p.segment >= 0]
+
+                if summary and segments:
+                    text_content = f"PËRMBLEDHJE: {summary}\nPËRMBAJTJA E TEKSTIT:\n" + "\n[...]\n".join(segments)
+                elif segments:
+                    text_content = "PËRMBAJTJA E TEKSTIT:\n" + "\n[...]\n".join(segments)
+                elif summary:
+                    text_content = f"PËRMBLEDHJE: {summary}"
                 else:
                     text_content = "Dokument i administruar në fashikull."
 
                 context += f"\n==================== DOKUMENTI #{idx} ====================\n"
-                context += f"CITIMI I SAKTË: {doc_clickable_link}\n"
+                context += f"CITIMI I SAKTË: {doc_links[doc_id]}\n"
                 context += f"{text_content}\n"
                 context += f"===========================================================\n"
         else:
             context += "Nuk ka dokumente të bashkangjitura në fashikull.\n\n"
 
         context += "\n<<< PARAGRAFET SELEKTIVE NGA KËRKIMI SEMANTIK I LËNDËS >>>\n"
-        for idx, d in enumerate(case_docs):
-            text_content = self._get_expanded_text(d)
-            context += f"[{d.get('source') or 'Dokument'}, FAQJA: {d.get('page') or 'N/A'}]: {text_content}\n"
+        for p in passages:
+            if p.kind == context_packer.KIND_CASE_HIT:
+                context += f"[{p.source}, FAQJA: {p.meta.get('page')}]: {p.text}\n"
 
         context += "\n<<< BAZA LIGJORE STATUTORE E REPUBLIKËS SË KOSOVËS >>>\n"
-        for d in global_docs:
-            law_title = d.get('law_title') or d.get('source') or "Ligji përkatës"
-            article_num = d.get('article_number', 'N/A')
-            text_content = self._get_expanded_text(d)
-            context += f"LIGJI: {law_title}, Neni {article_num}\nPËRMBAJTJA: {text_content}\n"
+        for p in passages:
+            if p.kind == context_packer.KIND_LAW_HIT:
+                context += f"LIGJI: {p.source}, Neni {p.meta.get('article_number')}\nPËRMBAJTJA: {p.text}\n"
 
+        logger.info(f"[RAG] Context packing report: {self.last_packing_report}")
         return "\n".join(manifest_lines), context
 
     def _get_role_adapted_pillars(self, position: str) -> List[Tuple[str, str]]:
@@ -175,41 +205,54 @@ class AlbanianRAGService:
     async def chat(self, query: str, user_id: str, case_id: Optional[str] = None,
                    document_ids: Optional[List[str]] = None, jurisdiction: str = 'ks',
                    history: Optional[List[Dict[str, Any]]] = None,
-                   domain: Optional[str] = 'automatic') -> AsyncGenerator[str, None]:
+                   domain: Optional[str] = 'automatic',
+                   emit_events: bool = False) -> AsyncGenerator[str, None]:
         
         if not self.client:
             yield "Sistemi AI nuk është aktiv. Kontrolloni çelësat në Render."
             yield AI_DISCLAIMER
             return
 
-        from app.services import vector_store_service, llm_service
+        from app.services import llm_service, retrieval_orchestrator
 
         client_position = "DEFENDANT"
         client_name = "Pala Kliente"
         opposing_name = "Pala Kundërshtare"
         case_title = "Lënda Ligjore"
         case_desc = ""
-        db_documents = []
 
-        if case_id and self.db is not None:
-            try:
-                c_oid = ObjectId(case_id) if ObjectId.is_valid(case_id) else case_id
-                case_doc = self.db.cases.find_one({"_id": c_oid})
-                if case_doc:
-                    if case_doc.get("client_position") or case_doc.get("client_role"):
-                        client_position = str(case_doc.get("client_position") or case_doc.get("client_role")).upper()
-                    client_name = case_doc.get("client_name") or case_doc.get("client", {}).get("name") or client_name
-                    opposing_name = case_doc.get("opposing_party") or case_doc.get("opponent") or opposing_name
-                    case_title = case_doc.get("title") or case_doc.get("case_name") or case_title
-                    case_desc = case_doc.get("description") or ""
-
-                doc_cursor = self.db.documents.find({
-                    "$or": [{"case_id": case_id}, {"case_id": c_oid}], 
-                    "status": {"$ne": "DELETED"}
-                })
-                db_documents = list(doc_cursor)
-            except Exception as ex:
-                logger.warning(f"Could not read case documents: {ex}")
+        # Të gjitha degët e kërkimit (lënda, dokumentet, vektorët e lëndës, ligjet) ekzekutohen paralelisht
+        optimized_query = self._optimize_query(query)
+        def _query_for_case(loaded_case: Optional[Dict[str, Any]]) -> str:
+            # Si më parë: të dy kërkimet vektoriale përdorin pyetjen e pastruar me emrin e palës kundërshtare
+            opposing = (loaded_case or {}).get("opposing_party") or (loaded_case or {}).get("opponent") or opposing_name
+            return llm_service._sanitize_and_disambiguate_prompt(optimized_query, opposing_name=opposing)
+
+        retrieval = await retrieval_orchestrator.retrieve(
+            user_id=user_id,
+            query_text=llm_service._sanitize_and_disambiguate_prompt(optimized_query, opposing_name=opposing_name),
+            case_id=case_id,
+            case_results=16,
+            global_results=8,
+            document_ids=document_ids,
+            query_for_case=_query_for_case if case_id else None
+        )
+        self.last_retrieval_report = retrieval["report"]
+        if emit_events:
+            yield f"{RETRIEVAL_EVENT_PREFIX}{json.dumps(retrieval['report'])}\n\n"
+
+        case_doc = retrieval["case"]
+        db_documents = retrieval["documents"]
+        case_docs = retrieval["case_hits"]
+        global_docs = retrieval["global_hits"]
+
+        if case_doc:
+            if case_doc.get("client_position") or case_doc.get("client_role"):
+                client_position = str(case_doc.get("client_position") or case_doc.get("client_role")).upper()
+            client_name = case_doc.get("client_name") or case_doc.get("client", {}).get("name") or client_name
+            opposing_name = case_doc.get("opposing_party") or case_doc.get("opponent") or opposing_name
+            case_title = case_doc.get("title") or case_doc.get("case_name") or case_title
+            case_desc = case_doc.get("description") or ""
 
         identity_header = llm_service.build_dynamic_identity_header(
             client_name=client_name, 
@@ -217,18 +260,10 @@ class AlbanianRAGService:
             position=client_position
         )
 
-        optimized_query = self._optimize_query(query)
         sanitized_query = llm_service._sanitize_and_disambiguate_prompt(optimized_query, opposing_name=opposing_name)
 
-        case_docs = vector_store_service.query_case_knowledge_base(
-            user_id=user_id, query_text=sanitized_query, case_context_id=case_id, n_results=16
-        )
-
-        global_docs = vector_store_service.query_global_knowledge_base(
-            query_text=sanitized_query, n_results=8
-        )
-
-        manifest_str, context_str = self._build_context(case_docs, global_docs, db_documents)
+        await self._expand_focus_documents(db_documents, document_ids)
+        manifest_str, context_str = self._build_context(case_docs, global_docs, db_documents, document_ids=document_ids)
 
         # Llogaritja progresive e kartave (3 -> 2 -> 1 -> 0)
         remaining_pills = self._determine_remaining_pills(query=query, position=client_position, history=history)
@@ -9,29 +9,28 @@ from bson import ObjectId
 from datetime import datetime, timezone
 
 from .llm_service import _call_llm_async, clean_and_parse_json, build_dynamic_identity_header, FAST_MODEL
-from . import vector_store_service, report_service, archive_service
+from .llm.llm_cache import TTL_ANALYSIS
+from . import vector_store_service, report_service, archive_service, async_repository
 
 logger = structlog.get_logger(__name__)
 
 async def _fetch_rag_context_async(db: Database, case_id: str, user_id: str, include_laws: bool = True) -> str:
-    c_oid = ObjectId(case_id) if ObjectId.is_valid(case_id) else case_id
-    case = await asyncio.to_thread(db.cases.find_one, {"_id": c_oid})
+    case = await async_repository.get_case(case_id)
     
     q = f"{case.get('title', '')} {case.get('case_name', '')} {case.get('description', '')}" if case else "Legal analysis"
     
     tasks = [
-        asyncio.to_thread(vector_store_service.query_case_knowledge_base, user_id=user_id, query_text=q, case_context_id=case_id, n_results=15)
+        vector_store_service.query_case_knowledge_base_async(user_id=user_id, query_text=q, case_context_id=case_id, n_results=15),
+        async_repository.list_case_documents(case_id)
     ]
     if include_laws:
         law_query = f"{q} ligj neni LPK LMD KPRK KPPRK LFK"
-        tasks.append(asyncio.to_thread(vector_store_service.query_global_knowledge_base, query_text=law_query, n_results=15))
+        tasks.append(vector_store_service.query_global_knowledge_base_async(query_text=law_query, n_results=15))
     
     results = await asyncio.gather(*tasks)
     case_facts = results[0]
-    global_laws = results[1] if include_laws else []
-
-    doc_filter = {"$or": [{"case_id": case_id}, {"case_id": c_oid}], "status": {"$ne": "DELETED"}}
-    documents = await asyncio.to_thread(lambda: list(db.documents.find(doc_filter)))
+    documents = results[1]
+    global_laws = results[2] if include_laws else []
 
     blocks = ["<<< FASHIKULLI I PROVEVE MATERIALE (DOKUMENTE TË IZOLUARA) >>>\n"]
     
@@ -82,13 +81,20 @@ def authorize_case_access(db: Database, case_id: str, user_id: str) -> bool:
     except Exception: 
         return False
 
+async def authorize_case_access_async(case_id: str, user_id: str) -> bool:
+    try:
+        return await async_repository.get_owned_case(case_id, user_id) is not None
+    except Exception: 
+        return False
+
 async def _analyze_primary_integrity_async(context: str, system_prompt: str) -> Dict[str, Any]:
     raw = await _call_llm_async(
         system_prompt=system_prompt,
         user_content=context,
         json_mode=True,
         temperature=0.0,
-        model=FAST_MODEL
+        model=FAST_MODEL,
+        cache_ttl=TTL_ANALYSIS
     )
     return clean_and_parse_json(raw)
 
@@ -109,7 +115,8 @@ async def _generate_adversarial_simulation_async(context_with_role: str) -> Dict
         user_content=context_with_role,
         json_mode=True,
         temperature=0.0,
-        model=FAST_MODEL
+        model=FAST_MODEL,
+        cache_ttl=TTL_ANALYSIS
     )
     return clean_and_parse_json(raw)
 
@@ -128,7 +135,8 @@ async def _build_case_chronology_async(facts_only: str) -> Dict[str, Any]:
         user_content=facts_only,
         json_mode=True,
         temperature=0.0,
-        model=FAST_MODEL
+        model=FAST_MODEL,
+        cache_ttl=TTL_ANALYSIS
     )
     return clean_and_parse_json(raw)
 
@@ -152,7 +160,8 @@ async def _detect_contradictions_async(context: str) -> Dict[str, Any]:
         user_content=context,
         json_mode=True,
         temperature=0.0,
-        model=FAST_MODEL
+        model=FAST_MODEL,
+        cache_ttl=TTL_ANALYSIS
     )
     return clean_and_parse_json(raw)
 
@@ -164,18 +173,16 @@ async def cross_examine_case(
     force: bool = False
 ) -> Dict[str, Any]:
     """Kryen analizën e thellë të lëndës dhe War Room në vetëm ~8-10 sekonda pa bllokime."""
-    if not authorize_case_access(db, case_id, user_id): 
+    if not await authorize_case_access_async(case_id, user_id): 
         return {"error": "Pa autorizim."}
     
-    c_oid = ObjectId(case_id) if ObjectId.is_valid(case_id) else case_id
-    case = await asyncio.to_thread(db.cases.find_one, {"_id": c_oid}) or {}
+    case = await async_repository.get_case(case_id) or {}
     effective_position = (client_position or case.get("client_position") or case.get("client_role") or "DEFENDANT").upper()
     
     client_name = case.get("client_name") or case.get("client", {}).get("name") or case.get("title") or "Pala Kliente"
     opposing_name = case.get("opposing_party") or case.get("opponent") or "Pala Kundërshtare"
 
-    doc_filter = {"$or": [{"case_id": case_id}, {"case_id": c_oid}], "status": {"$ne": "DELETED"}}
-    documents = await asyncio.to_thread(lambda: list(db.documents.find(doc_filter, {"_id": 1, "updated_at": 1})))
+    documents = await async_repository.list_case_documents(case_id, {"_id": 1, "updated_at": 1})
     current_doc_ids = sorted([str(d["_id"]) for d in documents])
 
     cached_analysis = case.get("latest_analysis")
@@ -268,9 +275,8 @@ async def cross_examine_case(
         "contradictions": cnt.get("contradictions", []) if isinstance(cnt, dict) else []
     }
 
-    await asyncio.to_thread(
-        db.cases.update_one,
-        {"_id": c_oid},
+    await async_repository.update_case(
+        case_id,
         {"$set": {
             "latest_analysis": primary_analysis,
             "latest_deep_analysis": deep_analysis,
@@ -288,8 +294,7 @@ async def cross_examine_case(
     }
 
 async def run_deep_strategy(db: Database, case_id: str, user_id: str, client_position: Optional[str] = None) -> Dict[str, Any]:
-    c_oid = ObjectId(case_id) if ObjectId.is_valid(case_id) else case_id
-    case = await asyncio.to_thread(db.cases.find_one, {"_id": c_oid}) or {}
+    case = await async_repository.get_case(case_id) or {}
     
     if case.get("latest_deep_analysis"):
         return case["latest_deep_analysis"]
@@ -298,10 +303,9 @@ async def run_deep_strategy(db: Database, case_id: str, user_id: str, client_pos
     return res.get("latest_deep_analysis", {})
 
 async def archive_full_strategy_report(db: Database, case_id: str, user_id: str, legal_data: Dict[str, Any], deep_data: Dict[str, Any], lang: str = "sq") -> Dict[str, Any]:
-    if not authorize_case_access(db, case_id, user_id): return {"error": "Pa autorizim."}
+    if not await authorize_case_access_async(case_id, user_id): return {"error": "Pa autorizim."}
     
-    c_oid = ObjectId(case_id) if ObjectId.is_valid(case_id) else case_id
-    case = await asyncio.to_thread(db.cases.find_one, {"_id": c_oid})
+    case = await async_repository.get_case(case_id)
     if not case: return {"error": "Rasti nuk u gjet."}
         
     case_name = case.get("title") or case.get("case_name") or "Pa Titull"
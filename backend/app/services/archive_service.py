@@ -15,6 +15,7 @@ from fastapi.exceptions import HTTPException
 from ..models.archive import ArchiveItemInDB
 from .storage_service import get_s3_client, transfer_config
 from .pdf_service import pdf_service 
+from . import public_portal_service
 
 logger = logging.getLogger(__name__)
 
@@ -216,6 +217,7 @@ class ArchiveService:
             try: get_s3_client().delete_object(Bucket=self.bucket, Key=item["storage_key"])
             except Exception: pass
         self.db.archives.delete_one({"_id": oid_item})
+        public_portal_service.invalidate_case(self.db, item.get("case_id"))
 
     def rename_item(self, user_id: str, item_id: str, new_title: str) -> None:
         oid_user = self._to_oid(user_id)
@@ -233,6 +235,7 @@ class ArchiveService:
         )
         if not result:
              raise HTTPException(status_code=404, detail="Item not found")
+        public_portal_service.invalidate_case(self.db, result.get("case_id"))
         
         result["id"] = result["_id"]
         return ArchiveItemInDB.model_validate(result)
@@ -245,6 +248,7 @@ class ArchiveService:
             {"$or": [{"case_id": oid_case}, {"case_id": case_id}], "$or": [{"user_id": oid_user}, {"owner_id": oid_user}]},
             {"$set": {"is_shared": is_shared}}
         )
+        public_portal_service.invalidate_case(self.db, case_id)
         return result.modified_count
 
     async def save_generated_file(self, user_id: str, filename: str, content: bytes, category: str, title: str, case_id: Optional[str] = None) -> ArchiveItemInDB:
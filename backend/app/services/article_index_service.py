@@ -0,0 +1,271 @@
+# FILE: backend/app/services/article_index_service.py
+# PHOENIX PROTOCOL - ARTICLE INDEX V1.0 (LAW_ID • ARTICLE • PART • POINT LOOKUPS)
+# 1. The statute chunker stamps every chunk with (law_id, article_key, part): '03/L-006', '91', 0.
+#    legal_knowledge_base carries a compound index on that key; backfill() stamps chunks ingested before.
+# 2. The API process keeps a map (law_id, article) -> chunk ids/page plus a law-name resolver in memory,
+#    reloaded when the law_catalog version changes, so "Neni N of Law X" is a dict hit plus one _id fetch.
+# 3. Numbered paragraphs ('Neni 91.3') are cut from the article text at lookup time.
+# 4. Used by find_law_documents (/laws/article), /laws/case-page and citation verification of drafts.
+
+import re
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+from pymongo.database import Database
+
+from app.services.lexical_index_service import article_token, fold, stem
+
+logger = logging.getLogger(__name__)
+
+CHUNK_COLLECTION = "legal_knowledge_base"
+CHECK_INTERVAL = 15.0
+RESOLVE_CACHE_MAX = 1024
+STOP_TOKENS = {"ligji", "ligj", "kodi", "nr", "per", "dhe", "i", "e", "te", "se", "republikes", "kosoves", "pdf", "l"}
+
+LAW_CODE = re.compile(r'(?<!\d)(\d{2})[\s_/.\-]*L[\s_\-]*(\d{2,4})(?!\d)', re.IGNORECASE)
+YEAR_CODE = re.compile(r'nr[\W_]*((?:19|20)\d{2})[\W_]+(\d{1,3})(?!\d)', re.IGNORECASE)
+NUMBERED_PARAGRAPH = re.compile(r'^\s*(\d{1,3})\.\s', re.MULTILINE)
+CITATION = re.compile(
+    r'(?:\b(?P<before>LPK|LMD|LSHT|LPP|KPPK|KPRK|KPK|KPP)\s+)?\b(?:Neni|neni|Nenit|nenit|Nenin|nenin|Nenet|nenet)\s+(?P<article>\d{1,4}[a-z]?)'
+    r'(?:\.(?P<paragraph>\d{1,3}))?'
+    r'(?:\s*(?:,\s*)?(?:i|të|e|së|te|se)?\s+(?P<after>(?:Ligj|Kod|Kushtetut|LPK|LMD|LSHT|KPK|KPPK|LPP)[^,.;:\n()]{0,80}))?'
+)
+
+
+def law_id_for(*names: str) -> str:
+    """'LIGJI_NR._03_L-006_...' -> '03/L-006'; 'Nr. 2004/32' -> '2004/32'; otherwise a folded slug of the first name."""
+    for name in names:
+        match = LAW_CODE.search(name or "")
+        if match:
+            return f"{match.group(1)}/L-{match.group(2)}"
+        match = YEAR_CODE.search(name or "")
+        if match:
+            return f"{match.group(1)}/{int(match.group(2))}"
+    first = re.sub(r'\.pdf$', '', next((n for n in names if n), ""), flags=re.IGNORECASE)
+    return re.sub(r'[^a-z0-9]+', '-', fold(first)).strip('-')
+
+
+def chunk_keys(source: str, law_title: str, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """(law_id, article_key, part) per statute chunk; part counts repeated article numbers (amendments)."""
+    law_id = law_id_for(law_title, source)
+    seen: Dict[str, int] = {}
+    keys = []
+    for chunk in chunks:
+        article = article_token(chunk.get("article_number"))
+        part = seen.get(article, 0) if article else 0
+        if article:
+            seen[article] = part + 1
+        keys.append({"law_id": law_id, "article_key": article, "part": part})
+    return keys
+
+
+def ensure_indexes(db: Database) -> None:
+    db[CHUNK_COLLECTION].create_index(
+        [("law_id", ASCENDING), ("article_key", ASCENDING), ("part", ASCENDING)],
+        partialFilterExpression={"law_id": {"$exists": True}}
+    )
+
+
+def backfill(db: Database, batch_size: int = 1000) -> int:
+    """Stamps statute chunks written before the key existed (grouped per source in chunk order)."""
+    ensure_indexes(db)
+    updated = 0
+    query = {"category": {"$nin": ["academic", "caselaw"]}, "law_id": {"$exists": False}}
+    for source in db[CHUNK_COLLECTION].distinct("source", query):
+        rows = list(db[CHUNK_COLLECTION].find(
+            {"source": source}, {"law_title": 1, "article_number": 1, "chunk_index": 1}
+        ).sort("chunk_index", ASCENDING))
+        if not rows:
+            continue
+        keys = chunk_keys(source, rows[0].get("law_title") or source, rows)
+        ops = [UpdateOne({"_id": row["_id"]}, {"$set": key}) for row, key in zip(rows, keys)]
+        for start in range(0, len(ops), batch_size):
+            db[CHUNK_COLLECTION].bulk_write(ops[start:start + batch_size], ordered=False)
+        updated += len(ops)
+    if updated:
+        from app.services import law_catalog_service
+        # API processes reload their article map on the next version check
+        law_catalog_service.bump_version(db)
+    logger.info(f"Article index backfill: {updated} chunks stamped")
+    return updated
+
+
+# --- IN-MEMORY MAP (API PROCESS) ---
+class ArticleMap:
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        self.articles: Dict[Tuple[str, str], List[Tuple[int, str, int]]] = {}
+        self.laws: Dict[str, Dict[str, Any]] = {}
+        self.by_slug: Dict[str, str] = {}
+        self.tokens: Dict[str, set] = {}
+        self._resolved: Dict[str, Optional[str]] = {}
+        for row in rows:
+            law_id = row["law_id"]
+            page = _page(row)
+            law = self.laws.setdefault(law_id, {"law_id": law_id, "law_title": row.get("law_title"), "source": row.get("source"), "first_page": page})
+            law["first_page"] = min(law["first_page"], page)
+            if row.get("article_key"):
+                self.articles.setdefault((law_id, row["article_key"]), []).append((row.get("part", 0), str(row["_id"]), page))
+        for parts in self.articles.values():
+            parts.sort()
+        for law_id, law in self.laws.items():
+            for name in (law_id, law.get("law_title"), law.get("source")):
+                self.by_slug.setdefault(_slug(name), law_id)
+            self.tokens[law_id] = _tokens(f"{law.get('law_title') or ''} {law.get('source') or ''}")
+
+    def resolve(self, law: str, dictionary: bool = True) -> Optional[str]:
+        """
+        Law name / number / acronym -> law_id: exact id, slug, the laws_dictionary mapping of acronyms and
+        loose names (skipped with dictionary=False), then the smallest title containing every token.
+        """
+        key = f"{int(dictionary)}|{(law or '').strip().lower()}"
+        if key in self._resolved:
+            return self._resolved[key]
+        law_id = self._resolve(law or "", dictionary)
+        if len(self._resolved) < RESOLVE_CACHE_MAX:
+            self._resolved[key] = law_id
+        return law_id
+
+    def _resolve(self, law: str, dictionary: bool) -> Optional[str]:
+        candidate = law_id_for(law)
+        if candidate in self.laws:
+            return candidate
+        if _slug(law) in self.by_slug:
+            return self.by_slug[_slug(law)]
+        if dictionary:
+            candidate = self._dictionary_law(law)
+            if candidate:
+                return candidate
+        wanted = _tokens(law)
+        if not wanted:
+            return None
+        matches = [law_id for law_id, tokens in self.tokens.items() if wanted <= tokens]
+        return min(matches, key=lambda l: len(self.tokens[l])) if matches else None
+
+    def _dictionary_law(self, law: str) -> Optional[str]:
+        try:
+            from app.api.endpoints.laws_pkg.laws_dictionary import _normalize_hallucinated_title
+            official = _normalize_hallucinated_title(law, "")
+        except ImportError:
+            return None
+        candidate = law_id_for(official) if official != law else None
+        return candidate if candidate in self.laws else None
+
+
+def _page(row: Dict[str, Any]) -> int:
+    try:
+        return int(row.get("page") or row.get("page_number") or 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def _slug(text: Optional[str]) -> str:
+    return re.sub(r'[^a-z0-9]', '', fold(re.sub(r'\.pdf$', '', text or "", flags=re.IGNORECASE)))
+
+
+def _tokens(text: str) -> set:
+    return {stem(t) for t in re.findall(r'[a-z0-9]+', fold(text)) if len(t) > 2 and t not in STOP_TOKENS}
+
+
+_map: Dict[str, Any] = {"version": None, "map": None, "checked_at": 0.0}
+_map_lock = threading.Lock()
+
+
+def article_map(db: Database) -> ArticleMap:
+    from app.services import law_catalog_service
+
+    now = time.monotonic()
+    with _map_lock:
+        if _map["map"] is not None and now - _map["checked_at"] < CHECK_INTERVAL:
+            return _map["map"]
+    # Every ingest bumps the law_catalog version after stamping its chunks
+    version = law_catalog_service.current_version(db)
+    with _map_lock:
+        if _map["map"] is None or version != _map["version"]:
+            rows = db[CHUNK_COLLECTION].find(
+                {"law_id": {"$exists": True}},
+                {"law_id": 1, "article_key": 1, "part": 1, "page": 1, "page_number": 1, "law_title": 1, "source": 1}
+            )
+            _map.update({"version": version, "map": ArticleMap(rows)})
+        _map["checked_at"] = now
+        return _map["map"]
+
+
+# --- LOOKUPS ---
+def paragraph_text(text: str, paragraph: int) -> Optional[str]:
+    """Numbered paragraph 'N.' of an article, up to paragraph 'N+1.'."""
+    marks = [(int(m.group(1)), m.start()) for m in NUMBERED_PARAGRAPH.finditer(text or "")]
+    start = next((pos for number, pos in marks if number == paragraph), None)
+    if start is None:
+        return None
+    end = next((pos for number, pos in marks if pos > start and number == paragraph + 1), len(text))
+    return text[start:end].strip()
+
+
+def lookup(db: Database, law: str, article: Any, paragraph: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Neni N (and optionally paragraph P) of law X: chunks in part order, or None if the law/article is unknown."""
+    amap = article_map(db)
+    law_id = amap.resolve(law)
+    key = article_token(article)
+    if not law_id or not key:
+        return None
+    parts = amap.articles.get((law_id, key))
+    if not parts:
+        return None
+    ids = [ObjectId(chunk_id) if ObjectId.is_valid(chunk_id) else chunk_id for _, chunk_id, _ in parts]
+    by_id = {str(d["_id"]): d for d in db[CHUNK_COLLECTION].find({"_id": {"$in": ids}}, {"embedding": 0})}
+    docs = [by_id[chunk_id] for _, chunk_id, _ in parts if chunk_id in by_id]
+    if not docs:
+        return None
+    text = "\n\n".join(d.get("text", "") for d in docs)
+    result = {
+        "law_id": law_id, "law_title": docs[0].get("law_title"), "source": docs[0].get("source"),
+        "article_number": docs[0].get("article_number", key), "page": parts[0][2], "docs": docs, "text": text,
+    }
+    if paragraph is not None:
+        result["paragraph"] = paragraph
+        result["paragraph_text"] = paragraph_text(text, paragraph)
+    return result
+
+
+def page_for(db: Database, law: str, article: Any = None) -> Optional[int]:
+    """Viewer page jump: the article's first page, or the law's first page. No database round trip."""
+    amap = article_map(db)
+    # No loose dictionary matching: a court decision title must not land on a statute
+    law_id = amap.resolve(law, dictionary=False)
+    if not law_id:
+        return None
+    key = article_token(article) if article is not None else None
+    if key and (law_id, key) in amap.articles:
+        return amap.articles[(law_id, key)][0][2]
+    return amap.laws[law_id]["first_page"]
+
+
+def verify_citations(db: Database, text: str, default_law: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Gjen citimet 'LPK Neni 91.3' / 'Neni 136 i LMD' në tekst dhe kontrollon secilin në indeksin e neneve.
+    Citations without a law name are checked against default_law (the draft's detected law), if given.
+    """
+    amap = article_map(db)
+    results, seen = [], set()
+    for match in CITATION.finditer(text or ""):
+        law = (match.group("before") or match.group("after") or default_law or "").strip()
+        article = article_token(match.group("article"))
+        paragraph = int(match.group("paragraph")) if match.group("paragraph") else None
+        key = (law.lower(), article, paragraph)
+        if not article or key in seen:
+            continue
+        seen.add(key)
+        law_id = amap.resolve(law) if law else None
+        found = bool(law_id and (law_id, article) in amap.articles)
+        if found and paragraph is not None:
+            hit = lookup(db, law_id, article, paragraph)
+            found = bool(hit and hit.get("paragraph_text"))
+        results.append({
+            "citation": match.group(0).strip(), "law": law or None, "law_id": law_id,
+            "article": article, "paragraph": paragraph, "verified": found,
+        })
+    return results
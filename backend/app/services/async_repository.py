@@ -0,0 +1,63 @@
+# FILE: backend/app/services/async_repository.py
+# PHOENIX PROTOCOL - ASYNC REPOSITORY V1.0 (MOTOR HOT PATH)
+# 1. Non-blocking reads/writes for cases, documents, chat messages and vector queries.
+# 2. Used by the chat, RAG and analysis endpoints so Atlas round trips no longer stall the event loop.
+# 3. Shares pool settings with core/db.py via get_async_db().
+
+import logging
+from typing import List, Dict, Any, Optional
+from bson import ObjectId
+
+from app.core.db import get_async_db
+
+logger = logging.getLogger(__name__)
+
+
+def _oid(value: Any) -> Any:
+    value_str = str(value)
+    return ObjectId(value_str) if ObjectId.is_valid(value_str) else value
+
+
+def _case_id_filter(case_id: str) -> Dict[str, Any]:
+    return {"$or": [{"case_id": str(case_id)}, {"case_id": _oid(case_id)}]}
+
+
+# --- CASES ---
+async def get_case(case_id: str, owner_id: Optional[Any] = None, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+    query: Dict[str, Any] = {"_id": _oid(case_id)}
+    if owner_id is not None:
+        query["owner_id"] = _oid(owner_id)
+    return await get_async_db().cases.find_one(query, projection)
+
+
+async def get_owned_case(case_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    u_oid = _oid(user_id)
+    return await get_async_db().cases.find_one({"_id": _oid(case_id), "$or": [{"owner_id": u_oid}, {"user_id": u_oid}]})
+
+
+async def update_case(case_id: str, update: Dict[str, Any]) -> None:
+    await get_async_db().cases.update_one({"_id": _oid(case_id)}, update)
+
+
+# --- DOCUMENTS ---
+async def list_case_documents(case_id: str, projection: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+    query = {**_case_id_filter(case_id), "status": {"$ne": "DELETED"}}
+    return await get_async_db().documents.find(query, projection).to_list(length=None)
+
+
+# --- CHAT MESSAGES ---
+async def append_chat_message(case_id: str, message: Dict[str, Any]) -> None:
+    await get_async_db().cases.update_one({"_id": _oid(case_id)}, {"$push": {"chat_history": message}})
+
+
+# --- VECTOR QUERIES ---
+async def aggregate(collection: str, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return await get_async_db()[collection].aggregate(pipeline).to_list(length=None)
+
+
+async def count(collection: str, query: Dict[str, Any]) -> int:
+    return await get_async_db()[collection].count_documents(query)
+
+
+async def find(collection: str, query: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    return await get_async_db()[collection].find(query).limit(limit).to_list(length=limit)
@@ -0,0 +1,134 @@
+# FILE: backend/app/services/business_days.py
+# PHOENIX PROTOCOL - BUSINESS DAY ORDINALS V1.0 (KOSOVO HOLIDAYS • O(1) LOOKUP)
+# 1. Kosovo public holidays mirror frontend/src/utils/kosovoHolidays.ts (weekend -> Monday substitution, both Easters, Bajram table).
+# 2. A prefix-count table of working days is built once; the distance between two dates is a subtraction.
+# 3. Dates outside the table fall back to a closed-form weekday count (no holidays), never a day-by-day loop.
+
+import threading
+from array import array
+from datetime import date, timedelta
+from typing import Dict, Optional, Set, Tuple
+
+TABLE_START = date(2000, 1, 1)
+TABLE_END = date(2100, 12, 31)
+
+FIXED_HOLIDAYS: Tuple[Tuple[int, int], ...] = (
+    (1, 1),    # Viti i Ri
+    (1, 7),    # Krishtlindjet Ortodokse
+    (2, 17),   # Dita e Pavarësisë
+    (4, 9),    # Dita e Kushtetutës
+    (5, 1),    # Dita e Punëtorëve
+    (5, 9),    # Dita e Evropës
+    (12, 25),  # Krishtlindjet Katolike
+)
+
+# Bajram dates are announced yearly; keep in sync with the frontend table.
+EID_DATES: Dict[int, Dict[str, Tuple[int, int]]] = {
+    2024: {"fitr": (4, 10), "adha": (6, 16)},
+    2025: {"fitr": (3, 31), "adha": (6, 6)},
+    2026: {"fitr": (3, 20), "adha": (5, 27)},
+}
+
+_ordinals: Optional[array] = None
+_lock = threading.Lock()
+
+
+def _catholic_easter(year: int) -> date:
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = ((h + l - 7 * m + 114) % 31) + 1
+    return date(year, month, day)
+
+
+def _orthodox_easter(year: int) -> date:
+    a, b, c = year % 19, year % 4, year % 7
+    d = (19 * a + 15) % 30
+    e = (2 * b + 4 * c + 6 * d + 6) % 7
+    day, month = d + e + 22, 3
+    if day > 31:
+        day, month = day - 31, 4
+    # Julian -> Gregorian offset (valid 1900-2099)
+    return date(year, month, day) + timedelta(days=13)
+
+
+def _substitute(d: date) -> date:
+    """Festa që bie në fundjavë kalon të hënën (Ligji për Festat Zyrtare)."""
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    if d.weekday() == 5:
+        return d + timedelta(days=2)
+    return d
+
+
+def holidays_for_year(year: int) -> Set[date]:
+    days = {_substitute(date(year, month, day)) for month, day in FIXED_HOLIDAYS}
+    days.add(_catholic_easter(year))
+    days.add(_orthodox_easter(year))
+    eids = EID_DATES.get(year)
+    if eids:
+        days.update(_substitute(date(year, m, d)) for m, d in eids.values())
+    return days
+
+
+def _build_table() -> array:
+    holidays: Set[date] = set()
+    for year in range(TABLE_START.year, TABLE_END.year + 1):
+        holidays |= holidays_for_year(year)
+    total = (TABLE_END - TABLE_START).days + 1
+    # ordinals[i] = working days strictly before TABLE_START + i
+    ordinals = array("i", [0]) * (total + 1)
+    count, current, one = 0, TABLE_START, timedelta(days=1)
+    for i in range(total):
+        ordinals[i] = count
+        if current.weekday() < 5 and current not in holidays:
+            count += 1
+        current += one
+    ordinals[total] = count
+    return ordinals
+
+
+def _table() -> array:
+    global _ordinals
+    if _ordinals is None:
+        with _lock:
+            if _ordinals is None:
+                _ordinals = _build_table()
+    return _ordinals
+
+
+def _weekdays_before(d: date) -> int:
+    """Numri i ditëve nga e hëna deri të premten para datës `d` (formulë e mbyllur, pa festa)."""
+    ordinal = d.toordinal() - 1  # date(1, 1, 1) is a Monday
+    weeks, rest = divmod(ordinal, 7)
+    return weeks * 5 + min(rest, 5)
+
+
+def _working_days_before(d: date) -> int:
+    """Numërues monoton i ditëve të punës; jashtë tabelës vazhdon me ditët e javës pa festa."""
+    if d < TABLE_START:
+        return _weekdays_before(d)
+    table = _table()
+    base = _weekdays_before(TABLE_START)
+    table_end = TABLE_END + timedelta(days=1)
+    if d <= table_end:
+        return base + table[(d - TABLE_START).days]
+    return base + table[-1] + _weekdays_before(d) - _weekdays_before(table_end)
+
+
+def is_working_day(d: date) -> bool:
+    return _working_days_before(d + timedelta(days=1)) - _working_days_before(d) == 1
+
+
+def working_days_between(start_date: date, end_date: date) -> int:
+    """Ditët e punës nga `start_date` deri `end_date` (pa e numëruar ditën e nisjes).
+    Për data në të kaluarën kthen ditët kalendarike me shenjë negative, si më parë."""
+    if start_date > end_date:
+        return -1 * (start_date - end_date).days
+    return _working_days_before(end_date + timedelta(days=1)) - _working_days_before(start_date) - 1
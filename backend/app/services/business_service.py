@@ -13,7 +13,8 @@ from fastapi import UploadFile, HTTPException
 
 # RELATIVE IMPORT CHECK: This requires 'app/models/business.py' to exist
 from ..models.business import BusinessProfileUpdate, BusinessProfileInDB
-from ..services import storage_service
+from ..services import storage_service, public_portal_service
+from ..services.report_service import branding as report_branding
 
 logger = structlog.get_logger(__name__)
 
@@ -52,6 +53,8 @@ class BusinessService:
         
         if not result:
             raise HTTPException(status_code=404, detail="Profile not found after update.")
+        public_portal_service.invalidate_owner(self.db, user_id)
+        report_branding.invalidate(user_id)
             
         return BusinessProfileInDB(**result)
 
@@ -81,6 +84,8 @@ class BusinessService:
                 },
                 return_document=True
             )
+            public_portal_service.invalidate_owner(self.db, user_id)
+            report_branding.invalidate(user_id)
             
             return BusinessProfileInDB(**result)
             
@@ -1,6 +1,10 @@
 # FILE: backend/app/services/calendar_service.py
-# PHOENIX PROTOCOL - CALENDAR SERVICE V4.1 (NO PUBLIC HOLIDAYS)
+# PHOENIX PROTOCOL - CALENDAR SERVICE V5.0 (WINDOWED LIST • KOSOVO BUSINESS DAYS)
+# 1. Events are listed per date window with a keyset cursor (start_date, _id) instead of the full history.
+# 2. Working-day distance is a lookup in the business_days ordinal table (weekends + Kosovo holidays).
+# 3. Read-only list rows are built straight from a projection, without Pydantic validation.
 
+import base64
 from typing import List, Dict, Any, Tuple, Optional
 from datetime import datetime, timezone, timedelta, date
 from bson import ObjectId
@@ -8,12 +12,52 @@ from fastapi import HTTPException, status
 from pymongo.database import Database
 
 from app.models.calendar import CalendarEventInDB, CalendarEventCreate, EventStatus, EventCategory
+from app.services import public_portal_service, business_days
+
+CLIENT_VISIBLE_MARKER = "CLIENT_VISIBLE"
+
+def is_client_visible(event: Dict[str, Any]) -> bool:
+    """Portal visibility is stored as the indexed 'is_public' flag; the UI still marks notes with [CLIENT_VISIBLE]."""
+    text = f"{event.get('notes') or ''} {event.get('description') or ''}".upper()
+    return CLIENT_VISIBLE_MARKER in text
+
+MAX_PAGE_SIZE = 500
+
+LIST_PROJECTION = {
+    "title": 1, "description": 1, "start_date": 1, "end_date": 1, "is_all_day": 1, "event_type": 1,
+    "category": 1, "priority": 1, "location": 1, "attendees": 1, "notes": 1, "owner_id": 1, "case_id": 1,
+    "document_id": 1, "status": 1, "is_public": 1, "created_at": 1, "updated_at": 1,
+}
+
+LIST_DEFAULTS = {
+    "description": None, "end_date": None, "is_all_day": False, "event_type": "MEETING", "category": "AGENDA",
+    "priority": "MEDIUM", "location": None, "attendees": None, "notes": None, "document_id": None,
+    "status": "PENDING", "is_public": False, "created_at": None, "updated_at": None,
+    "severity": None, "effective_deadline": None, "is_extended": False,
+}
+
+def encode_cursor(start: datetime, oid: ObjectId) -> str:
+    return base64.urlsafe_b64encode(f"{start.isoformat()}|{oid}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    try:
+        raw_date, raw_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(raw_date), ObjectId(raw_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
 
 class CalendarService:
     
     def is_working_day(self, d: date) -> bool:
-        """Only weekends are considered non-working days. No public holidays."""
-        return d.weekday() < 5  # Monday=0 ... Friday=4
+        """Weekends and Kosovo public holidays are non-working days."""
+        return business_days.is_working_day(d)
 
     def get_event_triage(self, title: str) -> str:
         t_low = title.lower()
@@ -24,11 +68,7 @@ class CalendarService:
         return "LEVEL_3_PROCEDURAL"
 
     def calculate_working_days(self, start_date: date, end_date: date) -> int:
-        if start_date > end_date:
-            return -1 * (start_date - end_date).days
-        days_diff = (end_date - start_date).days
-        working_days = sum(1 for i in range(days_diff + 1) if self.is_working_day(start_date + timedelta(days=i)))
-        return working_days - 1
+        return business_days.working_days_between(start_date, end_date)
 
     def generate_briefing(self, db: Database, user_id: ObjectId, user_name: str) -> Dict[str, Any]:
         """Guardian Briefing: Strictly triages AGENDA items for the Risk Radar. (No motivational quotes)"""
@@ -78,24 +118,55 @@ class CalendarService:
             "data": {"name": safe_name, "count": urgent_count}
         }
 
-    def get_events_for_user(self, db: Database, user_id: ObjectId) -> List[Dict[str, Any]]:
-        events_cursor = db.calendar_events.find({"owner_id": user_id}).sort("start_date", 1)
+    def get_events_for_user(
+        self, db: Database, user_id: ObjectId,
+        start: Optional[datetime] = None, end: Optional[datetime] = None,
+        cursor: Optional[str] = None, limit: Optional[int] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Kthen ngjarjet e dritares [start, end) si rreshta JSON dhe kursorin e faqes tjetër (ose None)."""
+        query: Dict[str, Any] = {"owner_id": user_id}
+        date_range: Dict[str, Any] = {}
+        if start:
+            date_range["$gte"] = start
+        if end:
+            date_range["$lt"] = end
+        if date_range:
+            query["start_date"] = date_range
+        if cursor:
+            after_date, after_id = decode_cursor(cursor)
+            query["$or"] = [
+                {"start_date": {"$gt": after_date}},
+                {"start_date": after_date, "_id": {"$gt": after_id}},
+            ]
+
+        events_cursor = db.calendar_events.find(query, LIST_PROJECTION).sort([("start_date", 1), ("_id", 1)])
+        if limit:
+            events_cursor = events_cursor.limit(min(limit, MAX_PAGE_SIZE) + 1)
+
+        rows = list(events_cursor)
+        next_cursor = None
+        if limit and len(rows) > min(limit, MAX_PAGE_SIZE):
+            rows = rows[:min(limit, MAX_PAGE_SIZE)]
+            next_cursor = encode_cursor(rows[-1]["start_date"], rows[-1]["_id"])
+
         enriched, today = [], datetime.now(timezone.utc).date()
-        
-        for doc in events_cursor:
-            doc['id'] = str(doc['_id'])
-            if 'case_id' in doc and doc['case_id']:
-                doc['case_id'] = str(doc['case_id'])
-            
-            val = CalendarEventInDB.model_validate(doc)
-            effective_date = val.start_date.date()
-            item = val.model_dump(by_alias=True)
+        for doc in rows:
+            item = {key: _json_value(doc.get(key, default)) for key, default in LIST_DEFAULTS.items()}
+            event_id = str(doc["_id"])
+            title = doc.get("title") or ""
+            start_date = doc.get("start_date")
             item.update({
-                "working_days_remaining": self.calculate_working_days(today, effective_date),
-                "risk_level": self.get_event_triage(val.title)
+                "_id": event_id,
+                "id": event_id,
+                "title": title,
+                "start_date": _json_value(start_date),
+                "owner_id": _json_value(doc.get("owner_id")),
+                "case_id": str(doc["case_id"]) if doc.get("case_id") else None,
+                "working_days_remaining": self.calculate_working_days(today, start_date.date()) if isinstance(start_date, datetime) else None,
+                "risk_level": self.get_event_triage(title)
             })
             enriched.append(item)
-        return enriched
+        return enriched, next_cursor
 
     def create_event(self, db: Database, event_data: CalendarEventCreate, user_id: ObjectId) -> CalendarEventInDB:
         d = event_data.model_dump()
@@ -105,9 +176,10 @@ class CalendarService:
             "created_at": datetime.now(timezone.utc),
             "updated_at": datetime.now(timezone.utc),
             "status": EventStatus.PENDING,
-            "is_public": False
+            "is_public": is_client_visible(d)
         })
         res = db.calendar_events.insert_one(d)
+        public_portal_service.invalidate_case(db, d["case_id"])
         created = db.calendar_events.find_one({"_id": res.inserted_id})
         if not created:
             raise HTTPException(500, "Creation Failed")
@@ -115,8 +187,13 @@ class CalendarService:
         return CalendarEventInDB.model_validate(created)
 
     def delete_event(self, db: Database, event_id: ObjectId, user_id: ObjectId) -> bool:
-        if db.calendar_events.delete_one({"_id": event_id, "owner_id": user_id}).deleted_count == 0:
+        deleted = db.calendar_events.find_one_and_delete({"_id": event_id, "owner_id": user_id})
+        if not deleted:
             raise HTTPException(404, "Not Found")
+        public_portal_service.invalidate_case(db, deleted.get("case_id"))
         return True
 
+    def ensure_indexes(self, db: Database) -> None:
+        db.calendar_events.create_index([("owner_id", 1), ("start_date", 1), ("_id", 1)])
+
 calendar_service = CalendarService()
\ No newline at end of file
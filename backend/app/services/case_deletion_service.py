@@ -0,0 +1,199 @@
+# FILE: backend/app/services/case_deletion_service.py
+# PHOENIX PROTOCOL - CASE DELETION JOB V1.0 (TOMBSTONE • BATCHED • RESUMABLE)
+# 1. DELETE /cases/{id} only writes a tombstone ('deletion' on the case) and queues the job; the case
+#    disappears from every access-guarded query immediately.
+# 2. The job runs in phases: storage -> index -> graph -> records. Storage keys go out in DeleteObjects
+#    batches of 1 000, vectors/pages/artifacts in one delete_many each, the graph in batched DETACH DELETE.
+# 3. Each finished phase is checkpointed on the tombstone, so a retry or a reaper requeue resumes where the
+#    previous run stopped. Every phase is idempotent; the case row is removed last.
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.database import Database
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("storage", "index", "graph", "records")
+CASE_COLLECTIONS = ("documents", "media_evidence", "archives", "calendar_events", "alerts", "findings")
+
+MAX_ATTEMPTS = 5
+STALE_AFTER = timedelta(minutes=10)
+ORPHAN_KEYS_KEPT = 1000
+
+
+class CaseDeletionError(Exception):
+    pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _any_id_query(case_id: str) -> Dict[str, Any]:
+    return {"case_id": {"$in": [ObjectId(case_id), case_id]}}
+
+
+def ensure_indexes(db: Database) -> None:
+    db.cases.create_index([("deletion.state", ASCENDING), ("deletion.heartbeat_at", ASCENDING)], sparse=True)
+
+
+def mark_for_deletion(db: Database, case_id: ObjectId, requested_by: Optional[str] = None) -> bool:
+    """Shkruan tombstone-in. Kthen False nëse rasti tashmë është duke u fshirë."""
+    result = db.cases.update_one(
+        {"_id": case_id, "deletion": {"$exists": False}},
+        {"$set": {"deletion": {
+            "state": "PENDING",
+            "requested_at": _now(),
+            "requested_by": requested_by,
+            "heartbeat_at": _now(),
+            "attempts": 0,
+            "phases": {},
+        }}}
+    )
+    return result.modified_count == 1
+
+
+def enqueue(case_id: str) -> bool:
+    try:
+        from app.celery_app import celery_app
+        celery_app.send_task("delete_case_task", args=[case_id])
+        return True
+    except Exception as e:
+        logger.warning(f"Case deletion enqueue failed for {case_id}: {e}")
+        return False
+
+
+# --- PHASES ---
+def _purge_storage(db: Database, case_id: str, tolerate_errors: bool) -> Dict[str, Any]:
+    from app.services import storage_service
+
+    query = _any_id_query(case_id)
+    keys: List[str] = []
+    for document in db.documents.find(query, {"storage_key": 1, "processed_text_storage_key": 1, "preview_storage_key": 1}):
+        keys.extend([document.get("storage_key"), document.get("processed_text_storage_key"), document.get("preview_storage_key")])
+    for collection in ("media_evidence", "archives"):
+        keys.extend(item.get("storage_key") for item in db[collection].find(query, {"storage_key": 1}))
+
+    failed = storage_service.delete_files(keys)
+    if failed and not tolerate_errors:
+        raise CaseDeletionError(f"{len(failed)} storage objects could not be deleted")
+    stats: Dict[str, Any] = {"objects": len({k for k in keys if k}), "failed": len(failed)}
+    if failed:
+        # Final attempt: keep going and leave the list for a manual sweep instead of a case stuck forever
+        stats["orphaned_keys"] = failed[:ORPHAN_KEYS_KEPT]
+    return stats
+
+
+def _purge_index(db: Database, case_id: str) -> Dict[str, Any]:
+    from app.services import vector_store_service, document_text_service
+
+    document_ids = [str(d["_id"]) for d in db.documents.find(_any_id_query(case_id), {"_id": 1})]
+    vectors = vector_store_service.delete_case_embeddings(case_id, db)
+    document_text_service.delete_document_text(db, document_ids)
+    if document_ids:
+        db.document_artifacts.delete_many({"document_id": {"$in": document_ids}})
+    return {"vectors": vectors, "documents": len(document_ids)}
+
+
+def _purge_graph(db: Database, case_id: str) -> Dict[str, Any]:
+    from app.services.graph_service import graph_service
+
+    nodes = graph_service.purge_case(case_id)
+    db.case_graphs.delete_many({"case_id": case_id})
+    return {"nodes": nodes}
+
+
+def _purge_records(db: Database, case_id: str) -> Dict[str, Any]:
+    from app.services import public_portal_service
+
+    query = _any_id_query(case_id)
+    stats = {collection: db[collection].delete_many(query).deleted_count for collection in CASE_COLLECTIONS}
+    public_portal_service.invalidate_case(db, case_id)
+    return stats
+
+
+def run_case_deletion(db: Database, case_id: str, tolerate_storage_errors: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Ekzekuton (ose vazhdon) fshirjen e rastit faza pas faze. Kthen statistikat, ose None kur nuk ka
+    tombstone (rasti tashmë u fshi ose nuk u shënua kurrë për fshirje).
+    """
+    case_oid = ObjectId(case_id)
+    case = db.cases.find_one_and_update(
+        {"_id": case_oid, "deletion.state": {"$in": ["PENDING", "DELETING", "FAILED"]}},
+        {"$set": {"deletion.state": "DELETING", "deletion.heartbeat_at": _now()}, "$inc": {"deletion.attempts": 1}},
+        projection={"deletion": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if case is None:
+        return None
+
+    done = case["deletion"].get("phases") or {}
+    stats: Dict[str, Any] = dict(done)
+    for phase in PHASES:
+        if phase in done:
+            continue
+        if phase == "storage":
+            result = _purge_storage(db, case_id, tolerate_storage_errors)
+        elif phase == "index":
+            result = _purge_index(db, case_id)
+        elif phase == "graph":
+            result = _purge_graph(db, case_id)
+        else:
+            result = _purge_records(db, case_id)
+        stats[phase] = result
+        db.cases.update_one(
+            {"_id": case_oid},
+            {"$set": {f"deletion.phases.{phase}": result, "deletion.heartbeat_at": _now()}}
+        )
+        logger.info(f"Case {case_id} deletion phase '{phase}' done: {result}")
+
+    db.cases.delete_one({"_id": case_oid})
+    return stats
+
+
+def record_failure(db: Database, case_id: str, error: str, final: bool) -> None:
+    update: Dict[str, Any] = {"deletion.last_error": error[:500], "deletion.heartbeat_at": _now()}
+    if final:
+        update["deletion.state"] = "FAILED"
+    db.cases.update_one({"_id": ObjectId(case_id), "deletion": {"$exists": True}}, {"$set": update})
+
+
+def reap_stale_deletions(db: Database, limit: int = 50) -> Dict[str, int]:
+    """Rivendos në radhë fshirjet pa heartbeat (deploy, OOM, mesazh i humbur)."""
+    cutoff = _now() - STALE_AFTER
+    stats = {"requeued": 0, "abandoned": 0, "errors": 0}
+    stale = {"deletion.state": {"$in": ["PENDING", "DELETING"]}, "deletion.heartbeat_at": {"$lt": cutoff}}
+
+    for candidate in db.cases.find(stale, {"_id": 1}).limit(limit):
+        case = db.cases.find_one_and_update(
+            {"_id": candidate["_id"], **stale},
+            {"$set": {"deletion.heartbeat_at": _now()}},
+            projection={"deletion": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if case is None:
+            continue
+        case_id = str(case["_id"])
+        if case["deletion"].get("attempts", 0) >= MAX_ATTEMPTS:
+            record_failure(db, case_id, "Too many interrupted attempts", final=True)
+            stats["abandoned"] += 1
+            continue
+        if enqueue(case_id):
+            stats["requeued"] += 1
+        else:
+            stats["errors"] += 1
+    return stats
+
+
+def deletion_overview(db: Database, limit: int = 50) -> List[Dict[str, Any]]:
+    rows = db.cases.find({"deletion": {"$exists": True}}, {"deletion": 1, "title": 1, "case_name": 1}).limit(limit)
+    return [{
+        "case_id": str(row["_id"]),
+        "title": row.get("title") or row.get("case_name"),
+        **{k: v for k, v in row["deletion"].items() if k != "phases"},
+        "phases_done": [p for p in PHASES if p in (row["deletion"].get("phases") or {})],
+    } for row in rows]
@@ -1,8 +1,7 @@
 # FILE: backend/app/services/case_service.py
-# PHOENIX PROTOCOL - CASE SERVICE V10.0 (ENTERPRISE TEAM COLLABORATION & MULTI-DEVICE SYNC)
+# PHOENIX PROTOCOL - CASE SERVICE V10.1 (ENTERPRISE TEAM COLLABORATION & MULTI-DEVICE SYNC • BACKGROUND DELETION)
 
 import re
-import importlib
 import urllib.parse 
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List, cast
@@ -15,6 +14,7 @@ from ..models.case import CaseCreate
 from ..models.user import UserInDB
 from ..models.drafting import DraftRequest
 from ..celery_app import celery_app
+from . import public_portal_service, case_deletion_service
 
 # --- HELPER FUNCTIONS ---
 
@@ -52,7 +52,8 @@ def _build_case_access_query(user: UserInDB, case_id: Optional[ObjectId] = None)
             {"organization_id": str(org_id)}
         ])
 
-    base_query: Dict[str, Any] = {"$or": or_clauses}
+    # Tombstoned cases are being deleted in the background and must not be reachable anymore
+    base_query: Dict[str, Any] = {"$or": or_clauses, "deletion": {"$exists": False}}
     if case_id:
         base_query["_id"] = case_id
 
@@ -244,69 +245,20 @@ def get_case_full_context(db: Database, case_id: ObjectId, owner: UserInDB) -> D
     mapped_case["document_summaries"] = trilingual_doc_summaries
     return mapped_case
 
-def delete_case_by_id(db: Database, case_id: ObjectId, owner: UserInDB):
-    storage_service = importlib.import_module("app.services.storage_service")
-    vector_store_service = importlib.import_module("app.services.vector_store_service")
-    graph_service_module = importlib.import_module("app.services.graph_service")
-    graph_service = getattr(graph_service_module, "graph_service")
-    
+def delete_case_by_id(db: Database, case_id: ObjectId, owner: UserInDB) -> bool:
+    """
+    Tombstones the case and queues the background deletion job (services/case_deletion_service.py).
+    Returns False when the broker is unreachable; the caller then runs the job in-process.
+    """
     query_filter = _build_case_access_query(owner, case_id=case_id)
-    case = db.cases.find_one(query_filter)
+    case = db.cases.find_one(query_filter, {"_id": 1})
     if not case: 
         raise HTTPException(status_code=404, detail="Rasti nuk u gjet.")
-    
-    case_id_str = str(case_id)
-    any_id_query: Dict[str, Any] = {"case_id": {"$in": [case_id, case_id_str]}}
-    
-    documents = list(db.documents.find(any_id_query))
-    for doc in documents:
-        doc_id_str = str(doc["_id"])
-        keys_to_delete = [doc.get("storage_key"), doc.get("processed_text_storage_key"), doc.get("preview_storage_key")]
-        for key in filter(None, keys_to_delete):
-            try: 
-                storage_service.delete_file(key)
-            except Exception: 
-                pass
-        try: 
-            vector_store_service.delete_document_embeddings(user_id=str(owner.id), document_id=doc_id_str)
-        except Exception: 
-            pass
-        try: 
-            graph_service.delete_node(doc_id_str)
-        except Exception: 
-            pass
-
-    media_items = list(db.media_evidence.find(any_id_query))
-    for media in media_items:
-        storage_key = media.get("storage_key")
-        if storage_key:
-            try: 
-                storage_service.delete_file(storage_key)
-            except Exception: 
-                pass
-    db.media_evidence.delete_many(any_id_query)
-
-    archive_items = db.archives.find(any_id_query)
-    for item in archive_items:
-        if "storage_key" in item:
-            try: 
-                storage_service.delete_file(item["storage_key"])
-            except Exception: 
-                pass
-    
-    db.archives.delete_many(any_id_query)
-    db.cases.delete_one({"_id": case_id})
-    db.documents.delete_many(any_id_query)
-    db.calendar_events.delete_many(any_id_query)
-    try: 
-        db.alerts.delete_many(any_id_query)
-    except Exception: 
-        pass
 
-    try:
-        graph_service.delete_node(case_id_str)
-    except Exception as e:
-        print(f"Graph deletion warning: {e}")
+    if not case_deletion_service.mark_for_deletion(db, case_id, requested_by=str(owner.id)):
+        raise HTTPException(status_code=404, detail="Rasti nuk u gjet.")
+    public_portal_service.invalidate_case(db, str(case_id))
+    return case_deletion_service.enqueue(str(case_id))
 
 def create_draft_job_for_case(db: Database, case_id: ObjectId, job_in: DraftRequest, owner: UserInDB) -> Dict[str, Any]:
     query_filter = _build_case_access_query(owner, case_id=case_id)
@@ -330,24 +282,19 @@ def rename_document(db: Database, case_id: ObjectId, doc_id: ObjectId, new_name:
     extension = original_name.split(".")[-1] if "." in original_name else ""
     final_name = new_name if not extension or new_name.endswith(f".{extension}") else f"{new_name}.{extension}"
     db.documents.update_one({"_id": doc_id}, {"$set": {"file_name": final_name, "title": final_name, "updated_at": datetime.now(timezone.utc)}})
+    public_portal_service.invalidate_case(db, case_id)
     return {"id": str(doc_id), "file_name": final_name, "message": "Document renamed successfully."}
 
 def get_public_case_events(db: Database, case_id: str) -> Optional[Dict[str, Any]]:
     try:
         case_oid = ObjectId(case_id)
-        case = db.cases.find_one({"_id": case_oid})
+        case = db.cases.find_one({"_id": case_oid, "deletion": {"$exists": False}})
         if not case: 
             return None
         
         events_cursor = db.calendar_events.find({
-            "$and": [
-                {"$or": [{"case_id": case_id}, {"case_id": case_oid}]},
-                {"$or": [
-                    {"is_public": True},
-                    {"notes": {"$regex": "CLIENT_VISIBLE", "$options": "i"}},
-                    {"description": {"$regex": "CLIENT_VISIBLE", "$options": "i"}}
-                ]}
-            ]
+            "case_id": {"$in": [case_id, case_oid]},
+            "is_public": True
         }).sort("start_date", 1)
         
         events = []
@@ -13,8 +13,8 @@ from bson import ObjectId
 from datetime import datetime, timezone
 from pymongo.database import Database
 from app.models.case import ChatMessage
-from app.services.albanian_rag_service import AlbanianRAGService
-from app.services import llm_service, vector_store_service
+from app.services.albanian_rag_service import AlbanianRAGService, RETRIEVAL_EVENT_PREFIX
+from app.services import llm_service, vector_store_service, async_repository
 
 logger = structlog.get_logger(__name__)
 
@@ -25,7 +25,8 @@ async def stream_chat_response(
     user_id: str,
     document_ids: Optional[List[str]] = None,
     jurisdiction: Optional[str] = 'ks',
-    domain: Optional[str] = 'automatic'
+    domain: Optional[str] = 'automatic',
+    emit_events: bool = False
 ) -> AsyncGenerator[str, None]:
     """
     Unified chat endpoint. Every request uses the hardened AlbanianRAGService.chat()
@@ -33,20 +34,17 @@ async def stream_chat_response(
     """
     try:
         oid, user_oid = ObjectId(case_id), ObjectId(user_id)
-        case = db.cases.find_one({"_id": oid, "owner_id": user_oid})
+        case = await async_repository.get_case(case_id, owner_id=user_oid)
         if not case:
             yield "Gabim: Qasja u refuzua."
             return
 
         # Sync User Message to History
-        db.cases.update_one(
-            {"_id": oid}, 
-            {"$push": {"chat_history": ChatMessage(
-                role="user", 
-                content=user_query, 
-                timestamp=datetime.now(timezone.utc)
-            ).model_dump()}}
-        )
+        await async_repository.append_chat_message(case_id, ChatMessage(
+            role="user", 
+            content=user_query, 
+            timestamp=datetime.now(timezone.utc)
+        ).model_dump())
         
         full_response = ""
         yield " "  # Keep-alive
@@ -64,21 +62,21 @@ async def stream_chat_response(
             document_ids=document_ids,
             jurisdiction=jurisdiction or 'ks',
             history=recent_history,
-            domain=domain
+            domain=domain,
+            emit_events=emit_events
         ):
-            full_response += token
+            if not token.startswith(RETRIEVAL_EVENT_PREFIX):
+                full_response += token
             yield token
 
         # Sync AI Message to History
         if full_response.strip():
-            db.cases.update_one(
-                {"_id": oid}, 
-                {"$push": {"chat_history": ChatMessage(
-                    role="ai", 
-                    content=full_response.strip(), 
-                    timestamp=datetime.now(timezone.utc)
-                ).model_dump()}}
-            )
+            await async_repository.append_chat_message(case_id, ChatMessage(
+                role="ai", 
+                content=full_response.strip(), 
+                timestamp=datetime.now(timezone.utc),
+                packing_report=agent_service.last_packing_report or None
+            ).model_dump())
             
     except Exception as e:
         logger.error(f"Streaming Error: {e}")
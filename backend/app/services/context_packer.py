@@ -0,0 +1,241 @@
+# FILE: backend/app/services/context_packer.py
+# PHOENIX PROTOCOL - TOKEN-BUDGETED CONTEXT PACKER V1.0
+# 1. Counts tokens with tiktoken when available, otherwise with a character-ratio approximation.
+# 2. Ranks candidate passages by retrieval score, recency and document type.
+# 3. Drops near-duplicate chunks (vector hits that repeat document text) before they cost tokens.
+# 4. Fills a per-model budget and returns a packing report for every answer.
+
+import re
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tokens reserved for retrieved context per model (prompt scaffolding, history and the answer live outside this).
+MODEL_CONTEXT_BUDGETS: Dict[str, int] = {
+    "deepseek/deepseek-chat": 40000,
+    "deepseek/deepseek-r1": 40000,
+}
+DEFAULT_CONTEXT_BUDGET = 24000
+
+CHARS_PER_TOKEN = 3.5          # Albanian legal text averages ~3.5 chars/token on cl100k
+SEGMENT_CHARS = 2000           # document text is offered to the packer in segments of this size
+MIN_TRUNCATED_TOKENS = 200     # below this a partial passage is not worth including
+DUPLICATE_THRESHOLD = 0.8      # share of a passage's shingles already packed before it is dropped
+SHINGLE_SIZE = 5
+
+KIND_DOCUMENT = "document"
+KIND_CASE_HIT = "case_hit"
+KIND_LAW_HIT = "law_hit"
+
+DOC_TYPE_WEIGHTS = {
+    "aktgjykim": 1.25, "aktvendim": 1.2, "vendim": 1.2, "aktakuz": 1.2, "padi": 1.15,
+    "procesverbal": 1.1, "kontrat": 1.1, "ankes": 1.1, "fatur": 0.8, "invoice": 0.8,
+}
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.info(f"tiktoken unavailable, using character approximation: {e}")
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    enc = _get_encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return max(1, int(len(text) / CHARS_PER_TOKEN))
+
+
+def get_context_budget(model: str) -> int:
+    override = getattr(settings, "RAG_CONTEXT_TOKEN_BUDGET", 0)
+    if override:
+        return int(override)
+    return MODEL_CONTEXT_BUDGETS.get(model, DEFAULT_CONTEXT_BUDGET)
+
+
+@dataclass
+class Passage:
+    kind: str
+    text: str
+    score: float
+    source: str = ""
+    doc_id: Optional[str] = None
+    segment: int = 0
+    meta: Dict[str, Any] = field(default_factory=dict)
+    tokens: int = 0
+    truncated: bool = False
+
+
+def _shingles(text: str) -> Set[int]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {hash(" ".join(words))} if words else set()
+    return {hash(" ".join(words[i:i + SHINGLE_SIZE])) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _segment_text(text: str, size: int = SEGMENT_CHARS) -> List[str]:
+    """Ndan tekstin në segmente afërsisht `size` karaktere, duke respektuar kufijtë e paragrafëve."""
+    text = text.strip()
+    if len(text) <= size:
+        return [text] if text else []
+    segments, current = [], ""
+    for para in re.split(r"\n\s*\n", text):
+        para = para.strip()
+        if not para:
+            continue
+        while len(para) > size:
+            if current:
+                segments.append(current)
+                current = ""
+            segments.append(para[:size])
+            para = para[size:]
+        if len(current) + len(para) + 2 > size and current:
+            segments.append(current)
+            current = para
+        else:
+            current = f"{current}\n\n{para}" if current else para
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _doc_type_weight(doc: Dict[str, Any]) -> float:
+    label = " ".join(str(doc.get(k) or "") for k in ("document_type", "category", "file_name", "title")).lower()
+    for key, weight in DOC_TYPE_WEIGHTS.items():
+        if key in label:
+            return weight
+    return 1.0
+
+
+def _doc_timestamp(doc: Dict[str, Any]) -> float:
+    for key in ("created_at", "uploaded_at", "updated_at"):
+        value = doc.get(key)
+        if isinstance(value, datetime):
+            return value.timestamp()
+    return 0.0
+
+
+def _hit_score(hit: Dict[str, Any], rank: int, total: int) -> float:
+    score = hit.get("score")
+    if isinstance(score, (int, float)) and score > 0:
+        return float(score)
+    return 1.0 - (rank / max(total, 1)) * 0.5
+
+
+def build_candidates(
+    case_hits: List[Dict[str, Any]],
+    law_hits: List[Dict[str, Any]],
+    documents: List[Dict[str, Any]],
+    text_of: Any,
+    focus_document_ids: Optional[List[str]] = None,
+) -> List[Passage]:
+    """Kthen të gjithë pasazhet kandidate me rezultatin e renditjes. `text_of` nxjerr tekstin nga një hit."""
+    candidates: List[Passage] = []
+    focus = set(focus_document_ids or [])
+
+    for rank, hit in enumerate(case_hits):
+        text = text_of(hit)
+        if text:
+            candidates.append(Passage(
+                kind=KIND_CASE_HIT, text=text, score=1.1 * _hit_score(hit, rank, len(case_hits)),
+                source=str(hit.get("source") or "Dokument"), meta={"page": hit.get("page") or "N/A"}
+            ))
+
+    for rank, hit in enumerate(law_hits):
+        text = text_of(hit)
+        if text:
+            candidates.append(Passage(
+                kind=KIND_LAW_HIT, text=text, score=1.0 * _hit_score(hit, rank, len(law_hits)),
+                source=str(hit.get("law_title") or hit.get("source") or "Ligji përkatës"),
+                meta={"article_number": hit.get("article_number", "N/A")}
+            ))
+
+    ordered = sorted(documents, key=_doc_timestamp, reverse=True)
+    recency = {str(d.get("_id", "")): 1.0 - 0.4 * (i / max(len(ordered) - 1, 1)) for i, d in enumerate(ordered)}
+
+    for doc in documents:
+        doc_id = str(doc.get("_id", ""))
+        weight = _doc_type_weight(doc) * recency.get(doc_id, 1.0)
+        if doc_id in focus:
+            weight *= 1.5
+
+        summary = doc.get("summary") or ""
+        if summary == "Sinteza...":
+            summary = ""
+        if summary:
+            candidates.append(Passage(
+                kind=KIND_DOCUMENT, text=summary, score=0.95 * weight, doc_id=doc_id, segment=-1,
+                source=doc.get("file_name") or doc.get("title") or "Dokument.pdf"
+            ))
+
+        raw = doc.get("extracted_text") or doc.get("text_content") or doc.get("text") or doc.get("content") or ""
+        for idx, segment in enumerate(_segment_text(raw)):
+            candidates.append(Passage(
+                kind=KIND_DOCUMENT, text=segment, score=0.8 * weight / (1.0 + 0.15 * idx), doc_id=doc_id, segment=idx,
+                source=doc.get("file_name") or doc.get("title") or "Dokument.pdf"
+            ))
+
+    return candidates
+
+
+def pack(candidates: List[Passage], model: str, budget: Optional[int] = None) -> Dict[str, Any]:
+    """Mbush buxhetin e tokenëve me pasazhet më të mira; kthen pasazhet e zgjedhura dhe raportin."""
+    budget = budget or get_context_budget(model)
+    selected: List[Passage] = []
+    seen: Set[int] = set()
+    used = 0
+    dropped_budget = 0
+    dropped_duplicate = 0
+    truncated = 0
+
+    for passage in sorted(candidates, key=lambda p: p.score, reverse=True):
+        shingles = _shingles(passage.text)
+        if shingles and len(shingles & seen) / len(shingles) >= DUPLICATE_THRESHOLD:
+            dropped_duplicate += 1
+            continue
+
+        tokens = count_tokens(passage.text)
+        remaining = budget - used
+        if tokens > remaining:
+            if remaining < MIN_TRUNCATED_TOKENS:
+                dropped_budget += 1
+                continue
+            passage.text = passage.text[:int(remaining * CHARS_PER_TOKEN * 0.95)]
+            passage.truncated = True
+            tokens = count_tokens(passage.text)
+            truncated += 1
+
+        passage.tokens = tokens
+        used += tokens
+        seen |= shingles
+        selected.append(passage)
+
+    report = {
+        "model": model,
+        "budget_tokens": budget,
+        "used_tokens": used,
+        "candidates": len(candidates),
+        "packed": len(selected),
+        "dropped_budget": dropped_budget,
+        "dropped_duplicate": dropped_duplicate,
+        "truncated": truncated,
+        "tokenizer": "tiktoken" if _get_encoding() is not None else "approx",
+    }
+    return {"passages": selected, "report": report}
@@ -10,11 +10,15 @@ from bson import ObjectId
 from pymongo.database import Database
 
 from . import document_service, llm_service
+from .llm.llm_cache import TTL_DEADLINES
 from ..models.document import DocumentOut
 from ..models.calendar import EventType, EventStatus, EventPriority, EventCategory
 
 logger = structlog.get_logger(__name__)
 
+# Callers with a lazy text reader fetch only this much of the document
+MAX_TEXT_CHARS = 40000
+
 AL_MONTHS = {
     "janar": "January", "shkurt": "February", "mars": "March", "prill": "April",
     "maj": "May", "qershor": "June", "korrik": "July", "gusht": "August",
@@ -35,7 +39,7 @@ def _preprocess_date_text(text: str) -> str:
     return text_lower
 
 def _extract_dates_with_llm(full_text: str, doc_category: str) -> List[Dict[str, str]]:
-    truncated_text = full_text[:40000]
+    truncated_text = full_text[:MAX_TEXT_CHARS]
     current_date = datetime.now().strftime("%d %B %Y")
     
     logger.info(f"Deadline Engine input text length: {len(truncated_text)}")
@@ -58,7 +62,7 @@ def _extract_dates_with_llm(full_text: str, doc_category: str) -> List[Dict[str,
     """
 
     try:
-        raw_content = llm_service._call_llm(system_prompt, truncated_text, json_mode=True, temperature=0.1, model=llm_service.FAST_MODEL)
+        raw_content = llm_service._call_llm(system_prompt, truncated_text, json_mode=True, temperature=0.1, model=llm_service.FAST_MODEL, cache_ttl=TTL_DEADLINES)
         data = llm_service.clean_and_parse_json(raw_content)
         events = data.get("events", [])
         logger.info(f"LLM extracted events count: {len(events)}")
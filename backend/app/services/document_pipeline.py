@@ -0,0 +1,643 @@
+# FILE: backend/app/services/document_pipeline.py
+# PHOENIX PROTOCOL - DURABLE DOCUMENT PIPELINE V1.0 (CHECKPOINTED CELERY STAGES)
+# 1. The Hydra orchestrator is split into idempotent stages:
+#    download -> extract -> ocr -> chunk -> embed -> summarize -> preview -> deadlines -> graph.
+# 2. Every stage records a checkpoint on the document ('pipeline.stages.<name>'). A retry, a redelivered
+#    message or a reaper requeue resumes at the first unfinished stage instead of repeating the chain.
+# 3. Each stage is a Celery message on its own queue (doc_io / doc_cpu / doc_ocr / doc_llm), so OCR and
+#    LLM concurrency can be sized independently. Intermediate results live in 'document_artifacts';
+#    the final full text is stored paged in 'document_pages' (services/document_text_service.py).
+# 4. The document turns READY after 'preview'; deadlines and graph enrich it afterwards.
+# 5. reap_stale_pipelines() requeues documents whose heartbeat stopped (deploy, OOM, lost message).
+# 6. The 'pages' artifact keeps per-page provenance (text layer / OCR / mixed, OCR confidence); the chunk
+#    stage copies it onto chunk metadata next to 'page'.
+
+import os
+import asyncio
+import logging
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.database import Database
+
+from app.models.document import DocumentStatus
+from app.services.realtime_publisher import publish_event
+from app.services.document_text_service import DocumentTextReader, store_document_text
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("download", "extract", "ocr", "chunk", "embed", "summarize", "preview", "deadlines", "graph")
+STAGE_QUEUES = {
+    "download": "doc_io",
+    "extract": "doc_cpu",
+    "ocr": "doc_ocr",
+    "chunk": "doc_cpu",
+    "embed": "doc_llm",
+    "summarize": "doc_llm",
+    "preview": "doc_io",
+    "deadlines": "doc_llm",
+    "graph": "doc_llm",
+}
+PIPELINE_QUEUES = ("doc_io", "doc_cpu", "doc_ocr", "doc_llm")
+# Without these the document is useless for RAG; the others degrade to SKIPPED after their retries
+REQUIRED_STAGES = {"download", "extract", "ocr", "chunk", "embed"}
+READY_AFTER = "preview"
+
+STAGE_PROGRESS = {
+    "download": (10, "Duke shkarkuar skedarin..."),
+    "extract": (25, "Duke lexuar tekstin..."),
+    "ocr": (40, "Duke lexuar tekstin & OCR..."),
+    "chunk": (50, "Duke ndarë dokumentin..."),
+    "embed": (65, "Duke vektorizuar në RAG..."),
+    "summarize": (80, "Duke përmbledhur dokumentin..."),
+    "preview": (100, "Përfunduar"),
+}
+
+STAGE_MAX_RETRIES = 3
+STAGE_SOFT_TIME_LIMIT = 540
+STAGE_TIME_LIMIT = 600
+# Must exceed STAGE_TIME_LIMIT, otherwise the reaper would requeue stages that are still running
+STALE_AFTER = timedelta(minutes=15)
+MAX_REQUEUES = 3
+OCR_BATCH_PAGES = 8
+SUMMARY_TIMEOUT = 90.0
+GRAPH_MAX_CHARS = 45000
+
+WORK_DIR = os.path.join(tempfile.gettempdir(), "juristi_pipeline")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+class StageBusy(Exception):
+    """Another worker holds a fresh lease on this stage."""
+
+
+class StageError(Exception):
+    pass
+
+
+@dataclass
+class StageContext:
+    db: Database
+    document: Dict[str, Any]
+    document_id: str
+    user_id: str
+    case_id: str
+    file_name: str
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def ensure_indexes(db: Database) -> None:
+    db.documents.create_index([("pipeline.state", ASCENDING), ("pipeline.heartbeat_at", ASCENDING)])
+    db.documents.create_index([("status", ASCENDING), ("created_at", ASCENDING)])
+    db.document_artifacts.create_index([("document_id", ASCENDING)])
+
+
+# --- ARTIFACTS ---
+def _artifact_id(document_id: str, name: str) -> str:
+    return f"{document_id}:{name}"
+
+
+def save_artifact(db: Database, document_id: str, name: str, data: Dict[str, Any]) -> None:
+    db.document_artifacts.replace_one(
+        {"_id": _artifact_id(document_id, name)},
+        {"document_id": document_id, "name": name, "updated_at": _now(), **data},
+        upsert=True
+    )
+
+
+def load_artifact(db: Database, document_id: str, name: str) -> Dict[str, Any]:
+    artifact = db.document_artifacts.find_one({"_id": _artifact_id(document_id, name)})
+    if artifact is None:
+        raise StageError(f"Artifact '{name}' missing for document {document_id}")
+    return artifact
+
+
+def delete_artifacts(db: Database, document_id: str) -> None:
+    db.document_artifacts.delete_many({"document_id": document_id})
+
+
+# --- LOCAL FILE ---
+def _local_path(document_id: str, file_name: str) -> str:
+    suffix = os.path.splitext(file_name)[1] or ".pdf"
+    return os.path.join(WORK_DIR, f"{document_id}{suffix}")
+
+
+def _ensure_local_original(ctx: StageContext, refresh: bool = False) -> str:
+    """Stages may run on different hosts: any stage re-downloads the original if this host lacks it."""
+    from app.services import storage_service
+
+    path = _local_path(ctx.document_id, ctx.file_name)
+    if not refresh and os.path.exists(path):
+        return path
+    os.makedirs(WORK_DIR, exist_ok=True)
+    partial = f"{path}.{os.getpid()}.part"
+    stream = storage_service.download_original_document_stream(ctx.document["storage_key"])
+    try:
+        with open(partial, "wb") as target:
+            while True:
+                block = stream.read(1024 * 1024)
+                if not block:
+                    break
+                target.write(block)
+    finally:
+        if hasattr(stream, "close"):
+            stream.close()
+    os.replace(partial, path)
+    return path
+
+
+def _remove_local_original(document_id: str, file_name: str) -> None:
+    try:
+        os.remove(_local_path(document_id, file_name))
+    except OSError:
+        pass
+
+
+def _is_image(ctx: StageContext) -> bool:
+    mime = (ctx.document.get("mime_type") or "").lower()
+    return mime.startswith("image/") or ctx.file_name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _is_pdf(ctx: StageContext) -> bool:
+    return "pdf" in (ctx.document.get("mime_type") or "").lower() or ctx.file_name.lower().endswith(".pdf")
+
+
+def _text(ctx: StageContext, limit: Optional[int] = None) -> str:
+    reader = DocumentTextReader.for_id(ctx.db, ctx.document_id)
+    if reader is None:
+        raise StageError(f"Document {ctx.document_id} disappeared")
+    return reader.read() if limit is None else reader.head(limit)
+
+
+# --- STAGES ---
+def _stage_download(ctx: StageContext) -> Dict[str, Any]:
+    path = _ensure_local_original(ctx, refresh=True)
+    if os.path.getsize(path) == 0:
+        raise StageError("Downloaded original is empty")
+    return {}
+
+
+def _stage_extract(ctx: StageContext) -> Dict[str, Any]:
+    from app.services import text_extraction_service
+
+    path = _ensure_local_original(ctx)
+    if _is_pdf(ctx):
+        pages, ocr_pending, total, provenance = text_extraction_service.extract_pdf_digital_pages(path)
+        save_artifact(ctx.db, ctx.document_id, "pages", {
+            "kind": "pdf", "total": total, "ocr_pending": ocr_pending,
+            "pages": {str(i): text for i, text in pages.items()},
+            "provenance": {str(i): p for i, p in enumerate(provenance)}
+        })
+    elif _is_image(ctx):
+        save_artifact(ctx.db, ctx.document_id, "pages", {
+            "kind": "image", "total": 1, "ocr_pending": [0], "pages": {}, "provenance": {"0": {"page": 1, "method": "ocr"}}
+        })
+    else:
+        text = text_extraction_service.extract_text(path, ctx.document.get("mime_type", ""))
+        save_artifact(ctx.db, ctx.document_id, "pages", {"kind": "text", "total": 1, "ocr_pending": [], "pages": {"0": text}, "provenance": {}})
+    return {}
+
+
+def _stage_ocr(ctx: StageContext) -> Dict[str, Any]:
+    from app.services import text_extraction_service, storage_service
+
+    artifact = load_artifact(ctx.db, ctx.document_id, "pages")
+    pending: List[int] = list(artifact.get("ocr_pending") or [])
+
+    if pending and artifact.get("kind") == "image":
+        path = _ensure_local_original(ctx)
+        text = text_extraction_service.extract_text(path, ctx.document.get("mime_type", ""))
+        ctx.db.document_artifacts.update_one(
+            {"_id": artifact["_id"]}, {"$set": {"pages.0": text, "ocr_pending": []}}
+        )
+    elif pending:
+        path = _ensure_local_original(ctx)
+        # 'mixed' pages already hold their text layer from the extract stage; OCR is merged into it
+        text_layers = {int(i): text for i, text in (artifact.get("pages") or {}).items()}
+        # Page batches are checkpointed too: a timeout on page 180 does not re-OCR pages 1-179
+        for start in range(0, len(pending), OCR_BATCH_PAGES):
+            batch = pending[start:start + OCR_BATCH_PAGES]
+            results = text_extraction_service.ocr_pdf_pages(path, batch, {i: text_layers[i] for i in batch if i in text_layers})
+            updates: Dict[str, Any] = {}
+            for i, (text, ocr_provenance) in results.items():
+                updates[f"pages.{i}"] = text
+                updates.update({f"provenance.{i}.{field}": value for field, value in ocr_provenance.items()})
+            ctx.db.document_artifacts.update_one(
+                {"_id": artifact["_id"]}, {"$set": updates, "$pullAll": {"ocr_pending": batch}}
+            )
+            ctx.db.documents.update_one({"_id": ctx.document["_id"]}, {"$set": {"pipeline.heartbeat_at": _now()}})
+
+    artifact = load_artifact(ctx.db, ctx.document_id, "pages")
+    pages = {int(i): text for i, text in (artifact.get("pages") or {}).items()}
+    raw_text = text_extraction_service.join_pages(pages, artifact.get("total", 1))
+    if not raw_text or len(raw_text.strip()) <= 10:
+        raw_text = f"Dokument i ngarkuar: {ctx.file_name}."
+
+    # Full text goes to document_pages; the document keeps only the inline head
+    store_document_text(ctx.db, ctx.document_id, raw_text)
+    text_key = storage_service.upload_processed_text(raw_text, ctx.user_id, ctx.case_id, ctx.document_id)
+    return {"processed_text_storage_key": text_key}
+
+
+def _stage_chunk(ctx: StageContext) -> Dict[str, Any]:
+    from app.services import spreadsheet_text_service
+    from app.services.albanian_document_processor import EnhancedDocumentProcessor
+
+    raw_text = _text(ctx)
+    sheet_chunks = spreadsheet_text_service.split_blocks(raw_text) if spreadsheet_text_service.is_spreadsheet(
+        ctx.file_name, ctx.document.get("mime_type", "")) else []
+    if sheet_chunks:
+        # Spreadsheets arrive already token-bounded; one chunk per sheet/row-range block
+        save_artifact(ctx.db, ctx.document_id, "chunks", {
+            "chunks": [text for text, _ in sheet_chunks],
+            "metadatas": [{**meta, "file_name": ctx.file_name} for _, meta in sheet_chunks],
+        })
+        return {}
+
+    enriched_chunks = EnhancedDocumentProcessor.process_document(text_content=raw_text, document_metadata={"file_name": ctx.file_name})
+    if enriched_chunks:
+        chunks = [c.content for c in enriched_chunks]
+        metadatas = [c.metadata for c in enriched_chunks]
+    else:
+        chunks = [raw_text[i:i + 1500] for i in range(0, len(raw_text), 1200)]
+        metadatas = [{"page": 1, "source": ctx.file_name} for _ in chunks]
+
+    # Page provenance on every chunk: a citation can say whether page N was read from the text layer or by OCR
+    pages_artifact = ctx.db.document_artifacts.find_one({"_id": _artifact_id(ctx.document_id, "pages")}, {"provenance": 1})
+    provenance = (pages_artifact or {}).get("provenance") or {}
+    for meta in metadatas:
+        page = provenance.get(str(int(meta.get("page") or 1) - 1))
+        if page:
+            meta["extraction"] = page.get("method")
+            if page.get("ocr_confidence") is not None:
+                meta["ocr_confidence"] = page["ocr_confidence"]
+    save_artifact(ctx.db, ctx.document_id, "chunks", {"chunks": chunks, "metadatas": metadatas})
+    return {}
+
+
+def _stage_embed(ctx: StageContext) -> Dict[str, Any]:
+    from app.services.vector_store_service import create_and_store_embeddings_from_chunks, delete_document_embeddings
+
+    artifact = load_artifact(ctx.db, ctx.document_id, "chunks")
+    # Idempotent: a retry after a partial insert must not leave duplicate vectors behind
+    delete_document_embeddings(ctx.user_id, ctx.document_id)
+    stored = create_and_store_embeddings_from_chunks(
+        user_id=ctx.user_id, document_id=ctx.document_id, case_id=ctx.case_id,
+        file_name=ctx.file_name, chunks=artifact.get("chunks", []), metadatas=artifact.get("metadatas", [])
+    )
+    if not stored:
+        raise StageError("Embedding storage failed")
+    return {}
+
+
+def _stage_summarize(ctx: StageContext) -> Dict[str, Any]:
+    from app.services import llm_service
+
+    sterilized_text = llm_service.sterilize_legal_text(_text(ctx))
+    summary = asyncio.run(asyncio.wait_for(llm_service.process_large_document_async(sterilized_text), timeout=SUMMARY_TIMEOUT))
+    if not summary or not summary.strip():
+        raise StageError("Empty summary")
+    return {"summary": summary}
+
+
+def _stage_preview(ctx: StageContext) -> Dict[str, Any]:
+    from app.services import conversion_service, storage_service
+
+    path = _ensure_local_original(ctx)
+    pdf_path = conversion_service.convert_to_pdf(path)
+    if not pdf_path:
+        raise StageError("PDF conversion returned no file")
+    try:
+        key = storage_service.upload_document_preview(pdf_path, ctx.user_id, ctx.case_id, ctx.document_id)
+    finally:
+        if pdf_path != path and os.path.exists(pdf_path):
+            os.remove(pdf_path)
+    return {"preview_storage_key": key}
+
+
+def _stage_deadlines(ctx: StageContext) -> Dict[str, Any]:
+    from app.services import deadline_service
+
+    # Replaces the document's calendar events on every run, so a retry is safe
+    deadline_service.extract_and_save_deadlines(db=ctx.db, document_id=ctx.document_id, full_text=_text(ctx, deadline_service.MAX_TEXT_CHARS))
+    return {}
+
+
+def _stage_graph(ctx: StageContext) -> Dict[str, Any]:
+    from app.services.ontology_service import ontology_service
+
+    text = f"[{ctx.file_name}]\n{_text(ctx, GRAPH_MAX_CHARS)}"
+    extracted = asyncio.run(ontology_service.extract_ontology_from_batch_async(text, [ctx.document_id]))
+    if extracted.get("nodes") or extracted.get("edges"):
+        existing = ontology_service.get_case_graph(ctx.db, ctx.case_id)
+        # merge_graph_data deduplicates by node/edge id, so re-running the stage is a no-op
+        nodes, edges = ontology_service.merge_graph_data(
+            existing.get("nodes", []), existing.get("edges", []), extracted.get("nodes", []), extracted.get("edges", [])
+        )
+        ctx.db.case_graphs.update_one(
+            {"case_id": ctx.case_id},
+            {"$set": {"nodes": nodes, "edges": edges, "updated_at": _now()}},
+            upsert=True
+        )
+    return {}
+
+
+STAGE_HANDLERS: Dict[str, Callable[[StageContext], Dict[str, Any]]] = {
+    "download": _stage_download,
+    "extract": _stage_extract,
+    "ocr": _stage_ocr,
+    "chunk": _stage_chunk,
+    "embed": _stage_embed,
+    "summarize": _stage_summarize,
+    "preview": _stage_preview,
+    "deadlines": _stage_deadlines,
+    "graph": _stage_graph,
+}
+
+
+# --- STATE MACHINE ---
+def next_stage(document: Dict[str, Any]) -> Optional[str]:
+    stages = (document.get("pipeline") or {}).get("stages") or {}
+    for stage in STAGES:
+        if (stages.get(stage) or {}).get("status") not in ("DONE", "SKIPPED"):
+            return stage
+    return None
+
+
+def _following(stage: str) -> Optional[str]:
+    index = STAGES.index(stage)
+    return STAGES[index + 1] if index + 1 < len(STAGES) else None
+
+
+def _publish_progress(redis_client: Any, user_id: str, document_id: str, stage: str) -> None:
+    if redis_client is None or stage not in STAGE_PROGRESS:
+        return
+    percent, message = STAGE_PROGRESS[stage]
+    publish_event(redis_client, user_id, {"type": "DOCUMENT_PROGRESS", "document_id": document_id, "percent": percent, "message": message})
+
+
+def _publish_status(redis_client: Any, user_id: str, document_id: str, status: str, error: Optional[str] = None) -> None:
+    if redis_client is None:
+        return
+    publish_event(redis_client, user_id, {"type": "DOCUMENT_STATUS", "document_id": document_id, "status": status, "error": error})
+
+
+def enqueue_stage(document_id: str, stage: str, countdown: int = 0) -> None:
+    from app.celery_app import celery_app
+    celery_app.send_task("run_document_stage", args=[document_id, stage], queue=STAGE_QUEUES[stage], countdown=countdown)
+
+
+def start(db: Database, document_id: str, inline_fallback: bool = False) -> bool:
+    """
+    Nis (ose vazhdon) pipeline-in e dokumentit. Kthen False nëse broker-i nuk është i arritshëm.
+    inline_fallback=True: thirrësi e përpunon vetë dokumentin kur enqueue dështon (orchestrate_document_processing_mongo),
+    prandaj pipeline.state nuk bëhet RUNNING dhe reaper-i nuk e rinis. Pa të, dokumenti mbetet RUNNING që
+    reaper-i ta vërë në radhë sapo broker-i të kthehet.
+    """
+    doc_oid = ObjectId(document_id)
+    document = db.documents.find_one({"_id": doc_oid})
+    if document is None:
+        return False
+
+    stage = next_stage(document)
+    if stage is None:
+        return True
+    try:
+        enqueue_stage(document_id, stage)
+    except Exception as e:
+        logger.warning(f"Document pipeline enqueue failed for {document_id}: {e}")
+        if inline_fallback:
+            db.documents.update_one({"_id": doc_oid}, {"$set": {"pipeline.state": "INLINE"}})
+        else:
+            _mark_running(db, doc_oid)
+        return False
+
+    _mark_running(db, doc_oid)
+    return True
+
+
+def _mark_running(db: Database, doc_oid: ObjectId) -> None:
+    db.documents.update_one({"_id": doc_oid, "pipeline.started_at": {"$exists": False}}, {"$set": {"pipeline.started_at": _now()}})
+    # An enqueued stage may already have finished the whole pipeline; never move a COMPLETED document back
+    db.documents.update_one(
+        {"_id": doc_oid, "pipeline.state": {"$ne": "COMPLETED"}},
+        {"$set": {"pipeline.state": "RUNNING", "pipeline.heartbeat_at": _now()}}
+    )
+
+
+def run_stage(db: Database, redis_client: Any, document_id: str, stage: str, owner: Optional[str] = None) -> Optional[str]:
+    """
+    Ekzekuton një fazë dhe regjistron checkpoint-in. Kthen fazën e radhës (ose None kur pipeline mbaron).
+    """
+    doc_oid = ObjectId(document_id)
+    lease_cutoff = _now() - STALE_AFTER
+    prefix = f"pipeline.stages.{stage}"
+
+    document = db.documents.find_one({"_id": doc_oid})
+    if document is None:
+        return None
+    if ((document.get("pipeline") or {}).get("stages") or {}).get(stage, {}).get("status") in ("DONE", "SKIPPED"):
+        # Duplicate message: whoever finished this stage already enqueued the next one
+        return None
+
+    # Lease: a redelivered or requeued message must not run the stage twice in parallel
+    claimed = db.documents.find_one_and_update(
+        {"_id": doc_oid, "$or": [
+            {f"{prefix}.status": {"$ne": "RUNNING"}},
+            {f"{prefix}.owner": owner},
+            {"pipeline.heartbeat_at": {"$lt": lease_cutoff}},
+        ]},
+        {"$set": {
+            f"{prefix}.status": "RUNNING", f"{prefix}.owner": owner, f"{prefix}.started_at": _now(),
+            "pipeline.current": stage, "pipeline.state": "RUNNING", "pipeline.heartbeat_at": _now(),
+        }, "$inc": {f"{prefix}.attempts": 1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if claimed is None:
+        raise StageBusy(f"{stage} for {document_id} is held by another worker")
+
+    ctx = StageContext(
+        db=db, document=claimed, document_id=document_id,
+        user_id=str(claimed.get("owner_id")), case_id=str(claimed.get("case_id")),
+        file_name=claimed.get("file_name") or "Dokument"
+    )
+    fields = STAGE_HANDLERS[stage](ctx)
+
+    update = {
+        **fields,
+        f"{prefix}.status": "DONE", f"{prefix}.at": _now(), f"{prefix}.error": None,
+        "pipeline.heartbeat_at": _now(), "updated_at": _now(),
+    }
+    if stage == READY_AFTER:
+        update.update({"status": DocumentStatus.READY, "progress_percent": 100})
+    following = _following(stage)
+    if following is None:
+        update.update({"pipeline.state": "COMPLETED", "pipeline.current": None, "pipeline.finished_at": _now()})
+    db.documents.update_one({"_id": doc_oid}, {"$set": update})
+
+    _publish_progress(redis_client, ctx.user_id, document_id, stage)
+    if stage == READY_AFTER:
+        _publish_status(redis_client, ctx.user_id, document_id, DocumentStatus.READY)
+    if following is None:
+        delete_artifacts(db, document_id)
+        _remove_local_original(document_id, ctx.file_name)
+    return following
+
+
+def record_stage_failure(db: Database, redis_client: Any, document_id: str, stage: str, error: str, final: bool) -> Optional[str]:
+    """
+    Regjistron dështimin e një faze. Në përpjekjen e fundit: fazat opsionale kalohen (SKIPPED),
+    fazat e domosdoshme e shënojnë dokumentin FAILED. Kthen fazën e radhës nëse pipeline vazhdon.
+    """
+    doc_oid = ObjectId(document_id)
+    prefix = f"pipeline.stages.{stage}"
+    document = db.documents.find_one({"_id": doc_oid}, {"owner_id": 1, "file_name": 1})
+    if document is None:
+        return None
+    user_id = str(document.get("owner_id"))
+
+    if not final:
+        db.documents.update_one({"_id": doc_oid}, {"$set": {
+            f"{prefix}.status": "RETRYING", f"{prefix}.error": error[:500], "pipeline.heartbeat_at": _now()
+        }})
+        return None
+
+    if stage in REQUIRED_STAGES:
+        db.documents.update_one({"_id": doc_oid}, {"$set": {
+            f"{prefix}.status": "FAILED", f"{prefix}.error": error[:500],
+            "pipeline.state": "FAILED", "pipeline.finished_at": _now(),
+            "status": DocumentStatus.FAILED, "error_message": error[:500],
+        }})
+        _publish_status(redis_client, user_id, document_id, DocumentStatus.FAILED, error[:500])
+        _remove_local_original(document_id, document.get("file_name") or "Dokument")
+        return None
+
+    update: Dict[str, Any] = {f"{prefix}.status": "SKIPPED", f"{prefix}.error": error[:500], "pipeline.heartbeat_at": _now()}
+    if stage == "summarize":
+        reader = DocumentTextReader.for_id(db, document_id)
+        if reader is not None:
+            update["summary"] = reader.head(500)
+    following = _following(stage)
+    if stage == READY_AFTER:
+        update.update({"status": DocumentStatus.READY, "progress_percent": 100})
+    if following is None:
+        update.update({"pipeline.state": "COMPLETED", "pipeline.current": None, "pipeline.finished_at": _now()})
+    db.documents.update_one({"_id": doc_oid}, {"$set": update})
+    logger.warning(f"Document {document_id}: optional stage '{stage}' skipped after retries: {error}")
+
+    if stage == READY_AFTER:
+        _publish_progress(redis_client, user_id, document_id, stage)
+        _publish_status(redis_client, user_id, document_id, DocumentStatus.READY)
+    if following is None:
+        delete_artifacts(db, document_id)
+        _remove_local_original(document_id, document.get("file_name") or "Dokument")
+    return following
+
+
+def retry_delay(retries: int) -> int:
+    return min(300, 15 * (2 ** retries))
+
+
+# --- REAPER ---
+def _stale_filter(cutoff: datetime) -> Dict[str, Any]:
+    return {"$or": [
+        {"pipeline.state": "RUNNING", "pipeline.heartbeat_at": {"$lt": cutoff}},
+        # Uploads from before the pipeline existed (BackgroundTasks era) that never left PENDING
+        {"status": DocumentStatus.PENDING, "pipeline": {"$exists": False}, "created_at": {"$lt": cutoff}},
+    ]}
+
+
+def reap_stale_pipelines(db: Database, redis_client: Any = None, limit: int = 100) -> Dict[str, int]:
+    """Rivendos në radhë dokumentet pa heartbeat; pas MAX_REQUEUES i shënon FAILED."""
+    cutoff = _now() - STALE_AFTER
+    stats = {"requeued": 0, "failed": 0, "errors": 0}
+
+    for candidate in db.documents.find(_stale_filter(cutoff), {"_id": 1}).limit(limit):
+        # Claim with the same filter so concurrent reapers never requeue one document twice
+        document = db.documents.find_one_and_update(
+            {"_id": candidate["_id"], **_stale_filter(cutoff)},
+            {"$set": {"pipeline.heartbeat_at": _now(), "pipeline.state": "RUNNING"}, "$inc": {"pipeline.requeues": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if document is None:
+            continue
+        document_id = str(document["_id"])
+
+        if document["pipeline"].get("requeues", 0) > MAX_REQUEUES:
+            error = "Përpunimi u ndërpre disa herë. Ju lutem ngarkojeni dokumentin përsëri."
+            db.documents.update_one({"_id": document["_id"]}, {"$set": {
+                "status": DocumentStatus.FAILED, "error_message": error,
+                "pipeline.state": "FAILED", "pipeline.finished_at": _now(),
+            }})
+            _publish_status(redis_client, str(document.get("owner_id")), document_id, DocumentStatus.FAILED, error)
+            stats["failed"] += 1
+            continue
+
+        stage = next_stage(document)
+        if stage is not None:
+            # The dead worker's lease: without this the requeued message fails every lease clause in run_stage
+            # (status RUNNING, other owner, heartbeat just refreshed above) and is dropped as StageBusy
+            db.documents.update_one(
+                {"_id": document["_id"], f"pipeline.stages.{stage}.status": "RUNNING"},
+                {"$set": {f"pipeline.stages.{stage}.status": "REAPED"}, "$unset": {f"pipeline.stages.{stage}.owner": ""}}
+            )
+        try:
+            if stage is None:
+                db.documents.update_one({"_id": document["_id"]}, {"$set": {"pipeline.state": "COMPLETED", "pipeline.current": None}})
+            else:
+                enqueue_stage(document_id, stage)
+            stats["requeued"] += 1
+            logger.info(f"Reaper requeued document {document_id} at stage '{stage}'")
+        except Exception as e:
+            stats["errors"] += 1
+            logger.error(f"Reaper could not requeue document {document_id}: {e}")
+
+    return stats
+
+
+# --- ADMIN VIEW ---
+def pipeline_overview(db: Database, redis_client: Any = None) -> Dict[str, Any]:
+    """Thellësia e radhëve sipas fazës + dokumentet në punë, të ngecura dhe të dështuara."""
+    cutoff = _now() - STALE_AFTER
+    queue_depth: Dict[str, Optional[int]] = {}
+    for queue in PIPELINE_QUEUES:
+        try:
+            queue_depth[queue] = int(redis_client.llen(queue)) if redis_client is not None else None
+        except Exception:
+            queue_depth[queue] = None
+
+    in_flight = {row["_id"]: row for row in db.documents.aggregate([
+        {"$match": {"pipeline.state": "RUNNING"}},
+        {"$group": {
+            "_id": "$pipeline.current",
+            "documents": {"$sum": 1},
+            "stale": {"$sum": {"$cond": [{"$lt": ["$pipeline.heartbeat_at", cutoff]}, 1, 0]}},
+        }},
+    ])}
+
+    stages = []
+    for stage in STAGES:
+        row = in_flight.get(stage, {})
+        stages.append({
+            "stage": stage,
+            "queue": STAGE_QUEUES[stage],
+            "queue_depth": queue_depth.get(STAGE_QUEUES[stage]),
+            "in_progress": row.get("documents", 0),
+            "stale": row.get("stale", 0),
+        })
+
+    return {
+        "stages": stages,
+        "queues": queue_depth,
+        "pending_without_pipeline": db.documents.count_documents({"status": DocumentStatus.PENDING, "pipeline": {"$exists": False}}),
+        "stale_total": db.documents.count_documents(_stale_filter(cutoff)),
+        "failed_last_24h": db.documents.count_documents({"pipeline.state": "FAILED", "pipeline.finished_at": {"$gte": _now() - timedelta(hours=24)}}),
+        "generated_at": _now(),
+    }
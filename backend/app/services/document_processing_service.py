@@ -1,5 +1,7 @@
 # FILE: backend/app/services/document_processing_service.py
-# PHOENIX PROTOCOL - JURISTI HYDRA ORCHESTRATOR V26.0 (LIVE MULTI-STAGE PROGRESS BROADCASTER)
+# PHOENIX PROTOCOL - JURISTI HYDRA ORCHESTRATOR V26.1 (IN-PROCESS FALLBACK)
+# NOTE: Uploads are processed by the checkpointed Celery pipeline (services/document_pipeline.py).
+# This single-pass orchestrator only runs inside the API when the broker cannot be reached.
 
 import os
 import tempfile
@@ -14,7 +16,7 @@ from datetime import datetime, timezone
 from bson import ObjectId
 import redis.asyncio as aioredis
 
-from app.services import storage_service, llm_service, text_extraction_service, conversion_service
+from app.services import storage_service, llm_service, text_extraction_service, conversion_service, document_text_service
 from app.services.albanian_document_processor import EnhancedDocumentProcessor
 from app.models.document import DocumentStatus
 from app.services.vector_store_service import create_and_store_embeddings_from_chunks
@@ -23,6 +25,10 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 
+class DocumentNotFoundInDBError(Exception):
+    """The document record is not (yet) visible in MongoDB."""
+
+
 def _safe_remove_temp_file(file_path: str):
     """Safely removes temporary files on Windows without raising WinError 32."""
     if not file_path or not os.path.exists(file_path):
@@ -230,6 +236,7 @@ async def orchestrate_document_processing_mongo(
                     }
                 }
             )
+            await asyncio.to_thread(document_text_service.store_document_text, db, document_id_str, raw_text)
             logger.info(f"✅ [Orchestrator V26.0] Document {document_id_str} is marked 100% READY in MongoDB.")
         except Exception as db_err:
             logger.error(f"Failed to update MongoDB document status: {db_err}")
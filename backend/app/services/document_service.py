@@ -15,7 +15,7 @@ from pymongo.database import Database
 
 from ..models.document import DocumentOut, DocumentStatus
 from ..models.user import UserInDB
-from . import vector_store_service, storage_service
+from . import vector_store_service, storage_service, public_portal_service, document_text_service
 
 logger = logging.getLogger(__name__)
 
@@ -231,6 +231,8 @@ def delete_document_by_id(db: Database, redis_client: redis.Redis, doc_id: Objec
         logger.error(f"S3 cleanup failed (non-critical): {e}")
     
     db.documents.delete_one({"_id": doc_id})
+    document_text_service.delete_document_text(db, [doc_id_str])
+    public_portal_service.invalidate_case(db, document_to_delete.get("case_id"))
     
     try:
         if redis_client:
@@ -0,0 +1,240 @@
+# FILE: backend/app/services/document_text_service.py
+# PHOENIX PROTOCOL - DOCUMENT TEXT STORE V1.0 (PAGED • LAZY • CACHED)
+# 1. The full processed text lives out-of-line in 'document_pages': one row per PDF page ("--- [FAQJA N] ---"),
+#    or per SEGMENT_CHARS window for page-less text, with [start, end) character offsets.
+# 2. documents.extracted_text stays as the inline 15 000-char head for list views; everything that needs more
+#    asks a DocumentTextReader for exactly the pages or character range it needs.
+# 3. Hot segments are cached per process, keyed by the text version, so reprocessing never serves stale text.
+# 4. Documents processed before this store are backfilled lazily from processed_text_storage_key on first read.
+
+import re
+import uuid
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING
+from pymongo.database import Database
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_CHARS = 8000
+MAX_SEGMENT_CHARS = 16000
+INLINE_HEAD_CHARS = 15000
+CACHE_SEGMENTS = 512
+
+PAGE_MARKER = re.compile(r"\n--- \[FAQJA (\d+)\] ---\n")
+
+_cache: "OrderedDict[Tuple[str, str, int], str]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def ensure_indexes(db: Database) -> None:
+    db.document_pages.create_index([("document_id", ASCENDING), ("seq", ASCENDING)], unique=True)
+    db.document_pages.create_index([("document_id", ASCENDING), ("start", ASCENDING)])
+
+
+def _split_long(text: str, limit: int) -> List[str]:
+    """Splits at the last whitespace before the limit so words are never cut in half."""
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut < limit // 2:
+            cut = text.rfind(" ", 0, limit)
+        if cut < limit // 2:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:]
+    if text:
+        parts.append(text)
+    return parts
+
+
+def split_segments(text: str) -> List[Dict[str, Any]]:
+    """Ndan tekstin në segmente me faqe dhe offset-e; faqet shumë të gjata ndahen më tej."""
+    if not text:
+        return []
+
+    pieces: List[Tuple[Optional[int], str]] = []
+    markers = list(PAGE_MARKER.finditer(text))
+    if markers:
+        if markers[0].start() > 0:
+            pieces.append((None, text[:markers[0].start()]))
+        for i, marker in enumerate(markers):
+            end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+            pieces.append((int(marker.group(1)), text[marker.start():end]))
+    else:
+        pieces = [(None, part) for part in _split_long(text, SEGMENT_CHARS)]
+
+    segments = []
+    offset = 0
+    for page, piece in pieces:
+        for part in _split_long(piece, MAX_SEGMENT_CHARS):
+            segments.append({"seq": len(segments), "page": page, "start": offset, "end": offset + len(part), "text": part})
+            offset += len(part)
+    return segments
+
+
+def store_document_text(db: Database, document_id: str, text: str) -> Dict[str, Any]:
+    """Ruan tekstin e plotë si segmente dhe përditëson indeksin e tekstit në dokument."""
+    segments = split_segments(text)
+    version = uuid.uuid4().hex
+    db.document_pages.delete_many({"document_id": document_id})
+    if segments:
+        db.document_pages.insert_many([{"document_id": document_id, "version": version, **segment} for segment in segments])
+
+    text_index = {
+        "version": version,
+        "length": len(text),
+        "segments": len(segments),
+        "pages": len({s["page"] for s in segments if s["page"] is not None}),
+        "stored_at": datetime.now(timezone.utc),
+    }
+    db.documents.update_one(
+        {"_id": ObjectId(document_id)},
+        {"$set": {"text_index": text_index, "extracted_text": text[:INLINE_HEAD_CHARS]}}
+    )
+    return text_index
+
+
+def delete_document_text(db: Database, document_ids: List[str]) -> None:
+    if document_ids:
+        db.document_pages.delete_many({"document_id": {"$in": [str(d) for d in document_ids]}})
+
+
+def _cache_get(key: Tuple[str, str, int]) -> Optional[str]:
+    with _lock:
+        text = _cache.get(key)
+        if text is not None:
+            _cache.move_to_end(key)
+        return text
+
+
+def _cache_put(key: Tuple[str, str, int], text: str) -> None:
+    with _lock:
+        _cache[key] = text
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SEGMENTS:
+            _cache.popitem(last=False)
+
+
+class DocumentTextReader:
+    """
+    Lazy access to a document's full text:
+      reader.read(0, 40000)   -> first 40 000 chars (fetches only the overlapping segments)
+      reader.page(3)          -> text of PDF page 3
+      reader.segments()       -> iterates segment texts in order, one small query at a time
+    """
+
+    def __init__(self, db: Database, document: Dict[str, Any]):
+        self.db = db
+        self.document = document
+        self.document_id = str(document["_id"])
+        self._index: Optional[Dict[str, Any]] = document.get("text_index")
+        self._legacy_text: Optional[str] = None
+
+    @classmethod
+    def for_id(cls, db: Database, document_id: str) -> Optional["DocumentTextReader"]:
+        document = db.documents.find_one(
+            {"_id": ObjectId(document_id)},
+            {"text_index": 1, "extracted_text": 1, "processed_text_storage_key": 1}
+        )
+        return cls(db, document) if document else None
+
+    # --- index / legacy ---
+    def _ensure_index(self) -> Optional[Dict[str, Any]]:
+        if self._index is None and self._legacy_text is None:
+            self._backfill()
+        return self._index
+
+    def _backfill(self) -> None:
+        stored = self.db.documents.find_one({"_id": ObjectId(self.document_id)}, {"text_index": 1})
+        if stored and stored.get("text_index"):
+            # The caller loaded the document with a projection that left the index out
+            self._index = stored["text_index"]
+            return
+
+        text = None
+        key = self.document.get("processed_text_storage_key")
+        if key:
+            try:
+                from app.services import storage_service
+                raw = storage_service.download_processed_text(key)
+                text = raw.decode("utf-8") if raw else None
+            except Exception as e:
+                logger.warning(f"Processed text download failed for {self.document_id}: {e}")
+        if text:
+            try:
+                self._index = store_document_text(self.db, self.document_id, text)
+                return
+            except Exception as e:
+                logger.warning(f"Text backfill failed for {self.document_id}: {e}")
+            self._legacy_text = text
+        else:
+            self._legacy_text = self.document.get("extracted_text") or ""
+
+    def __len__(self) -> int:
+        index = self._ensure_index()
+        return index["length"] if index else len(self._legacy_text or "")
+
+    # --- reads ---
+    def _fetch(self, query: Dict[str, Any]) -> List[Tuple[int, int, str]]:
+        """Returns (seq, start, text) for matching segments, serving cached ones without a round trip."""
+        version = self._index["version"]
+        rows = list(self.db.document_pages.find(
+            {"document_id": self.document_id, "version": version, **query}, {"seq": 1, "start": 1}
+        ).sort("seq", ASCENDING))
+
+        missing = [r["seq"] for r in rows if _cache_get((self.document_id, version, r["seq"])) is None]
+        if missing:
+            for row in self.db.document_pages.find({"document_id": self.document_id, "version": version, "seq": {"$in": missing}}, {"seq": 1, "text": 1}):
+                _cache_put((self.document_id, version, row["seq"]), row["text"])
+
+        result = []
+        for row in rows:
+            text = _cache_get((self.document_id, version, row["seq"]))
+            if text is None:
+                # Evicted between the two queries under heavy load; read it directly
+                text = (self.db.document_pages.find_one({"document_id": self.document_id, "version": version, "seq": row["seq"]}) or {}).get("text", "")
+            result.append((row["seq"], row["start"], text))
+        return result
+
+    def read(self, start: int = 0, end: Optional[int] = None) -> str:
+        if self._ensure_index() is None:
+            return (self._legacy_text or "")[start:end]
+        end = self._index["length"] if end is None else min(end, self._index["length"])
+        if start >= end:
+            return ""
+        parts = self._fetch({"start": {"$lt": end}, "end": {"$gt": start}})
+        return "".join(text[max(0, start - seg_start):end - seg_start] for _, seg_start, text in parts)
+
+    def head(self, limit: int) -> str:
+        if limit <= INLINE_HEAD_CHARS and self.document.get("extracted_text") is not None and self._index is not None:
+            inline = self.document.get("extracted_text") or ""
+            if len(inline) >= min(limit, self._index["length"]):
+                return inline[:limit]
+        return self.read(0, limit)
+
+    def page(self, number: int) -> str:
+        if self._ensure_index() is None:
+            return ""
+        return "".join(text for _, _, text in self._fetch({"page": number}))
+
+    def segments(self):
+        if self._ensure_index() is None:
+            if self._legacy_text:
+                yield self._legacy_text
+            return
+        for seq in range(self._index["segments"]):
+            parts = self._fetch({"seq": seq})
+            if parts:
+                yield parts[0][2]
+
+
+def read_document_text(db: Database, document: Dict[str, Any], limit: Optional[int] = None) -> str:
+    """Teksti i dokumentit deri në 'limit' karaktere, pa shkarkuar më shumë se sa duhet."""
+    reader = DocumentTextReader(db, document)
+    return reader.read() if limit is None else reader.head(limit)
@@ -9,7 +9,7 @@ from datetime import datetime, timezone
 from typing import Optional, Dict, List, AsyncGenerator
 from bson import ObjectId
 from pymongo.database import Database
-from . import llm_service, vector_store_service
+from . import llm_service, vector_store_service, article_index_service
 
 logger = structlog.get_logger(__name__)
 
@@ -255,14 +255,25 @@ Udhëzim: {context_note}
             yield clean_char
 
         if full_content.strip() and case_id:
-            asyncio.create_task(save_draft_result(db, user_id, case_id, draft_type, full_content))
+            asyncio.create_task(save_draft_result(db, user_id, case_id, draft_type, full_content, detected_law))
 
     except Exception as e:
         logger.error(f"Streaming draft generation failed: {e}")
         yield f"\n\n[GABIM SISTEMI]: {str(e)}"
 
-async def save_draft_result(db: Database, user_id: str, case_id: str, draft_type: str, content: str):
+async def save_draft_result(db: Database, user_id: str, case_id: str, draft_type: str, content: str,
+                            default_law: Optional[str] = None):
     try:
+        # Every "Neni N" of the draft is checked against the article index (point lookups, no LLM)
+        try:
+            citations = await asyncio.to_thread(article_index_service.verify_citations, db, content, default_law)
+        except Exception as e:
+            logger.warning("Citation verification skipped", error=str(e))
+            citations = []
+        unverified = [c["citation"] for c in citations if not c["verified"]]
+        if unverified:
+            logger.info("Draft cites articles missing from the knowledge base", case_id=case_id, citations=unverified[:20])
+
         await asyncio.to_thread(
             db.drafting_results.insert_one, 
             {
@@ -270,6 +281,8 @@ async def save_draft_result(db: Database, user_id: str, case_id: str, draft_type
                 "user_id": user_id, 
                 "draft_type": draft_type, 
                 "result_text": content, 
+                "citations": citations,
+                "unverified_citations": len(unverified),
                 "status": "COMPLETED", 
                 "created_at": datetime.now(timezone.utc)
             }
@@ -0,0 +1,342 @@
+# FILE: backend/app/services/email_outbox.py
+# PHOENIX PROTOCOL - EMAIL OUTBOX V1.0 (ENQUEUE • BATCH • POOLED TRANSPORT)
+# 1. API handlers only insert into the 'outbox' collection; delivery happens in the Celery worker.
+# 2. A batch claims due messages atomically and sends them over ONE authenticated SMTP connection
+#    or ONE keep-alive HTTP session (Resend), reused across batches in the same process.
+# 3. Failures are retried with exponential backoff; after MAX_ATTEMPTS a message is marked FAILED.
+# 4. If the broker is unreachable the batch runs in a background thread of the web process instead.
+# 5. Token-bearing messages (password reset, invitations) are stored Fernet-encrypted (key derived from
+#    SECRET_KEY) with an expires_at matching the link's validity; a TTL index removes them if never sent.
+# 6. The next wake-up's due time is kept in Redis and replaced only by an earlier one (WATCH/MULTI), so a
+#    short retry or a leftover batch is never held back behind a long backoff.
+
+import os
+import base64
+import hashlib
+import smtplib
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from typing import Any, Dict, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from pymongo import ReturnDocument
+from pymongo.database import Database
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_COLLECTION = "outbox"
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 6
+BASE_BACKOFF_SECONDS = 30
+MAX_BACKOFF_SECONDS = 3600
+SENDING_LEASE = timedelta(minutes=10)  # a SENDING message older than this belongs to a dead worker
+SCHEDULE_KEY = "outbox:next_batch_due"  # epoch seconds of the earliest scheduled wake-up
+
+STATUS_PENDING = "PENDING"
+STATUS_SENDING = "SENDING"
+STATUS_SENT = "SENT"
+STATUS_FAILED = "FAILED"
+
+
+class MailTransport:
+    """Mban një sesion HTTP (Resend) dhe një lidhje SMTP të autentikuar për të gjitha mesazhet e procesit."""
+
+    def __init__(self):
+        self._session = None
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._lock = threading.Lock()
+
+    # --- RESEND (HTTP) ---
+    def _http_session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def _send_resend(self, api_key: str, to_email: str, subject: str, html_content: str) -> None:
+        mail_from = os.getenv("MAIL_FROM") or "info@juristi.tech"
+        # Resend sandbox requires onboarding@resend.dev sender unless custom domain is verified
+        if "re_" not in api_key or "onboarding" in mail_from:
+            from_sender = "Juristi AI <onboarding@resend.dev>"
+        else:
+            from_sender = f"Juristi AI <{mail_from}>"
+        response = self._http_session().post(
+            "https://api.resend.com/emails",
+            json={"from": from_sender, "to": [to_email], "subject": subject, "html": html_content},
+            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+            timeout=15,
+        )
+        response.raise_for_status()
+
+    # --- SMTP ---
+    def _smtp_config(self) -> Dict[str, Any]:
+        smtp_user = os.getenv("MAIL_USERNAME") or os.getenv("SMTP_USER")
+        smtp_password = os.getenv("MAIL_PASSWORD") or os.getenv("SMTP_PASSWORD")
+        if not smtp_user or not smtp_password:
+            logger.warning("⚠️ SMTP Credentials Missing from OS Environment. Email not sent.")
+            raise ValueError("SMTP Credentials Missing from environment configuration.")
+        try:
+            smtp_port = int(os.getenv("MAIL_PORT") or os.getenv("SMTP_PORT") or "587")
+        except Exception:
+            smtp_port = 587
+        smtp_tls_raw = os.getenv("MAIL_STARTTLS") or os.getenv("SMTP_TLS") or "True"
+        return {
+            "host": os.getenv("MAIL_SERVER") or os.getenv("SMTP_HOST") or "smtp.gmail.com",
+            "port": smtp_port,
+            "tls": str(smtp_tls_raw).lower() in ("true", "1", "yes"),
+            "user": smtp_user,
+            "password": smtp_password,
+            "from": os.getenv("MAIL_FROM") or smtp_user,
+        }
+
+    def _smtp_connection(self, config: Dict[str, Any]) -> smtplib.SMTP:
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except Exception:
+                pass
+            self._close_smtp()
+        server = smtplib.SMTP(config["host"], config["port"], timeout=20)
+        if config["tls"]:
+            server.starttls()
+        server.login(config["user"], config["password"])
+        self._smtp = server
+        return server
+
+    def _send_smtp(self, to_email: str, subject: str, html_content: str) -> None:
+        from app.services.email_service import BRAND_NAME
+
+        config = self._smtp_config()
+        msg = MIMEMultipart("alternative")
+        msg['From'] = f"{BRAND_NAME} <{config['from']}>"
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        msg.attach(MIMEText(html_content, 'html', 'utf-8'))
+        try:
+            self._smtp_connection(config).send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped an idle connection between our NOOP and the send; retry once on a fresh one
+            self._close_smtp()
+            self._smtp_connection(config).send_message(msg)
+
+    def _close_smtp(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def send(self, to_email: str, subject: str, html_content: str) -> str:
+        """Dërgon një mesazh; kthen kanalin e përdorur ('resend' ose 'smtp')."""
+        with self._lock:
+            resend_api_key = os.getenv("RESEND_API_KEY")
+            if resend_api_key:
+                try:
+                    self._send_resend(resend_api_key, to_email, subject, html_content)
+                    return "resend"
+                except Exception as e:
+                    logger.error(f"❌ Resend HTTP API dispatch failed, attempting SMTP fallback: {e}")
+            self._send_smtp(to_email, subject, html_content)
+            return "smtp"
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_smtp()
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+transport = MailTransport()
+_fallback_lock = threading.Lock()
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BASE_BACKOFF_SECONDS * (2 ** max(attempts - 1, 0)), MAX_BACKOFF_SECONDS))
+
+
+def _get_db() -> Database:
+    from app.core.db import connect_to_mongo
+    _, db = connect_to_mongo()
+    return db
+
+
+def ensure_indexes(db: Database) -> None:
+    try:
+        db[OUTBOX_COLLECTION].create_index([("status", 1), ("next_attempt_at", 1)])
+        # Only documents that carry expires_at (sensitive messages) are ever removed by this index
+        db[OUTBOX_COLLECTION].create_index([("expires_at", 1)], expireAfterSeconds=0)
+    except Exception as e:
+        logger.warning(f"Outbox index creation skipped: {e}")
+
+
+def _fernet() -> Fernet:
+    from app.core.config import settings
+    return Fernet(base64.urlsafe_b64encode(hashlib.sha256(f"outbox:{settings.SECRET_KEY}".encode("utf-8")).digest()))
+
+
+def _message_html(message: Dict[str, Any]) -> str:
+    if "html_enc" in message:
+        return _fernet().decrypt(message["html_enc"].encode("ascii")).decode("utf-8")
+    return message["html"]
+
+
+def enqueue(to_email: str, subject: str, html_content: str, kind: str = "generic", db: Optional[Database] = None,
+            sensitive: bool = False, expires_in: Optional[timedelta] = None) -> str:
+    """
+    Ruan mesazhin në outbox dhe njofton punëtorin. Nuk kontakton asnjë server poste.
+    sensitive=True ruan HTML-në të enkriptuar (linke me token); expires_in e fshin mesazhin e padërguar pas afatit.
+    """
+    db = db if db is not None else _get_db()
+    now = datetime.now(timezone.utc)
+    doc: Dict[str, Any] = {
+        "to": to_email,
+        "subject": subject,
+        "kind": kind,
+        "status": STATUS_PENDING,
+        "attempts": 0,
+        "next_attempt_at": now,
+        "created_at": now,
+        "updated_at": now,
+    }
+    if sensitive:
+        doc["html_enc"] = _fernet().encrypt(html_content.encode("utf-8")).decode("ascii")
+    else:
+        doc["html"] = html_content
+    if expires_in is not None:
+        doc["expires_at"] = now + expires_in
+    result = db[OUTBOX_COLLECTION].insert_one(doc)
+    _wake_worker()
+    return str(result.inserted_id)
+
+
+def _wake_worker(countdown: int = 0) -> None:
+    try:
+        from app.tasks.email_tasks import send_outbox_batch
+        send_outbox_batch.apply_async(countdown=countdown)
+    except Exception as e:
+        logger.warning(f"Outbox: broker unavailable ({e}); draining in-process.")
+        if countdown:
+            timer = threading.Timer(countdown, _drain_in_thread)
+            timer.daemon = True
+            timer.start()
+        else:
+            threading.Thread(target=_drain_in_thread, daemon=True).start()
+
+
+def _drain_in_thread() -> None:
+    if not _fallback_lock.acquire(blocking=False):
+        return  # another thread is already draining this process's view of the outbox
+    try:
+        process_batch(_get_db(), reschedule=False)
+    except Exception as e:
+        logger.error(f"Outbox in-process drain failed: {e}")
+    finally:
+        _fallback_lock.release()
+
+
+def _claim(db: Database, now: datetime) -> Optional[Dict[str, Any]]:
+    return db[OUTBOX_COLLECTION].find_one_and_update(
+        {"status": STATUS_PENDING, "next_attempt_at": {"$lte": now},
+         "$or": [{"expires_at": {"$exists": False}}, {"expires_at": {"$gt": now}}]},
+        {"$set": {"status": STATUS_SENDING, "locked_at": now, "updated_at": now}},
+        sort=[("next_attempt_at", 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def process_batch(db: Database, limit: int = BATCH_SIZE, reschedule: bool = True) -> Dict[str, int]:
+    """Dërgon deri në `limit` mesazhe të gatshme me të njëjtin transport dhe planifikon riprovimet."""
+    outbox = db[OUTBOX_COLLECTION]
+    now = datetime.now(timezone.utc)
+    outbox.update_many(
+        {"status": STATUS_SENDING, "locked_at": {"$lt": now - SENDING_LEASE}},
+        {"$set": {"status": STATUS_PENDING, "updated_at": now}},
+    )
+
+    stats = {"sent": 0, "retried": 0, "failed": 0}
+    for _ in range(limit):
+        message = _claim(db, datetime.now(timezone.utc))
+        if not message:
+            break
+        attempts = int(message.get("attempts", 0)) + 1
+        try:
+            channel = transport.send(message["to"], message["subject"], _message_html(message))
+            outbox.update_one(
+                {"_id": message["_id"]},
+                {"$set": {"status": STATUS_SENT, "attempts": attempts, "channel": channel,
+                          "sent_at": datetime.now(timezone.utc), "updated_at": datetime.now(timezone.utc)},
+                 "$unset": {"html": "", "html_enc": "", "locked_at": ""}},
+            )
+            stats["sent"] += 1
+            logger.info(f"✅ Email sent via {channel} to {message['to']}: {message['subject']}")
+        except Exception as e:
+            # A body that no longer decrypts (SECRET_KEY rotated) will never send
+            final = attempts >= MAX_ATTEMPTS or isinstance(e, InvalidToken)
+            outbox.update_one(
+                {"_id": message["_id"]},
+                {"$set": {"status": STATUS_FAILED if final else STATUS_PENDING, "attempts": attempts,
+                          "last_error": str(e)[:500] or type(e).__name__,
+                          "next_attempt_at": datetime.now(timezone.utc) + _backoff(attempts),
+                          "updated_at": datetime.now(timezone.utc)},
+                 "$unset": {"locked_at": "", **({"html": "", "html_enc": ""} if final else {})}},
+            )
+            stats["failed" if final else "retried"] += 1
+            logger.error(f"❌ Email to {message['to']} failed (attempt {attempts}/{MAX_ATTEMPTS}): {e}")
+
+    if reschedule:
+        _schedule_next(db)
+    return stats
+
+
+def _schedule_next(db: Database) -> None:
+    """Planifikon batch-in e radhës kur ka ende mesazhe në pritje (p.sh. riprovime me vonesë)."""
+    now = datetime.now(timezone.utc)
+    upcoming = db[OUTBOX_COLLECTION].find_one(
+        {"status": STATUS_PENDING, "$or": [{"expires_at": {"$exists": False}}, {"expires_at": {"$gt": now}}]},
+        {"next_attempt_at": 1}, sort=[("next_attempt_at", 1)]
+    )
+    if not upcoming:
+        return
+    due = upcoming["next_attempt_at"]
+    if due.tzinfo is None:
+        due = due.replace(tzinfo=timezone.utc)
+    now = datetime.now(timezone.utc)
+    countdown = max(0, int((due - now).total_seconds()))
+    try:
+        from app.core.db import connect_to_redis
+        # One scheduled wake-up per due time, no matter how many batches finished concurrently
+        if not reserve_wakeup(connect_to_redis(), now.timestamp() + countdown, now.timestamp()):
+            return
+    except Exception:
+        pass
+    _wake_worker(countdown=countdown)
+
+
+def reserve_wakeup(redis_client, due_ts: float, now_ts: float) -> bool:
+    """
+    True when the caller should schedule a wake-up at `due_ts`: nothing is scheduled, the scheduled one is
+    later, or it is already due (that batch has run or is running). Compare-and-set on the stored due time.
+    """
+    from redis.exceptions import WatchError
+
+    with redis_client.pipeline() as pipe:
+        try:
+            pipe.watch(SCHEDULE_KEY)
+            scheduled = pipe.get(SCHEDULE_KEY)
+            if scheduled is not None and now_ts < float(scheduled) <= due_ts:
+                pipe.unwatch()
+                return False
+            pipe.multi()
+            pipe.set(SCHEDULE_KEY, repr(due_ts), ex=max(1, int(due_ts - now_ts) + 1))
+            pipe.execute()
+            return True
+        except WatchError:
+            # Another batch rescheduled at the same moment; an extra wake-up only finds nothing to claim
+            return True
@@ -1,25 +1,27 @@
 # FILE: backend/app/services/email_service.py
-# PHOENIX PROTOCOL - EMAIL SYSTEM V6.4 (HYBRID SMTP & HTTP BYPASS)
+# PHOENIX PROTOCOL - EMAIL SYSTEM V7.0 (OUTBOX QUEUE)
 # 1. FIX: Moved 'import os' to the global imports block to resolve all undefined 'os' Pylance warnings.
+# 2. QUEUE: Notification helpers enqueue into the outbox; delivery (Resend/SMTP, retries) lives in email_outbox.
+# 3. Password-reset and invitation emails are queued encrypted and expire with their link.
 
 import os
-import smtplib
 import logging
-import requests
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from datetime import timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
 
 from app.core.config import settings
+from app.services import email_outbox
 
 logger = logging.getLogger(__name__)
 
 BRAND_COLOR = "#2563EB"  # Primary Blue
 BRAND_NAME = "Juristi.tech"
 
-def _create_html_wrapper(title: str, body_content: str) -> str:
-    """Wraps content in a professional HTML Email Template."""
-    return f"""
+@lru_cache(maxsize=32)
+def _html_shell(title: str) -> Tuple[str, str]:
+    """Renders the branded wrapper once per title; only the body changes between messages."""
+    return (f"""
     <!DOCTYPE html>
     <html>
     <head>
@@ -38,7 +40,7 @@ def _create_html_wrapper(title: str, body_content: str) -> str:
                 <p>{title}</p>
             </div>
             <div class="content">
-                {body_content}
+                """, f"""
             </div>
             <div class="footer">
                 &copy; 2025 {BRAND_NAME}. Të gjitha të drejtat e rezervuara.<br>
@@ -47,82 +49,28 @@ def _create_html_wrapper(title: str, body_content: str) -> str:
         </div>
     </body>
     </html>
-    """
-
-def send_email_sync(to_email: str, subject: str, html_content: str):
-    """Core function to send an email via SMTP or Resend HTTP API (Self-healing)."""
-    # Check if HTTP-based email bypass is configured
-    resend_api_key = os.getenv("RESEND_API_KEY")
-    
-    # --- PATH 1: RESEND HTTP API (BYPASSES HOSTING FIREWALLS ON PORT 443) ---
-    if resend_api_key:
-        try:
-            url = "https://api.resend.com/emails"
-            headers = {
-                "Authorization": f"Bearer {resend_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            mail_from = os.getenv("MAIL_FROM") or "info@juristi.tech"
-            # Resend sandbox requires onboarding@resend.dev sender unless custom domain is verified
-            if "re_" not in resend_api_key or "onboarding" in mail_from:
-                from_sender = "Juristi AI <onboarding@resend.dev>"
-            else:
-                from_sender = f"Juristi AI <{mail_from}>"
-                
-            payload = {
-                "from": from_sender,
-                "to": [to_email],
-                "subject": subject,
-                "html": html_content
-            }
-            
-            response = requests.post(url, json=payload, headers=headers, timeout=15)
-            response.raise_for_status()
-            logger.info(f"✅ Email sent via Resend HTTP API to {to_email}: {subject}")
-            return
-        except Exception as e:
-            logger.error(f"❌ Resend HTTP API dispatch failed, attempting SMTP fallback: {e}")
-            
-    # --- PATH 2: STANDARD SMTP (FALLBACK FOR LOCAL DEV OR UNBLOCKED SERVERS) ---
-    smtp_user = os.getenv("MAIL_USERNAME") or os.getenv("SMTP_USER")
-    smtp_password = os.getenv("MAIL_PASSWORD") or os.getenv("SMTP_PASSWORD")
-    smtp_host = os.getenv("MAIL_SERVER") or os.getenv("SMTP_HOST") or "smtp.gmail.com"
-    smtp_port_raw = os.getenv("MAIL_PORT") or os.getenv("SMTP_PORT") or "587"
-    smtp_tls_raw = os.getenv("MAIL_STARTTLS") or os.getenv("SMTP_TLS") or "True"
-    mail_from = os.getenv("MAIL_FROM") or smtp_user
+    """)
 
-    if not smtp_user or not smtp_password:
-        logger.warning("⚠️ SMTP Credentials Missing from OS Environment. Email not sent.")
-        raise ValueError("SMTP Credentials Missing from environment configuration.")
-
-    try:
-        smtp_port = int(smtp_port_raw)
-    except Exception:
-        smtp_port = 587
-
-    smtp_tls = str(smtp_tls_raw).lower() in ("true", "1", "yes")
+def _create_html_wrapper(title: str, body_content: str) -> str:
+    """Wraps content in a professional HTML Email Template."""
+    head, tail = _html_shell(title)
+    return head + body_content + tail
 
+def send_email_sync(to_email: str, subject: str, html_content: str):
+    """Sends immediately over the pooled transport. Request handlers should use queue_email instead."""
     try:
-        msg = MIMEMultipart("alternative")
-        msg['From'] = f"{BRAND_NAME} <{mail_from}>"
-        msg['To'] = to_email
-        msg['Subject'] = subject
-
-        msg.attach(MIMEText(html_content, 'html', 'utf-8'))
-
-        server = smtplib.SMTP(smtp_host, smtp_port)
-        if smtp_tls:
-            server.starttls()
-        server.login(smtp_user, smtp_password)
-        server.send_message(msg)
-        server.quit()
-        
-        logger.info(f"✅ Email sent via SMTP to {to_email}: {subject}")
+        channel = email_outbox.transport.send(to_email, subject, html_content)
+        logger.info(f"✅ Email sent via {channel} to {to_email}: {subject}")
     except Exception as e:
-        logger.error(f"❌ Failed to send email via SMTP (Note: Render Free Tier blocks SMTP ports. Please add RESEND_API_KEY to bypass): {e}")
+        logger.error(f"❌ Failed to send email (Note: Render Free Tier blocks SMTP ports. Please add RESEND_API_KEY to bypass): {e}")
         raise
 
+def queue_email(to_email: str, subject: str, html_content: str, kind: str = "generic",
+                sensitive: bool = False, expires_in: Optional[timedelta] = None) -> None:
+    """Persists the message in the outbox; the worker delivers it with retries.
+    Messages carrying live tokens pass sensitive=True (stored encrypted) and expire with the link."""
+    email_outbox.enqueue(to_email, subject, html_content, kind=kind, sensitive=sensitive, expires_in=expires_in)
+
 def send_support_notification_sync(data: dict):
     """Formats and sends the Support Request email to Admin."""
     admin_email = os.getenv("ADMIN_EMAIL") or getattr(settings, "ADMIN_EMAIL", None)
@@ -147,7 +95,7 @@ def send_support_notification_sync(data: dict):
     """
     
     final_html = _create_html_wrapper("Qendra e Ndihmës", content)
-    send_email_sync(admin_email, subject, final_html)
+    queue_email(admin_email, subject, final_html, kind="support_notification")
 
 # ========== INVITATION EMAIL ==========
 def send_invitation_email(to_email: str, token: str) -> bool:
@@ -174,7 +122,7 @@ def send_invitation_email(to_email: str, token: str) -> bool:
     """
     
     html_content = _create_html_wrapper("Ftesë për t'u bashkuar", body_content)
-    send_email_sync(to_email, subject, html_content)
+    queue_email(to_email, subject, html_content, kind="invitation", sensitive=True, expires_in=timedelta(days=7))
     return True
 
 # ========== PASSWORD RESET EMAIL ==========
@@ -200,7 +148,7 @@ def send_password_reset_email(to_email: str, reset_token: str) -> bool:
     """
     
     html_content = _create_html_wrapper("Rivendosja e Fjalëkalimit", body_content)
-    send_email_sync(to_email, subject, html_content)
+    queue_email(to_email, subject, html_content, kind="password_reset", sensitive=True, expires_in=timedelta(hours=1))
     return True
 
 # ========== WELCOME EMAIL ==========
@@ -228,7 +176,7 @@ def send_welcome_email(to_email: str, username: str) -> bool:
     """
     
     html_content = _create_html_wrapper("Mirëseardhje!", body_content)
-    send_email_sync(to_email, subject, html_content)
+    queue_email(to_email, subject, html_content, kind="welcome")
     return True
 
 # ========== SUPPORT REPLY EMAIL ==========
@@ -246,7 +194,7 @@ def send_support_reply(to_email: str, reply_message: str, ticket_id: Optional[st
     """
     
     html_content = _create_html_wrapper("Përgjigje nga Mbështetja", body_content)
-    send_email_sync(to_email, subject, html_content)
+    queue_email(to_email, subject, html_content, kind="support_reply")
     return True
 
 # ========== TEAM INVITE ACCEPTED NOTIFICATION ==========
@@ -268,5 +216,5 @@ def send_team_invite_accepted_email(owner_email: str, new_member_email: str, new
     """
     
     html_content = _create_html_wrapper("Anëtar i ri në ekip", body_content)
-    send_email_sync(owner_email, subject, html_content)
+    queue_email(owner_email, subject, html_content, kind="team_invite_accepted")
     return True
\ No newline at end of file
@@ -17,6 +17,7 @@ from app.models.finance import (
 )
 import app.services.llm_service as llm_service
 from app.services.storage_service import upload_file_raw, get_file_stream
+from app.services import public_portal_service
 
 logger = structlog.get_logger(__name__)
 
@@ -138,6 +139,7 @@ class FinanceService:
         
         result = self.db.invoices.insert_one(invoice_doc)
         invoice_doc["_id"] = result.inserted_id
+        public_portal_service.invalidate_case(self.db, invoice_doc.get("related_case_id"))
         return InvoiceInDB(**invoice_doc)
 
     def get_invoices(self, user_id: str) -> List[InvoiceInDB]:
@@ -181,6 +183,8 @@ class FinanceService:
 
         update_dict["updated_at"] = datetime.now(timezone.utc)
         result = self.db.invoices.find_one_and_update({"_id": oid}, {"$set": update_dict}, return_document=True)
+        public_portal_service.invalidate_case(self.db, existing.get("related_case_id"))
+        public_portal_service.invalidate_case(self.db, result.get("related_case_id"))
         return InvoiceInDB(**result)
 
     def update_invoice_status(self, user_id: str, invoice_id: str, status: str) -> InvoiceInDB:
@@ -192,6 +196,7 @@ class FinanceService:
             return_document=True
         )
         if not result: raise HTTPException(status_code=404, detail="Invoice not found")
+        public_portal_service.invalidate_case(self.db, result.get("related_case_id"))
         return InvoiceInDB(**result)
 
     def delete_invoice(self, user_id: str, invoice_id: str) -> None:
@@ -201,6 +206,7 @@ class FinanceService:
         if existing and existing.get("is_locked"): raise HTTPException(status_code=403, detail="Cannot delete a locked invoice.")
         result = self.db.invoices.delete_one({"_id": oid, "user_id": ObjectId(user_id)})
         if result.deleted_count == 0: raise HTTPException(status_code=404, detail="Invoice not found")
+        public_portal_service.invalidate_case(self.db, existing.get("related_case_id"))
 
     # --- EXPENSE CRUD ---
     def create_expense(self, user_id: str, data: ExpenseCreate) -> ExpenseInDB:
@@ -20,6 +20,7 @@ def normalize_text_to_albanian(text: str) -> str:
 class GraphService:
     _driver: Optional[Driver] = None
     _connection_failed_until: float = 0.0
+    _case_index_ready: bool = False
 
     def _connect(self):
         if time.time() < self._connection_failed_until:
@@ -130,13 +131,36 @@ class GraphService:
             
         return {"nodes": list(nodes_dict.values()), "links": links_list}
 
-    def delete_case_nodes(self, case_id: str):
+    def _ensure_case_index(self, session):
+        if not self._case_index_ready:
+            session.run("CREATE INDEX entity_case_id IF NOT EXISTS FOR (n:Entity) ON (n.case_id)")
+            self._case_index_ready = True
+
+    def purge_case(self, case_id: str, batch_size: int = 5000) -> int:
+        """
+        Fshin të gjitha nyjet e rastit me DETACH DELETE në transaksione të vogla (indeksi Entity.case_id).
+        Ngre gabimin që thirrësi (fshirja e rastit) ta riprovojë; kthen numrin e nyjeve të fshira.
+        """
         self._connect()
         if not self._driver:
-            return
+            return 0
+        deleted = 0
+        with self._driver.session() as session:
+            self._ensure_case_index(session)
+            while True:
+                record = session.run(
+                    "MATCH (n:Entity {case_id: $id}) WITH n LIMIT $limit DETACH DELETE n RETURN count(n) AS deleted",
+                    id=case_id, limit=batch_size
+                ).single()
+                batch = record["deleted"] if record else 0
+                deleted += batch
+                if batch < batch_size:
+                    break
+        return deleted
+
+    def delete_case_nodes(self, case_id: str):
         try:
-            with self._driver.session() as session:
-                session.run("MATCH (n {case_id: $id}) DETACH DELETE n", id=case_id)
+            self.purge_case(case_id)
         except Exception as e:
             logger.warning(f"Delete Case Nodes Error: {e}")
 
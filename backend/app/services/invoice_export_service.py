@@ -0,0 +1,195 @@
+# FILE: backend/app/services/invoice_export_service.py
+# PHOENIX PROTOCOL - BULK INVOICE EXPORT V1.0 (PROCESS POOL • STREAMED ZIP • SSE PROGRESS)
+# 1. Branding (profile, logo, palette) is resolved once per export and shipped to the renderers as one context.
+# 2. PDFs are rendered in chunks by a bounded, spawn-based process pool (one worker by default, see POOL_WORKERS)
+#    so reportlab never runs on the event loop.
+# 3. The ZIP is streamed entry by entry as chunks complete; only a small window of chunks is in flight.
+# 4. Progress is published on the user's existing SSE channel (user:{id}:updates).
+
+import io
+import os
+import json
+import uuid
+import asyncio
+import logging
+import zipfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo.database import Database
+
+logger = logging.getLogger(__name__)
+
+MAX_EXPORT_INVOICES = 500
+CHUNK_SIZE = 8
+# Memory budget: the API runs as ONE uvicorn process in a 512 MB container, and every spawn worker re-imports
+# the app (reportlab, boto3, pydantic models) for ~100-150 MB. One worker keeps reportlab off the event loop
+# without doubling the footprint; raise INVOICE_EXPORT_WORKERS only on larger instances.
+POOL_WORKERS = max(1, int(os.getenv("INVOICE_EXPORT_WORKERS", "1")))
+IN_FLIGHT_CHUNKS = POOL_WORKERS * 2
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the API process holds Mongo/Redis/Motor threads that must not be forked
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+# --- RENDERER (runs inside the pool) ---
+_worker_assets: Dict[str, Any] = {}
+
+
+def _render_chunk(context: Dict[str, Any], invoices: List[Dict[str, Any]], lang: str) -> List[Tuple[str, bytes]]:
+    from app.models.finance import InvoiceInDB
+    from app.services.report_service import render_invoice_pdf
+    from app.services.report_service.branding import from_context
+
+    # A worker keeps the last template context, so consecutive chunks of one export skip the rebuild
+    assets = _worker_assets.get(context["version"])
+    if assets is None:
+        _worker_assets.clear()
+        assets = from_context(context)
+        _worker_assets[context["version"]] = assets
+
+    rendered = []
+    for doc in invoices:
+        invoice = InvoiceInDB(**doc)
+        number = str(invoice.invoice_number or doc.get("_id")).replace("/", "-")
+        rendered.append((f"Invoice_{number}.pdf", render_invoice_pdf(invoice, assets, lang).getvalue()))
+    return rendered
+
+
+# --- QUERY ---
+def build_filter(user_id: str, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                 statuses: Optional[List[str]] = None, case_id: Optional[str] = None) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"user_id": ObjectId(user_id)}
+    date_range: Dict[str, Any] = {}
+    if date_from:
+        date_range["$gte"] = date_from
+    if date_to:
+        date_range["$lte"] = date_to
+    if date_range:
+        query["issue_date"] = date_range
+    if statuses:
+        query["status"] = {"$in": [s.upper() for s in statuses]}
+    if case_id:
+        query["related_case_id"] = case_id
+    return query
+
+
+def find_invoices(db: Database, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return list(db.invoices.find(query).sort("issue_date", 1).limit(MAX_EXPORT_INVOICES))
+
+
+# --- ZIP STREAMING ---
+class _ZipSink(io.RawIOBase):
+    """Non-seekable sink: zipfile writes data descriptors, we hand out whatever bytes accumulated."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer.extend(data)
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _unique_name(name: str, used: Dict[str, int]) -> str:
+    if name not in used:
+        used[name] = 1
+        return name
+    used[name] += 1
+    stem, ext = os.path.splitext(name)
+    return f"{stem}_{used[name]}{ext}"
+
+
+def _publish_progress(user_id: str, export_id: str, done: int, total: int, status: str) -> None:
+    try:
+        from app.core.db import connect_to_redis
+        payload = {"type": "INVOICE_EXPORT_PROGRESS", "export_id": export_id, "done": done, "total": total, "status": status}
+        connect_to_redis().publish(f"user:{user_id}:updates", json.dumps(payload))
+    except Exception as e:
+        logger.warning(f"SSE export progress skipped: {e}")
+
+
+async def stream_invoice_zip(invoices: List[Dict[str, Any]], branding_context: Dict[str, Any], user_id: str,
+                             lang: str = "sq", export_id: Optional[str] = None) -> AsyncGenerator[bytes, None]:
+    """Gjeneron ZIP-in gradualisht: çdo copë faturash e përfunduar shkruhet dhe dërgohet menjëherë."""
+    export_id = export_id or uuid.uuid4().hex
+    total = len(invoices)
+    chunks = [invoices[i:i + CHUNK_SIZE] for i in range(0, total, CHUNK_SIZE)]
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+    used_names: Dict[str, int] = {}
+    pending: List[asyncio.Future] = []
+    next_chunk = 0
+    done = 0
+    await asyncio.to_thread(_publish_progress, user_id, export_id, 0, total, "STARTED")
+
+    try:
+        while next_chunk < len(chunks) or pending:
+            while next_chunk < len(chunks) and len(pending) < IN_FLIGHT_CHUNKS:
+                pending.append(asyncio.wrap_future(pool.submit(_render_chunk, branding_context, chunks[next_chunk], lang), loop=loop))
+                next_chunk += 1
+
+            finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in finished:
+                pending.remove(future)
+                for name, pdf_bytes in future.result():
+                    archive.writestr(_unique_name(name, used_names), pdf_bytes)
+                    done += 1
+                data = sink.drain()
+                if data:
+                    yield data
+            await asyncio.to_thread(_publish_progress, user_id, export_id, done, total, "RUNNING")
+
+        archive.close()
+        yield sink.drain()
+        await asyncio.to_thread(_publish_progress, user_id, export_id, done, total, "COMPLETED")
+    except (asyncio.CancelledError, GeneratorExit):
+        for future in pending:
+            future.cancel()
+        logger.info(f"Invoice export {export_id} cancelled after {done}/{total}")
+        raise
+    except Exception as e:
+        for future in pending:
+            future.cancel()
+        logger.error(f"Invoice export {export_id} failed: {e}")
+        await asyncio.to_thread(_publish_progress, user_id, export_id, done, total, "FAILED")
+        raise
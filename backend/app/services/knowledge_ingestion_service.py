@@ -0,0 +1,409 @@
+# FILE: backend/app/services/knowledge_ingestion_service.py
+# PHOENIX PROTOCOL - KNOWLEDGE INGESTION ENGINE V1.0 (CONTENT-HASH • INCREMENTAL • RESUMABLE)
+# 1. One engine behind scripts/ingest_statutes.py, ingest_caselaw.py and ingest_academic.py.
+# 2. 'knowledge_manifest' records per source file: sha256, chunker version and the ordered chunk ids.
+#    An unchanged file with the same chunker version is skipped without being opened.
+# 3. Chunk ids are derived from the chunk text, so an edited statute re-embeds only the articles that
+#    changed; unchanged chunks keep their vector, stale ones are deleted in one delete_many at the end.
+# 4. Vectors are written batch by batch as they are embedded. A killed run resumes on the next start:
+#    the diff sees the chunks already written and embeds only the rest.
+# 5. PDF parsing runs in a process pool; embedding batches run on a small thread pool.
+# 6. Every completed file refreshes its row in the 'law_catalog' collection (services/law_catalog_service.py).
+# 7. A run that changed anything rebuilds the lexical (BM25) index file (services/lexical_index_service.py).
+# 8. Statute chunks carry their (law_id, article_key, part) key for point lookups (services/article_index_service.py).
+
+import os
+import re
+import hashlib
+import logging
+import unicodedata
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.database import Database
+
+from app.services import article_index_service, law_catalog_service, lexical_index_service
+
+logger = logging.getLogger(__name__)
+
+CHUNK_COLLECTION = "legal_knowledge_base"
+MANIFEST_COLLECTION = "knowledge_manifest"
+
+EMBED_BATCH = 64
+EMBED_CONCURRENCY = 4
+PARSE_WINDOW = 2  # Parsed files held in memory per worker while the main process embeds
+
+
+class SkipFile(Exception):
+    """The file is not ingestible (HTML saved as .pdf, no readable text, ...)."""
+
+
+@dataclass(frozen=True)
+class Corpus:
+    name: str
+    chunker_version: str
+    # Module-level function (must be picklable for the process pool): path -> [{"text": ..., **metadata}]
+    parse: Callable[[str], List[Dict[str, Any]]]
+    upload_prefix: Optional[str] = None
+
+
+# --- HASHING ---
+def file_sha256(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_key(source: str, text_hash: str, occurrence: int) -> str:
+    """Stable chunk id: same file + same text -> same id, whatever its position. URL-safe hex."""
+    return hashlib.sha256(f"{source}\0{text_hash}\0{occurrence}".encode("utf-8")).hexdigest()[:32]
+
+
+def ensure_indexes(db: Database) -> None:
+    db[CHUNK_COLLECTION].create_index([("chunk_id", ASCENDING)])
+    db[CHUNK_COLLECTION].create_index([("source", ASCENDING)])
+    article_index_service.ensure_indexes(db)
+
+
+def _valid_vector(vector: Optional[List[float]]) -> bool:
+    return bool(vector) and any(vector)
+
+
+def _parse_job(parse: Callable[[str], List[Dict[str, Any]]], path: str) -> Tuple[str, Optional[List[Dict[str, Any]]], Optional[str]]:
+    try:
+        return path, parse(path), None
+    except SkipFile as e:
+        return path, None, f"skip: {e}"
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+# --- ENGINE ---
+class IngestionEngine:
+    def __init__(self, db: Database, corpus: Corpus, workers: Optional[int] = None,
+                 force: bool = False, dry_run: bool = False, embed: Optional[Callable[[List[str]], List[List[float]]]] = None):
+        self.db = db
+        self.coll = db[CHUNK_COLLECTION]
+        self.manifest = db[MANIFEST_COLLECTION]
+        self.corpus = corpus
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.force = force
+        self.dry_run = dry_run
+        if embed is None:
+            from app.services.embedding_service import generate_embeddings_batch
+            embed = generate_embeddings_batch
+        self.embed = embed
+        self.stats = Counter()
+
+    # -- planning --
+    def plan(self, paths: Iterable[str]) -> List[Tuple[str, str]]:
+        """Returns (path, sha256) for files whose content or chunker changed since the last complete run."""
+        todo = []
+        for path in paths:
+            source = os.path.basename(path)
+            digest = file_sha256(path)
+            entry = self.manifest.find_one({"_id": source}, {"file_hash": 1, "chunker_version": 1, "state": 1})
+            unchanged = (
+                entry is not None and entry.get("state") == "COMPLETE"
+                and entry.get("file_hash") == digest
+                and entry.get("chunker_version") == self.corpus.chunker_version
+            )
+            if unchanged and not self.force:
+                self.stats["unchanged"] += 1
+                continue
+            todo.append((path, digest))
+        return todo
+
+    def run(self, paths: Iterable[str]) -> Counter:
+        ensure_indexes(self.db)
+        todo = self.plan(paths)
+        logger.info(f"[{self.corpus.name}] {len(todo)} file(s) to ingest, {self.stats['unchanged']} unchanged")
+        if not todo or self.dry_run:
+            self.stats["planned"] = len(todo)
+            return self.stats
+
+        digests = dict(todo)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = []
+            queue = list(digests)
+            window = self.workers * PARSE_WINDOW
+            while queue or pending:
+                while queue and len(pending) < window:
+                    pending.append(pool.submit(_parse_job, self.corpus.parse, queue.pop(0)))
+                done = next(as_completed(pending))
+                pending.remove(done)
+                path, chunks, error = done.result()
+                if error:
+                    logger.warning(f"[{self.corpus.name}] {os.path.basename(path)}: {error}")
+                    self.stats["skipped" if error.startswith("skip:") else "failed"] += 1
+                    continue
+                try:
+                    self.ingest_file(path, digests[path], chunks or [])
+                except Exception as e:
+                    logger.error(f"[{self.corpus.name}] {os.path.basename(path)} failed: {e}", exc_info=True)
+                    self.stats["failed"] += 1
+
+        if self.stats["ingested"]:
+            try:
+                lexical_index_service.build(self.db)
+            except Exception as e:
+                logger.warning(f"[{self.corpus.name}] lexical index rebuild failed (run scripts/build_lexical_index.py): {e}")
+        return self.stats
+
+    # -- one file --
+    def _chunk_ids(self, source: str, chunks: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        seen: Counter = Counter()
+        ids = []
+        for chunk in chunks:
+            text_hash = content_hash(chunk["text"])
+            seen[text_hash] += 1
+            ids.append((chunk_key(source, text_hash, seen[text_hash]), text_hash))
+        return ids
+
+    def _embed_batches(self, texts: List[str]) -> List[Optional[List[float]]]:
+        batches = [texts[i:i + EMBED_BATCH] for i in range(0, len(texts), EMBED_BATCH)]
+        vectors: List[Optional[List[float]]] = []
+        with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY) as pool:
+            for batch, result in zip(batches, pool.map(self.embed, batches)):
+                result = list(result or [])
+                vectors.extend(result[i] if i < len(result) else None for i in range(len(batch)))
+        return vectors
+
+    def ingest_file(self, path: str, file_hash: str, chunks: List[Dict[str, Any]]) -> Dict[str, int]:
+        source = os.path.basename(path)
+        now = datetime.now(timezone.utc)
+        ids = self._chunk_ids(source, chunks)
+        wanted = {chunk_id for chunk_id, _ in ids}
+
+        self.manifest.update_one(
+            {"_id": source},
+            {"$set": {"corpus": self.corpus.name, "state": "IN_PROGRESS", "pending_hash": file_hash, "updated_at": now}},
+            upsert=True
+        )
+        if self.corpus.upload_prefix:
+            self._upload(path, source)
+
+        existing = {
+            row["chunk_id"] for row in self.coll.find(
+                {"source": source, "content_hash": {"$exists": True}, "embedding.0": {"$exists": True}}, {"chunk_id": 1}
+            )
+        }
+        # Chunks written by the old per-file scripts: reuse their vectors when the text is identical
+        legacy_vectors = {}
+        for row in self.coll.find({"source": source, "content_hash": {"$exists": False}}, {"text": 1, "embedding": 1}):
+            if row.get("text") and _valid_vector(row.get("embedding")):
+                legacy_vectors.setdefault(content_hash(row["text"]), row["embedding"])
+
+        base = {"source": source, "file_hash": file_hash, "processor_version": self.corpus.chunker_version}
+        keep_ops, new_rows = [], []
+        for chunk, (chunk_id, text_hash) in zip(chunks, ids):
+            metadata = {k: v for k, v in chunk.items() if k != "text"}
+            if chunk_id in existing:
+                keep_ops.append(UpdateOne({"chunk_id": chunk_id}, {"$set": {**base, **metadata}}))
+            else:
+                new_rows.append({"chunk_id": chunk_id, "content_hash": text_hash, "text": chunk["text"], **base, **metadata})
+
+        reused, to_embed = [], []
+        for row in new_rows:
+            vector = legacy_vectors.get(row["content_hash"])
+            if vector is not None:
+                row["embedding"] = vector
+                reused.append(row)
+            else:
+                to_embed.append(row)
+        self._upsert(reused)
+
+        failed = 0
+        for start in range(0, len(to_embed), EMBED_BATCH * EMBED_CONCURRENCY):
+            window = to_embed[start:start + EMBED_BATCH * EMBED_CONCURRENCY]
+            for row, vector in zip(window, self._embed_batches([row["text"] for row in window])):
+                if _valid_vector(vector):
+                    row["embedding"] = vector
+                else:
+                    failed += 1
+            # Checkpoint: everything embedded so far is durable before the next API round trip
+            self._upsert([row for row in window if "embedding" in row])
+
+        if keep_ops:
+            self.coll.bulk_write(keep_ops, ordered=False)
+
+        result = {"chunks": len(chunks), "kept": len(keep_ops), "embedded": len(to_embed) - failed,
+                  "reused": len(reused), "failed": failed, "deleted": 0}
+        if failed:
+            # Leave the old chunks and the IN_PROGRESS manifest; the next run retries only the failures
+            logger.warning(f"[{self.corpus.name}] {source}: {failed} chunk(s) could not be embedded, will retry next run")
+            self.stats["incomplete"] += 1
+        else:
+            result["deleted"] = self.coll.delete_many({
+                "source": source,
+                "$or": [{"chunk_id": {"$nin": list(wanted)}}, {"content_hash": {"$exists": False}}]
+            }).deleted_count
+            self.manifest.update_one({"_id": source}, {"$set": {
+                "state": "COMPLETE", "file_hash": file_hash, "chunker_version": self.corpus.chunker_version,
+                "chunk_ids": [chunk_id for chunk_id, _ in ids], "chunks": len(ids), "updated_at": datetime.now(timezone.utc),
+            }, "$unset": {"pending_hash": ""}})
+            self.stats["ingested"] += 1
+            try:
+                law_catalog_service.upsert_source(self.db, source)
+            except Exception as e:
+                logger.warning(f"[{self.corpus.name}] law catalog update failed for {source}: {e}")
+
+        for key in ("kept", "embedded", "reused", "deleted"):
+            self.stats[f"chunks_{key}"] += result[key]
+        logger.info(f"[{self.corpus.name}] {source}: {result}")
+        return result
+
+    def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            self.coll.bulk_write([UpdateOne({"chunk_id": row["chunk_id"]}, {"$set": row}, upsert=True) for row in rows], ordered=False)
+
+    def _upload(self, path: str, source: str) -> None:
+        from app.services import storage_service
+        try:
+            with open(path, "rb") as f:
+                storage_service.get_s3_client().put_object(
+                    Bucket=storage_service.B2_BUCKET_NAME, Key=f"{self.corpus.upload_prefix}/{source}",
+                    Body=f, ContentType="application/pdf"
+                )
+        except Exception as e:
+            logger.error(f"[{self.corpus.name}] B2 upload failed for {source}: {e}")
+
+
+# --- CHUNKERS (module level so the process pool can pickle them) ---
+ARTICLE_HEADER = re.compile(r'^\s*(?:Neni|NENI|Artikulli)\s+(\d+[a-zA-Z]*)\b[^\n]*$', re.MULTILINE)
+CASE_NO_PATTERN = re.compile(r'((?:PML|PA1|Rev|A|CP|PKR|P|KMLP)\s*\.?\s*Nr\s*\.?\s*\d+\s*/\s*\d{4})', re.IGNORECASE)
+STATUTE_EXCLUDED = ("AKADEMIA", "KOMMENTAR", "DORACAK")
+
+
+def clean_law_title(filename: str) -> str:
+    clean = filename.replace(".pdf", "").replace("_", " ").replace("-", " ")
+    return " ".join(word.capitalize() for word in unicodedata.normalize('NFC', clean).split())
+
+
+def _reject_html(path: str) -> None:
+    with open(path, "rb") as f:
+        header = f.read(10)
+    if b"<!DOC" in header or b"<html" in header.lower():
+        raise SkipFile("not a real PDF (HTML content)")
+
+
+def _windows(text: str, size: int = 1000, overlap: int = 100) -> List[str]:
+    return [text[start:start + size] for start in range(0, len(text), size - overlap)]
+
+
+def split_articles_strictly(raw_text: str) -> List[Tuple[str, str, int]]:
+    page_splits = re.split(r'--- \[FAQJA (\d+)\] ---', raw_text)
+    content_by_page = {}
+    if len(page_splits) > 1:
+        for i in range(1, len(page_splits), 2):
+            content_by_page[int(page_splits[i])] = page_splits[i + 1]
+    else:
+        content_by_page[1] = raw_text
+
+    articles = []
+    current_art_num = "0"
+    current_art_lines: List[str] = []
+    current_page = 1
+
+    for p_num in sorted(content_by_page.keys()):
+        for line in content_by_page[p_num].split('\n'):
+            header_match = ARTICLE_HEADER.match(line)
+            if header_match and not line.strip().startswith('(') and not line.strip().endswith(')'):
+                if current_art_lines:
+                    full_art_text = "\n".join(current_art_lines).strip()
+                    if len(full_art_text) > 15:
+                        articles.append((current_art_num, full_art_text, current_page))
+                current_art_num = header_match.group(1)
+                current_art_lines = [line]
+                current_page = p_num
+            else:
+                current_art_lines.append(line)
+
+    if current_art_lines:
+        full_art_text = "\n".join(current_art_lines).strip()
+        if len(full_art_text) > 15:
+            articles.append((current_art_num, full_art_text, current_page))
+
+    if len(articles) <= 1 and len(raw_text) > 4000:
+        articles = [(str(idx), ch, 1) for idx, ch in enumerate((raw_text[i:i + 2500] for i in range(0, len(raw_text), 2200)), 1)]
+
+    return articles
+
+
+def parse_statute(path: str) -> List[Dict[str, Any]]:
+    from app.services.text_extraction_service import extract_text
+    from app.services.albanian_language_detector import detect_document_language
+
+    raw_text = extract_text(path, "application/pdf")
+    if not raw_text or len(raw_text.strip()) < 50:
+        raise SkipFile("extraction empty or too short")
+
+    fname = os.path.basename(path)
+    lang = detect_document_language(raw_text)
+    law_title = clean_law_title(fname)
+    chunks = []
+    for idx, (art_num, art_text, p_num) in enumerate(split_articles_strictly(raw_text)):
+        text = art_text[:4000].strip()
+        if text:
+            chunks.append({
+                "text": text, "law_title": law_title, "article_number": art_num, "chunk_index": idx,
+                "page": p_num, "language": lang, "jurisdiction": "ks", "is_article": True,
+            })
+    for chunk, key in zip(chunks, article_index_service.chunk_keys(fname, law_title, chunks)):
+        chunk.update(key)
+    return chunks
+
+
+def parse_caselaw(path: str) -> List[Dict[str, Any]]:
+    from pypdf import PdfReader
+
+    _reject_html(path)
+    fname = os.path.basename(path)
+    current_case_no = "Gjyjata Supreme e Kosovës"
+    chunks = []
+    for p_idx, page in enumerate(PdfReader(path).pages, 1):
+        page_text = page.extract_text() or ""
+        if not page_text.strip():
+            continue
+        # A page that quotes a new case number (e.g. PML.Nr.85/2025) starts a new decision
+        matches = CASE_NO_PATTERN.findall(page_text)
+        if matches:
+            current_case_no = matches[0].strip().replace(" ", "")
+        for chunk_text in _windows(page_text):
+            chunks.append({
+                "text": chunk_text, "law_title": f"{current_case_no} - {fname.replace('.pdf', '')}",
+                "category": "caselaw", "case_number": current_case_no, "page": p_idx, "chunk_index": len(chunks) + 1,
+            })
+    if not chunks:
+        raise SkipFile("no readable text")
+    return chunks
+
+
+def parse_academic(path: str) -> List[Dict[str, Any]]:
+    from pypdf import PdfReader
+
+    _reject_html(path)
+    fname = os.path.basename(path)
+    full_text = "".join(f"\n--- Faqja {idx + 1} ---\n" + (page.extract_text() or "") for idx, page in enumerate(PdfReader(path).pages))
+    if not full_text.strip():
+        raise SkipFile("no readable text")
+    title_display = fname.replace(".pdf", "").replace("_", " ")
+    return [
+        {"text": chunk_text, "law_title": title_display, "category": "academic", "chunk_index": c_idx}
+        for c_idx, chunk_text in enumerate(_windows(full_text), 1)
+    ]
+
+
+STATUTES = Corpus(name="statutes", chunker_version="V9.1-STATUTE", parse=parse_statute)
+CASELAW = Corpus(name="caselaw", chunker_version="V2.0-CASELAW", parse=parse_caselaw, upload_prefix="case_law")
+ACADEMIC = Corpus(name="academic", chunker_version="V2.0-ACADEMIC", parse=parse_academic, upload_prefix="academic")
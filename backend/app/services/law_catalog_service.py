@@ -0,0 +1,297 @@
+# FILE: backend/app/services/law_catalog_service.py
+# PHOENIX PROTOCOL - LAW TITLES CATALOG V1.1 (MATERIALIZED • VERSIONED • CACHED)
+# 1. 'law_catalog' holds one row per source file: title, number, year, category, article/chunk counts and
+#    PDF key. The ingestion engine upserts a row after every completed file; rebuild() backfills all rows.
+# 2. Every write bumps the version in 'law_catalog_meta'. The API process keeps the rows in memory and
+#    re-reads them only when that version changes (checked at most every CHECK_INTERVAL seconds).
+# 3. /laws/titles filters and pages the cached rows in Python and answers If-None-Match with 304, instead
+#    of five distinct() scans over legal_knowledge_base plus bucket listings per page load. Every decision
+#    title of a case-law compilation is its own entry, so paging reaches all of them.
+# 4. PDFs that were never ingested come from the sync manifest plus a listing of the academic/case-law
+#    prefixes. start() runs the first rebuild (or the bucket-only refresh) in the background at startup.
+
+import re
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Container, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING, ReplaceOne, ReturnDocument
+from pymongo.database import Database
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "law_catalog"
+META_COLLECTION = "law_catalog_meta"
+META_ID = "law_catalog"
+CHECK_INTERVAL = 15.0
+
+CATEGORIES = ("statute", "academic", "caselaw")
+PDF_PREFIXES = {"academic": "academic/", "caselaw": "case_law/", "statute": "laws/"}
+
+LAW_NUMBER = re.compile(r'(\d{2})\s*[/_\-.\s]?\s*L\s*[-_\s]?\s*(\d{2,4})', re.IGNORECASE)
+YEAR_NUMBER = re.compile(r'\b((?:19|20)\d{2})\s*[/_-]\s*(\d{1,4})\b')
+
+
+def ensure_indexes(db: Database) -> None:
+    db[COLLECTION].create_index([("category", ASCENDING), ("title", ASCENDING)])
+
+
+def _category(value: Optional[str]) -> str:
+    return value if value in ("academic", "caselaw") else "statute"
+
+
+def parse_number(*texts: str) -> Tuple[Optional[str], Optional[int]]:
+    """('LIGJI_NR._04_L-139...',) -> ('04/L-139', None); ('Nr. 2004/26',) -> ('2004/26', 2004)."""
+    for text in texts:
+        match = LAW_NUMBER.search(text or "")
+        if match:
+            return f"{match.group(1)}/L-{match.group(2)}", None
+        match = YEAR_NUMBER.search(text or "")
+        if match:
+            return f"{match.group(1)}/{int(match.group(2))}", int(match.group(1))
+    return None, None
+
+
+def bump_version(db: Database) -> int:
+    meta = db[META_COLLECTION].find_one_and_update(
+        {"_id": META_ID},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return meta["version"]
+
+
+def _manifest_keys(list_bucket: bool = False) -> Dict[Tuple[str, str], str]:
+    """
+    (category, filename) -> storage key, from the sync manifest. list_bucket adds the academic and case-law
+    prefixes as listed in the bucket, which the deployed image has no manifest for.
+    """
+    keys: Dict[Tuple[str, str], str] = {}
+    try:
+        from app.services import law_sync_service
+        stored = [entry["key"] for entry in law_sync_service.manifest_entries([""])]
+    except Exception as e:
+        logger.warning(f"Law catalog: storage manifest skipped: {e}")
+        stored = []
+    if list_bucket:
+        stored.extend(_bucket_keys())
+    for key in stored:
+        category = next((c for c, prefix in PDF_PREFIXES.items() if key.startswith(prefix)), "statute")
+        keys.setdefault((category, key.rsplit("/", 1)[-1]), key)
+    return keys
+
+
+def _bucket_keys() -> List[str]:
+    try:
+        from app.services import storage_service, law_sync_service
+        s3 = storage_service.get_s3_client()
+        keys: List[str] = []
+        for category in ("academic", "caselaw"):
+            keys.extend(law_sync_service.list_remote(s3, storage_service.B2_BUCKET_NAME, PDF_PREFIXES[category]))
+        return keys
+    except Exception as e:
+        logger.warning(f"Law catalog: bucket listing skipped: {e}")
+        return []
+
+
+def _pdf_key(source: str, category: str, manifest_keys: Dict[Tuple[str, str], str]) -> Optional[str]:
+    key = manifest_keys.get((category, source))
+    if key:
+        return key
+    # The ingest scripts upload academic/case-law PDFs under a fixed prefix
+    return f"{PDF_PREFIXES[category]}{source}" if category != "statute" else None
+
+
+def _row(source: str, stats: Dict[str, Any], manifest_keys: Dict[Tuple[str, str], str]) -> Dict[str, Any]:
+    category = _category(stats.get("category"))
+    titles = sorted(t.strip() for t in stats.get("titles") or [] if t and t.strip())
+    title = titles[0] if category == "statute" and titles else source
+    number, year = parse_number(title, source)
+    articles = [a for a in stats.get("articles") or [] if a not in (None, "", "0")]
+    return {
+        "_id": source,
+        "source": source,
+        "title": title,
+        "titles": titles if category == "caselaw" else [],
+        "category": category,
+        "number": number,
+        "year": year,
+        "article_count": len(set(map(str, articles))),
+        "chunk_count": stats.get("chunks", 0),
+        "pdf_key": _pdf_key(source, category, manifest_keys),
+        "updated_at": datetime.now(timezone.utc),
+    }
+
+
+def _source_stats(db: Database, match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return list(db.legal_knowledge_base.aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": "$source",
+            "category": {"$first": "$category"},
+            "titles": {"$addToSet": "$law_title"},
+            "articles": {"$addToSet": "$article_number"},
+            "chunks": {"$sum": 1},
+        }},
+    ], allowDiskUse=True))
+
+
+def upsert_source(db: Database, source: str) -> Optional[Dict[str, Any]]:
+    """Rifreskon rreshtin e një skedari pas ingestimit (ose e fshin nëse nuk ka më chunks)."""
+    stats = _source_stats(db, {"source": source})
+    if not stats:
+        db[COLLECTION].delete_one({"_id": source})
+        bump_version(db)
+        return None
+    row = _row(source, stats[0], _manifest_keys())
+    db[COLLECTION].replace_one({"_id": source}, row, upsert=True)
+    bump_version(db)
+    return row
+
+
+def _bucket_only_rows(manifest_keys: Dict[Tuple[str, str], str], known: Container[str]) -> Dict[str, Dict[str, Any]]:
+    """Academic manuals and decisions that are browsable as PDFs but were never ingested."""
+    return {
+        source: _row(source, {"category": category}, manifest_keys)
+        for (category, source) in manifest_keys
+        if category in ("academic", "caselaw") and source.lower().endswith(".pdf") and source not in known
+    }
+
+
+def rebuild(db: Database, include_bucket_only: bool = True) -> int:
+    """Backfill i plotë nga legal_knowledge_base (+ PDF-të në manifest/bucket pa chunks)."""
+    ensure_indexes(db)
+    manifest_keys = _manifest_keys(list_bucket=include_bucket_only)
+    rows = {s["_id"]: _row(s["_id"], s, manifest_keys) for s in _source_stats(db, {"source": {"$type": "string"}}) if s["_id"]}
+
+    if include_bucket_only:
+        rows.update(_bucket_only_rows(manifest_keys, rows))
+
+    if rows:
+        db[COLLECTION].bulk_write([ReplaceOne({"_id": source}, row, upsert=True) for source, row in rows.items()], ordered=False)
+    stale = db[COLLECTION].delete_many({"_id": {"$nin": list(rows)}}).deleted_count
+    bump_version(db)
+    logger.info(f"Law catalog rebuilt: {len(rows)} rows, {stale} stale removed")
+    return len(rows)
+
+
+def add_bucket_only(db: Database) -> int:
+    """Shton PDF-të e reja të bucket-it (pa chunks) pa rindërtuar katalogun; kthen numrin e rreshtave të shtuar."""
+    manifest_keys = _manifest_keys(list_bucket=True)
+    known = set(db[COLLECTION].distinct("_id"))
+    rows = _bucket_only_rows(manifest_keys, known)
+    if rows:
+        db[COLLECTION].bulk_write([ReplaceOne({"_id": source}, row, upsert=True) for source, row in rows.items()], ordered=False)
+        bump_version(db)
+    return len(rows)
+
+
+# --- READ SIDE (API PROCESS) ---
+_cache: Dict[str, Any] = {"version": None, "rows": [], "checked_at": 0.0, "legacy": None}
+_cache_lock = threading.Lock()
+_rebuild_lock = threading.Lock()
+
+
+def _is_empty(db: Database) -> bool:
+    return current_version(db) == 0 and db[COLLECTION].estimated_document_count() == 0
+
+
+def ensure_built(db: Database) -> None:
+    """First start on an existing knowledge base: materialize once, even with concurrent callers."""
+    if not _is_empty(db):
+        return
+    with _rebuild_lock:
+        if _is_empty(db):
+            rebuild(db)
+
+
+def warm(db: Database) -> None:
+    try:
+        if _is_empty(db):
+            ensure_built(db)
+        else:
+            added = add_bucket_only(db)
+            if added:
+                logger.info(f"Law catalog: {added} bucket-only PDFs added")
+    except Exception as e:
+        logger.warning(f"Law catalog warm-up failed: {e}")
+
+
+def start(db: Database) -> None:
+    """Runs warm() off the startup path; a request arriving first waits on the same lock in ensure_built()."""
+    threading.Thread(target=warm, args=(db,), name="law-catalog-warm", daemon=True).start()
+
+
+def current_version(db: Database) -> int:
+    meta = db[META_COLLECTION].find_one({"_id": META_ID}, {"version": 1})
+    return meta["version"] if meta else 0
+
+
+def cached_rows(db: Database) -> Tuple[int, List[Dict[str, Any]]]:
+    now = time.monotonic()
+    with _cache_lock:
+        if _cache["version"] is not None and now - _cache["checked_at"] < CHECK_INTERVAL:
+            return _cache["version"], _cache["rows"]
+
+    ensure_built(db)
+    version = current_version(db)
+
+    with _cache_lock:
+        if version != _cache["version"]:
+            rows = list(db[COLLECTION].find({}, {"updated_at": 0}))
+            # One entry per decision title, so /titles pages and searches every decision of a compilation
+            decisions = [
+                {"source": row["source"], "title": title, "category": "caselaw", "decision": True, "pdf_key": row.get("pdf_key")}
+                for row in rows if row.get("category") == "caselaw" for title in row.get("titles") or [] if title != row["source"]
+            ]
+            rows.extend(decisions)
+            rows.sort(key=lambda r: (r.get("title") or "").lower())
+            for row in rows:
+                row["_search"] = f"{row.get('title', '')} {row.get('source', '')} {row.get('number') or ''}".lower()
+            _cache.update({"version": version, "rows": rows, "legacy": None})
+        _cache["checked_at"] = now
+        return _cache["version"], _cache["rows"]
+
+
+def etag_for(version: int, *params: Any) -> str:
+    raw = "|".join([str(version), *map(str, params)])
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24] + '"'
+
+
+def legacy_titles(db: Database) -> Tuple[int, Dict[str, List[str]]]:
+    """The original /titles shape (statutes / academic_manuals / case_law / all_titles), cached per version."""
+    version, rows = cached_rows(db)
+    with _cache_lock:
+        if _cache["legacy"] is not None and _cache["version"] == version:
+            return version, _cache["legacy"]
+
+    statutes = sorted({r["title"] for r in rows if r["category"] == "statute" and r.get("title") and not r["title"].lower().endswith(".pdf")})
+    academic = sorted({r["source"] for r in rows if r["category"] == "academic" and r["source"].lower().endswith(".pdf")})
+    caselaw = sorted({t for r in rows if r["category"] == "caselaw" for t in (r["title"], r["source"]) if t})
+    legacy = {
+        "statutes": statutes,
+        "academic_manuals": academic,
+        "case_law": caselaw,
+        "all_titles": sorted(set(statutes + academic + caselaw)),
+    }
+    with _cache_lock:
+        if _cache["version"] == version:
+            _cache["legacy"] = legacy
+    return version, legacy
+
+
+def query(db: Database, q: Optional[str] = None, category: Optional[str] = None,
+          page: int = 1, limit: int = 50) -> Dict[str, Any]:
+    version, rows = cached_rows(db)
+    if category:
+        rows = [r for r in rows if r["category"] == category]
+    if q:
+        terms = q.lower().split()
+        rows = [r for r in rows if all(term in r["_search"] for term in terms)]
+    start = (page - 1) * limit
+    items = [{k: v for k, v in r.items() if k not in ("_id", "_search", "titles")} for r in rows[start:start + limit]]
+    return {"items": items, "total": len(rows), "page": page, "limit": limit, "version": version}
@@ -0,0 +1,338 @@
+# FILE: backend/app/services/law_file_catalog.py
+# PHOENIX PROTOCOL - LAW FILE CATALOG V1.1 (IN-MEMORY • O(1) LOOKUPS • BACKGROUND REFRESH)
+# 1. Built once at startup from the local data roots, the storage manifest (scripts/sync_b2.py) and a
+#    listing of the bucket, then swapped atomically by a background refresher when a data directory or the
+#    manifest changes, every REMOTE_REFRESH_INTERVAL, or (at most every MISS_RELIST_SECONDS) after a miss.
+# 2. Indexes every PDF by exact filename, alphanumeric key, official law number ("04l139", "2004/26")
+#    and title tokens, each pointing at a local path and/or a B2 key with size and etag.
+# 3. The law PDF router and laws_search_service resolve names with dictionary lookups instead of a Mongo
+#    regex, six rglob walks and a list_objects_v2 call per request.
+
+import os
+import re
+import time
+import logging
+import threading
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+DATA_ROOTS = [BACKEND_DIR.parent / "data", BACKEND_DIR / "data", Path.cwd() / "data", Path.cwd().parent / "data"]
+REFRESH_INTERVAL = 60.0
+REMOTE_REFRESH_INTERVAL = 15 * 60.0  # PDFs uploaded to the bucket without a redeploy
+MISS_RELIST_SECONDS = 60.0           # a resolve miss re-lists the bucket at most this often
+
+# Local directory / bucket prefix -> kind
+KIND_PREFIXES = (
+    ("laws/", "laws"),
+    ("academic_manuals/", "academic"),
+    ("academic/", "academic"),
+    ("case_law/", "case_law"),
+    ("jurisprudence/", "case_law"),
+    ("decisions/", "case_law"),
+)
+TITLE_STOP_WORDS = {
+    "ligji", "ligj", "kodi", "nr", "per", "për", "dhe", "i", "e", "te", "të", "se", "së", "mbi",
+    "republikes", "republikës", "kosoves", "kosovës", "pdf", "l",
+}
+
+LAW_CODE = re.compile(r'(\d{2})[-_\s\/]?L[-_\s\/]?(\d{2,4})', re.IGNORECASE)
+YEAR_NUMBER = re.compile(r'\b((?:19|20)\d{2})\s*[/_-]\s*(\d{1,4})\b')
+
+
+def normalize_name(name: str) -> str:
+    return unicodedata.normalize('NFC', name or "").strip()
+
+
+def alpha_key(name: str) -> str:
+    """Same key as laws_pdf_router._to_alpha_key and laws_dictionary._strip_alpha."""
+    clean = re.sub(r'\.pdf$', '', normalize_name(name), flags=re.IGNORECASE).lower()
+    return re.sub(r'[^a-z0-9]', '', clean)
+
+
+def number_keys(name: str) -> List[str]:
+    """Official identifiers: '04/L-139' -> '04l139', 'Nr. 2004/26' -> '2004/26'."""
+    keys = [f"{m.group(1)}l{m.group(2)}".lower() for m in LAW_CODE.finditer(name or "")]
+    keys.extend(f"{m.group(1)}/{int(m.group(2))}" for m in YEAR_NUMBER.finditer(name or ""))
+    return keys
+
+
+def title_tokens(name: str) -> Set[str]:
+    clean = re.sub(r'\.pdf$', '', normalize_name(name), flags=re.IGNORECASE).lower()
+    folded = unicodedata.normalize('NFKD', clean).encode('ascii', 'ignore').decode('ascii')
+    return {t for t in re.split(r'[^a-z0-9]+', folded) if len(t) >= 3 and t not in TITLE_STOP_WORDS and not t.isdigit()}
+
+
+def _kind_for(relative_key: str) -> str:
+    for prefix, kind in KIND_PREFIXES:
+        if relative_key.startswith(prefix):
+            return kind
+    return "other"
+
+
+@dataclass
+class LawFile:
+    name: str
+    kind: str
+    path: Optional[str] = None
+    key: Optional[str] = None
+    size: int = 0
+    etag: Optional[str] = None
+
+
+@dataclass
+class CatalogSnapshot:
+    files: List[LawFile] = field(default_factory=list)
+    by_name: Dict[str, LawFile] = field(default_factory=dict)
+    by_alpha: Dict[str, LawFile] = field(default_factory=dict)
+    by_number: Dict[str, List[LawFile]] = field(default_factory=dict)
+    by_token: Dict[str, Set[int]] = field(default_factory=dict)
+    built_at: float = 0.0
+    build_seconds: float = 0.0
+    signature: Tuple = ()
+    remote: Dict[str, Dict] = field(default_factory=dict)
+    listed_at: float = 0.0
+
+    def add(self, entry: LawFile) -> None:
+        index = len(self.files)
+        self.files.append(entry)
+        self.by_name.setdefault(entry.name.lower(), entry)
+        alpha = alpha_key(entry.name)
+        if alpha:
+            self.by_alpha.setdefault(alpha, entry)
+        for key in number_keys(entry.name):
+            self.by_number.setdefault(key, []).append(entry)
+        for token in title_tokens(entry.name):
+            self.by_token.setdefault(token, set()).add(index)
+
+    def resolve(self, requested: str, kinds: Optional[Iterable[str]] = None) -> Optional[LawFile]:
+        """Exact filename -> law number -> alphanumeric key -> all title tokens. First hit wins."""
+        allowed = set(kinds) if kinds else None
+
+        def ok(entry: Optional[LawFile]) -> bool:
+            return entry is not None and (allowed is None or entry.kind in allowed)
+
+        name = normalize_name(requested)
+        if name.lower().endswith(".pdf"):
+            # A storage key or relative path; law numbers like '04/L-139' keep their slash
+            name = os.path.basename(name)
+        if not name:
+            return None
+        pdf_name = name if name.lower().endswith(".pdf") else f"{name}.pdf"
+
+        entry = self.by_name.get(pdf_name.lower())
+        if ok(entry):
+            return entry
+        for key in number_keys(name):
+            for entry in self.by_number.get(key, []):
+                if ok(entry):
+                    return entry
+        entry = self.by_alpha.get(alpha_key(name))
+        if ok(entry):
+            return entry
+
+        tokens = title_tokens(name)
+        if tokens:
+            sets = [self.by_token.get(t) for t in tokens]
+            if all(sets):
+                for index in sorted(set.intersection(*sets), key=lambda i: len(self.files[i].name)):
+                    if ok(self.files[index]):
+                        return self.files[index]
+        return None
+
+
+# --- BUILD ---
+def _existing_roots() -> List[Path]:
+    roots, seen = [], set()
+    for root in DATA_ROOTS:
+        try:
+            resolved = root.resolve()
+        except OSError:
+            continue
+        if resolved.is_dir() and resolved not in seen:
+            seen.add(resolved)
+            roots.append(resolved)
+    return roots
+
+
+def _signature(roots: List[Path]) -> Tuple:
+    """Cheap change detector: mtimes of every directory under the roots plus the storage manifest."""
+    from app.services import law_sync_service
+
+    stamps = []
+    for root in roots:
+        for dirpath, _, _ in os.walk(root):
+            try:
+                stamps.append((dirpath, os.stat(dirpath).st_mtime))
+            except OSError:
+                pass
+    try:
+        stamps.append(("manifest", law_sync_service.manifest_path().stat().st_mtime))
+    except OSError:
+        pass
+    return tuple(stamps)
+
+
+def build(remote_listing: bool = True, previous: Optional[CatalogSnapshot] = None) -> CatalogSnapshot:
+    """
+    remote_listing=False reuses the bucket listing of `previous` (a local change needs no network hop);
+    a failed listing also falls back to it.
+    """
+    from app.services import law_sync_service
+
+    started = time.perf_counter()
+    roots = _existing_roots()
+    snapshot = CatalogSnapshot(signature=_signature(roots))
+    by_path: Dict[str, LawFile] = {}
+
+    # Local files first: they are served without a network hop
+    for root in roots:
+        for dirpath, _, names in os.walk(root):
+            rel_dir = os.path.relpath(dirpath, root).replace("\\", "/")
+            for fname in names:
+                if not fname.lower().endswith(".pdf"):
+                    continue
+                path = os.path.join(dirpath, fname)
+                rel_key = fname if rel_dir == "." else f"{rel_dir}/{fname}"
+                real = os.path.realpath(path)
+                if real in by_path:
+                    continue
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                entry = LawFile(name=normalize_name(fname), kind=_kind_for(rel_key), path=path, size=size)
+                by_path[real] = entry
+
+    # Storage manifest plus the bucket listing: attach B2 keys to local files, add bucket-only files
+    remote = _remote_entries() if remote_listing else None
+    if remote is not None:
+        snapshot.remote, snapshot.listed_at = remote, time.time()
+    elif previous is not None:
+        snapshot.remote, snapshot.listed_at = previous.remote, previous.listed_at
+    entries = dict(law_sync_service.load_manifest().get("entries", {}))
+    entries.update(snapshot.remote)
+    by_local_name = {(e.kind, e.name.lower()): e for e in by_path.values()}
+    remote_only: List[LawFile] = []
+    for key, meta in entries.items():
+        fname = normalize_name(os.path.basename(key))
+        if not fname.lower().endswith(".pdf"):
+            continue
+        kind = _kind_for(key)
+        local = by_local_name.get((kind, fname.lower()))
+        if local is not None:
+            local.key, local.etag = key, meta.get("etag")
+            continue
+        remote_only.append(LawFile(name=fname, kind=kind, key=key, size=meta.get("size") or 0, etag=meta.get("etag")))
+
+    for entry in list(by_path.values()) + remote_only:
+        snapshot.add(entry)
+
+    snapshot.built_at = time.time()
+    snapshot.build_seconds = time.perf_counter() - started
+    return snapshot
+
+
+def _remote_entries() -> Optional[Dict[str, Dict]]:
+    """
+    The known prefixes plus the PDFs at the bucket root, once per build (never per request). The root is
+    listed with a delimiter so case documents under other prefixes are not walked. None when listing fails.
+    """
+    try:
+        from app.services import storage_service, law_sync_service
+        s3 = storage_service.get_s3_client()
+        bucket = storage_service.B2_BUCKET_NAME
+        entries: Dict[str, Dict] = {}
+        for prefix, _ in KIND_PREFIXES:
+            entries.update(law_sync_service.list_remote(s3, bucket, prefix))
+        entries.update(law_sync_service.list_remote(s3, bucket, "", delimiter="/"))
+        return entries
+    except Exception as e:
+        logger.warning(f"Law catalog: bucket listing skipped: {e}")
+        return None
+
+
+# --- SINGLETON ---
+_snapshot = CatalogSnapshot()
+_lock = threading.Lock()
+_wakeup = threading.Event()
+_missed = threading.Event()
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def refresh(remote_listing: bool = True) -> CatalogSnapshot:
+    global _snapshot
+    snapshot = build(remote_listing=remote_listing, previous=_snapshot)
+    with _lock:
+        _snapshot = snapshot
+    logger.info(f"📚 Law catalog built: {len(snapshot.files)} files in {snapshot.build_seconds * 1000:.0f} ms")
+    return snapshot
+
+
+def current() -> CatalogSnapshot:
+    return _snapshot
+
+
+def resolve(requested: str, kinds: Optional[Iterable[str]] = None) -> Optional[LawFile]:
+    entry = _snapshot.resolve(requested, kinds)
+    if entry is None:
+        # A file added since the last build: let the refresher look now instead of at the next tick
+        _missed.set()
+        _wakeup.set()
+    return entry
+
+
+def stats() -> Dict[str, object]:
+    snapshot = _snapshot
+    kinds: Dict[str, int] = {}
+    for entry in snapshot.files:
+        kinds[entry.kind] = kinds.get(entry.kind, 0) + 1
+    return {
+        "entries": len(snapshot.files),
+        "by_kind": kinds,
+        "local": sum(1 for e in snapshot.files if e.path),
+        "remote": sum(1 for e in snapshot.files if e.key),
+        "build_ms": round(snapshot.build_seconds * 1000, 1),
+        "built_at": snapshot.built_at,
+    }
+
+
+def _refresher(interval: float) -> None:
+    while not _stop.is_set():
+        _wakeup.wait(interval)
+        _wakeup.clear()
+        if _stop.is_set():
+            break
+        missed = _missed.is_set()
+        _missed.clear()
+        try:
+            listing_age = time.time() - _snapshot.listed_at
+            if listing_age >= REMOTE_REFRESH_INTERVAL or (missed and listing_age >= MISS_RELIST_SECONDS):
+                refresh()
+            elif _signature(_existing_roots()) != _snapshot.signature:
+                refresh(remote_listing=False)
+        except Exception as e:
+            logger.warning(f"Law catalog refresh failed: {e}")
+
+
+def start(interval: float = REFRESH_INTERVAL) -> None:
+    global _thread
+    if _thread and _thread.is_alive():
+        return
+    try:
+        refresh()
+    except Exception as e:
+        logger.error(f"Law catalog initial build failed: {e}")
+    _stop.clear()
+    _thread = threading.Thread(target=_refresher, args=(interval,), name="law-catalog-refresh", daemon=True)
+    _thread.start()
+
+
+def stop() -> None:
+    _stop.set()
+    _wakeup.set()
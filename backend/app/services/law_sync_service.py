@@ -0,0 +1,240 @@
+# FILE: backend/app/services/law_sync_service.py
+# PHOENIX PROTOCOL - LAW STORAGE SYNC V1.0 (PAGINATED • CHECKSUM • PARALLEL • MANIFEST)
+# 1. Remote listings use the list_objects_v2 paginator; the old single call stopped at 1 000 keys.
+# 2. A file is uploaded when the remote object is missing, differs in size, or carries a different
+#    sha256 in its x-amz-meta-sha256 metadata; renamed-but-identical files are never re-sent.
+# 3. Uploads run in parallel through storage_service.transfer_config (multipart for large PDFs).
+# 4. The manifest (JSON, one entry per key) records size/sha256/etag and is the lookup index of the law
+#    PDF router, which no longer lists the bucket per request.
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+DATA_DIRS = [BACKEND_DIR.parent / "data", BACKEND_DIR / "data"]
+MANIFEST_NAME = "storage_manifest.json"
+MANIFEST_VERSION = 1
+
+UPLOAD_CONCURRENCY = 6
+HEAD_CONCURRENCY = 16
+CHECKSUM_META = "sha256"
+
+_manifest_cache: Dict[str, Any] = {"mtime": None, "path": None, "data": None}
+_manifest_lock = threading.Lock()
+
+
+def manifest_path() -> Path:
+    configured = os.getenv("LAW_MANIFEST_PATH")
+    if configured:
+        return Path(configured)
+    for data_dir in DATA_DIRS:
+        if data_dir.exists():
+            return data_dir / MANIFEST_NAME
+    return DATA_DIRS[0] / MANIFEST_NAME
+
+
+def file_sha256(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+# --- MANIFEST ---
+def load_manifest(path: Optional[Path] = None) -> Dict[str, Any]:
+    """Lexon manifestin, i ruajtur në memorie derisa skedari të ndryshojë (mtime)."""
+    path = path or manifest_path()
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return {"version": MANIFEST_VERSION, "entries": {}}
+
+    with _manifest_lock:
+        if _manifest_cache["path"] == str(path) and _manifest_cache["mtime"] == mtime:
+            return _manifest_cache["data"]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        logger.warning(f"Storage manifest unreadable ({path}): {e}")
+        return {"version": MANIFEST_VERSION, "entries": {}}
+    data.setdefault("entries", {})
+    with _manifest_lock:
+        _manifest_cache.update({"path": str(path), "mtime": mtime, "data": data})
+    return data
+
+
+def save_manifest(data: Dict[str, Any], path: Optional[Path] = None) -> Path:
+    """Atomic write: readers (the PDF router) never see a half-written file."""
+    path = path or manifest_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data["version"] = MANIFEST_VERSION
+    data["generated_at"] = datetime.now(timezone.utc).isoformat()
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=".manifest-", suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+    return path
+
+
+def manifest_entries(prefixes: Iterable[str]) -> List[Dict[str, Any]]:
+    """Entries under any of the given key prefixes, in prefix priority order."""
+    entries = load_manifest().get("entries", {})
+    seen = set()
+    result = []
+    for prefix in prefixes:
+        for key, entry in entries.items():
+            if key.startswith(prefix) and key not in seen:
+                seen.add(key)
+                result.append({"key": key, **entry})
+    return result
+
+
+# --- REMOTE ---
+def list_remote(s3, bucket: str, prefix: str, delimiter: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """key -> {size, etag}. With a delimiter only the keys directly under `prefix` are listed."""
+    objects = {}
+    params = {"Bucket": bucket, "Prefix": prefix}
+    if delimiter:
+        params["Delimiter"] = delimiter
+    for page in s3.get_paginator("list_objects_v2").paginate(**params):
+        for obj in page.get("Contents", []):
+            objects[obj["Key"]] = {"size": obj.get("Size", 0), "etag": (obj.get("ETag") or "").strip('"')}
+    return objects
+
+
+def _remote_checksums(s3, bucket: str, keys: List[str]) -> Dict[str, Optional[str]]:
+    def head(key: str) -> Tuple[str, Optional[str]]:
+        try:
+            return key, (s3.head_object(Bucket=bucket, Key=key).get("Metadata") or {}).get(CHECKSUM_META)
+        except Exception as e:
+            logger.warning(f"HEAD {key} failed: {e}")
+            return key, None
+
+    if not keys:
+        return {}
+    with ThreadPoolExecutor(max_workers=HEAD_CONCURRENCY) as pool:
+        return dict(pool.map(head, keys))
+
+
+# --- LOCAL ---
+def scan_local(local_dir: str, prefix: str, previous: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """key -> {path, size, mtime, sha256}. Hashes are reused from the manifest when size+mtime match."""
+    files = {}
+    for root, _, names in os.walk(local_dir):
+        rel = os.path.relpath(root, local_dir).replace("\\", "/")
+        for name in names:
+            if not name.lower().endswith(".pdf"):
+                continue
+            path = os.path.join(root, name)
+            key = f"{prefix}{name}" if rel == "." else f"{prefix}{rel}/{name}"
+            stat = os.stat(path)
+            old = previous.get(key) or {}
+            digest = old.get("sha256") if old.get("size") == stat.st_size and old.get("mtime") == stat.st_mtime else None
+            files[key] = {"path": path, "size": stat.st_size, "mtime": stat.st_mtime, "sha256": digest or file_sha256(path)}
+    return files
+
+
+# --- SYNC ---
+def sync_directory(local_dir: str, prefix: str, delete_orphans: bool = False, dry_run: bool = False,
+                   concurrency: int = UPLOAD_CONCURRENCY, progress: Optional[Callable[[str, str], None]] = None) -> Dict[str, int]:
+    from app.services import storage_service
+
+    prefix = prefix if prefix.endswith("/") else f"{prefix}/"
+    s3 = storage_service.get_s3_client()
+    bucket = storage_service.B2_BUCKET_NAME
+    notify = progress or (lambda action, key: None)
+
+    manifest = load_manifest()
+    entries: Dict[str, Dict[str, Any]] = dict(manifest.get("entries", {}))
+    local = scan_local(local_dir, prefix, entries)
+    remote = list_remote(s3, bucket, prefix)
+
+    # Only objects whose listing changed since the manifest was written need a HEAD for their checksum
+    unknown = [
+        key for key in local
+        if key in remote and not (entries.get(key, {}).get("etag") == remote[key]["etag"] and entries[key].get("sha256"))
+    ]
+    remote_sums = _remote_checksums(s3, bucket, unknown)
+
+    stats = {"local": len(local), "remote": len(remote), "uploaded": 0, "unchanged": 0, "deleted": 0, "failed": 0}
+    to_upload = []
+    for key, info in local.items():
+        if key in remote:
+            remote_sum = remote_sums[key] if key in remote_sums else entries[key].get("sha256")
+            if remote[key]["size"] == info["size"] and remote_sum == info["sha256"]:
+                stats["unchanged"] += 1
+                entries[key] = {**_entry(info), "etag": remote[key]["etag"], "synced_at": entries.get(key, {}).get("synced_at")}
+                continue
+        to_upload.append(key)
+
+    def upload(key: str) -> Tuple[str, Optional[str]]:
+        info = local[key]
+        try:
+            s3.upload_file(
+                info["path"], bucket, key,
+                ExtraArgs={"ContentType": "application/pdf", "Metadata": {CHECKSUM_META: info["sha256"]}},
+                Config=storage_service.transfer_config
+            )
+            etag = (s3.head_object(Bucket=bucket, Key=key).get("ETag") or "").strip('"')
+            notify("uploaded", key)
+            return key, etag
+        except Exception as e:
+            logger.error(f"Upload failed for {key}: {e}")
+            notify("failed", key)
+            return key, None
+
+    if dry_run:
+        for key in to_upload:
+            notify("would_upload", key)
+    elif to_upload:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            for key, etag in pool.map(upload, to_upload):
+                if etag is None:
+                    stats["failed"] += 1
+                    continue
+                stats["uploaded"] += 1
+                entries[key] = {**_entry(local[key]), "etag": etag, "synced_at": datetime.now(timezone.utc).isoformat()}
+
+    orphans = [key for key in remote if key not in local]
+    if delete_orphans and orphans:
+        if dry_run:
+            for key in orphans:
+                notify("would_delete", key)
+        else:
+            failed = set(storage_service.delete_files(orphans))
+            for key in orphans:
+                if key not in failed:
+                    entries.pop(key, None)
+                    notify("deleted", key)
+            stats["deleted"] = len(orphans) - len(failed)
+            stats["failed"] += len(failed)
+    else:
+        # Orphans stay in the bucket and stay routable, but carry no local path
+        for key in orphans:
+            entries[key] = {**entries.get(key, {}), "size": remote[key]["size"], "etag": remote[key]["etag"], "path": None}
+    stats["orphans"] = len(orphans)
+
+    # Keys under this prefix that vanished from both sides
+    for key in [k for k in entries if k.startswith(prefix) and k not in local and k not in remote]:
+        entries.pop(key)
+
+    if not dry_run:
+        manifest["entries"] = entries
+        save_manifest(manifest)
+    return stats
+
+
+def _entry(info: Dict[str, Any]) -> Dict[str, Any]:
+    return {"path": info["path"], "size": info["size"], "mtime": info["mtime"], "sha256": info["sha256"]}
@@ -0,0 +1,303 @@
+# FILE: backend/app/services/lexical_index_service.py
+# PHOENIX PROTOCOL - LEXICAL LAW INDEX V1.1 (SQLITE FTS5 • BM25 • ALBANIAN ANALYZER)
+# 1. A persisted SQLite FTS5 file holds one row per legal_knowledge_base chunk (title, body, article) and one
+#    row per source file (titles). It is built offline by scripts/build_lexical_index.py or at the end of an
+#    ingest run, written to a temp file and swapped in atomically.
+# 2. Text is folded (ë->e, ç->c, lowercase), split, and suffix-stemmed (ligjit/ligjin/ligjet -> ligj,
+#    procedura/procedurës -> procedur) before it reaches FTS5; queries go through the same analyzer. Law codes
+#    get one extra token in place ('04/L-139' -> '04l139 04 l 139'). Indexed columns keep stop words so quoted
+#    phrases ('"lënda nr 5"') match; free query terms drop them. An index built with another analyzer is not used.
+# 3. Title, article and phrase lookups are BM25-ranked index reads, replacing the unanchored $regex scans in
+#    laws_search_service. search() returns ranked chunk ids, so it can serve as the lexical leg of hybrid retrieval.
+
+import os
+import re
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ANALYZER_VERSION = "sq-3"
+INDEX_NAME = "lexical_index.sqlite"
+BUILD_BATCH = 2000
+
+# Column weights for bm25(): title, body, article
+CHUNK_WEIGHTS = (8.0, 1.0, 4.0)
+
+STOP_WORDS = {
+    "dhe", "ose", "per", "nga", "ne", "me", "mbi", "te", "se", "si", "qe", "ka", "jane", "eshte", "nje", "i", "e",
+    "the", "of", "and", "nr", "pdf", "web", "republikes", "kosoves",
+}
+# Longest first; folded forms (ë -> e). Case/article endings only: a stem-final j/i (familj-a, kompani-a) is
+# part of the stem, and a vowel left at the end after stripping is dropped by stem().
+SUFFIXES = tuple(sorted({
+    "imeve", "imet", "imit", "imin", "imi", "im", "ave", "eve", "ive", "uara", "uar", "ise", "ine", "ite",
+    "it", "in", "ut", "un", "es", "en", "et", "at", "ve", "a", "e", "i", "u",
+}, key=len, reverse=True))
+STEM_VOWELS = "aeiu"
+MIN_STEM = 3
+
+LAW_CODE = re.compile(r'\b(\d{2})\s*[/_\-.\s]?\s*L\s*[-_\s]?\s*(\d{2,4})\b', re.IGNORECASE)
+ARTICLE_REF = re.compile(r'^\s*(?:neni|nenin|nenit|article|art\.?)?\s*(\d+)\s*([a-z]?)\s*\.?\s*$', re.IGNORECASE)
+QUOTED = re.compile(r'"([^"]+)"')
+
+
+# --- ANALYZER ---
+def fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", (text or "").lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def stem(token: str) -> str:
+    """puna/punës -> pun, familja/familjes -> familj, kompania/kompanisë -> kompan."""
+    if token.isdigit() or len(token) <= MIN_STEM:
+        return token
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+            token = token[:-len(suffix)]
+            break
+    # The indefinite ending stays on when a case ending follows it (procedurë-s, kompani-së, ligje-ve)
+    if token[-1] in STEM_VOWELS and len(token) > MIN_STEM:
+        token = token[:-1]
+    return token
+
+
+def analyze(text: str, keep_stop_words: bool = False) -> List[str]:
+    """
+    Tekst -> tokenë të normalizuar (fold + stem). Kodi i ligjit shtohet si një token i vetëm në vendin e vet,
+    para pjesëve të tij, që frazat me kod ligji të ruajnë rendin.
+    """
+    folded = fold(text)
+    # LAW_CODE starts at a word boundary before its digits, i.e. where a token starts
+    codes = {m.start(): f"{m.group(1)}l{m.group(2)}" for m in LAW_CODE.finditer(folded)}
+    tokens = []
+    for match in re.finditer(r'[a-z0-9]+', folded):
+        if match.start() in codes:
+            tokens.append(codes[match.start()])
+        token = match.group(0)
+        if not keep_stop_words and token in STOP_WORDS:
+            continue
+        tokens.append(stem(token))
+    return tokens
+
+
+def article_token(value: Any) -> Optional[str]:
+    """'Neni 12', '12.', 12, '12a' -> '12' / '12a'. None for preambles and unnumbered sections."""
+    match = ARTICLE_REF.match(str(value if value is not None else ""))
+    if not match or match.group(1).lstrip("0") == "":
+        return None
+    return f"{int(match.group(1))}{match.group(2).lower()}"
+
+
+def _fts_terms(tokens: Iterable[str]) -> List[str]:
+    return [f'"{t}"' for t in tokens if t]
+
+
+def match_expression(query: str, mode: str = "any") -> Optional[str]:
+    """Quoted parts become FTS5 phrases; the rest are ORed ('any') or ANDed ('all') terms."""
+    parts = []
+    for phrase in QUOTED.findall(query or ""):
+        tokens = analyze(phrase, keep_stop_words=True)
+        if tokens:
+            parts.append('"' + " ".join(tokens) + '"')
+    parts.extend(_fts_terms(dict.fromkeys(analyze(QUOTED.sub(" ", query or "")))))
+    if not parts:
+        return None
+    return (" OR " if mode == "any" else " AND ").join(parts)
+
+
+# --- LOCATION ---
+def index_path() -> Path:
+    configured = os.getenv("LEXICAL_INDEX_PATH")
+    if configured:
+        return Path(configured)
+    from app.services import law_sync_service
+    return law_sync_service.manifest_path().parent / INDEX_NAME
+
+
+# --- BUILD (OFFLINE) ---
+SCHEMA = """
+CREATE VIRTUAL TABLE chunks USING fts5(
+    title, body, article,
+    chunk_id UNINDEXED, source UNINDEXED, law_title UNINDEXED, article_number UNINDEXED,
+    category UNINDEXED, chunk_index UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE titles USING fts5(
+    title, source UNINDEXED, law_title UNINDEXED, category UNINDEXED, chunks UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _chunk_rows(db, batch_size: int) -> Iterator[Dict[str, Any]]:
+    projection = {"text": 1, "law_title": 1, "source": 1, "article_number": 1, "category": 1, "chunk_index": 1}
+    cursor = db.legal_knowledge_base.find({}, projection, batch_size=batch_size, no_cursor_timeout=True)
+    try:
+        yield from cursor
+    finally:
+        cursor.close()
+
+
+def build(db, path: Optional[Path] = None, batch_size: int = BUILD_BATCH) -> Dict[str, Any]:
+    """Ndërton indeksin nga legal_knowledge_base në një skedar të përkohshëm dhe e zëvendëson atomikisht."""
+    path = Path(path or index_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=".lexical-", suffix=".sqlite")
+    os.close(fd)
+
+    titles: Dict[str, Dict[str, Any]] = {}
+    rows = 0
+    try:
+        conn = sqlite3.connect(tmp)
+        conn.executescript("PRAGMA journal_mode=OFF; PRAGMA synchronous=OFF;" + SCHEMA)
+        batch: List[Tuple] = []
+        for doc in _chunk_rows(db, batch_size):
+            source = doc.get("source") or ""
+            law_title = doc.get("law_title") or source
+            article = article_token(doc.get("article_number"))
+            # Stop words stay in the indexed columns: a quoted phrase keeps them, so they must be there to match
+            batch.append((
+                " ".join(analyze(law_title, keep_stop_words=True)),
+                " ".join(analyze(doc.get("text") or "", keep_stop_words=True)), article or "",
+                str(doc["_id"]), source, law_title, str(doc.get("article_number") or ""),
+                doc.get("category") or "statute", doc.get("chunk_index") or 0,
+            ))
+            info = titles.setdefault(source, {"titles": set(), "category": doc.get("category") or "statute", "chunks": 0})
+            info["titles"].add(law_title)
+            info["chunks"] += 1
+            if len(batch) >= batch_size:
+                conn.executemany("INSERT INTO chunks VALUES (?,?,?,?,?,?,?,?,?)", batch)
+                rows += len(batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT INTO chunks VALUES (?,?,?,?,?,?,?,?,?)", batch)
+            rows += len(batch)
+
+        for source, info in titles.items():
+            law_title = sorted(info["titles"])[0]
+            analyzed = " ".join(analyze(" ".join([source, *info["titles"]]), keep_stop_words=True))
+            conn.execute("INSERT INTO titles VALUES (?,?,?,?,?)", (analyzed, source, law_title, info["category"], info["chunks"]))
+
+        conn.executemany("INSERT INTO meta VALUES (?,?)", [
+            ("analyzer", ANALYZER_VERSION), ("built_at", str(time.time())), ("chunks", str(rows)), ("sources", str(len(titles))),
+        ])
+        conn.execute("INSERT INTO chunks(chunks) VALUES ('optimize')")
+        conn.execute("INSERT INTO titles(titles) VALUES ('optimize')")
+        conn.commit()
+        conn.close()
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    stats = {"chunks": rows, "sources": len(titles), "seconds": round(time.perf_counter() - started, 2), "path": str(path)}
+    logger.info(f"🔎 Lexical index built: {stats}")
+    return stats
+
+
+# --- QUERY ---
+class LexicalIndex:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self.meta = dict(self._conn().execute("SELECT key, value FROM meta").fetchall())
+        if self.meta.get("analyzer") != ANALYZER_VERSION:
+            logger.warning(f"Lexical index {path} was built with analyzer {self.meta.get('analyzer')}; ignored until it is rebuilt")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _filters(categories: Optional[Iterable[str]], sources: Optional[Iterable[str]]) -> Tuple[str, List[Any]]:
+        sql, params = "", []
+        for column, values in (("category", categories), ("source", sources)):
+            values = [values] if isinstance(values, str) else list(values or [])
+            if values:
+                sql += f" AND {column} IN ({','.join('?' * len(values))})"
+                params.extend(values)
+        return sql, params
+
+    def search(self, query: str, limit: int = 20, categories: Optional[Iterable[str]] = None,
+               sources: Optional[Iterable[str]] = None, mode: str = "any") -> List[Dict[str, Any]]:
+        """BM25 over title+body+article. Lower bm25 is better; 'score' is returned positive (higher = better)."""
+        expression = match_expression(query, mode)
+        if not expression:
+            return []
+        filters, filter_params = self._filters(categories, sources)
+        sql = ("SELECT chunk_id, source, law_title, article_number, category, chunk_index, bm25(chunks, ?, ?, ?) AS rank "
+               f"FROM chunks WHERE chunks MATCH ?{filters} ORDER BY rank LIMIT ?")
+        return [self._hit(row) for row in self._conn().execute(sql, [*CHUNK_WEIGHTS, expression, *filter_params, limit])]
+
+    def find_titles(self, query: str, limit: int = 5, categories: Optional[Iterable[str]] = None,
+                    mode: str = "all") -> List[Dict[str, Any]]:
+        """Source files whose title/filename contain every query term (law codes and numbers included)."""
+        expression = match_expression(query, mode=mode)
+        if not expression:
+            return []
+        filters, filter_params = self._filters(categories, None)
+        sql = f"SELECT source, law_title, category, chunks, bm25(titles) AS rank FROM titles WHERE titles MATCH ?{filters} ORDER BY rank LIMIT ?"
+        return [self._hit(row) for row in self._conn().execute(sql, [expression, *filter_params, limit])]
+
+    def find_article(self, article: Any, sources: Optional[Iterable[str]] = None,
+                     categories: Optional[Iterable[str]] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Chunks of 'Neni N' (optionally within given source files / categories), in document order."""
+        token = article_token(article)
+        if not token:
+            return []
+        filters, filter_params = self._filters(categories, sources)
+        sql = ("SELECT chunk_id, source, law_title, article_number, category, chunk_index, 0.0 AS rank FROM chunks "
+               f"WHERE chunks MATCH ?{filters} ORDER BY CAST(chunk_index AS INTEGER) LIMIT ?")
+        return [self._hit(row) for row in self._conn().execute(sql, [f'article : "{token}"', *filter_params, limit])]
+
+    @staticmethod
+    def _hit(row: sqlite3.Row) -> Dict[str, Any]:
+        hit = dict(row)
+        hit["score"] = 0.0 - hit.pop("rank") + 0.0
+        return hit
+
+
+# --- SINGLETON ---
+_index: Dict[str, Any] = {"path": None, "mtime": None, "index": None}
+_index_lock = threading.Lock()
+
+
+def get_index() -> Optional[LexicalIndex]:
+    """The persisted index, reopened when the file is replaced. None when it has not been built yet."""
+    path = index_path()
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+    with _index_lock:
+        if _index["path"] == str(path) and _index["mtime"] == mtime:
+            return _index["index"]
+        try:
+            index = LexicalIndex(path)
+            if index.meta.get("analyzer") != ANALYZER_VERSION:
+                # Its tokens no longer match what analyze() produces for queries
+                index = None
+        except sqlite3.Error as e:
+            logger.warning(f"Lexical index unreadable ({path}): {e}")
+            index = None
+        _index.update({"path": str(path), "mtime": mtime, "index": index})
+        return index
+
+
+def search(query: str, limit: int = 20, **kwargs) -> List[Dict[str, Any]]:
+    index = get_index()
+    return index.search(query, limit, **kwargs) if index else []
@@ -0,0 +1,171 @@
+# FILE: app/services/llm/llm_cache.py
+# PHOENIX PROTOCOL - LLM RESPONSE CACHE V1.0 (REDIS PERSISTENCE & SINGLE-FLIGHT)
+# 1. Deterministic prompts are keyed on (model, system prompt, user prompt, temperature, json_mode, prompt version).
+# 2. Redis is the shared store; an in-process TTL map keeps working when Redis is down.
+# 3. Concurrent identical calls wait on one upstream request (single-flight) instead of fanning out.
+
+import time
+import json
+import hashlib
+import logging
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Optional, Callable, Awaitable, Dict, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "llm:cache:"
+LOCAL_MAX_ENTRIES = 512
+
+# TTLs per call-site family (seconds). Call sites pass one of these explicitly; None disables caching.
+TTL_EXTRACTION = 7 * 24 * 3600      # metadata, receipts, summaries of identical text
+TTL_DEADLINES = 24 * 3600           # the prompt embeds today's date, so a day is the natural horizon
+TTL_ANALYSIS = 6 * 3600             # War Room sub-analyses on an unchanged case context
+
+_local_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_local_lock = threading.Lock()
+
+_inflight_sync: Dict[str, threading.Event] = {}
+_inflight_sync_lock = threading.Lock()
+_inflight_async: Dict[Tuple[int, str], "asyncio.Task[str]"] = {}
+
+REDIS_RETRY_SECONDS = 30
+_redis_client = None
+_redis_down_until = 0.0
+_redis_lock = threading.Lock()
+
+
+def make_cache_key(model: str, system_prompt: str, user_prompt: str, temperature: float, json_mode: bool = False, prompt_version: str = "v1") -> str:
+    payload = json.dumps(
+        [model, system_prompt, user_prompt, round(float(temperature), 4), bool(json_mode), prompt_version],
+        ensure_ascii=False
+    )
+    return CACHE_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _redis():
+    """Shared client, resolved once; after a failure Redis is skipped for REDIS_RETRY_SECONDS."""
+    global _redis_client, _redis_down_until
+    if not getattr(settings, "LLM_CACHE_ENABLED", True) or not settings.REDIS_URL:
+        return None
+    if _redis_client is not None:
+        return _redis_client
+    if time.time() < _redis_down_until:
+        return None
+    with _redis_lock:
+        if _redis_client is None and time.time() >= _redis_down_until:
+            try:
+                from app.core.db import connect_to_redis
+                _redis_client = connect_to_redis()
+            except Exception as e:
+                _redis_down_until = time.time() + REDIS_RETRY_SECONDS
+                logger.warning(f"LLM cache: Redis unavailable, local cache only for {REDIS_RETRY_SECONDS}s ({e})")
+    return _redis_client
+
+
+def _redis_failed(e: Exception) -> None:
+    """A get/set error drops the client and starts the same backoff as a failed connect."""
+    global _redis_client, _redis_down_until
+    with _redis_lock:
+        _redis_client = None
+        _redis_down_until = time.time() + REDIS_RETRY_SECONDS
+    logger.debug(f"LLM cache: Redis call failed, backing off: {e}")
+
+
+def get_cached(key: str) -> Optional[str]:
+    now = time.time()
+    with _local_lock:
+        hit = _local_cache.get(key)
+        if hit:
+            if hit[0] > now:
+                _local_cache.move_to_end(key)
+                return hit[1]
+            _local_cache.pop(key, None)
+
+    client = _redis()
+    if client is None:
+        return None
+    try:
+        value = client.get(key)
+        return value if value else None
+    except Exception as e:
+        _redis_failed(e)
+        return None
+
+
+def set_cached(key: str, value: str, ttl: int) -> None:
+    if not value or ttl <= 0:
+        return
+    with _local_lock:
+        _local_cache[key] = (time.time() + ttl, value)
+        _local_cache.move_to_end(key)
+        while len(_local_cache) > LOCAL_MAX_ENTRIES:
+            _local_cache.popitem(last=False)
+
+    client = _redis()
+    if client is None:
+        return
+    try:
+        client.set(key, value, ex=ttl)
+    except Exception as e:
+        _redis_failed(e)
+
+
+def cached_call_sync(key: str, ttl: Optional[int], producer: Callable[[], str]) -> str:
+    """Kthen përgjigjen nga cache ose thërret producer-in një herë për çdo çelës njëkohësisht."""
+    if not ttl:
+        return producer()
+
+    cached = get_cached(key)
+    if cached is not None:
+        return cached
+
+    with _inflight_sync_lock:
+        event = _inflight_sync.get(key)
+        leader = event is None
+        if leader:
+            event = threading.Event()
+            _inflight_sync[key] = event
+
+    if not leader:
+        event.wait(timeout=120)
+        cached = get_cached(key)
+        return cached if cached is not None else producer()
+
+    try:
+        result = producer()
+        set_cached(key, result, ttl)
+        return result
+    finally:
+        with _inflight_sync_lock:
+            _inflight_sync.pop(key, None)
+        event.set()
+
+
+async def cached_call_async(key: str, ttl: Optional[int], producer: Callable[[], Awaitable[str]]) -> str:
+    """Versioni asinkron: thirrjet identike në të njëjtin event loop presin të njëjtin Task."""
+    if not ttl:
+        return await producer()
+
+    cached = await asyncio.to_thread(get_cached, key)
+    if cached is not None:
+        return cached
+
+    loop_key = (id(asyncio.get_running_loop()), key)
+    task = _inflight_async.get(loop_key)
+    if task is None:
+        async def _run() -> str:
+            try:
+                result = await producer()
+                await asyncio.to_thread(set_cached, key, result, ttl)
+                return result
+            finally:
+                _inflight_async.pop(loop_key, None)
+
+        task = asyncio.ensure_future(_run())
+        _inflight_async[loop_key] = task
+
+    return await asyncio.shield(task)
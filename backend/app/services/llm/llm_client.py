@@ -6,12 +6,13 @@ import json
 import logging
 import re
 import asyncio
-from typing import List, Dict, Any, AsyncGenerator
+from typing import List, Dict, Any, AsyncGenerator, Optional
 from dotenv import load_dotenv
 from openai import OpenAI, AsyncOpenAI
 
 from app.core.config import settings
 from app.services.llm.prompt_templates import build_dynamic_identity_header, _sanitize_and_disambiguate_prompt, AI_DISCLAIMER
+from app.services.llm import llm_cache
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -26,16 +27,41 @@ TEMP_DRAFTING = 0.0
 TEMP_ANALYSIS = 0.0
 TEMP_CHAT = 0.05
 
+# Rrit këtë kur ndryshojnë prompt-et e përbashkëta (identity header, rregulli gjuhësor) që cache-i të zhvlerësohet.
+PROMPT_VERSION = "v27"
+
 def _get_api_key() -> str:
     return getattr(settings, "OPENROUTER_API_KEY", None) or os.getenv("OPENROUTER_API_KEY", "") or os.getenv("OPENAI_API_KEY", "")
 
+# Klientët ripërdoren brenda procesit (pool HTTP keep-alive). Pas fork-ut (Celery prefork) krijohen rishtas,
+# dhe klienti async lidhet me event loop-in ku u krijua.
+_sync_client: Optional[OpenAI] = None
+_sync_client_pid: Optional[int] = None
+_async_client: Optional[AsyncOpenAI] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
 def _get_sync_client() -> OpenAI: 
-    key = _get_api_key()
-    return OpenAI(api_key=key, base_url=OPENROUTER_URL, timeout=60.0)
+    global _sync_client, _sync_client_pid
+    if _sync_client is None or _sync_client_pid != os.getpid():
+        _sync_client = OpenAI(api_key=_get_api_key(), base_url=OPENROUTER_URL, timeout=60.0)
+        _sync_client_pid = os.getpid()
+    return _sync_client
 
 def _get_async_client() -> AsyncOpenAI: 
-    key = _get_api_key()
-    return AsyncOpenAI(api_key=key, base_url=OPENROUTER_URL, timeout=60.0)
+    global _async_client, _async_client_loop
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return AsyncOpenAI(api_key=_get_api_key(), base_url=OPENROUTER_URL, timeout=60.0)
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = AsyncOpenAI(api_key=_get_api_key(), base_url=OPENROUTER_URL, timeout=60.0)
+        _async_client_loop = loop
+    return _async_client
+
+def reset_clients() -> None:
+    """Harron klientët e trashëguar nga procesi prind (thirret nga worker_process_init)."""
+    global _sync_client, _sync_client_pid, _async_client, _async_client_loop
+    _sync_client, _sync_client_pid, _async_client, _async_client_loop = None, None, None, None
 
 def clean_and_parse_json(text: str) -> Dict[str, Any]:
     """
@@ -76,8 +102,9 @@ def clean_and_parse_json(text: str) -> Dict[str, Any]:
 
     return {}
 
-def _call_llm(system_prompt: str, user_content: str, json_mode: bool = False, temperature: float = 0.0, model: str = FAST_MODEL) -> str:
-    """Thirrje sinkrone e sigurt me auto-retry."""
+def _call_llm(system_prompt: str, user_content: str, json_mode: bool = False, temperature: float = 0.0, model: str = FAST_MODEL,
+              cache_ttl: Optional[int] = None, prompt_version: str = PROMPT_VERSION) -> str:
+    """Thirrje sinkrone e sigurt me auto-retry. `cache_ttl` aktivizon cache-in për prompt-e deterministe."""
     key = _get_api_key()
     if not key:
         logger.error("❌ Mungon OPENROUTER_API_KEY")
@@ -101,6 +128,10 @@ def _call_llm(system_prompt: str, user_content: str, json_mode: bool = False, te
     if json_mode:
         kwargs["response_format"] = {"type": "json_object"}
 
+    cache_key = llm_cache.make_cache_key(kwargs["model"], full_sys_prompt, sanitized_user_content, temperature, json_mode, prompt_version)
+    return llm_cache.cached_call_sync(cache_key, cache_ttl, lambda: _complete_sync(client, kwargs, model))
+
+def _complete_sync(client: OpenAI, kwargs: Dict[str, Any], model: str) -> str:
     for attempt in range(3):
         try:
             res = client.chat.completions.create(**kwargs)
@@ -117,8 +148,9 @@ def _call_llm(system_prompt: str, user_content: str, json_mode: bool = False, te
             return ""
     return ""
 
-async def _call_llm_async(system_prompt: str, user_content: str, json_mode: bool = False, temperature: float = 0.0, model: str = FAST_MODEL) -> str:
-    """Thirrje asinkrone e sigurt pa gabime NoneType dhe me auto-retry."""
+async def _call_llm_async(system_prompt: str, user_content: str, json_mode: bool = False, temperature: float = 0.0, model: str = FAST_MODEL,
+                          cache_ttl: Optional[int] = None, prompt_version: str = PROMPT_VERSION) -> str:
+    """Thirrje asinkrone e sigurt pa gabime NoneType dhe me auto-retry. Thirrjet identike të njëkohshme bashkohen."""
     key = _get_api_key()
     if not key:
         logger.error("❌ Mungon OPENROUTER_API_KEY")
@@ -142,6 +174,10 @@ async def _call_llm_async(system_prompt: str, user_content: str, json_mode: bool
     if json_mode:
         kwargs["response_format"] = {"type": "json_object"}
 
+    cache_key = llm_cache.make_cache_key(kwargs["model"], full_sys_prompt, sanitized_user_content, temperature, json_mode, prompt_version)
+    return await llm_cache.cached_call_async(cache_key, cache_ttl, lambda: _complete_async(client, kwargs, model))
+
+async def _complete_async(client: AsyncOpenAI, kwargs: Dict[str, Any], model: str) -> str:
     for attempt in range(3):
         try:
             res = await client.chat.completions.create(**kwargs)
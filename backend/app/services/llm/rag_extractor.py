@@ -7,6 +7,7 @@ from app.services.llm.llm_client import (
     FAST_MODEL, DEEP_MODEL
 )
 from app.services.llm.prompt_templates import build_dynamic_identity_header
+from app.services.llm import llm_cache
 
 logger = logging.getLogger(__name__)
 
@@ -30,16 +31,22 @@ async def process_large_document_async(text: str, task_type: str = "SUMMARY") ->
         3. Shumat monetare, obligimet ose fushëveprimin e marrëveshjes.
         4. Fakti më i rëndësishëm ligjor ose financiar.
         """
-        res = await client.chat.completions.create(
-            model=FAST_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"TEKSTI I DOKUMENTIT PËR PËRMBLEDHJE:\n{text[:6000]}"}
-            ],
-            temperature=0.0
-        )
-        content = res.choices[0].message.content or ""
-        return content.strip() if content else text[:500]
+        user_content = f"TEKSTI I DOKUMENTIT PËR PËRMBLEDHJE:\n{text[:6000]}"
+
+        async def _summarize() -> str:
+            res = await client.chat.completions.create(
+                model=FAST_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content}
+                ],
+                temperature=0.0
+            )
+            return (res.choices[0].message.content or "").strip()
+
+        cache_key = llm_cache.make_cache_key(FAST_MODEL, system_prompt, user_content, 0.0, prompt_version=task_type)
+        content = await llm_cache.cached_call_async(cache_key, llm_cache.TTL_EXTRACTION, _summarize)
+        return content if content else text[:500]
     except Exception as e:
         logger.error(f"Error in process_large_document_async: {e}")
         return text[:500]
@@ -274,7 +281,7 @@ def extract_expense_details_from_text(text: str) -> Dict[str, Any]:
           "description": "Emri i tregtarit"
         }
         """
-        content = _call_llm(system_prompt, f"TEKSTI I FATURËS:\n{text}", json_mode=True, temperature=0.0, model=FAST_MODEL)
+        content = _call_llm(system_prompt, f"TEKSTI I FATURËS:\n{text}", json_mode=True, temperature=0.0, model=FAST_MODEL, cache_ttl=llm_cache.TTL_EXTRACTION)
         return clean_and_parse_json(content)
     except Exception as e:
         logger.error(f"Error in extract_expense_details_from_text: {e}")
@@ -0,0 +1,299 @@
+# FILE: backend/app/services/ocr_engine_service.py
+# PHOENIX PROTOCOL - PLUGGABLE OCR ENGINES V1.0 (LOCAL TESSERACT POOL • OCR.SPACE REMOTE • PAGE-HASH CACHE)
+# 1. An OCR engine turns one page image into (text, confidence). 'tesseract' runs locally with the sqi+eng
+#    models (tesseract-ocr-sqi ships in the Dockerfile); 'ocrspace' is the optional remote backend; 'auto'
+#    (default) uses Tesseract when the binary is present and falls back to OCR.space page by page.
+# 2. Tesseract pages run on a bounded thread pool in every process (one single-threaded tesseract per worker).
+#    pytesseract runs tesseract as a subprocess, so threads already give real parallelism without the memory
+#    of spawned interpreters in the 512 MB API process, and they also work in daemonic Celery children.
+# 3. Results are cached in 'ocr_page_cache' under sha256(page image) + engine key, so reprocessing a
+#    document (or the same scan uploaded twice) never OCRs a page again. Entries expire after CACHE_TTL_DAYS.
+# 4. Pages are rendered per engine: grayscale PNG at 2x for Tesseract, JPEG at 1.5x for OCR.space uploads.
+
+import io
+import os
+import shutil
+import hashlib
+import logging
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING
+from pymongo.database import Database
+
+logger = logging.getLogger(__name__)
+
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto").lower()
+TESSERACT_LANG = os.getenv("TESSERACT_LANG", "sqi+eng")
+TESSERACT_CONFIG = os.getenv("TESSERACT_CONFIG", "--oem 1 --psm 3")
+POOL_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+REMOTE_WORKERS = 2  # OCR.space free tier rate-limits above this
+MIN_PAGE_CHARS = 20
+
+CACHE_COLLECTION = "ocr_page_cache"
+CACHE_TTL_DAYS = 90
+
+_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+def ensure_indexes(db: Database) -> None:
+    db[CACHE_COLLECTION].create_index([("created_at", ASCENDING)], expireAfterSeconds=CACHE_TTL_DAYS * 86400)
+
+
+# --- ENGINES ---
+class OCREngine:
+    name = "base"
+    zoom = 1.5
+    image_format = "jpeg"
+    grayscale = False
+    workers = 1
+
+    @property
+    def key(self) -> str:
+        """Part of the cache key: a page OCR'd by another engine or language set is not reused."""
+        return self.name
+
+    def available(self) -> bool:
+        return True
+
+    def recognize(self, image_bytes: bytes) -> Tuple[str, float]:
+        raise NotImplementedError
+
+
+class TesseractEngine(OCREngine):
+    name = "tesseract"
+    zoom = 2.0
+    image_format = "png"
+    grayscale = True
+    workers = POOL_WORKERS
+
+    def __init__(self, lang: str = TESSERACT_LANG, config: str = TESSERACT_CONFIG):
+        self.lang = lang
+        self.config = config
+
+    @property
+    def key(self) -> str:
+        return f"tesseract:{self.lang}:{self.config}"
+
+    def available(self) -> bool:
+        try:
+            import pytesseract  # noqa: F401
+        except ImportError:
+            return False
+        return shutil.which(os.getenv("TESSERACT_CMD", "tesseract")) is not None
+
+    def recognize(self, image_bytes: bytes) -> Tuple[str, float]:
+        return _tesseract_page(image_bytes, self.lang, self.config)
+
+
+class OCRSpaceEngine(OCREngine):
+    name = "ocrspace"
+    workers = REMOTE_WORKERS
+
+    @property
+    def key(self) -> str:
+        from app.services.ocr_service import OCR_SPACE_LANGUAGE
+        return f"ocrspace:{OCR_SPACE_LANGUAGE}"
+
+    def available(self) -> bool:
+        from app.services.ocr_service import OCR_SPACE_API_KEY
+        return bool(OCR_SPACE_API_KEY)
+
+    def recognize(self, image_bytes: bytes) -> Tuple[str, float]:
+        from app.services.ocr_service import run_ocr_space_ocr
+        return run_ocr_space_ocr(image_bytes)
+
+
+ENGINES = {"tesseract": TesseractEngine, "ocrspace": OCRSpaceEngine}
+
+
+def get_engine(name: Optional[str] = None) -> Optional[OCREngine]:
+    """Primary engine for `name` (default OCR_ENGINE), or None when nothing is usable."""
+    name = (name or OCR_ENGINE).lower()
+    order = ["tesseract", "ocrspace"] if name == "auto" else [name]
+    for candidate in order:
+        engine_cls = ENGINES.get(candidate)
+        if engine_cls is None:
+            logger.error(f"Unknown OCR engine '{candidate}'")
+            continue
+        engine = engine_cls()
+        if engine.available():
+            return engine
+    return None
+
+
+def _fallback_for(engine: OCREngine) -> Optional[OCREngine]:
+    if OCR_ENGINE != "auto" or engine.name == "ocrspace":
+        return None
+    remote = OCRSpaceEngine()
+    return remote if remote.available() else None
+
+
+# --- TESSERACT WORKER (runs on the pool) ---
+def _tesseract_page(image_bytes: bytes, lang: str, config: str) -> Tuple[str, float]:
+    # One tesseract thread per page: parallelism comes from the pool, not from OpenMP inside each subprocess
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    import pytesseract
+    from PIL import Image
+
+    tesseract_cmd = os.getenv("TESSERACT_CMD")
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+    image = Image.open(io.BytesIO(image_bytes))
+    data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+
+    lines: Dict[Tuple[int, int, int], List[str]] = {}
+    confidences = []
+    for i, word in enumerate(data["text"]):
+        if not word or not word.strip():
+            continue
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+        conf = float(data["conf"][i])
+        if conf >= 0:
+            confidences.append(conf)
+
+    text = "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+    confidence = (sum(confidences) / len(confidences) / 100.0) if confidences else 0.0
+    return text, round(confidence, 3)
+
+
+def _get_pool() -> Executor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=POOL_WORKERS, thread_name_prefix="ocr")
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+# --- CACHE ---
+def page_hash(image_bytes: bytes) -> str:
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def _cache_db() -> Optional[Database]:
+    try:
+        from app.core.db import get_db_instance
+        return get_db_instance()
+    except Exception as e:
+        logger.warning(f"OCR cache unavailable: {e}")
+        return None
+
+
+def _cache_get(db: Optional[Database], keys: List[str]) -> Dict[str, Dict]:
+    if db is None or not keys:
+        return {}
+    try:
+        return {doc["_id"]: doc for doc in db[CACHE_COLLECTION].find({"_id": {"$in": keys}}, {"text": 1, "confidence": 1, "engine": 1})}
+    except Exception as e:
+        logger.warning(f"OCR cache read failed: {e}")
+        return {}
+
+
+def _cache_put(db: Optional[Database], key: str, engine: OCREngine, text: str, confidence: float) -> None:
+    # Empty results are not cached: a transient engine failure must not stick for CACHE_TTL_DAYS
+    if db is None or not text.strip():
+        return
+    try:
+        db[CACHE_COLLECTION].replace_one(
+            {"_id": key},
+            {"_id": key, "engine": engine.key, "text": text, "confidence": confidence, "created_at": datetime.now(timezone.utc)},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning(f"OCR cache write failed: {e}")
+
+
+# --- PUBLIC API ---
+def render_page(page, engine: OCREngine) -> bytes:
+    """Renders a fitz page the way `engine` wants it. Deterministic, so the bytes double as the cache key."""
+    import fitz
+
+    pix = page.get_pixmap(matrix=fitz.Matrix(engine.zoom, engine.zoom), colorspace=fitz.csGRAY if engine.grayscale else fitz.csRGB)
+    if engine.image_format == "png":
+        return pix.tobytes("png")
+    return pix.tobytes("jpeg", jpg_quality=80)
+
+
+def render_pdf_pages(doc, page_numbers: List[int], engine: OCREngine) -> Dict[int, bytes]:
+    return {i: render_page(doc[i], engine) for i in page_numbers}
+
+
+def recognize_pages(images: Dict[int, bytes], engine: Optional[OCREngine] = None, use_cache: bool = True,
+                    fallback: bool = True) -> Dict[int, Dict]:
+    """
+    OCRs {page_num: image bytes} and returns {page_num: {"text", "confidence", "engine", "cached"}}.
+    Cached pages are served without touching an engine; misses run concurrently on the engine's pool.
+    """
+    engine = engine or get_engine()
+    if not images:
+        return {}
+    if engine is None:
+        return {i: {"text": "", "confidence": 0.0, "engine": None, "cached": False} for i in images}
+
+    db = _cache_db() if use_cache else None
+    keys = {i: f"{engine.key}:{page_hash(img)}" for i, img in images.items()}
+    hits = _cache_get(db, list(keys.values()))
+
+    results: Dict[int, Dict] = {}
+    misses = []
+    for i, key in keys.items():
+        hit = hits.get(key)
+        if hit:
+            results[i] = {"text": hit.get("text", ""), "confidence": hit.get("confidence", 0.0), "engine": engine.name, "cached": True}
+        else:
+            misses.append(i)
+
+    if misses:
+        # Identical pages (repeated cover sheets, blank separators) are OCR'd once per batch
+        first_page: Dict[str, int] = {}
+        for i in misses:
+            first_page.setdefault(keys[i], i)
+        if isinstance(engine, TesseractEngine):
+            executor, owned = _get_pool(), False
+            futures = {key: executor.submit(_tesseract_page, images[i], engine.lang, engine.config) for key, i in first_page.items()}
+        else:
+            executor, owned = ThreadPoolExecutor(max_workers=min(len(first_page), engine.workers)), True
+            futures = {key: executor.submit(engine.recognize, images[i]) for key, i in first_page.items()}
+        try:
+            recognized: Dict[str, Tuple[str, float]] = {}
+            for key, future in futures.items():
+                try:
+                    text, confidence = future.result()
+                except Exception as e:
+                    logger.error(f"❌ [OCR:{engine.name}] Page {first_page[key] + 1} Error: {e}")
+                    text, confidence = "", 0.0
+                recognized[key] = (text or "", confidence)
+                _cache_put(db, key, engine, text or "", confidence)
+        finally:
+            if owned:
+                executor.shutdown(wait=True)
+        for i in misses:
+            text, confidence = recognized[keys[i]]
+            results[i] = {"text": text, "confidence": confidence, "engine": engine.name, "cached": False}
+
+    # 'auto': pages the local engine could not read get one remote attempt
+    remote = _fallback_for(engine) if fallback else None
+    retry = [i for i in misses if len(results[i]["text"].strip()) < MIN_PAGE_CHARS] if remote else []
+    if retry:
+        logger.info(f"OCR fallback to {remote.name} for {len(retry)} page(s)")
+        results.update(recognize_pages({i: images[i] for i in retry}, remote, use_cache, fallback=False))
+    return results
+
+
+def recognize_image(image_bytes: bytes, engine: Optional[OCREngine] = None, use_cache: bool = True) -> Tuple[str, float]:
+    """Single uploaded image (receipt, photo of a page). Same engines and cache as PDF pages."""
+    result = recognize_pages({0: image_bytes}, engine, use_cache)[0]
+    return result["text"], result["confidence"]
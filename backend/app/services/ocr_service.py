@@ -1,5 +1,8 @@
 # FILE: backend/app/services/ocr_service.py
-# PHOENIX PROTOCOL - OCR ENGINE V8.0 (429 RATE-LIMIT AUTO-RETRY & MULTI-PAGE RESILIENCE)
+# PHOENIX PROTOCOL - OCR ENGINE V9.1 (ENGINE LAYER • OCR.SPACE AS OPTIONAL REMOTE BACKEND)
+# 1. Image OCR goes through ocr_engine_service (local Tesseract sqi+eng by default, page-hash cached).
+# 2. OCR.space is only used when OCR_SPACE_API_KEY is configured; there is no built-in key any more.
+# 3. PDF bytes go through text_extraction_service's single fitz pass (no separate pypdf read).
 
 import os
 import json
@@ -13,7 +16,8 @@ from typing import Dict, List, Tuple, Optional, Any
 logger = logging.getLogger(__name__)
 
 # --- SECURE CREDENTIALS ---
-OCR_SPACE_API_KEY = os.getenv("OCR_SPACE_API_KEY", "K89840741888957")
+OCR_SPACE_API_KEY = os.getenv("OCR_SPACE_API_KEY", "")
+OCR_SPACE_LANGUAGE = os.getenv("OCR_SPACE_LANGUAGE", "eng")
 
 INVOICE_KEYWORDS = {
     'sq': ['total', 'shuma', 'data', 'faturë', 'kupon', 'tvsh', 'zbritje', 'pagesë', 'çmimi', 'numri fiskal'],
@@ -30,23 +34,6 @@ class SmartOCRResult:
     def to_dict(self) -> Dict[str, Any]:
         return {'text': self.text, 'confidence': self.confidence, 'metadata': self.metadata, 'structured_data': self.structured_data}
 
-# --- HYBRID PARSER: LOCAL PDF TEXT EXTRACTOR ---
-
-def extract_text_from_pdf_locally(pdf_bytes: bytes) -> Optional[str]:
-    try:
-        import pypdf
-        reader = pypdf.PdfReader(io.BytesIO(pdf_bytes))
-        text_runs = []
-        for page in reader.pages:
-            text_runs.append(page.extract_text() or "")
-        full_text = "\n".join(text_runs).strip()
-        if len(full_text) > 80:
-            logger.info(f"✅ Local PDF text extraction success: {len(full_text)} chars")
-            return full_text
-    except Exception as e:
-        logger.warning(f"Local PDF parser skipped: {e}")
-    return None
-
 # --- ADVANCED OCR.SPACE ENGINE WITH 429 AUTO-RETRY ---
 
 def run_ocr_space_ocr(image_bytes: bytes) -> Tuple[str, float]:
@@ -54,7 +41,7 @@ def run_ocr_space_ocr(image_bytes: bytes) -> Tuple[str, float]:
     Sends image or PDF bytes to OCR.space API with automatic 429 rate limit backoff.
     """
     if not OCR_SPACE_API_KEY:
-        logger.error("❌ OCR_SPACE_API_KEY is missing from environment variables.")
+        logger.warning("OCR_SPACE_API_KEY is not configured; remote OCR disabled.")
         return "", 0.0
 
     url = "https://api.ocr.space/parse/image"
@@ -65,7 +52,7 @@ def run_ocr_space_ocr(image_bytes: bytes) -> Tuple[str, float]:
     
     payload = {
         "apikey": OCR_SPACE_API_KEY,
-        "language": "eng", 
+        "language": OCR_SPACE_LANGUAGE,
         "isOverlayRequired": False,
         "OCREngine": "2",
         "scale": True,
@@ -135,11 +122,13 @@ def rule_based_correction(text: str) -> str:
 def extract_text_from_image_bytes(image_bytes: bytes) -> str:
     try:
         if image_bytes.startswith(b'%PDF-'):
-            local_text = extract_text_from_pdf_locally(image_bytes)
-            if local_text:
-                return rule_based_correction(local_text)
-                
-        raw_text, confidence = run_ocr_space_ocr(image_bytes)
+            # Same per-page classifier as uploaded documents: text layer where it exists, OCR only where it does not
+            from app.services.text_extraction_service import extract_pdf, join_pages
+            pages, provenance = extract_pdf(image_bytes)
+            return rule_based_correction(join_pages(pages, len(provenance)))
+
+        from app.services.ocr_engine_service import recognize_image
+        raw_text, confidence = recognize_image(image_bytes)
         corrected_text = rule_based_correction(raw_text)
         return corrected_text
     except Exception as e:
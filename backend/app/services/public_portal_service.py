@@ -0,0 +1,90 @@
+# FILE: backend/app/services/public_portal_service.py
+# PHOENIX PROTOCOL - PUBLIC PORTAL SNAPSHOTS V1.0 (MATERIALIZED • ETAG-AWARE)
+# 1. The client portal payload is built once per case and stored in 'public_portal_snapshots'.
+# 2. Writes to events, documents, archives, invoices, the case or the business profile invalidate it.
+# 3. Every snapshot carries a strong ETag so the portal and link-preview crawlers can get 304s.
+
+import json
+import hashlib
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, Optional
+from bson import ObjectId
+from pymongo.database import Database
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_COLLECTION = "public_portal_snapshots"
+# Safety net for writes that bypass the invalidation hooks (scripts, manual fixes)
+SNAPSHOT_MAX_AGE = timedelta(minutes=10)
+PUBLIC_CACHE_CONTROL = "public, max-age=30, s-maxage=120, stale-while-revalidate=300"
+
+
+def _compute_etag(payload: Dict[str, Any]) -> str:
+    raw = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def get_snapshot(db: Database, case_id: str) -> Optional[Dict[str, Any]]:
+    """Kthen {'payload', 'etag'} për portalin publik, duke e rindërtuar vetëm kur mungon ose ka skaduar."""
+    from app.services import case_service
+
+    now = datetime.now(timezone.utc)
+    cached = db[SNAPSHOT_COLLECTION].find_one({"_id": case_id})
+    if cached:
+        built_at = cached.get("built_at")
+        if isinstance(built_at, datetime) and built_at.tzinfo is None:
+            built_at = built_at.replace(tzinfo=timezone.utc)
+        if built_at and now - built_at < SNAPSHOT_MAX_AGE:
+            return {"payload": cached["payload"], "etag": cached["etag"]}
+
+    payload = case_service.get_public_case_events(db, case_id)
+    if not payload:
+        return None
+
+    owner = db.cases.find_one({"_id": ObjectId(case_id)}, {"owner_id": 1, "user_id": 1}) or {}
+    owner_id = owner.get("owner_id") or owner.get("user_id")
+    etag = _compute_etag(payload)
+    try:
+        db[SNAPSHOT_COLLECTION].replace_one(
+            {"_id": case_id},
+            {"_id": case_id, "owner_id": str(owner_id) if owner_id else None, "payload": payload, "etag": etag, "built_at": now},
+            upsert=True
+        )
+    except Exception as e:
+        logger.warning(f"Public portal snapshot write failed for {case_id}: {e}")
+    return {"payload": payload, "etag": etag}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def invalidate_case(db: Database, case_id: Any) -> None:
+    if not case_id:
+        return
+    try:
+        db[SNAPSHOT_COLLECTION].delete_one({"_id": str(case_id)})
+    except Exception as e:
+        logger.warning(f"Public portal invalidation failed for case {case_id}: {e}")
+
+
+def invalidate_owner(db: Database, owner_id: Any) -> None:
+    """Fshin të gjitha snapshot-et e një zyre (p.sh. pas ndryshimit të profilit të biznesit)."""
+    if not owner_id:
+        return
+    try:
+        db[SNAPSHOT_COLLECTION].delete_many({"owner_id": str(owner_id)})
+    except Exception as e:
+        logger.warning(f"Public portal invalidation failed for owner {owner_id}: {e}")
+
+
+def ensure_indexes(db: Database) -> None:
+    try:
+        db[SNAPSHOT_COLLECTION].create_index("owner_id")
+        db.calendar_events.create_index([("case_id", 1), ("is_public", 1), ("start_date", 1)])
+    except Exception as e:
+        logger.warning(f"Public portal index creation skipped: {e}")
@@ -0,0 +1,108 @@
+# FILE: backend/app/services/realtime_publisher.py
+# PHOENIX PROTOCOL - REALTIME PUBLISHER V1.0 (REDIS PUB/SUB • COALESCED TOKEN FRAMES)
+# 1. Celery workers publish chat/draft results straight to the user's SSE channel (user:{id}:updates);
+#    the old HTTP loopback to http://backend:8000/internal/broadcast is gone.
+# 2. Streaming mode buffers LLM tokens and publishes one frame per FLUSH_INTERVAL or MAX_FRAME_CHARS,
+#    so a 2 000-token answer costs tens of PUBLISH calls instead of thousands.
+# 3. Frames carry stream_id + seq so the client can order/deduplicate; the final frame carries the full text.
+
+import json
+import time
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.05
+MAX_FRAME_CHARS = 512
+
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}:updates"
+
+
+def publish_event(redis_client: redis.Redis, user_id: str, payload: Dict[str, Any]) -> bool:
+    """Publikon një ngjarje në kanalin SSE të përdoruesit. Kthen False nëse Redis nuk është i arritshëm."""
+    try:
+        redis_client.publish(user_channel(user_id), json.dumps(payload, default=str))
+        return True
+    except Exception as e:
+        logger.warning(f"Realtime publish to user {user_id} failed: {e}")
+        return False
+
+
+class TokenStreamPublisher:
+    """
+    Coalesces streamed tokens into frames:
+      {kind}_chunk -> {"stream_id", "seq", "delta"}
+      {kind}_end   -> {"stream_id", "seq", "status", "text"}
+    """
+
+    def __init__(self, redis_client: redis.Redis, user_id: str, stream_id: str, kind: str,
+                 case_id: Optional[str] = None, flush_interval: float = FLUSH_INTERVAL,
+                 max_frame_chars: int = MAX_FRAME_CHARS):
+        self.redis = redis_client
+        self.user_id = user_id
+        self.stream_id = stream_id
+        self.kind = kind
+        self.case_id = case_id
+        self.flush_interval = flush_interval
+        self.max_frame_chars = max_frame_chars
+        self.seq = 0
+        self.frames_published = 0
+        self._parts: list[str] = []
+        self._pending = 0
+        self._text: list[str] = []
+        self._last_flush = time.monotonic()
+
+    def _frame(self, type_suffix: str, **fields: Any) -> Dict[str, Any]:
+        frame = {"type": f"{self.kind}_{type_suffix}", "stream_id": self.stream_id, "seq": self.seq}
+        if self.case_id:
+            frame["case_id"] = self.case_id
+        frame.update(fields)
+        return frame
+
+    def push(self, token: str) -> None:
+        if not token:
+            return
+        self._parts.append(token)
+        self._text.append(token)
+        self._pending += len(token)
+        if self._pending >= self.max_frame_chars or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._parts:
+            return
+        delta = "".join(self._parts)
+        self._parts.clear()
+        self._pending = 0
+        if publish_event(self.redis, self.user_id, self._frame("chunk", delta=delta)):
+            self.frames_published += 1
+        self.seq += 1
+
+    @property
+    def text(self) -> str:
+        return "".join(self._text)
+
+    def finish(self, status: str = "COMPLETED", text: Optional[str] = None, **extra: Any) -> str:
+        """Dërgon pjesën e mbetur dhe kornizën përfundimtare me tekstin e plotë."""
+        self.flush()
+        final_text = self.text if text is None else text
+        if publish_event(self.redis, self.user_id, self._frame(
+            "end", status=status, text=final_text,
+            timestamp=datetime.now(timezone.utc).isoformat(), **extra
+        )):
+            self.frames_published += 1
+        return final_text
+
+    async def pump(self, tokens: AsyncIterator[str]) -> str:
+        """Konsumon një gjenerator asinkron tokenësh dhe i publikon në korniza të bashkuara."""
+        async for token in tokens:
+            self.push(token)
+        self.flush()
+        return self.text
@@ -0,0 +1,154 @@
+# FILE: backend/app/services/report_service/branding.py
+# PHOENIX PROTOCOL - BRANDING ASSET CACHE V1.0 (RENDER ONCE PER PROFILE VERSION)
+# 1. One projected business_profiles read per user, reused for BRANDING_TTL seconds.
+# 2. Logo download + PIL re-encode happens once per profile version (updated_at + logo key), not per PDF.
+# 3. Cached per process; business_service invalidates on profile/logo changes, the TTL covers other processes.
+
+import io
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+from bson import ObjectId
+from pymongo.database import Database
+from reportlab.lib.colors import HexColor
+
+from .styles import BRAND_COLOR_DEFAULT
+
+logger = structlog.get_logger(__name__)
+
+BRANDING_TTL = 60            # seconds a fetched profile is trusted before re-checking its version
+MAX_ENTRIES = 256
+LOGO_MAX_PX = 600            # the logo is drawn at most 40 x 30 mm; 600 px is > 300 dpi at that size
+
+PROFILE_PROJECTION = {
+    "firm_name": 1, "address": 1, "email_public": 1, "phone": 1, "branding_color": 1, "logo_url": 1,
+    "logo_storage_key": 1, "website": 1, "tax_id": 1, "updated_at": 1,
+}
+
+
+@dataclass
+class BrandingAssets:
+    branding: Dict[str, Any]
+    version: str
+    logo_bytes: Optional[bytes] = None
+    logo_size: Optional[Tuple[int, int]] = None
+    palette: Dict[str, Any] = field(default_factory=dict)
+
+    def logo_buffer(self) -> Optional[io.BytesIO]:
+        """ReportLab consumes the stream, so every PDF gets its own buffer over the shared bytes."""
+        return io.BytesIO(self.logo_bytes) if self.logo_bytes else None
+
+
+_cache: "OrderedDict[str, Tuple[float, BrandingAssets]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _default_branding() -> Dict[str, Any]:
+    return {"firm_name": "Juristi.tech", "branding_color": BRAND_COLOR_DEFAULT}
+
+
+def _branding_from_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "firm_name": profile.get("firm_name", "Juristi.tech"), "address": profile.get("address", ""),
+        "email_public": profile.get("email_public", ""), "phone": profile.get("phone", ""),
+        "branding_color": profile.get("branding_color", BRAND_COLOR_DEFAULT), "logo_url": profile.get("logo_url"),
+        "logo_storage_key": profile.get("logo_storage_key"), "website": profile.get("website", ""),
+        "nui": profile.get("tax_id", "")
+    }
+
+
+def _load_profile(db: Database, user_id: str) -> Optional[Dict[str, Any]]:
+    candidates: list = [str(user_id)]
+    if ObjectId.is_valid(str(user_id)):
+        candidates.insert(0, ObjectId(str(user_id)))
+    # Single round trip for both the ObjectId and the legacy string form of user_id; ObjectId wins
+    profiles = list(db.business_profiles.find({"user_id": {"$in": candidates}}, {**PROFILE_PROJECTION, "user_id": 1}).limit(2))
+    profiles.sort(key=lambda p: not isinstance(p.get("user_id"), ObjectId))
+    return profiles[0] if profiles else None
+
+
+def _profile_version(profile: Optional[Dict[str, Any]]) -> str:
+    if not profile:
+        return "default"
+    updated = profile.get("updated_at")
+    return f"{updated.isoformat() if hasattr(updated, 'isoformat') else updated}|{profile.get('logo_storage_key')}|{profile.get('logo_url')}"
+
+
+def _palette(color: Optional[str]) -> Dict[str, Any]:
+    try:
+        brand = HexColor(color or BRAND_COLOR_DEFAULT)
+    except Exception:
+        color, brand = BRAND_COLOR_DEFAULT, HexColor(BRAND_COLOR_DEFAULT)
+    return {"brand_hex": color or BRAND_COLOR_DEFAULT, "brand": brand}
+
+
+def _build_assets(branding: Dict[str, Any], version: str) -> BrandingAssets:
+    from .helpers import _fetch_logo_buffer
+
+    assets = BrandingAssets(branding=branding, version=version, palette=_palette(branding.get("branding_color")))
+    logo = _fetch_logo_buffer(branding.get("logo_url"), branding.get("logo_storage_key"), max_px=LOGO_MAX_PX)
+    if logo:
+        try:
+            from PIL import Image as PILImage
+            assets.logo_bytes = logo.getvalue()
+            assets.logo_size = PILImage.open(io.BytesIO(assets.logo_bytes)).size
+        except Exception as e:
+            logger.warning("branding.logo_probe_failed", error=str(e))
+            assets.logo_bytes, assets.logo_size = None, None
+    return assets
+
+
+def get_branding_assets(db: Database, user_id: str) -> BrandingAssets:
+    """Kthen brandingun e përpunuar (logo, ngjyrat) nga cache; rindërton vetëm kur ndryshon versioni i profilit."""
+    key = str(user_id)
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(key)
+        if entry and now - entry[0] < BRANDING_TTL:
+            _cache.move_to_end(key)
+            return entry[1]
+
+    try:
+        profile = _load_profile(db, key)
+    except Exception as e:
+        logger.error(f"Branding fetch failed: {e}")
+        profile = None
+    version = _profile_version(profile)
+
+    if entry and entry[1].version == version:
+        assets = entry[1]
+    else:
+        branding = _branding_from_profile(profile) if profile else _default_branding()
+        assets = _build_assets(branding, version)
+
+    with _lock:
+        _cache[key] = (now, assets)
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return assets
+
+
+def to_context(assets: BrandingAssets) -> Dict[str, Any]:
+    """Picklable form for process-pool renderers (HexColor objects are rebuilt on the other side)."""
+    return {"branding": assets.branding, "version": assets.version, "logo_bytes": assets.logo_bytes, "logo_size": assets.logo_size}
+
+
+def from_context(context: Dict[str, Any]) -> BrandingAssets:
+    return BrandingAssets(
+        branding=context["branding"], version=context["version"], logo_bytes=context.get("logo_bytes"),
+        logo_size=tuple(context["logo_size"]) if context.get("logo_size") else None,
+        palette=_palette(context["branding"].get("branding_color")),
+    )
+
+
+def invalidate(user_id: Any = None) -> None:
+    with _lock:
+        if user_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(str(user_id), None)
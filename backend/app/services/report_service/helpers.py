@@ -1,5 +1,5 @@
 # FILE: backend/app/services/report_service/helpers.py
-# PHOENIX PROTOCOL - REPORT HELPERS & TEXT CLEANERS V2.0 (FIXED NONE TYPO)
+# PHOENIX PROTOCOL - REPORT HELPERS & TEXT CLEANERS V2.1 (PRECOMPILED SANITIZER • CACHED BRANDING)
 
 import io
 import os
@@ -7,7 +7,6 @@ import re
 import requests
 import structlog
 from typing import Optional
-from bson import ObjectId
 from pymongo.database import Database
 from PIL import Image as PILImage
 
@@ -16,62 +15,69 @@ from .styles import TRANSLATIONS, BRAND_COLOR_DEFAULT
 
 logger = structlog.get_logger(__name__)
 
+_BAD_CHARS = [
+    "■", "□", "▪", "▫", "◆", "◇", "●", "○", "★", "☆", "✔", "✓", "✅", "❌", "✖",
+    "⚖", "👨", "💼", "⚖️", "👨‍💼", "👨‍⚖️", "🛡", "⚔", "🛡️", "⚔️", "💀", "⏱", "⏱️",
+    "⚡", "📁", "📂", "🔍"
+]
+# Multi-codepoint entries can never match once their leading glyph has been stripped, so a
+# single-character translate table is equivalent to the old sequential replace() chain.
+_BAD_CHAR_TABLE = {ord(c): None for c in _BAD_CHARS if len(c) == 1}
+
+_EMOJI_PATTERN = re.compile(
+    "["
+    "\U0001F600-\U0001F64F"
+    "\U0001F300-\U0001F5FF"
+    "\U0001F680-\U0001F6FF"
+    "\U0001F1E0-\U0001F1FF"
+    "\u2702-\u27B0"
+    "\u24C2-\U0001F251"
+    "\u2600-\u26FF"
+    "\u2700-\u27BF"
+    "]+", flags=re.UNICODE
+)
+
+_REPLACEMENTS = {
+    "Conflict: CRITICAL": "Mospërputhje: KRITIKE",
+    "Conflict: HIGH": "Mospërputhje: E LARTË",
+    "Conflict: MEDIUM": "Mospërputhje: E MESME",
+    "Conflict: LOW": "Mospërputhje: E ULËT",
+    "Konflikt: CRITICAL": "Mospërputhje: KRITIKE",
+    "Konflikt: HIGH": "Mospërputhje: E LARTË",
+    "Konflikt: MEDIUM": "Mospërputhje: E MESME",
+    "Konflikt: LOW": "Mospërputhje: E ULËT",
+    "Severity: CRITICAL": "Rrezikshmëria: KRITIKE",
+    "Severity: HIGH": "Rrezikshmëria: E LARTË",
+    "Severity: MEDIUM": "Rrezikshmëria: E MESME",
+    "Severity: LOW": "Rrezikshmëria: E ULËT",
+    "Rrezikshmëria: CRITICAL": "Rrezikshmëria: KRITIKE",
+    "Rrezikshmëria: HIGH": "Rrezikshmëria: E LARTË",
+    "Rrezikshmëria: MEDIUM": "Rrezikshmëria: E MESME",
+    "Rrezikshmëria: LOW": "Rrezikshmëria: E ULËT",
+    "supports": "mbështet",
+    "contradicts": "kundërshton",
+    "related": "lidhet me",
+    "opponent_strategy": "strategjia_e_kundershtarit",
+    "weakness_attacks": "pikat_e_sulmit"
+}
+_REPLACEMENT_LOOKUP = {k.lower(): v for k, v in _REPLACEMENTS.items()}
+_REPLACEMENT_PATTERN = re.compile(
+    r'\b(?:' + "|".join(re.escape(k) for k in sorted(_REPLACEMENTS, key=len, reverse=True)) + r')\b',
+    flags=re.IGNORECASE
+)
+_NONE_LINE_PATTERN = re.compile(r'^\s*(None|\*\*None\*\*)\s*$', flags=re.MULTILINE | re.IGNORECASE)
+_BLANK_RUN_PATTERN = re.compile(r'\n{3,}')
+
 def clean_text_for_pdf(text: str) -> str:
     """Strips unrenderable emojis, black box glyphs ('■'), stray 'None' values, and translates English markers."""
     if not text:
         return ""
     
-    clean = text
-    bad_chars = [
-        "■", "□", "▪", "▫", "◆", "◇", "●", "○", "★", "☆", "✔", "✓", "✅", "❌", "✖",
-        "⚖", "👨", "💼", "⚖️", "👨‍💼", "👨‍⚖️", "🛡", "⚔", "🛡️", "⚔️", "💀", "⏱", "⏱️",
-        "⚡", "📁", "📂", "🔍"
-    ]
-    for char in bad_chars:
-        clean = clean.replace(char, "")
-
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"
-        "\U0001F300-\U0001F5FF"
-        "\U0001F680-\U0001F6FF"
-        "\U0001F1E0-\U0001F1FF"
-        "\u2702-\u27B0"
-        "\u24C2-\U0001F251"
-        "\u2600-\u26FF"
-        "\u2700-\u27BF"
-        "]+", flags=re.UNICODE
-    )
-    clean = emoji_pattern.sub("", clean)
-
-    replacements = {
-        "Conflict: CRITICAL": "Mospërputhje: KRITIKE",
-        "Conflict: HIGH": "Mospërputhje: E LARTË",
-        "Conflict: MEDIUM": "Mospërputhje: E MESME",
-        "Conflict: LOW": "Mospërputhje: E ULËT",
-        "Konflikt: CRITICAL": "Mospërputhje: KRITIKE",
-        "Konflikt: HIGH": "Mospërputhje: E LARTË",
-        "Konflikt: MEDIUM": "Mospërputhje: E MESME",
-        "Konflikt: LOW": "Mospërputhje: E ULËT",
-        "Severity: CRITICAL": "Rrezikshmëria: KRITIKE",
-        "Severity: HIGH": "Rrezikshmëria: E LARTË",
-        "Severity: MEDIUM": "Rrezikshmëria: E MESME",
-        "Severity: LOW": "Rrezikshmëria: E ULËT",
-        "Rrezikshmëria: CRITICAL": "Rrezikshmëria: KRITIKE",
-        "Rrezikshmëria: HIGH": "Rrezikshmëria: E LARTË",
-        "Rrezikshmëria: MEDIUM": "Rrezikshmëria: E MESME",
-        "Rrezikshmëria: LOW": "Rrezikshmëria: E ULËT",
-        "supports": "mbështet",
-        "contradicts": "kundërshton",
-        "related": "lidhet me",
-        "opponent_strategy": "strategjia_e_kundershtarit",
-        "weakness_attacks": "pikat_e_sulmit"
-    }
-    for eng, alb in replacements.items():
-        clean = re.sub(r'\b' + re.escape(eng) + r'\b', alb, clean, flags=re.IGNORECASE)
-
-    clean = re.sub(r'^\s*(None|\*\*None\*\*)\s*$', '', clean, flags=re.MULTILINE | re.IGNORECASE)
-    clean = re.sub(r'\n{3,}', '\n\n', clean)
+    clean = text.translate(_BAD_CHAR_TABLE)
+    clean = _EMOJI_PATTERN.sub("", clean)
+    clean = _REPLACEMENT_PATTERN.sub(lambda m: _REPLACEMENT_LOOKUP[m.group(0).lower()], clean)
+    clean = _NONE_LINE_PATTERN.sub('', clean)
+    clean = _BLANK_RUN_PATTERN.sub('\n\n', clean)
     
     return clean.strip()
 
@@ -79,23 +85,15 @@ def _get_text(key: str, lang: str = "sq") -> str:
     return TRANSLATIONS.get(lang, TRANSLATIONS["sq"]).get(key, key)
 
 def _get_branding(db: Database, user_id: str) -> dict:
-    try:
-        try: oid = ObjectId(user_id)
-        except: oid = user_id
-        
-        profile = db.business_profiles.find_one({"user_id": oid})
-        if not profile: profile = db.business_profiles.find_one({"user_id": str(user_id)})
-
-        if profile:
-            return {
-                "firm_name": profile.get("firm_name", "Juristi.tech"), "address": profile.get("address", ""),"email_public": profile.get("email_public", ""), "phone": profile.get("phone", ""),"branding_color": profile.get("branding_color", BRAND_COLOR_DEFAULT), "logo_url": profile.get("logo_url"), "logo_storage_key": profile.get("logo_storage_key"), "website": profile.get("website", ""), "nui": profile.get("tax_id", "") 
-            }
-    except Exception as e: logger.error(f"Branding fetch failed: {e}")
-    return {"firm_name": "Juristi.tech", "branding_color": BRAND_COLOR_DEFAULT}
+    """Branding dict for the PDF header; served from the per-profile-version cache in branding.py."""
+    from .branding import get_branding_assets
+    return get_branding_assets(db, user_id).branding
 
-def _process_image_bytes(data: bytes) -> Optional[io.BytesIO]:
+def _process_image_bytes(data: bytes, max_px: Optional[int] = None) -> Optional[io.BytesIO]:
     try:
         img = PILImage.open(io.BytesIO(data))
+        if max_px and max(img.size) > max_px:
+            img.thumbnail((max_px, max_px))
         if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
             bg = PILImage.new("RGB", img.size, (255, 255, 255))
             if img.mode == 'P': img = img.convert('RGBA')
@@ -110,7 +108,7 @@ def _process_image_bytes(data: bytes) -> Optional[io.BytesIO]:
     except Exception as e: logger.error(f"Image processing failed: {e}")
     return None
 
-def _fetch_logo_buffer(url: Optional[str], storage_key: Optional[str] = None) -> Optional[io.BytesIO]:
+def _fetch_logo_buffer(url: Optional[str], storage_key: Optional[str] = None, max_px: Optional[int] = None) -> Optional[io.BytesIO]:
     if not url and not storage_key: return None
     if url and "static" in url:
         clean_path = url.split("static/", 1)[-1] 
@@ -118,17 +116,17 @@ def _fetch_logo_buffer(url: Optional[str], storage_key: Optional[str] = None) ->
         for cand in candidates:
             if os.path.exists(cand):
                 try:
-                    with open(cand, "rb") as f: return _process_image_bytes(f.read())
+                    with open(cand, "rb") as f: return _process_image_bytes(f.read(), max_px)
                 except Exception: pass
     if storage_key:
         try:
             stream = storage_service.get_file_stream(storage_key)
-            if hasattr(stream, 'read'): return _process_image_bytes(stream.read())
-            if isinstance(stream, bytes): return _process_image_bytes(stream)
+            if hasattr(stream, 'read'): return _process_image_bytes(stream.read(), max_px)
+            if isinstance(stream, bytes): return _process_image_bytes(stream, max_px)
         except Exception: pass
     if url and url.startswith("http"):
         try:
             response = requests.get(url, timeout=2) 
-            if response.status_code == 200: return _process_image_bytes(response.content)
+            if response.status_code == 200: return _process_image_bytes(response.content, max_px)
         except Exception: pass
     return None
\ No newline at end of file
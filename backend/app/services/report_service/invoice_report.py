@@ -1,5 +1,5 @@
 # FILE: backend/app/services/report_service/invoice_report.py
-# PHOENIX PROTOCOL - INVOICE PDF GENERATOR
+# PHOENIX PROTOCOL - INVOICE PDF GENERATOR V1.1 (CACHED BRANDING ASSETS)
 
 import io
 from datetime import datetime
@@ -10,12 +10,13 @@ from reportlab.platypus import Image as ReportLabImage
 from reportlab.lib.colors import HexColor
 from pymongo.database import Database
 from typing import List
+from functools import lru_cache
 from xml.sax.saxutils import escape
-from PIL import Image as PILImage
 
 from app.models.finance import InvoiceInDB
 from .styles import STYLES, COLOR_BORDER, COLOR_PRIMARY_TEXT, COLOR_SECONDARY_TEXT, BRAND_COLOR_DEFAULT
-from .helpers import _get_text, _get_branding, _fetch_logo_buffer
+from .helpers import _get_text
+from .branding import BrandingAssets, get_branding_assets
 
 def _header_footer_invoice(c: canvas.Canvas, doc: BaseDocTemplate, branding: dict, lang: str):
     c.saveState()
@@ -37,22 +38,27 @@ def _build_doc(buffer: io.BytesIO, branding: dict, lang: str) -> BaseDocTemplate
     doc.addPageTemplates([template])
     return doc
 
+@lru_cache(maxsize=64)
+def _items_table_style(brand_hex: str) -> TableStyle:
+    return TableStyle([('BACKGROUND', (0,0), (-1,0), HexColor(brand_hex)), ('VALIGN', (0,0), (-1,-1), 'TOP'), ('LINEBELOW', (0,-1), (-1,-1), 1, COLOR_BORDER), ('TOPPADDING', (0,0), (-1,-1), 8), ('BOTTOMPADDING', (0,0), (-1,-1), 8), ('ROWBACKGROUNDS', (0,1), (-1,-1), [HexColor("#FFFFFF"), HexColor("#F9FAFB")]), ('LEFTPADDING', (0,0), (-1,-1), 6), ('RIGHTPADDING', (0,0), (-1,-1), 6)])
+
 def generate_invoice_pdf(invoice: InvoiceInDB, db: Database, user_id: str, lang: str = "sq") -> io.BytesIO:
-    branding = _get_branding(db, user_id)
+    return render_invoice_pdf(invoice, get_branding_assets(db, user_id), lang)
+
+def render_invoice_pdf(invoice: InvoiceInDB, assets: BrandingAssets, lang: str = "sq") -> io.BytesIO:
+    """Renders with already-resolved branding; bulk exports share one BrandingAssets across the batch."""
+    branding = assets.branding
     buffer = io.BytesIO()
     doc = _build_doc(buffer, branding, lang)
-    brand_color = HexColor(branding.get("branding_color", BRAND_COLOR_DEFAULT))
     Story: List[Flowable] = []
-    logo_buffer = _fetch_logo_buffer(branding.get("logo_url"), branding.get("logo_storage_key"))
+    logo_buffer = assets.logo_buffer()
     logo_obj = Spacer(0, 0)
-    if logo_buffer:
+    if logo_buffer and assets.logo_size:
         try:
-            p_img = PILImage.open(logo_buffer)
-            iw, ih = p_img.size
+            iw, ih = assets.logo_size
             aspect = ih / float(iw)
             w = 40 * mm; h = w * aspect
             if h > 30 * mm: h = 30 * mm; w = h / aspect
-            logo_buffer.seek(0)
             logo_obj = ReportLabImage(logo_buffer, width=w, height=h); logo_obj.hAlign = 'LEFT'
         except: pass
 
@@ -92,7 +98,7 @@ def generate_invoice_pdf(invoice: InvoiceInDB, db: Database, user_id: str, lang:
     for item in invoice.items:
         data.append([Paragraph(item.description, STYLES['TableCell']), Paragraph(str(item.quantity), STYLES['TableCellRight']), Paragraph(f"{item.unit_price:,.2f} EUR", STYLES['TableCellRight']), Paragraph(f"{item.total:,.2f} EUR", STYLES['TableCellRight'])])
     t_items = Table(data, colWidths=[90*mm, 20*mm, 35*mm, 35*mm])
-    t_items.setStyle(TableStyle([('BACKGROUND', (0,0), (-1,0), brand_color), ('VALIGN', (0,0), (-1,-1), 'TOP'), ('LINEBELOW', (0,-1), (-1,-1), 1, COLOR_BORDER), ('TOPPADDING', (0,0), (-1,-1), 8), ('BOTTOMPADDING', (0,0), (-1,-1), 8), ('ROWBACKGROUNDS', (0,1), (-1,-1), [HexColor("#FFFFFF"), HexColor("#F9FAFB")]), ('LEFTPADDING', (0,0), (-1,-1), 6), ('RIGHTPADDING', (0,0), (-1,-1), 6)]))
+    t_items.setStyle(_items_table_style(assets.palette.get("brand_hex", BRAND_COLOR_DEFAULT)))
     Story.append(t_items)
 
     totals_data = [[Paragraph(_get_text('subtotal', lang), STYLES['TotalLabel']), Paragraph(f"{invoice.subtotal:,.2f} EUR", STYLES['TotalLabel'])], [Paragraph(_get_text('tax', lang), STYLES['TotalLabel']), Paragraph(f"{invoice.tax_amount:,.2f} EUR", STYLES['TotalLabel'])], [Paragraph(f"<b>{_get_text('total', lang)}</b>", STYLES['TotalValue']), Paragraph(f"<b>{invoice.total_amount:,.2f} EUR</b>", STYLES['TotalValue'])]]
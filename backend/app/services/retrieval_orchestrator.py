@@ -0,0 +1,97 @@
+# FILE: backend/app/services/retrieval_orchestrator.py
+# PHOENIX PROTOCOL - RETRIEVAL ORCHESTRATOR V1.0 (CONCURRENT LEGS • SINGLE EMBEDDING)
+# 1. Embeds the query once and shares the vector between the case and global vector searches.
+# 2. Case load, document load, embedding and both vector searches run concurrently.
+# 3. Every leg has its own timeout; a slow leg degrades to an empty result instead of blocking the answer.
+# 4. An optional query_for_case hook rewrites the query from the loaded case (opposing-party disambiguation)
+#    before it is embedded; only the case load is awaited first.
+# 5. Returns per-leg latencies so the chat stream can report "retrieval done" to the client.
+
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.services import async_repository, embedding_service, vector_store_service
+
+logger = logging.getLogger(__name__)
+
+LEG_TIMEOUTS = {
+    "case": 3.0,
+    "documents": 5.0,
+    "embedding": 8.0,
+    "case_vectors": 8.0,
+    "global_laws": 8.0,
+}
+
+
+async def _run_leg(name: str, awaitable: Awaitable[Any], default: Any, timings: Dict[str, Dict[str, Any]]) -> Any:
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        return await asyncio.wait_for(awaitable, timeout=LEG_TIMEOUTS[name])
+    except asyncio.TimeoutError:
+        status = "timeout"
+        logger.warning(f"[Retrieval] Leg '{name}' timed out after {LEG_TIMEOUTS[name]}s")
+        return default
+    except Exception as e:
+        status = "error"
+        logger.warning(f"[Retrieval] Leg '{name}' failed: {e}")
+        return default
+    finally:
+        timings[name] = {"ms": round((time.perf_counter() - started) * 1000, 1), "status": status}
+
+
+async def retrieve(user_id: str, query_text: str, case_id: Optional[str] = None,
+                   case_results: int = 16, global_results: int = 8,
+                   document_ids: Optional[List[str]] = None,
+                   query_for_case: Optional[Callable[[Optional[Dict[str, Any]]], str]] = None) -> Dict[str, Any]:
+    """
+    Ekzekuton të gjitha degët e kërkimit paralelisht dhe kthen rezultatet me kohëzgjatjet për degë.
+    `query_for_case(case_doc)`, kur jepet, ndërton pyetjen e kërkimit nga lënda (p.sh. emri i palës kundërshtare):
+    embedding-u pret vetëm ngarkimin e lëndës (një find_one), dokumentet vazhdojnë paralelisht.
+    """
+    started = time.perf_counter()
+    timings: Dict[str, Dict[str, Any]] = {}
+
+    async def _none() -> Any:
+        return None
+
+    async def _empty() -> List[Dict[str, Any]]:
+        return []
+
+    case_task = asyncio.ensure_future(_run_leg(
+        "case", async_repository.get_case(case_id) if case_id else _none(), None, timings
+    ))
+    documents_task = asyncio.ensure_future(_run_leg(
+        "documents", async_repository.list_case_documents(case_id) if case_id else _empty(), [], timings
+    ))
+
+    if query_for_case is not None:
+        query_text = query_for_case(await case_task)
+
+    vector = await _run_leg("embedding", asyncio.to_thread(embedding_service.generate_embedding, query_text), [], timings)
+    # An empty vector makes both searches take their keyword/direct fallbacks without re-embedding
+    shared_vector: List[float] = vector or []
+
+    case_hits, global_hits, case_doc, documents = await asyncio.gather(
+        _run_leg("case_vectors", vector_store_service.query_case_knowledge_base_async(
+            user_id=user_id, query_text=query_text, case_context_id=case_id, n_results=case_results,
+            vector=shared_vector, document_ids=document_ids
+        ), [], timings),
+        _run_leg("global_laws", vector_store_service.query_global_knowledge_base_async(
+            query_text=query_text, n_results=global_results, vector=shared_vector
+        ), [], timings),
+        case_task,
+        documents_task,
+    )
+
+    report = {"total_ms": round((time.perf_counter() - started) * 1000, 1), "legs": timings}
+    logger.info(f"[Retrieval] Done: {report}")
+    return {
+        "case": case_doc,
+        "documents": documents or [],
+        "case_hits": case_hits or [],
+        "global_hits": global_hits or [],
+        "report": report,
+    }
@@ -1,5 +1,5 @@
 # FILE: backend/app/services/storage_service.py
-# PHOENIX PROTOCOL - STORAGE SERVICE v5.3 (HIGH-PERFORMANCE CONTENT-LENGTH METADATA STREAM)
+# PHOENIX PROTOCOL - STORAGE SERVICE v5.4 (HIGH-PERFORMANCE CONTENT-LENGTH METADATA STREAM • BATCHED DELETES)
 
 import os
 import boto3
@@ -12,7 +12,8 @@ from fastapi import UploadFile
 from fastapi.exceptions import HTTPException
 import logging
 import tempfile
-from typing import Any, Optional, IO, Tuple
+from typing import Any, Iterable, List, Optional, IO, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 from app.core.config import settings
 
@@ -234,6 +235,44 @@ def delete_file(storage_key: str):
         logger.error(f"!!! ERROR: Delete failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete file.")
 
+DELETE_BATCH_SIZE = 1000  # S3 DeleteObjects hard limit per request
+DELETE_CONCURRENCY = 4
+
+def _delete_batch(keys: List[str]) -> List[str]:
+    """Deletes up to 1 000 keys in one DeleteObjects call. Returns the keys that failed."""
+    s3_client = get_s3_client()
+    try:
+        response = s3_client.delete_objects(
+            Bucket=B2_BUCKET_NAME,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True}
+        )
+    except Exception as e:
+        logger.error(f"!!! ERROR: Batch delete of {len(keys)} keys failed: {e}")
+        return list(keys)
+    errors = response.get("Errors") or []
+    for error in errors[:5]:
+        logger.warning(f"--- [Storage] Delete failed for {error.get('Key')}: {error.get('Code')} {error.get('Message')} ---")
+    return [error["Key"] for error in errors if error.get("Key")]
+
+def delete_files(storage_keys: Iterable[Optional[str]], concurrency: int = DELETE_CONCURRENCY) -> List[str]:
+    """
+    Bulk delete: batches keys into DeleteObjects calls (1 000 per call) and runs up to
+    'concurrency' batches at once. Missing keys count as deleted. Returns the keys that failed.
+    """
+    keys = sorted({key for key in storage_keys if key})
+    if not keys:
+        return []
+    batches = [keys[i:i + DELETE_BATCH_SIZE] for i in range(0, len(keys), DELETE_BATCH_SIZE)]
+    logger.info(f"--- Deleting {len(keys)} objects in {len(batches)} batch(es) ---")
+    if len(batches) == 1:
+        return _delete_batch(batches[0])
+
+    failed: List[str] = []
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(batches)))) as pool:
+        for batch_failed in pool.map(_delete_batch, batches):
+            failed.extend(batch_failed)
+    return failed
+
 def copy_s3_object(source_key: str, dest_folder: str) -> str:
     """
     Copies an object within the same bucket (Server-Side Copy).
@@ -1,5 +1,12 @@
 # FILE: backend/app/services/text_extraction_service.py
-# PHOENIX PROTOCOL - OCR ENGINE V14.0 (UNIVERSAL CLI & ASGI RUNTIME COMPATIBILITY)
+# PHOENIX PROTOCOL - OCR ENGINE V16.0 (SINGLE-PASS PER-PAGE CLASSIFIER • PAGE PROVENANCE)
+# 1. Every PDF page is classified once from its fitz layout: 'text' (text layer trusted), 'ocr' (no usable layer:
+#    too few characters over a picture, or a broken font encoding) or 'mixed' (text layer plus scanned regions no
+#    text sits on; a searchable scan's page image under its OCR layer stays 'text'). Only 'ocr' and 'mixed' pages are rendered and sent to ocr_engine_service.
+# 2. iter_pdf_pages streams a PDF through one fitz handle in windows of OCR_WINDOW_PAGES, in page order.
+# 3. Each page carries provenance (method, density, glyph/image coverage, OCR engine and confidence) that the
+#    document pipeline stores next to the page texts and copies onto chunks for page-accurate citations.
+# 4. Spreadsheets (XLSX/XLS/CSV) are handed to spreadsheet_text_service instead of DataFrame.to_string().
 
 import fitz
 import logging
@@ -7,8 +14,7 @@ import os
 import tempfile
 import re
 import io
-from typing import Dict, List, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 try:
     import docx
@@ -23,9 +29,19 @@ except Exception:
     except Exception:
         advanced_bytes_ocr = None
 
+from app.services import ocr_engine_service, spreadsheet_text_service
+
 logger = logging.getLogger(__name__)
 FOOTER_PATTERN = re.compile(r'Rasti:\s*\S+\s*\|\s*Juristi AI System')
 
+# Page classifier thresholds
+MIN_TEXT_CHARS = 80          # fewer non-space characters than this is not a usable text layer
+MIN_IMAGE_COVERAGE = 0.10    # ...and it is only worth OCR when a picture covers at least this much of the page
+MIXED_IMAGE_COVERAGE = 0.25  # area of pictures with no text on them that turns a text page into 'mixed'
+MAX_GARBAGE_RATIO = 0.20     # broken font encodings (U+FFFD / private-use glyphs) above this go to OCR
+OCR_WINDOW_PAGES = 8
+TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_MEDIABOX_CLIP
+
 
 def _sanitize_text(text: str) -> str: 
     return text.replace("\x00", "") if text else ""
@@ -76,62 +92,223 @@ def _extract_docx_text(file_path: str) -> str:
     return _extract_legacy_doc_text(file_path)
 
 
-def _ocr_single_page_bytes(page_num: int, jpeg_bytes: bytes) -> Tuple[int, str]:
-    """Worker executed in parallel threads for Cloud OCR."""
-    marker = f"\n--- [FAQJA {page_num + 1}] ---\n"
-    if not advanced_bytes_ocr:
-        return page_num, marker + "[SCANNED - NO OCR ENGINE AVAILABLE]"
-
+# --- PDF: PER-PAGE CLASSIFIER ---
+def _page_marker(page_num: int) -> str:
+    return f"\n--- [FAQJA {page_num + 1}] ---\n"
+
+
+def _area(rect) -> float:
+    return max(0.0, rect[2] - rect[0]) * max(0.0, rect[3] - rect[1])
+
+
+def _overlap(a, b) -> float:
+    return _area((max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])))
+
+
+def _garbage_ratio(text: str) -> float:
+    """Share of glyphs a broken font encoding produces (U+FFFD, private-use, control chars)."""
+    chars = [c for c in text if not c.isspace()]
+    if not chars:
+        return 0.0
+    bad = sum(1 for c in chars if c == "\ufffd" or "\ue000" <= c <= "\uf8ff" or ord(c) < 32)
+    return bad / len(chars)
+
+
+def classify_page(page) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    Decides how one page is read: 'text' (trust the text layer), 'ocr' (no usable text layer) or 'mixed'
+    (a text layer plus scanned regions it does not cover, e.g. a typed cover page with a stamped scan pasted in).
+    Returns (method, text layer, provenance). One get_text("dict") call without image payloads, so it is cheap.
+    """
+    page_rect = tuple(page.rect)
+    page_area = _area(page_rect) or 1.0
+    layout = page.get_text("dict", flags=TEXT_FLAGS)
+
+    blocks = []
+    glyph_area = 0.0
+    for block in layout.get("blocks", []):
+        if block.get("type", 0) != 0:
+            continue
+        lines = []
+        for line in block.get("lines", []):
+            spans = line.get("spans", [])
+            lines.append("".join(span.get("text", "") for span in spans))
+            glyph_area += sum(_area(span["bbox"]) for span in spans if span.get("text", "").strip())
+        blocks.append((block["bbox"], "\n".join(lines)))
+    blocks.sort(key=lambda b: (int(b[0][1] / 3), int(b[0][0])))
+    text = _strip_footer(_sanitize_text("\n".join(t for _, t in blocks)))
+
+    # Image rects only (get_image_info carries no pixel data). A picture with no text on it is "uncovered"; one
+    # that text sits on (a searchable scan's page image under its OCR layer) is already read by that layer
+    text_boxes = [bbox for bbox, block_text in blocks if block_text.strip()]
+    image_area = 0.0
+    uncovered = 0.0
+    for info in page.get_image_info():
+        rect = tuple(info.get("bbox", (0, 0, 0, 0)))
+        rect = (max(rect[0], page_rect[0]), max(rect[1], page_rect[1]), min(rect[2], page_rect[2]), min(rect[3], page_rect[3]))
+        area = _area(rect)
+        image_area += area
+        if not any(_overlap(rect, bbox) > 0 for bbox in text_boxes):
+            uncovered += area
+
+    chars = len("".join(text.split()))
+    garbage = _garbage_ratio(text)
+    image_coverage = min(1.0, image_area / page_area)
+    uncovered_image = min(1.0, uncovered / page_area)
+
+    if garbage > MAX_GARBAGE_RATIO:
+        method = "ocr"
+    elif chars < MIN_TEXT_CHARS:
+        # A near-empty page with no picture on it (blank, separator, signature line) has nothing to OCR
+        method = "ocr" if image_coverage >= MIN_IMAGE_COVERAGE else "text"
+    elif uncovered_image >= MIXED_IMAGE_COVERAGE:
+        method = "mixed"
+    else:
+        method = "text"
+
+    provenance = {
+        "page": page.number + 1, "method": method, "chars": chars,
+        "density": round(chars / page_area * 1000, 2),  # characters per 1000 pt²
+        "glyph_coverage": round(min(1.0, glyph_area / page_area), 3),
+        "image_coverage": round(image_coverage, 3), "uncovered_image": round(uncovered_image, 3),
+        "garbage_ratio": round(garbage, 3),
+    }
+    return method, text, provenance
+
+
+def _ocr_page_text(page_num: int, result: Dict) -> str:
+    marker = _page_marker(page_num)
+    if result.get("engine") is None:
+        return marker + "[SCANNED - NO OCR ENGINE AVAILABLE]"
+    ocr_text = _sanitize_text(result.get("text", ""))
+    if ocr_text and len(ocr_text.strip()) > 20:
+        return marker + ocr_text
+    return marker + "[Përmbajtja nuk u lexua dot me OCR]"
+
+
+def _merge_mixed(text_layer: str, ocr_text: str) -> str:
+    """Text layer first, then the OCR lines it does not already contain (the scanned regions)."""
+    seen = {re.sub(r'\W+', '', line).lower() for line in text_layer.splitlines()}
+    extra = [line for line in ocr_text.splitlines() if line.strip() and re.sub(r'\W+', '', line).lower() not in seen]
+    return text_layer + ("\n" + "\n".join(extra) if extra else "")
+
+
+def _open_pdf(source: Union[str, bytes]):
+    return fitz.open(stream=source, filetype="pdf") if isinstance(source, (bytes, bytearray)) else fitz.open(source)
+
+
+def _ocr_window(doc, pending: Dict[int, Tuple[str, str]], engine) -> Dict[int, Tuple[str, Dict[str, Any]]]:
+    """OCRs {page_num: (method, text layer)} from an open document; returns {page_num: (page text, OCR provenance)}."""
+    if engine is None:
+        return {i: (_ocr_page_text(i, {"engine": None}) if method == "ocr" else _page_marker(i) + layer, {"ocr_engine": None})
+                for i, (method, layer) in pending.items()}
+
+    results = ocr_engine_service.recognize_pages(ocr_engine_service.render_pdf_pages(doc, list(pending), engine), engine)
+    out = {}
+    for i, (method, layer) in pending.items():
+        result = results[i]
+        if method == "mixed":
+            text = _page_marker(i) + _merge_mixed(layer, _sanitize_text(result.get("text", "")))
+        else:
+            text = _ocr_page_text(i, result)
+        out[i] = (text, {"ocr_engine": result.get("engine"), "ocr_confidence": result.get("confidence"), "ocr_cached": result.get("cached", False)})
+    return out
+
+
+def iter_pdf_pages(source: Union[str, bytes], window: int = OCR_WINDOW_PAGES) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    """
+    Single pass over a PDF with one fitz handle: classify each page, OCR only the 'ocr'/'mixed' ones, and yield
+    (page_num, page text with its FAQJA marker, provenance) in page order. At most `window` rendered page images
+    are held at a time, so memory stays flat on a 500-page scan.
+    """
+    engine = None
+    doc = _open_pdf(source)
     try:
-        ocr_text = _sanitize_text(advanced_bytes_ocr(jpeg_bytes))
-        if ocr_text and len(ocr_text.strip()) > 20:
-            return page_num, marker + ocr_text
-        return page_num, marker + "[Përmbajtja nuk u lexua dot me OCR]"
-    except Exception as e:
-        logger.error(f"❌ [OCR] Page {page_num + 1} Error: {e}")
-        return page_num, marker + ""
+        total = len(doc)
+        for start in range(0, total, window):
+            classified = [(i, *classify_page(doc[i])) for i in range(start, min(start + window, total))]
+            pending = {i: (method, layer) for i, method, layer, _ in classified if method != "text"}
+            if pending and engine is None:
+                engine = ocr_engine_service.get_engine()
+            ocr = _ocr_window(doc, pending, engine) if pending else {}
+            for i, method, layer, provenance in classified:
+                if i in ocr:
+                    text, ocr_provenance = ocr[i]
+                    provenance.update(ocr_provenance)
+                    yield i, text, provenance
+                else:
+                    yield i, _page_marker(i) + layer, provenance
+    finally:
+        doc.close()
 
 
-def _extract_text_from_pdf(file_path: str) -> str:
+def extract_pdf(source: Union[str, bytes]) -> Tuple[Dict[int, str], List[Dict[str, Any]]]:
+    """All pages of a PDF (path or bytes): ({page_num: text}, provenance list in page order)."""
+    pages: Dict[int, str] = {}
+    provenance: List[Dict[str, Any]] = []
+    for i, text, page_provenance in iter_pdf_pages(source):
+        pages[i] = text
+        provenance.append(page_provenance)
+    return pages, provenance
+
+
+def extract_pdf_digital_pages(file_path: str) -> Tuple[Dict[int, str], List[int], int, List[Dict[str, Any]]]:
+    """
+    Pipeline pass 1 (no OCR). Returns (text-layer page texts, pages still needing OCR, total pages, provenance).
+    'mixed' pages are returned with their text layer AND listed as pending; ocr_pdf_pages merges the OCR in.
+    Split from OCR so the document pipeline can checkpoint between the two stages.
+    """
+    doc = fitz.open(file_path)
     try:
-        doc = fitz.open(file_path)
         total = len(doc)
-        if total < 1: 
-            doc.close()
-            return ""
-        
         pages_results: Dict[int, str] = {}
-        pages_needing_ocr: List[Tuple[int, bytes]] = []
-
-        # Pass 1: Instant Digital Text Extraction (0.01s)
+        pages_needing_ocr: List[int] = []
+        provenance: List[Dict[str, Any]] = []
         for i in range(total):
-            page = doc[i]
-            digital_text = _strip_footer(_sanitize_text("\n".join([b[4] for b in sorted(page.get_text("blocks"), key=lambda b: (int(b[1]/3), int(b[0])))])))
-            
-            if digital_text and len(digital_text.strip()) > 80:
-                pages_results[i] = f"\n--- [FAQJA {i + 1}] ---\n" + digital_text
-            else:
-                pix = page.get_pixmap(matrix=fitz.Matrix(1.5, 1.5))
-                jpeg_bytes = pix.tobytes("jpeg", jpg_quality=80)
-                pages_needing_ocr.append((i, jpeg_bytes))
+            method, layer, page_provenance = classify_page(doc[i])
+            provenance.append(page_provenance)
+            if method != "ocr":
+                pages_results[i] = _page_marker(i) + layer
+            if method != "text":
+                pages_needing_ocr.append(i)
+        return pages_results, pages_needing_ocr, total, provenance
+    finally:
+        doc.close()
+
 
+def ocr_pdf_pages(file_path: str, page_numbers: List[int], text_layers: Optional[Dict[int, str]] = None) -> Dict[int, Tuple[str, Dict[str, Any]]]:
+    """
+    Pipeline pass 2: OCRs the given pages (local Tesseract pool by default, page-hash cached).
+    Pages with an entry in `text_layers` (marker included, as pass 1 returned it) are 'mixed' and keep that
+    text, with the OCR lines it lacks appended. Returns {page_num: (page text, OCR provenance fields)}.
+    """
+    if not page_numbers:
+        return {}
+    text_layers = text_layers or {}
+    pending = {}
+    for i in page_numbers:
+        layer = text_layers.get(i)
+        pending[i] = ("mixed", layer[len(_page_marker(i)):] if layer.startswith(_page_marker(i)) else layer) if layer else ("ocr", "")
+
+    doc = fitz.open(file_path)
+    try:
+        results = _ocr_window(doc, pending, ocr_engine_service.get_engine())
+    finally:
         doc.close()
+    cached = sum(1 for _, p in results.values() if p.get("ocr_cached"))
+    if cached:
+        logger.info(f"[OCR] {cached}/{len(results)} page(s) served from cache")
+    return results
 
-        # Pass 2: Throttled Concurrency (max_workers=2 avoids 429 rate limits)
-        if pages_needing_ocr:
-            max_workers = min(len(pages_needing_ocr), 2)
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_page = {
-                    executor.submit(_ocr_single_page_bytes, page_num, j_bytes): page_num
-                    for page_num, j_bytes in pages_needing_ocr
-                }
-                for future in as_completed(future_to_page):
-                    page_num, ocr_result = future.result()
-                    pages_results[page_num] = ocr_result
-
-        ordered_text = "".join([pages_results[i] for i in range(total) if i in pages_results])
-        return ordered_text
 
+def join_pages(pages: Dict[int, str], total: int) -> str:
+    return "".join([pages[i] for i in range(total) if i in pages])
+
+
+def _extract_text_from_pdf(file_path: str) -> str:
+    try:
+        pages, provenance = extract_pdf(file_path)
+        return join_pages(pages, len(provenance))
     except Exception as e:
         logger.error(f"❌ PDF Extraction Failed: {e}")
         return ""
@@ -144,6 +321,15 @@ def extract_text(file_path: str, mime_type: str) -> str:
     if "pdf" in m or fn.endswith(".pdf"): 
         return _extract_text_from_pdf(file_path)
 
+    # SPREADSHEETS (.xlsx/.xls/.csv): streamed row records in token-bounded, sheet/row-tagged blocks. Checked before
+    # Word: the XLSX MIME type (...officedocument.spreadsheetml.sheet) also contains 'officedocument'
+    if spreadsheet_text_service.is_spreadsheet(fn, m):
+        try:
+            return _sanitize_text(spreadsheet_text_service.extract_text(file_path, m))
+        except Exception as sheet_err:
+            logger.error(f"❌ Spreadsheet Extraction Error: {sheet_err}")
+            return ""
+
     # WORD DOCUMENTS (.docx & legacy .doc)
     if "word" in m or "officedocument" in m or fn.endswith(".docx") or fn.endswith(".doc") or m == "application/msword":
         return _extract_docx_text(file_path)
@@ -159,13 +345,6 @@ def extract_text(file_path: str, mime_type: str) -> str:
                 logger.error(f"❌ Direct Image OCR Error: {img_err}")
         return ""
 
-    if "excel" in m or "spreadsheet" in m or fn.endswith(".xlsx") or fn.endswith(".xls"):
-        try:
-            import pandas as pd
-            return _sanitize_text("\n".join(df.to_string() for _, df in pd.read_excel(file_path, sheet_name=None).items()))
-        except Exception:
-            return ""
-
     return "" 
 
 
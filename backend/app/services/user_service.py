@@ -14,7 +14,7 @@ import re
 
 from app.core.security import verify_password, get_password_hash
 from app.models.user import UserInDB, UserCreate
-from app.services import storage_service
+from app.services import storage_service, document_text_service
 
 logger = logging.getLogger(__name__)
 
@@ -106,12 +106,15 @@ def delete_user_and_all_data(db: Database, user: UserInDB):
         if cases_to_delete:
             case_ids = [c["_id"] for c in cases_to_delete]
             docs_to_delete = list(db.documents.find({"case_id": {"$in": case_ids}}))
-            for doc in docs_to_delete:
-                if doc.get("storage_key"): storage_service.delete_file(doc["storage_key"])
-                if doc.get("preview_storage_key"): storage_service.delete_file(doc["preview_storage_key"])
-                if doc.get("processed_text_storage_key"): storage_service.delete_file(doc["processed_text_storage_key"])
+            failed = storage_service.delete_files(
+                doc.get(field) for doc in docs_to_delete
+                for field in ("storage_key", "preview_storage_key", "processed_text_storage_key")
+            )
+            if failed:
+                logger.warning(f"{len(failed)} storage objects of user {user_id} could not be deleted")
             
             db.findings.delete_many({"case_id": {"$in": case_ids}})
+            document_text_service.delete_document_text(db, [str(doc["_id"]) for doc in docs_to_delete])
             db.documents.delete_many({"case_id": {"$in": case_ids}})
             db.calendar_events.delete_many({"case_id": {"$in": case_ids}})
             db.cases.delete_many({"_id": {"$in": case_ids}})
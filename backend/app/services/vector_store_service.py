@@ -1,8 +1,10 @@
 # FILE: backend/app/services/vector_store_service.py
-# PHOENIX PROTOCOL - SAAS VECTOR STORE V29.0 (HIGH-SPEED BATCH INGESTION ACCELERATOR)
+# PHOENIX PROTOCOL - SAAS VECTOR STORE V30.0 (HYBRID RRF GLOBAL SEARCH • HIGH-SPEED BATCH INGESTION)
 
-import os, time, logging, json
-from typing import List, Dict, Any, Sequence
+import os, re, time, logging, json, asyncio, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Sequence, Optional, Tuple
 from pymongo import MongoClient
 from bson import ObjectId
 
@@ -23,27 +25,16 @@ def get_global_collection():
     return None 
 
 
-def query_global_knowledge_base(query_text: str, n_results: int = 10, **kwargs) -> List[Dict[str, Any]]:
-    from . import embedding_service
-    vector = embedding_service.generate_embedding(query_text)
-    
-    db = _get_db()
-    coll = db["legal_knowledge_base"]
-    results = []
+def _global_vector_pipeline(vector: List[float], n_results: int) -> List[Dict[str, Any]]:
+    return [
+        {"$vectorSearch": {"index": "vector_index", "path": "embedding", "queryVector": vector,
+                           "numCandidates": max(100, n_results * 10), "limit": n_results}},
+        {"$addFields": {"score": {"$meta": "vectorSearchScore"}}},
+        {"$project": {"embedding": 0}}
+    ]
 
-    if vector:
-        try:
-            pipeline = [{"$vectorSearch": {"index": "vector_index", "path": "embedding", "queryVector": vector, "numCandidates": 100, "limit": n_results}}]
-            results = list(coll.aggregate(pipeline))
-        except Exception as e:
-            logger.warning(f"SaaS Global Vector Query Failed, running keyword fallback: {e}")
-
-    if not results:
-        try:
-            results = list(coll.find({"$text": {"$search": query_text}}).limit(n_results))
-        except Exception:
-            results = list(coll.find().limit(n_results))
 
+def _format_global_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     formatted_results = []
     for r in results:
         law_title = r.get("law_title", "Dokument Juridik")
@@ -65,48 +56,352 @@ def query_global_knowledge_base(query_text: str, n_results: int = 10, **kwargs)
         formatted_results.append({
             "text": r.get("text", ""), 
             "source": source_tag, 
+            "law_title": law_title,
+            "article_number": article_num or "N/A",
+            "score": r.get("score"),
+            "rrf_score": r.get("rrf_score"),
             "chunk_id": str(r.get("_id"))
         })
 
     return formatted_results
 
 
+# --- HYBRID GLOBAL SEARCH (VECTOR + LEXICAL, RECIPROCAL-RANK FUSION) ---
+# Both legs fetch GLOBAL_CANDIDATES x n_results, run concurrently, and are fused by rank (not by score, which
+# is not comparable between cosine and BM25). A query naming "neni N" adds an exact-article leg from the
+# best-matching law title and boosts every candidate carrying that article number. Results come back in fused
+# order with the fused value in 'rrf_score'; 'score' stays the cosine score (None for lexical-only hits), the
+# scale context_packer compares against case and document hits.
+RRF_K = 60
+LEG_WEIGHTS = {"vector": 1.0, "lexical": 1.0, "article": 1.5}
+ARTICLE_BOOST = 0.02            # a little more than one first place in a single leg (1 / 61)
+GLOBAL_CANDIDATES = 4
+GLOBAL_CACHE_TTL_SECONDS = 300
+GLOBAL_CACHE_MAX_ENTRIES = 256
+ARTICLE_IN_QUERY = re.compile(r'\b(?:neni|nenin|nenit|article|art\.)\s*(\d+[a-z]?)\b', re.IGNORECASE)
+
+_global_cache: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+_global_cache_lock = threading.Lock()
+
+
+def rrf_fuse(rankings: Dict[str, List[str]], weights: Optional[Dict[str, float]] = None, k: int = RRF_K) -> Dict[str, float]:
+    """Reciprocal-rank fusion: score(d) = sum over legs of weight / (k + rank of d in that leg)."""
+    scores: Dict[str, float] = {}
+    for leg, ids in rankings.items():
+        weight = (weights or {}).get(leg, 1.0)
+        for rank, doc_id in enumerate(dict.fromkeys(ids), 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return scores
+
+
+def _query_article(query_text: str) -> Optional[str]:
+    from . import lexical_index_service
+    match = ARTICLE_IN_QUERY.search(query_text or "")
+    return lexical_index_service.article_token(match.group(1)) if match else None
+
+
+def _global_cache_key(query_text: str, n_results: int) -> Optional[str]:
+    from . import lexical_index_service
+    terms = " ".join(lexical_index_service.analyze(query_text or "", keep_stop_words=True))
+    if not terms:
+        return None
+    index = lexical_index_service.get_index()
+    # A rebuilt lexical index (new ingest) invalidates every cached ranking
+    built_at = index.meta.get("built_at") if index else "-"
+    return f"{built_at}|{n_results}|{terms}"
+
+
+def _global_cache_get(key: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    if key is None:
+        return None
+    with _global_cache_lock:
+        hit = _global_cache.get(key)
+        if hit and hit[0] > time.time():
+            _global_cache.move_to_end(key)
+            return [dict(r) for r in hit[1]]
+        _global_cache.pop(key, None)
+    return None
+
+
+def _global_cache_set(key: Optional[str], results: List[Dict[str, Any]]) -> None:
+    if key is None or not results:
+        return
+    with _global_cache_lock:
+        _global_cache[key] = (time.time() + GLOBAL_CACHE_TTL_SECONDS, [dict(r) for r in results])
+        _global_cache.move_to_end(key)
+        while len(_global_cache) > GLOBAL_CACHE_MAX_ENTRIES:
+            _global_cache.popitem(last=False)
+
+
+def _lexical_legs(query_text: str, limit: int) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    """BM25 hits, plus the exact 'Neni N' chunks of the best-matching law. None when no index is built."""
+    from . import lexical_index_service
+    index = lexical_index_service.get_index()
+    if index is None:
+        return None
+    legs = {"lexical": index.search(query_text, limit)}
+    article = _query_article(query_text)
+    if article:
+        title_query = ARTICLE_IN_QUERY.sub(" ", query_text)
+        titles = index.find_titles(title_query, limit=1) or index.find_titles(title_query, limit=1, mode="any")
+        if titles:
+            legs["article"] = index.find_article(article, sources=[titles[0]["source"]], limit=limit)
+    return legs
+
+
+def _text_search_leg(docs: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Mongo $text results shaped like lexical hits (used when the lexical index file is missing)."""
+    return {"lexical": [{"chunk_id": str(d["_id"]), "article_number": d.get("article_number"), "doc": d} for d in docs]}
+
+
+def _fuse(vector_hits: List[Dict[str, Any]], legs: Dict[str, List[Dict[str, Any]]], article: Optional[str],
+          n_results: int) -> List[Tuple[str, float]]:
+    from . import lexical_index_service
+    rankings = {"vector": [str(d["_id"]) for d in vector_hits]}
+    articles = {str(d["_id"]): d.get("article_number") for d in vector_hits}
+    for leg, hits in legs.items():
+        rankings[leg] = [h["chunk_id"] for h in hits]
+        for h in hits:
+            articles.setdefault(h["chunk_id"], h.get("article_number"))
+
+    scores = rrf_fuse(rankings, LEG_WEIGHTS)
+    if article:
+        for doc_id in scores:
+            if lexical_index_service.article_token(articles.get(doc_id)) == article:
+                scores[doc_id] += ARTICLE_BOOST
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:n_results]
+
+
+def _missing_ids(ranked: List[Tuple[str, float]], known: Dict[str, Dict[str, Any]]) -> List[Any]:
+    return [ObjectId(doc_id) if ObjectId.is_valid(doc_id) else doc_id for doc_id, _ in ranked if doc_id not in known]
+
+
+def _assemble(ranked: List[Tuple[str, float]], known: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    results = []
+    for doc_id, score in ranked:
+        doc = known.get(doc_id)
+        if doc is not None:
+            results.append({**doc, "rrf_score": round(score, 6)})
+    return _format_global_results(results)
+
+
+def _known_docs(vector_hits: List[Dict[str, Any]], legs: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    known = {str(d["_id"]): d for d in vector_hits}
+    for hits in legs.values():
+        for h in hits:
+            if h.get("doc") is not None:
+                known.setdefault(h["chunk_id"], h["doc"])
+    return known
+
+
+def query_global_knowledge_base(query_text: str, n_results: int = 10, **kwargs) -> List[Dict[str, Any]]:
+    """Hybrid vector + BM25 search over legal_knowledge_base, fused with RRF and cached per normalized query."""
+    from . import embedding_service
+    use_cache = kwargs.get("use_cache", True)
+    cache_key = _global_cache_key(query_text, n_results) if use_cache else None
+    cached = _global_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    coll = _get_db()["legal_knowledge_base"]
+    candidates = n_results * GLOBAL_CANDIDATES
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        lexical_future = pool.submit(_lexical_legs, query_text, candidates)
+        vector = kwargs.get("vector") or embedding_service.generate_embedding(query_text)
+        vector_hits: List[Dict[str, Any]] = []
+        if vector:
+            try:
+                vector_hits = list(coll.aggregate(_global_vector_pipeline(vector, candidates)))
+            except Exception as e:
+                logger.warning(f"SaaS Global Vector Query Failed, continuing with the lexical leg: {e}")
+        try:
+            legs = lexical_future.result()
+        except Exception as e:
+            logger.warning(f"Lexical law search failed: {e}")
+            legs = {}
+
+    if legs is None:
+        try:
+            legs = _text_search_leg(list(coll.find({"$text": {"$search": query_text}}, {"embedding": 0}).limit(candidates)))
+        except Exception:
+            legs = {}
+
+    ranked = _fuse(vector_hits, legs, _query_article(query_text), n_results)
+    known = _known_docs(vector_hits, legs)
+    missing = _missing_ids(ranked, known)
+    if missing:
+        known.update({str(d["_id"]): d for d in coll.find({"_id": {"$in": missing}}, {"embedding": 0})})
+
+    results = _assemble(ranked, known)
+    _global_cache_set(cache_key, results)
+    return results
+
+
+async def query_global_knowledge_base_async(query_text: str, n_results: int = 10, vector: Optional[List[float]] = None,
+                                            use_cache: bool = True) -> List[Dict[str, Any]]:
+    """Non-blocking variant (Motor). Pass `vector` to reuse an embedding computed by the caller."""
+    from . import embedding_service, async_repository
+    cache_key = _global_cache_key(query_text, n_results) if use_cache else None
+    cached = _global_cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    candidates = n_results * GLOBAL_CANDIDATES
+    lexical_task = asyncio.ensure_future(asyncio.to_thread(_lexical_legs, query_text, candidates))
+    if vector is None:
+        vector = await asyncio.to_thread(embedding_service.generate_embedding, query_text)
+
+    vector_hits: List[Dict[str, Any]] = []
+    if vector:
+        try:
+            vector_hits = await async_repository.aggregate("legal_knowledge_base", _global_vector_pipeline(vector, candidates))
+        except Exception as e:
+            logger.warning(f"SaaS Global Vector Query Failed, continuing with the lexical leg: {e}")
+    try:
+        legs = await lexical_task
+    except Exception as e:
+        logger.warning(f"Lexical law search failed: {e}")
+        legs = {}
+
+    if legs is None:
+        try:
+            legs = _text_search_leg(await async_repository.find("legal_knowledge_base", {"$text": {"$search": query_text}}, candidates))
+        except Exception:
+            legs = {}
+
+    ranked = _fuse(vector_hits, legs, _query_article(query_text), n_results)
+    known = _known_docs(vector_hits, legs)
+    missing = _missing_ids(ranked, known)
+    if missing:
+        docs = await async_repository.find("legal_knowledge_base", {"_id": {"$in": missing}}, len(missing))
+        known.update({str(d["_id"]): d for d in docs})
+
+    results = _assemble(ranked, known)
+    _global_cache_set(cache_key, results)
+    return results
+
+
+# --- CASE-SCOPED VECTOR SEARCH ---
+# The Atlas index (scripts/atlas/user_vectors_vector_index.json) declares owner_id, case_id and
+# document_id as filter fields, so the case restriction happens inside $vectorSearch, before candidates are picked.
+EXACT_SEARCH_MAX_CHUNKS = 2000      # small cases: exact (ENN) scan of the pre-filtered chunks
+MAX_NUM_CANDIDATES = 10000          # Atlas upper bound for numCandidates
+CASE_SIZE_TTL_SECONDS = 300
+_case_size_cache: Dict[str, Tuple[float, int]] = {}
+
+
+def _case_vector_filter(user_id: str, case_context_id: Optional[str] = None, document_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    vector_filter: Dict[str, Any] = {"owner_id": user_id}
+    if case_context_id:
+        case_id_str = str(case_context_id)
+        case_ids: List[Any] = [case_id_str]
+        if ObjectId.is_valid(case_id_str):
+            case_ids.append(ObjectId(case_id_str))
+        vector_filter["case_id"] = {"$in": case_ids}
+    if document_ids:
+        vector_filter["document_id"] = {"$in": [str(d) for d in document_ids]}
+    return vector_filter
+
+
+def _cached_case_size(cache_key: str) -> Optional[int]:
+    hit = _case_size_cache.get(cache_key)
+    if hit and hit[0] > time.time():
+        return hit[1]
+    return None
+
+
+def _remember_case_size(cache_key: str, size: int) -> int:
+    _case_size_cache[cache_key] = (time.time() + CASE_SIZE_TTL_SECONDS, size)
+    return size
+
+
+def _search_params(case_size: Optional[int], n_results: int) -> Dict[str, Any]:
+    """Exact search for small cases, otherwise numCandidates scaled to the number of chunks in scope."""
+    if case_size is not None and case_size <= EXACT_SEARCH_MAX_CHUNKS:
+        return {"exact": True}
+    if case_size is None:
+        return {"numCandidates": max(100, n_results * 10)}
+    return {"numCandidates": min(MAX_NUM_CANDIDATES, max(n_results * 20, case_size // 10))}
+
+
+def _case_vector_pipeline(vector: List[float], vector_filter: Dict[str, Any], n_results: int, case_size: Optional[int] = None) -> List[Dict[str, Any]]:
+    return [{
+        "$vectorSearch": {
+            "index": "vector_index", 
+            "path": "embedding", 
+            "queryVector": vector, 
+            "limit": n_results, 
+            "filter": vector_filter,
+            **_search_params(case_size, n_results)
+        }
+    }, {"$addFields": {"score": {"$meta": "vectorSearchScore"}}}]
+
+
+def _case_size(coll, vector_filter: Dict[str, Any], scoped: bool) -> Optional[int]:
+    if not scoped:
+        return None
+    cache_key = json.dumps(vector_filter, default=str, sort_keys=True)
+    cached = _cached_case_size(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        return _remember_case_size(cache_key, coll.count_documents(vector_filter))
+    except Exception:
+        return None
+
+
+async def _case_size_async(vector_filter: Dict[str, Any], scoped: bool) -> Optional[int]:
+    from . import async_repository
+    if not scoped:
+        return None
+    cache_key = json.dumps(vector_filter, default=str, sort_keys=True)
+    cached = _cached_case_size(cache_key)
+    if cached is not None:
+        return cached
+    try:
+        return _remember_case_size(cache_key, await async_repository.count("user_vectors", vector_filter))
+    except Exception:
+        return None
+
+
+def _documents_as_chunks(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    fallback_chunks = []
+    for doc in docs:
+        text_content = doc.get("extracted_text") or doc.get("summary") or ""
+        if text_content and text_content != "Sinteza...":
+            file_name = doc.get("file_name") or doc.get("title") or "Dokument i Lëndës"
+            fallback_chunks.append({
+                "text": text_content[:3000],
+                "source": file_name,
+                "page": 1
+            })
+    return fallback_chunks
+
+
+def _format_case_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [{"text": r.get("text", ""), "source": r.get("file_name", "Doc"), "page": r.get("page", "1"), "score": r.get("score")} for r in results]
+
+
 def query_case_knowledge_base(user_id: str, query_text: str, n_results: int = 15, **kwargs) -> List[Dict[str, Any]]:
     """
     UNBREAKABLE DUAL-RETRIEVAL ENGINE:
-    1. Executes Atlas $vectorSearch with case_id + owner_id filter.
+    1. Executes Atlas $vectorSearch pre-filtered on owner_id + case_id (+ document_ids).
     2. Fallback: Directly queries db.user_vectors & db.documents for full extracted text.
     """
     from . import embedding_service
     case_context_id = kwargs.get("case_context_id") or kwargs.get("case_id")
-    vector = embedding_service.generate_embedding(query_text) if query_text else None
+    vector_filter = _case_vector_filter(user_id, case_context_id, kwargs.get("document_ids"))
+    vector = kwargs.get("vector") or (embedding_service.generate_embedding(query_text) if query_text else None)
     
     db = _get_db()
     coll = db["user_vectors"]
     results = []
 
-    case_filter: Dict[str, Any] = {"owner_id": user_id}
-    if case_context_id:
-        case_id_str = str(case_context_id)
-        case_filter["$or"] = [
-            {"case_id": case_id_str},
-            {"case_id": ObjectId(case_id_str) if ObjectId.is_valid(case_id_str) else case_id_str}
-        ]
-
     # Step 1: Vector Search if vector embedding succeeded
     if vector:
         try:
-            pipeline = [{
-                "$vectorSearch": {
-                    "index": "vector_index", 
-                    "path": "embedding", 
-                    "queryVector": vector, 
-                    "numCandidates": 100, 
-                    "limit": n_results, 
-                    "filter": {"owner_id": user_id}
-                }
-            }]
-            results = list(coll.aggregate(pipeline))
+            case_size = _case_size(coll, vector_filter, scoped=bool(case_context_id))
+            results = list(coll.aggregate(_case_vector_pipeline(vector, vector_filter, n_results, case_size)))
         except Exception as e:
             logger.warning(f"Vector search exception (falling back to direct Mongo search): {e}")
 
@@ -115,7 +410,7 @@ def query_case_knowledge_base(user_id: str, query_text: str, n_results: int = 15
         logger.info(f"⚡ [VectorStore] Vector search returned 0 results. Executing Direct Mongo Ingestion Fallback for case {case_context_id}")
         
         try:
-            results = list(coll.find(case_filter).limit(n_results))
+            results = list(coll.find(vector_filter).limit(n_results))
         except Exception as e:
             logger.error(f"Direct user_vectors fetch failed: {e}")
 
@@ -124,23 +419,45 @@ def query_case_knowledge_base(user_id: str, query_text: str, n_results: int = 15
             try:
                 c_oid = ObjectId(case_context_id) if ObjectId.is_valid(case_context_id) else case_context_id
                 doc_cursor = db.documents.find({"$or": [{"case_id": case_context_id}, {"case_id": c_oid}], "status": {"$ne": "DELETED"}})
-                docs = list(doc_cursor)
-                
-                fallback_chunks = []
-                for doc in docs:
-                    text_content = doc.get("extracted_text") or doc.get("summary") or ""
-                    if text_content and text_content != "Sinteza...":
-                        file_name = doc.get("file_name") or doc.get("title") or "Dokument i Lëndës"
-                        fallback_chunks.append({
-                            "text": text_content[:3000],
-                            "source": file_name,
-                            "page": 1
-                        })
-                return fallback_chunks
+                return _documents_as_chunks(list(doc_cursor))
             except Exception as doc_err:
                 logger.error(f"Direct document fallback failed: {doc_err}")
 
-    return [{"text": r.get("text", ""), "source": r.get("file_name", "Doc"), "page": r.get("page", "1")} for r in results]
+    return _format_case_results(results)
+
+
+async def query_case_knowledge_base_async(user_id: str, query_text: str, n_results: int = 15,
+                                          case_context_id: Optional[str] = None,
+                                          vector: Optional[List[float]] = None,
+                                          document_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Non-blocking variant of query_case_knowledge_base (Motor), with the same fallbacks."""
+    from . import embedding_service, async_repository
+    vector_filter = _case_vector_filter(user_id, case_context_id, document_ids)
+    if vector is None and query_text:
+        vector = await asyncio.to_thread(embedding_service.generate_embedding, query_text)
+
+    results = []
+    if vector:
+        try:
+            case_size = await _case_size_async(vector_filter, scoped=bool(case_context_id))
+            results = await async_repository.aggregate("user_vectors", _case_vector_pipeline(vector, vector_filter, n_results, case_size))
+        except Exception as e:
+            logger.warning(f"Vector search exception (falling back to direct Mongo search): {e}")
+
+    if not results:
+        logger.info(f"⚡ [VectorStore] Vector search returned 0 results. Executing Direct Mongo Ingestion Fallback for case {case_context_id}")
+        try:
+            results = await async_repository.find("user_vectors", vector_filter, n_results)
+        except Exception as e:
+            logger.error(f"Direct user_vectors fetch failed: {e}")
+
+        if not results and case_context_id:
+            try:
+                return _documents_as_chunks(await async_repository.list_case_documents(case_context_id))
+            except Exception as doc_err:
+                logger.error(f"Direct document fallback failed: {doc_err}")
+
+    return _format_case_results(results)
 
 
 def create_and_store_embeddings_from_chunks(
@@ -202,6 +519,15 @@ def delete_document_embeddings(user_id: str, document_id: str):
         pass
 
 
+def delete_case_embeddings(case_id: str, db=None) -> int:
+    """Removes every chunk of a case in one delete_many (the case_id is stored as str or ObjectId)."""
+    case_ids: List[Any] = [str(case_id)]
+    if ObjectId.is_valid(str(case_id)):
+        case_ids.append(ObjectId(str(case_id)))
+    target = db if db is not None else _get_db()
+    return target["user_vectors"].delete_many({"case_id": {"$in": case_ids}}).deleted_count
+
+
 def copy_document_embeddings(source_document_id: str, target_document_id: str, target_user_id: str, target_case_id: str):
     try:
         db = _get_db()
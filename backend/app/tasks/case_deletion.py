@@ -0,0 +1,37 @@
+# FILE: backend/app/tasks/case_deletion.py
+# PHOENIX PROTOCOL - CASE DELETION TASKS V1.0
+# 1. delete_case_task runs (or resumes) the phased deletion of a tombstoned case.
+# 2. The last retry tolerates storage errors so a flaky bucket never leaves a case tombstoned forever.
+# 3. reap_stale_case_deletions (celery beat) requeues deletions whose heartbeat stopped.
+
+from celery import shared_task
+import structlog
+
+from app.core.worker_context import ContextTask
+from app.services import case_deletion_service
+
+logger = structlog.get_logger(__name__)
+
+
+@shared_task(bind=True, base=ContextTask, name='delete_case_task', max_retries=case_deletion_service.MAX_ATTEMPTS - 1)
+def delete_case_task(self: ContextTask, case_id: str):
+    log = logger.bind(case_id=case_id, task_id=self.request.id, attempt=self.request.retries)
+    final = self.request.retries >= self.max_retries
+    try:
+        stats = case_deletion_service.run_case_deletion(self.ctx.db, case_id, tolerate_storage_errors=final)
+    except Exception as e:
+        log.warning("task.case_deletion.failed", error=str(e), final=final)
+        case_deletion_service.record_failure(self.ctx.db, case_id, str(e), final=final)
+        if not final:
+            raise self.retry(exc=e, countdown=30 * (2 ** self.request.retries))
+        return
+    if stats is None:
+        log.info("task.case_deletion.nothing_to_do")
+        return
+    log.info("task.case_deletion.done", **{phase: stats.get(phase) for phase in case_deletion_service.PHASES})
+
+
+@shared_task(bind=True, base=ContextTask, name='reap_stale_case_deletions', ignore_result=True)
+def reap_stale_case_deletions(self: ContextTask):
+    stats = case_deletion_service.reap_stale_deletions(self.ctx.db)
+    logger.info("task.case_deletion_reaper.done", **stats)
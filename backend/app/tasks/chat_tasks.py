@@ -1,72 +1,49 @@
 # FILE: backend/app/tasks/chat_tasks.py
-# PHOENIX PROTOCOL - CHAT TASKS V2.0 (SYNC WORKER)
-# 1. FIX: Replaced 'async_db_instance' with 'db_instance' (Synchronous).
-# 2. STATUS: Resolves the ImportError that crashes the Celery Worker.
+# PHOENIX PROTOCOL - CHAT TASKS V3.0 (REDIS PUB/SUB DELIVERY)
+# 1. FIX: 'db_instance' never existed in core.db; the DB comes from the per-process WorkerContext.
+# 2. FIX: Collects the unified stream_chat_response (get_http_chat_response was removed with V26).
+# 3. PERF: The result is published straight to user:{id}:updates via Redis; the hardcoded
+#    http://backend:8000 loopback and its per-answer httpx.Client are gone.
+# 4. STREAMING: stream=True publishes coalesced 'chat_stream_chunk' frames while the model is still writing.
 
 import asyncio
 import logging
-import httpx
-from datetime import datetime, timezone
 
 from ..celery_app import celery_app
 from ..services import chat_service
-# PHOENIX FIX: Import the synchronous database instance
-from ..core.db import db_instance
+from ..services.realtime_publisher import TokenStreamPublisher
+from ..core.worker_context import ContextTask
 
 logger = logging.getLogger(__name__)
 
-BROADCAST_ENDPOINT = "http://backend:8000/internal/broadcast/document-update"
+ERROR_TEXT = "Ndodhi një gabim gjatë përpunimit të pyetjes suaj. Ju lutem provoni përsëri."
 
-@celery_app.task(name="process_socratic_query_task")
-def process_socratic_query_task(query_text: str, case_id: str, user_id: str):
+
+async def _run_chat(db, publisher: TokenStreamPublisher, case_id: str, query_text: str, user_id: str, stream: bool) -> str:
+    tokens = chat_service.stream_chat_response(db=db, case_id=case_id, user_query=query_text, user_id=user_id)
+    if stream:
+        return (await publisher.pump(tokens)).strip()
+    parts = [token async for token in tokens]
+    return "".join(parts).strip()
+
+
+@celery_app.task(bind=True, base=ContextTask, name="process_socratic_query_task")
+def process_socratic_query_task(self: ContextTask, query_text: str, case_id: str, user_id: str, stream: bool = True):
     """
-    This background task runs the full RAG pipeline and sends the final result back.
+    Runs the full RAG pipeline and publishes the answer on the user's SSE channel.
     """
     logger.info(f"Celery task 'process_socratic_query_task' started for user {user_id} in case {case_id}")
-    
-    broadcast_payload = {}
-    try:
-        if db_instance is None:
-             raise RuntimeError("Database connection not initialized in Celery worker.")
 
-        # PHOENIX FIX: Pass the synchronous db_instance.
-        # We use asyncio.run() because the service method is 'async def' (it calls the AI).
-        full_response = asyncio.run(
-            chat_service.get_http_chat_response(
-                db=db_instance,
-                case_id=case_id,
-                user_query=query_text,
-                user_id=user_id
-            )
-        )
-        
-        broadcast_payload = {
-            "case_id": case_id,
-            "type": "chat_message_out",
-            "text": full_response,
-            "sender": "AI",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
+    stream_id = self.request.id or f"chat-{case_id}"
+    publisher = TokenStreamPublisher(self.ctx.redis, user_id, stream_id, kind="chat_stream", case_id=case_id)
 
+    try:
+        # asyncio.run() because the service is an async generator (it calls the AI).
+        full_response = asyncio.run(_run_chat(self.ctx.db, publisher, case_id, query_text, user_id, stream))
+        publisher.finish(status="COMPLETED", text=full_response, sender="AI")
     except Exception as e:
         logger.error(f"Celery task failed during RAG pipeline for user {user_id} in case {case_id}: {e}", exc_info=True)
-        broadcast_payload = {
-            "case_id": case_id,
-            "type": "chat_message_out",
-            "text": "Ndodhi një gabim gjatë përpunimit të pyetjes suaj. Ju lutem provoni përsëri.",
-            "sender": "AI",
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-        }
-
-    try:
-        with httpx.Client() as client:
-            response = client.post(BROADCAST_ENDPOINT, json=broadcast_payload)
-            response.raise_for_status() 
-        
-        logger.info(f"Celery task successfully triggered broadcast for user {user_id} in case {case_id}")
+        publisher.finish(status="FAILED", text=ERROR_TEXT, sender="AI")
+        return
 
-    except httpx.HTTPStatusError as e:
-        logger.error(f"Celery task failed to broadcast chat response via HTTP. Status: {e.response.status_code}, Response: {e.response.text}",
-                     extra={"payload": broadcast_payload})
-    except Exception as e:
-        logger.error(f"Celery task failed during HTTP broadcast of chat message: {e}", exc_info=True)
\ No newline at end of file
+    logger.info(f"Chat answer for user {user_id} in case {case_id} published in {publisher.frames_published} frames")
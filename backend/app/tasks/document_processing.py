@@ -1,128 +1,72 @@
 # FILE: backend/app/tasks/document_processing.py
-# PHOENIX PROTOCOL - JURISTI HYDRA WORKER V3.0
-# 1. BRIDGE: Integrated asyncio.run to call the refactored Hydra Orchestrator (V14.0).
-# 2. DE-DUPLICATION: Removed redundant graph ingestion (now handled in parallel by the service).
-# 3. STATUS: Optimized for high-speed parallel document processing.
+# PHOENIX PROTOCOL - JURISTI HYDRA WORKER V4.0 (CHECKPOINTED PIPELINE)
+# 1. process_document_task now only (re)starts the staged pipeline in services/document_pipeline.py.
+# 2. run_document_stage executes ONE stage per message, on the stage's queue; a retry repeats only that stage.
+# 3. reap_stale_document_pipelines (celery beat) requeues documents whose heartbeat stopped.
 
-import asyncio
 import structlog
-import time
-import json
 from celery import shared_task
 from bson import ObjectId
-from typing import Optional, Dict
-from redis import Redis 
-from pymongo.database import Database
 
-# Import connection functions for Lazy Init
-from app.core.db import db_instance as global_db, redis_sync_client as global_redis, connect_to_mongo, connect_to_redis
-from app.core.config import settings 
-from app.services import document_processing_service
+from app.core.worker_context import ContextTask
+from app.services import document_pipeline
 from app.services.document_processing_service import DocumentNotFoundInDBError
-from app.models.document import DocumentStatus
 
 logger = structlog.get_logger(__name__)
 
-def get_redis_safe() -> Redis:
-    """Ensure we have a valid Redis connection."""
-    if global_redis is not None:
-        return global_redis
-    return connect_to_redis()
-
-def get_db_safe() -> Database:
-    """Ensure we have a valid MongoDB connection."""
-    if global_db is not None:
-        return global_db
-    _, db = connect_to_mongo()
-    return db
-
-def publish_sse_update(document_id: str, status: str, error: Optional[str] = None):
-    """
-    Helper to publish status updates to Redis for SSE.
-    """
-    redis_client = None
-    try:
-        redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
-        db = get_db_safe()
-        
-        doc = db.documents.find_one({"_id": ObjectId(document_id)})
-        if not doc:
-            logger.warning("sse.doc_not_found", document_id=document_id)
-            return
-        
-        user_id = str(doc.get("owner_id") or doc.get("user_id"))
-
-        payload = {
-            "type": "DOCUMENT_STATUS",
-            "document_id": document_id,
-            "status": status,
-            "error": error
-        }
-        
-        channel = f"user:{user_id}:updates"
-        redis_client.publish(channel, json.dumps(payload))
-        logger.info(f"🚀 SSE PUBLISHED: {channel} -> {status}")
-        
-    except Exception as e:
-        logger.error("sse.publish_failed", error=str(e))
-    finally:
-        if redis_client:
-            redis_client.close()
 
 @shared_task(
     bind=True,
+    base=ContextTask,
     name='process_document_task',
     autoretry_for=(DocumentNotFoundInDBError,),
     retry_kwargs={'max_retries': 5, 'countdown': 10},
     default_retry_delay=10
 )
-def process_document_task(self, document_id_str: str):
+def process_document_task(self: ContextTask, document_id_str: str):
     log = logger.bind(document_id=document_id_str, task_id=self.request.id)
     log.info("task.received", attempt=self.request.retries)
 
-    # Initial delay for DB consistency on first attempt
-    if self.request.retries == 0:
-        time.sleep(1) 
+    if self.ctx.db.documents.count_documents({"_id": ObjectId(document_id_str)}, limit=1) == 0:
+        # The upload request may not have committed the record yet
+        raise DocumentNotFoundInDBError(document_id_str)
 
-    try:
-        db = get_db_safe()
-        redis_client = get_redis_safe()
-    except Exception as e:
-        log.critical("task.connection_failure", error=str(e))
-        raise e
+    if not document_pipeline.start(self.ctx.db, document_id_str):
+        log.error("task.pipeline_start_failed")
+        return
+    log.info("task.pipeline_started")
+
+
+@shared_task(
+    bind=True,
+    base=ContextTask,
+    name='run_document_stage',
+    max_retries=document_pipeline.STAGE_MAX_RETRIES,
+    soft_time_limit=document_pipeline.STAGE_SOFT_TIME_LIMIT,
+    time_limit=document_pipeline.STAGE_TIME_LIMIT,
+)
+def run_document_stage(self: ContextTask, document_id_str: str, stage: str):
+    log = logger.bind(document_id=document_id_str, stage=stage, task_id=self.request.id, attempt=self.request.retries)
+    db, redis_client = self.ctx.db, self.ctx.redis
 
     try:
-        log.info("task.hydra_orchestration_started")
-        
-        # PHOENIX BRIDGE: Running the Async Hydra Orchestrator inside the Sync Celery Task
-        # Note: orchestrate_document_processing_mongo (V14.0) now handles 
-        # Embeddings, Summary, Deadlines, Graph, and Storage in parallel.
-        asyncio.run(
-            document_processing_service.orchestrate_document_processing_mongo(
-                db=db,
-                redis_client=redis_client, 
-                document_id_str=document_id_str
-            )
-        )
+        following = document_pipeline.run_stage(db, redis_client, document_id_str, stage, owner=self.request.id)
+        log.info("task.stage.done", next_stage=following)
+    except document_pipeline.StageBusy:
+        log.info("task.stage.busy_skipped")
+        return
+    except Exception as e:
+        final = self.request.retries >= self.max_retries
+        log.warning("task.stage.failed", error=str(e), final=final)
+        following = document_pipeline.record_stage_failure(db, redis_client, document_id_str, stage, str(e), final=final)
+        if not final:
+            raise self.retry(exc=e, countdown=document_pipeline.retry_delay(self.request.retries))
 
-        log.info("task.completed.success")
-        # Status update is handled inside finalize_document_processing, 
-        # but we send a final SSE trigger here for UI refreshment.
-        publish_sse_update(document_id_str, DocumentStatus.READY)
+    if following:
+        document_pipeline.enqueue_stage(document_id_str, following)
 
-    except DocumentNotFoundInDBError as e:
-        log.warning("task.retrying.doc_not_found", error=str(e))
-        raise self.retry(exc=e)
 
-    except Exception as e:
-        log.error("task.failed.generic", error=str(e), exc_info=True)
-        try:
-            db_safe = get_db_safe()
-            db_safe.documents.update_one(
-                {"_id": ObjectId(document_id_str)},
-                {"$set": {"status": DocumentStatus.FAILED, "error_message": str(e)}}
-            )
-            publish_sse_update(document_id_str, DocumentStatus.FAILED, str(e))
-        except Exception as db_fail_e:
-             log.critical("task.CRITICAL_DB_FAILURE_ON_FAIL", error=str(db_fail_e))
-        raise e
\ No newline at end of file
+@shared_task(bind=True, base=ContextTask, name='reap_stale_document_pipelines', ignore_result=True)
+def reap_stale_document_pipelines(self: ContextTask):
+    stats = document_pipeline.reap_stale_pipelines(self.ctx.db, self.ctx.redis)
+    logger.info("task.pipeline_reaper.done", **stats)
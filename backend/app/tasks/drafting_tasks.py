@@ -1,27 +1,31 @@
 # FILE: backend/app/tasks/drafting_tasks.py
-# PHOENIX PROTOCOL - DRAFTING TASK (AGENTIC) V2.1 (TYPE FIX)
+# PHOENIX PROTOCOL - DRAFTING TASK (AGENTIC) V3.0 (REDIS PUB/SUB DELIVERY)
 # 1. FIX: Resolved 'self.request.id' attribute access error for Pylance.
-# 2. STATUS: Type-safe and production-ready.
+# 2. FIX: get_db() is not a generator; the DB now comes from the per-process WorkerContext.
+# 3. FIX: drafting_service.generate_draft no longer exists; the job consumes stream_draft_generator.
+# 4. STREAMING: the draft is published in coalesced 'draft_stream_chunk' frames on user:{id}:updates,
+#    followed by 'draft_stream_end' once the result is stored.
 
 import logging
 import asyncio
 from datetime import datetime, timezone
-from celery import shared_task, Task
+from celery import shared_task
 
-# Use a generic way to get the DB instance inside a Celery task
-from app.core.db import get_db
+from app.core.worker_context import ContextTask
 from app.services import drafting_service
+from app.services.realtime_publisher import TokenStreamPublisher
 
 logger = logging.getLogger(__name__)
 
-@shared_task(name="process_drafting_job", bind=True)
+@shared_task(name="process_drafting_job", bind=True, base=ContextTask)
 def process_drafting_job(
-    self: Task, # Explicitly type 'self' as a Celery Task
+    self: ContextTask, # Explicitly type 'self' as a Celery Task
     case_id: str,
     user_id: str,
     draft_type: str,
     user_prompt: str,
-    use_library: bool 
+    use_library: bool,
+    stream: bool = True
 ):
     """
     Celery task to run the agentic drafting service in the background.
@@ -34,19 +38,24 @@ def process_drafting_job(
 
     logger.info(f"[JOB:{job_id}] Starting AGENTIC drafting job for user {user_id}.")
     
-    # Get a DB instance from the generator
-    db_gen = get_db()
-    db = next(db_gen)
+    db = self.ctx.db
+    publisher = TokenStreamPublisher(self.ctx.redis, user_id, job_id, kind="draft_stream", case_id=case_id)
 
-    try:
-        # Run the async service function using asyncio.run
-        final_draft = asyncio.run(drafting_service.generate_draft(
+    async def _generate() -> str:
+        tokens = drafting_service.stream_draft_generator(
             db=db,
             user_id=user_id,
             case_id=case_id,
             draft_type=draft_type,
             user_prompt=user_prompt
-        ))
+        )
+        if stream:
+            return await publisher.pump(tokens)
+        return "".join([token async for token in tokens])
+
+    try:
+        # Run the async service generator using asyncio.run
+        final_draft = asyncio.run(_generate())
 
         # Save the result to the database
         db.drafting_results.update_one(
@@ -62,6 +71,7 @@ def process_drafting_job(
             },
             upsert=True
         )
+        publisher.finish(status="COMPLETED", text=final_draft, job_id=job_id)
         logger.info(f"✅ AGENTIC drafting job {job_id} completed successfully.")
         return "Drafting completed successfully."
 
@@ -80,5 +90,6 @@ def process_drafting_job(
             },
             upsert=True
         )
+        publisher.finish(status="FAILED", text="", job_id=job_id, error=str(e))
         # Re-raise the exception so Celery marks the task as FAILED
         raise
\ No newline at end of file
@@ -0,0 +1,17 @@
+# FILE: backend/app/tasks/email_tasks.py
+# PHOENIX PROTOCOL - EMAIL OUTBOX TASK V1.0
+# Drains the 'outbox' collection in batches. Concurrent runs are safe: messages are claimed atomically.
+
+from celery import shared_task
+import structlog
+
+from app.core.worker_context import ContextTask
+from app.services import email_outbox
+
+logger = structlog.get_logger(__name__)
+
+
+@shared_task(bind=True, base=ContextTask, name="send_outbox_batch", ignore_result=True)
+def send_outbox_batch(self: ContextTask):
+    stats = email_outbox.process_batch(self.ctx.db)
+    logger.info("task.email_outbox.batch_done", **stats)
@@ -0,0 +1,59 @@
+# FILE: backend/scripts/backfill_document_pages.py
+# PHOENIX PROTOCOL - DOCUMENT TEXT STORE BACKFILL
+#
+# Usage:
+#   python scripts/backfill_document_pages.py [--dry-run] [--limit N]
+#
+# Documents processed before the paged text store only have the 15 000-char inline head plus the
+# processed text in object storage. The reader backfills them lazily on first read; this script does
+# it up front so graph rebuilds and deadline extraction never pay the download on the request path.
+
+import os
+import sys
+import argparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except ImportError:
+    pass
+
+from app.core.db import get_db_instance
+from app.services import document_text_service
+from app.services.document_text_service import DocumentTextReader
+
+
+def backfill(db, dry_run: bool, limit: int):
+    legacy_filter = {"text_index": {"$exists": False}, "processed_text_storage_key": {"$ne": None}}
+    pending = db.documents.count_documents(legacy_filter)
+    print(f"🔎 Documents without a paged text index: {pending}")
+    if dry_run or not pending:
+        return
+
+    document_text_service.ensure_indexes(db)
+    cursor = db.documents.find(legacy_filter, {"extracted_text": 1, "processed_text_storage_key": 1})
+    if limit:
+        cursor = cursor.limit(limit)
+
+    stored = skipped = 0
+    for document in cursor:
+        reader = DocumentTextReader(db, document)
+        length = len(reader)  # Triggers the download + store_document_text
+        if reader._index is not None:
+            stored += 1
+        else:
+            skipped += 1
+            print(f"⚠️  {document['_id']}: processed text unavailable, kept inline head ({length} chars)")
+    print(f"✅ Stored {stored} documents in document_pages, {skipped} skipped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill document_pages for legacy documents")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--limit", type=int, default=0)
+    args = parser.parse_args()
+    backfill(get_db_instance(), args.dry_run, args.limit)
@@ -0,0 +1,55 @@
+# FILE: backend/scripts/backfill_public_events.py
+# PHOENIX PROTOCOL - PUBLIC EVENT FLAG BACKFILL
+#
+# Usage:
+#   python scripts/backfill_public_events.py [--dry-run]
+#
+# The client portal now filters calendar events on the indexed 'is_public' flag instead of a
+# regex over notes/description. This sets the flag on legacy events still marked [CLIENT_VISIBLE]
+# and clears every cached portal snapshot so the next visit rebuilds from the flag.
+
+import os
+import sys
+import argparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except ImportError:
+    pass
+
+from app.core.db import get_db_instance
+from app.services import public_portal_service
+from app.services.calendar_service import CLIENT_VISIBLE_MARKER
+
+
+def backfill(db, dry_run: bool):
+    legacy_filter = {
+        "is_public": {"$ne": True},
+        "$or": [
+            {"notes": {"$regex": CLIENT_VISIBLE_MARKER, "$options": "i"}},
+            {"description": {"$regex": CLIENT_VISIBLE_MARKER, "$options": "i"}},
+        ],
+    }
+    pending = db.calendar_events.count_documents(legacy_filter)
+    print(f"🔎 Events marked {CLIENT_VISIBLE_MARKER} without is_public: {pending}")
+    if dry_run or not pending:
+        return
+
+    result = db.calendar_events.update_many(legacy_filter, {"$set": {"is_public": True}})
+    print(f"✅ Flagged {result.modified_count} events as public")
+
+    public_portal_service.ensure_indexes(db)
+    cleared = db[public_portal_service.SNAPSHOT_COLLECTION].delete_many({})
+    print(f"🧹 Cleared {cleared.deleted_count} portal snapshots")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill is_public on client-visible calendar events")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    backfill(get_db_instance(), args.dry_run)
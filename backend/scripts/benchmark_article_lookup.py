@@ -0,0 +1,98 @@
+# FILE: backend/scripts/benchmark_article_lookup.py
+# PHOENIX PROTOCOL - ARTICLE FETCH LATENCY BENCHMARK (REGEX SCAN vs ARTICLE INDEX)
+#
+# Usage:
+#   python scripts/benchmark_article_lookup.py --backfill            # stamp chunks ingested before the article key
+#   python scripts/benchmark_article_lookup.py [--samples 200] [--seed 7]
+#
+# Samples (law, article) pairs from the article map and fetches each one twice:
+#   1. regex:  the previous path (title words as case-insensitive $regex, then article_number variants)
+#   2. index:  article_index_service.lookup (in-memory resolve + one _id fetch)
+# and reports p50/p95/max latency and how often both paths returned the same first chunk.
+
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except ImportError:
+    pass
+
+from app.core.db import get_db_instance
+from app.services import article_index_service
+
+STOP_WORDS = {"ligji", "kodi", "për", "per", "dhe", "i", "e", "të", "te", "së", "se", "nr", "nr.", "republikës", "republikes", "kosovës", "kosoves"}
+
+
+def regex_fetch(db, law_title: str, article: str):
+    words = [re.escape(w) for w in re.findall(r'\w+', law_title) if len(w) >= 3 and w.lower() not in STOP_WORDS]
+    conditions = [{"$or": [{"law_title": {"$regex": w, "$options": "i"}}, {"source": {"$regex": w, "$options": "i"}}]} for w in words]
+    candidates = list(db.legal_knowledge_base.find({"$and": conditions} if conditions else {}, {"law_title": 1}).limit(100))
+    if not candidates:
+        return []
+    variants = [article, f"{article}.", f"Neni {article}", f"NENI {article}", f"{article} ", f" {article}"]
+    if article.isdigit():
+        variants.append(int(article))
+    return list(db.legal_knowledge_base.find({
+        "law_title": candidates[0].get("law_title"), "article_number": {"$in": variants}
+    }).sort("chunk_index", 1))
+
+
+def index_fetch(db, law_title: str, article: str):
+    hit = article_index_service.lookup(db, law_title, article)
+    return hit["docs"] if hit else []
+
+
+def _stats(values):
+    ordered = sorted(values)
+    pick = lambda pct: ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+    return f"p50 {pick(50):7.2f} ms   p95 {pick(95):7.2f} ms   max {ordered[-1]:7.2f} ms"
+
+
+def benchmark(db, samples: int, seed: int):
+    amap = article_index_service.article_map(db)
+    if not amap.articles:
+        print("⚠️ No stamped statute chunks. Run with --backfill (or re-run scripts/ingest_statutes.py) first.")
+        return
+    pairs = sorted(amap.articles)
+    random.Random(seed).shuffle(pairs)
+    pairs = pairs[:samples]
+
+    timings = {"regex": [], "index": []}
+    agree = 0
+    for law_id, article in pairs:
+        title = amap.laws[law_id]["law_title"] or law_id
+        results = {}
+        for name, fetch in (("regex", regex_fetch), ("index", index_fetch)):
+            started = time.perf_counter()
+            results[name] = fetch(db, title, article)
+            timings[name].append((time.perf_counter() - started) * 1000)
+        if results["regex"] and results["index"] and results["regex"][0]["_id"] == results["index"][0]["_id"]:
+            agree += 1
+
+    print(f"\n{len(pairs)} article fetches over {len(amap.laws)} laws ({len(amap.articles)} indexed articles)")
+    for name, values in timings.items():
+        print(f"   {name:<6} {_stats(values)}")
+    print(f"   same first chunk: {agree}/{len(pairs)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Article fetch latency: regex scan vs article index")
+    parser.add_argument("--backfill", action="store_true", help="Stamp (law_id, article_key, part) on existing statute chunks")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    db = get_db_instance()
+    if args.backfill:
+        print(f"✅ {article_index_service.backfill(db)} chunks stamped")
+    benchmark(db, args.samples, args.seed)
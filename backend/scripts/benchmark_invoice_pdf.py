@@ -0,0 +1,69 @@
+# FILE: backend/scripts/benchmark_invoice_pdf.py
+# PHOENIX PROTOCOL - INVOICE PDF THROUGHPUT BENCHMARK (COLD vs CACHED BRANDING)
+#
+# Usage:
+#   python scripts/benchmark_invoice_pdf.py --user-id <id> [--invoice-id <id>] [--n 50]
+#
+# "cold" clears the branding cache before every PDF, which reproduces the old per-PDF cost
+# (profile lookup + logo download + PIL re-encode). "cached" renders with a warm cache.
+
+import os
+import sys
+import time
+import argparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except ImportError:
+    pass
+
+from bson import ObjectId
+
+from app.core.db import get_db_instance
+from app.models.finance import InvoiceInDB
+from app.services.report_service import generate_invoice_pdf
+from app.services.report_service import branding
+
+
+def _load_invoice(db, user_id: str, invoice_id: str = None) -> InvoiceInDB:
+    query = {"_id": ObjectId(invoice_id)} if invoice_id else {"user_id": ObjectId(user_id)}
+    doc = db.invoices.find_one(query, sort=[("created_at", -1)])
+    if not doc:
+        print("❌ No invoice found for this user.")
+        sys.exit(1)
+    return InvoiceInDB(**doc)
+
+
+def _run(db, invoice: InvoiceInDB, user_id: str, n: int, cold: bool) -> float:
+    started = time.perf_counter()
+    size = 0
+    for _ in range(n):
+        if cold:
+            branding.invalidate()
+        size = len(generate_invoice_pdf(invoice, db, user_id).getvalue())
+    elapsed = time.perf_counter() - started
+    print(f"{'cold  ' if cold else 'cached'}: {n / elapsed:6.1f} PDFs/s  ({elapsed * 1000 / n:.1f} ms/PDF, {size / 1024:.0f} KB)")
+    return n / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Invoice PDF throughput with and without the branding cache")
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--invoice-id")
+    parser.add_argument("--n", type=int, default=50)
+    args = parser.parse_args()
+
+    database = get_db_instance()
+    inv = _load_invoice(database, args.user_id, args.invoice_id)
+
+    print("\n================ INVOICE PDF BENCHMARK ================")
+    cold_rate = _run(database, inv, args.user_id, args.n, cold=True)
+    generate_invoice_pdf(inv, database, args.user_id)  # warm up
+    cached_rate = _run(database, inv, args.user_id, args.n, cold=False)
+    print(f"speed-up: x{cached_rate / cold_rate:.2f}")
+    print("=======================================================\n")
@@ -0,0 +1,153 @@
+# FILE: backend/scripts/benchmark_law_retrieval.py
+# PHOENIX PROTOCOL - OFFLINE LAW RETRIEVAL BENCHMARK (VECTOR vs LEXICAL vs HYBRID RRF)
+#
+# Usage:
+#   python scripts/benchmark_law_retrieval.py [--queries scripts/benchmarks/law_retrieval_queries.json] [--k 10] [--json out.json]
+#
+# For every labelled query the same embedding is fed to three retrievers over legal_knowledge_base:
+#   1. vector:  $vectorSearch only (the old global search)
+#   2. lexical: the BM25 index (scripts/build_lexical_index.py) plus the exact-article leg
+#   3. hybrid:  vector_store_service.query_global_knowledge_base (RRF fusion, cache disabled)
+# and reports recall@1/5/k (share of queries with a relevant chunk in the top results), MRR and latency.
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except ImportError:
+    pass
+
+from bson import ObjectId
+
+from app.core.db import get_db_instance
+from app.services import embedding_service, lexical_index_service, vector_store_service
+
+DEFAULT_QUERIES = os.path.join(SCRIPT_DIR, "benchmarks", "law_retrieval_queries.json")
+MODES = ("vector", "lexical", "hybrid")
+
+
+def run_vector(db, query: str, vector, k: int):
+    return [str(d["_id"]) for d in db.legal_knowledge_base.aggregate(vector_store_service._global_vector_pipeline(vector, k))]
+
+
+def run_lexical(db, query: str, vector, k: int):
+    legs = vector_store_service._lexical_legs(query, k) or {}
+    return [doc_id for doc_id, _ in vector_store_service._fuse([], legs, vector_store_service._query_article(query), k)]
+
+
+def run_hybrid(db, query: str, vector, k: int):
+    hits = vector_store_service.query_global_knowledge_base(query, n_results=k, vector=vector, use_cache=False)
+    return [h["chunk_id"] for h in hits]
+
+
+RUNNERS = {"vector": run_vector, "lexical": run_lexical, "hybrid": run_hybrid}
+
+
+class Judge:
+    """Resolves chunk ids to (source, law_title, article) once and checks them against a label."""
+
+    def __init__(self, db):
+        self.db = db
+        self.meta = {}
+
+    def load(self, ids):
+        missing = [i for i in ids if i not in self.meta]
+        if not missing:
+            return
+        oids = [ObjectId(i) if ObjectId.is_valid(i) else i for i in missing]
+        for doc in self.db.legal_knowledge_base.find({"_id": {"$in": oids}}, {"source": 1, "law_title": 1, "article_number": 1}):
+            self.meta[str(doc["_id"])] = doc
+
+    def relevant(self, doc_id: str, label) -> bool:
+        doc = self.meta.get(doc_id)
+        if not doc:
+            return False
+        # '03/L-006' / '2004/32' / 'Qasjen-në-Drejtësi' against 'LIGJI_NR._03_L-006...' or 'Ligji Nr. 2004 32 ...'
+        if not any(_alnum(label["law"]) in _alnum(doc.get(field, "")) for field in ("source", "law_title")):
+            return False
+        if label.get("article"):
+            return lexical_index_service.article_token(doc.get("article_number")) == lexical_index_service.article_token(label["article"])
+        return True
+
+
+def _alnum(text: str) -> str:
+    return re.sub(r'[^a-z0-9]', '', lexical_index_service.fold(text or ""))
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def benchmark(db, labels, k: int):
+    judge = Judge(db)
+    per_mode = {mode: {"ranks": [], "ms": []} for mode in MODES}
+    embed_ms = []
+
+    for label in labels:
+        started = time.perf_counter()
+        vector = embedding_service.generate_embedding(label["query"])
+        embed_ms.append((time.perf_counter() - started) * 1000)
+
+        for mode in MODES:
+            started = time.perf_counter()
+            try:
+                ids = RUNNERS[mode](db, label["query"], vector, k)
+            except Exception as e:
+                print(f"   ⚠️ {mode} failed for '{label['query']}': {e}")
+                ids = []
+            per_mode[mode]["ms"].append((time.perf_counter() - started) * 1000)
+            judge.load(ids)
+            rank = next((pos for pos, doc_id in enumerate(ids, 1) if judge.relevant(doc_id, label)), None)
+            per_mode[mode]["ranks"].append(rank)
+
+    report = {"queries": len(labels), "k": k, "embedding_ms_p50": round(_percentile(embed_ms, 50), 1), "modes": {}}
+    for mode, data in per_mode.items():
+        ranks = data["ranks"]
+        report["modes"][mode] = {
+            "recall@1": round(sum(1 for r in ranks if r and r <= 1) / len(ranks), 3),
+            "recall@5": round(sum(1 for r in ranks if r and r <= 5) / len(ranks), 3),
+            f"recall@{k}": round(sum(1 for r in ranks if r) / len(ranks), 3),
+            "mrr": round(statistics.mean(1 / r if r else 0 for r in ranks), 3),
+            "p50_ms": round(_percentile(data["ms"], 50), 1),
+            "p95_ms": round(_percentile(data["ms"], 95), 1),
+            "misses": [labels[i]["query"] for i, r in enumerate(ranks) if not r],
+        }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall/latency benchmark for global law search")
+    parser.add_argument("--queries", default=DEFAULT_QUERIES)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--json", default=None, help="Also write the full report to this file")
+    args = parser.parse_args()
+
+    with open(args.queries, "r", encoding="utf-8") as f:
+        labels = json.load(f)["queries"]
+    if lexical_index_service.get_index() is None:
+        print("⚠️ No lexical index found; run scripts/build_lexical_index.py first (lexical leg will be empty)")
+
+    report = benchmark(get_db_instance(), labels, args.k)
+    print(f"\n{report['queries']} queries, k={report['k']}, embedding p50 {report['embedding_ms_p50']} ms (excluded below)")
+    print(f"{'mode':<9}{'R@1':>7}{'R@5':>7}{'R@' + str(args.k):>7}{'MRR':>7}{'p50 ms':>9}{'p95 ms':>9}")
+    for mode, row in report["modes"].items():
+        print(f"{mode:<9}{row['recall@1']:>7}{row['recall@5']:>7}{row[f'recall@{args.k}']:>7}{row['mrr']:>7}{row['p50_ms']:>9}{row['p95_ms']:>9}")
+    for mode, row in report["modes"].items():
+        for query in row["misses"]:
+            print(f"   miss [{mode}] {query}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
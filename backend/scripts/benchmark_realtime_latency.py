@@ -0,0 +1,98 @@
+# FILE: backend/scripts/benchmark_realtime_latency.py
+# PHOENIX PROTOCOL - REALTIME DELIVERY LATENCY BENCHMARK (WORKER -> REDIS -> SSE)
+#
+# Usage:
+#   REDIS_URL=redis://localhost:6379/0 python scripts/benchmark_realtime_latency.py [--tokens 2000] [--rate 200]
+#
+# A fake "worker" thread pushes tokens through TokenStreamPublisher at --rate tokens/s while the real
+# SSE generator (api/endpoints/stream.event_generator) consumes the channel. Reports per-token delivery
+# latency (push -> SSE frame) and the number of PUBLISH calls, coalesced vs one frame per token.
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import threading
+import statistics
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except ImportError:
+    pass
+
+import redis
+
+from app.core.config import settings
+from app.api.endpoints.stream import event_generator
+from app.services.realtime_publisher import TokenStreamPublisher, user_channel
+
+
+def _worker(publisher: TokenStreamPublisher, n_tokens: int, rate: float, push_times: dict) -> None:
+    gap = 1.0 / rate if rate > 0 else 0.0
+    for i in range(n_tokens):
+        push_times[i] = time.perf_counter()
+        publisher.push(f"t{i} ")
+        if gap:
+            time.sleep(gap)
+    publisher.finish(status="COMPLETED")
+
+
+async def _run(label: str, n_tokens: int, rate: float, flush_interval: float, max_frame_chars: int) -> None:
+    user_id = f"bench-{uuid.uuid4().hex[:8]}"
+    publisher = TokenStreamPublisher(
+        redis.from_url(settings.REDIS_URL, decode_responses=True), user_id, uuid.uuid4().hex, kind="chat_stream",
+        flush_interval=flush_interval, max_frame_chars=max_frame_chars
+    )
+    push_times: dict = {}
+    latencies = []
+    frames = 0
+    started = None
+
+    sse = event_generator(user_channel(user_id), user_id=user_id, send_connected_event=True)
+    await sse.__anext__()  # subscribed
+    worker = threading.Thread(target=_worker, args=(publisher, n_tokens, rate, push_times), daemon=True)
+
+    try:
+        async for raw in sse:
+            if started is None:
+                started = time.perf_counter()
+                worker.start()
+            if not raw.startswith("event: update"):
+                continue
+            received = time.perf_counter()
+            frame = json.loads(raw.split("data: ", 1)[1])
+            frames += 1
+            if frame["type"].endswith("_end"):
+                break
+            for token in frame["delta"].split():
+                latencies.append((received - push_times[int(token[1:])]) * 1000)
+    finally:
+        await sse.aclose()
+        worker.join(timeout=5)
+
+    total = time.perf_counter() - started
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(f"{label:<10} frames={frames:<5} total={total:6.2f}s  "
+          f"latency p50={statistics.median(latencies):6.1f}ms p95={p95:6.1f}ms max={latencies[-1]:6.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker -> Redis -> SSE delivery latency")
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=200.0, help="Simulated LLM tokens per second (0 = as fast as possible)")
+    args = parser.parse_args()
+
+    print("\n================ REALTIME DELIVERY BENCHMARK ================")
+    print(f"redis: {settings.REDIS_URL}  tokens: {args.tokens}  rate: {args.rate}/s")
+    asyncio.run(_run("per-token", args.tokens, args.rate, flush_interval=0.0, max_frame_chars=1))
+    asyncio.run(_run("coalesced", args.tokens, args.rate, flush_interval=0.05, max_frame_chars=512))
+    print("=============================================================\n")
@@ -0,0 +1,122 @@
+# FILE: backend/scripts/benchmark_vector_recall.py
+# PHOENIX PROTOCOL - OFFLINE VECTOR RECALL BENCHMARK (CASE-SCOPED $vectorSearch vs NUMPY BRUTE FORCE)
+#
+# Usage:
+#   python scripts/benchmark_vector_recall.py --apply-index
+#   python scripts/benchmark_vector_recall.py --user-id <id> --case-id <id> [--queries 50] [--k 16]
+#
+# For each sampled query (an existing chunk embedding with small noise) it compares:
+#   1. legacy:  owner_id-only pre-filter, numCandidates=100, case restriction applied afterwards
+#   2. scoped:  owner_id + case_id pre-filter with adaptive numCandidates / exact search
+# against an exact cosine top-k computed with NumPy over every chunk of the case.
+
+import os
+import sys
+import json
+import time
+import argparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except ImportError:
+    pass
+
+import numpy as np
+
+from app.core.db import get_db_instance
+from app.services import vector_store_service
+
+INDEX_FILE = os.path.join(SCRIPT_DIR, "atlas", "user_vectors_vector_index.json")
+
+
+def apply_index(db):
+    from pymongo.operations import SearchIndexModel
+
+    with open(INDEX_FILE, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    coll = db[spec["collection"]]
+    existing = {idx["name"] for idx in coll.list_search_indexes()}
+    if spec["name"] in existing:
+        coll.update_search_index(spec["name"], spec["definition"])
+        print(f"🔁 Updated search index '{spec['name']}' on {spec['collection']}")
+    else:
+        coll.create_search_index(SearchIndexModel(definition=spec["definition"], name=spec["name"], type=spec["type"]))
+        print(f"✅ Created search index '{spec['name']}' on {spec['collection']}")
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def benchmark(db, user_id: str, case_id: str, n_queries: int, k: int, seed: int):
+    coll = db["user_vectors"]
+    scope = vector_store_service._case_vector_filter(user_id, case_id)
+    chunks = list(coll.find(scope, {"_id": 1, "embedding": 1}))
+    chunks = [c for c in chunks if c.get("embedding")]
+    if len(chunks) < k:
+        print(f"❌ Case has only {len(chunks)} embedded chunks; need at least k={k}.")
+        return
+
+    ids = [str(c["_id"]) for c in chunks]
+    matrix = _normalize(np.array([c["embedding"] for c in chunks], dtype=np.float32))
+    rng = np.random.default_rng(seed)
+    sample = rng.choice(len(chunks), size=min(n_queries, len(chunks)), replace=False)
+
+    owner_only = {"owner_id": user_id}
+    legacy_recalls, scoped_recalls = [], []
+    legacy_ms, scoped_ms = [], []
+
+    for i in sample:
+        query = matrix[i] + rng.normal(0, 0.02, matrix.shape[1]).astype(np.float32)
+        query = query / np.linalg.norm(query)
+        truth = {ids[j] for j in np.argsort(-(matrix @ query))[:k]}
+        qv = query.tolist()
+
+        started = time.perf_counter()
+        legacy_pipeline = [
+            {"$vectorSearch": {"index": "vector_index", "path": "embedding", "queryVector": qv,
+                               "numCandidates": 100, "limit": k, "filter": owner_only}},
+            {"$project": {"_id": 1, "case_id": 1}},
+        ]
+        legacy = [r for r in coll.aggregate(legacy_pipeline) if str(r.get("case_id")) == str(case_id)]
+        legacy_ms.append((time.perf_counter() - started) * 1000)
+        legacy_recalls.append(len({str(r["_id"]) for r in legacy} & truth) / k)
+
+        started = time.perf_counter()
+        scoped_pipeline = vector_store_service._case_vector_pipeline(qv, scope, k, case_size=len(chunks))
+        scoped = list(coll.aggregate(scoped_pipeline + [{"$project": {"_id": 1}}]))
+        scoped_ms.append((time.perf_counter() - started) * 1000)
+        scoped_recalls.append(len({str(r["_id"]) for r in scoped} & truth) / k)
+
+    print("\n================ VECTOR RECALL BENCHMARK ================")
+    print(f"Case {case_id}: {len(chunks)} chunks | queries: {len(sample)} | k={k}")
+    print(f"Scoped search params: {vector_store_service._search_params(len(chunks), k)}")
+    print(f"legacy (owner filter, post-filter case): recall@{k}={np.mean(legacy_recalls):.3f}  p50={np.median(legacy_ms):.1f} ms")
+    print(f"scoped (case pre-filter, adaptive):      recall@{k}={np.mean(scoped_recalls):.3f}  p50={np.median(scoped_ms):.1f} ms")
+    print("=========================================================\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Case-scoped vector search recall benchmark")
+    parser.add_argument("--apply-index", action="store_true", help="Create/update the Atlas vector index from scripts/atlas")
+    parser.add_argument("--user-id")
+    parser.add_argument("--case-id")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    database = get_db_instance()
+    if args.apply_index:
+        apply_index(database)
+    if args.user_id and args.case_id:
+        benchmark(database, args.user_id, args.case_id, args.queries, args.k, args.seed)
+    elif not args.apply_index:
+        parser.print_help()
@@ -0,0 +1,51 @@
+# FILE: backend/scripts/build_lexical_index.py
+# PHOENIX PROTOCOL - LEXICAL LAW INDEX BUILDER
+#
+# Usage:
+#   python scripts/build_lexical_index.py [--output PATH] [--query "ligji për procedurën përmbarimore"]
+#
+# Builds the SQLite FTS5 index over legal_knowledge_base used by the law title/article lookups
+# (app/services/lexical_index_service.py). The ingest scripts rebuild it after every run that changed
+# something; run this after manual edits to the knowledge base or on a host that never ran an ingest.
+# The file is written next to data/storage_manifest.json unless LEXICAL_INDEX_PATH or --output is set.
+
+import os
+import sys
+import time
+import argparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except ImportError:
+    pass
+
+from app.core.db import get_db_instance
+from app.services import lexical_index_service
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the lexical (BM25) index over legal_knowledge_base")
+    parser.add_argument("--output", default=None, help="Index file (default: LEXICAL_INDEX_PATH or data/lexical_index.sqlite)")
+    parser.add_argument("--query", default=None, help="Run one title and one chunk query against the new index")
+    args = parser.parse_args()
+
+    if args.output:
+        os.environ["LEXICAL_INDEX_PATH"] = args.output
+    stats = lexical_index_service.build(get_db_instance())
+    print(f"✅ {stats['chunks']} chunks / {stats['sources']} sources indexed in {stats['seconds']}s -> {stats['path']}")
+
+    if args.query:
+        index = lexical_index_service.get_index()
+        started = time.perf_counter()
+        titles = index.find_titles(args.query)
+        chunks = index.search(args.query, limit=5)
+        print(f"🔎 {(time.perf_counter() - started) * 1000:.1f} ms")
+        for hit in titles:
+            print(f"   title  {hit['score']:6.2f}  {hit['law_title']}  ({hit['source']})")
+        for hit in chunks:
+            print(f"   chunk  {hit['score']:6.2f}  {hit['law_title']}, Neni {hit['article_number']}  [{hit['chunk_id']}]")
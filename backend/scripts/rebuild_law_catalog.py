@@ -0,0 +1,29 @@
+# FILE: backend/scripts/rebuild_law_catalog.py
+# PHOENIX PROTOCOL - LAW CATALOG REBUILD
+#
+# Usage:
+#   python scripts/rebuild_law_catalog.py
+#
+# The ingest scripts keep 'law_catalog' current file by file. Run this once on an existing knowledge base,
+# after manual edits to legal_knowledge_base, or after scripts/sync_b2.py added PDFs that were never ingested.
+
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except ImportError:
+    pass
+
+from app.core.db import get_db_instance
+from app.services import law_catalog_service
+
+
+if __name__ == "__main__":
+    rows = law_catalog_service.rebuild(get_db_instance())
+    print(f"✅ law_catalog rebuilt with {rows} rows")
@@ -1,8 +1,16 @@
 # FILE: backend/scripts/sync_b2.py
-# PHOENIX PROTOCOL - INCREMENTAL B2 LAW PDF SYNC SCRIPT (STANDALONE SCRIPTS FOLDER)
+# PHOENIX PROTOCOL - INCREMENTAL B2 LAW PDF SYNC SCRIPT V2.0 (PAGINATED • CHECKSUM • PARALLEL)
+#
+# Usage:
+#   python scripts/sync_b2.py [--source data/laws] [--prefix laws/] [--delete-orphans] [--dry-run] [--concurrency 6]
+#   python scripts/sync_b2.py --source data/academic --prefix academic/
+#
+# Uploads new or changed PDFs only (size + sha256 kept in object metadata), in parallel, and writes
+# data/storage_manifest.json, which the law PDF router uses instead of listing the bucket.
 
 import os
 import sys
+import argparse
 
 # Calculate absolute paths relative to script location
 script_dir = os.path.dirname(os.path.abspath(__file__))      # backend/scripts
@@ -24,77 +32,50 @@ try:
 except ImportError:
     pass
 
-from app.services import storage_service
+from app.services import law_sync_service
 
-def upload_new_laws_only():
-    print("🚀 Connecting to Backblaze B2 Storage...")
-    s3 = storage_service.get_s3_client()
-    bucket = storage_service.B2_BUCKET_NAME
+ICONS = {"uploaded": "  ✓ Uploaded", "failed": "  ❌ Failed", "deleted": "  🗑 Deleted orphan",
+         "would_upload": "  → Would upload", "would_delete": "  → Would delete orphan"}
 
-    # Step 1: Fetch list of files already stored in Backblaze B2 under 'laws/'
-    print("🔍 Checking existing cloud files in Backblaze B2...")
-    existing_b2_files = set()
-    try:
-        response = s3.list_objects_v2(Bucket=bucket, Prefix="laws/")
-        for obj in response.get('Contents', []):
-            key = obj.get('Key', '')
-            filename = os.path.basename(key)
-            if filename:
-                existing_b2_files.add(filename)
-                existing_b2_files.add(key)
-        print(f"📦 Found {len(existing_b2_files)} existing files in Backblaze B2.")
-    except Exception as e:
-        print(f"⚠️ Warning during existing B2 inspection: {e}")
 
-    # Step 2: Locate local laws directory
+def _find_laws_dir():
     candidate_laws_dirs = [
         os.path.join(project_root, "data", "laws"),
         os.path.join(backend_dir, "data", "laws"),
         "data/laws"
     ]
-
-    laws_dir = None
     for cand in candidate_laws_dirs:
         if os.path.exists(cand):
-            laws_dir = cand
-            break
-
-    if not laws_dir:
-        print(f"❌ Could not find data/laws directory in {candidate_laws_dirs}")
-        return
+            return cand
+    print(f"❌ Could not find data/laws directory in {candidate_laws_dirs}")
+    return None
 
-    print(f"📂 Scanning local directory: {laws_dir}")
 
-    uploaded_count = 0
-    skipped_count = 0
-
-    # Step 3: Scan and upload ONLY new PDF files
-    for root, _, files in os.walk(laws_dir):
-        rel_path = os.path.relpath(root, laws_dir)
-        subfolder = '' if rel_path == '.' else rel_path.replace('\\', '/')
-
-        for f in files:
-            if f.lower().endswith('.pdf'):
-                filepath = os.path.join(root, f)
-                b2_key = f"laws/{subfolder}/{f}".replace('//', '/') if subfolder else f"laws/{f}"
+def sync_laws(source=None, prefix="laws/", delete_orphans=False, dry_run=False, concurrency=law_sync_service.UPLOAD_CONCURRENCY):
+    local_dir = source or _find_laws_dir()
+    if not local_dir or not os.path.isdir(local_dir):
+        if source:
+            print(f"❌ Source directory not found: {source}")
+        return
 
-                # Skip if file already exists in cloud
-                if f in existing_b2_files or b2_key in existing_b2_files:
-                    print(f"  ⏭ Skipped (Already in B2): {f}")
-                    skipped_count += 1
-                    continue
+    print(f"🚀 Syncing {local_dir} -> B2 '{prefix}'" + (" (dry run)" if dry_run else ""))
+    stats = law_sync_service.sync_directory(
+        local_dir, prefix, delete_orphans=delete_orphans, dry_run=dry_run, concurrency=concurrency,
+        progress=lambda action, key: print(f"{ICONS.get(action, action)}: {key}")
+    )
 
-                print(f"Uploading NEW law [{f}] -> B2 Key: '{b2_key}'...")
-                s3.upload_file(
-                    filepath,
-                    bucket,
-                    b2_key,
-                    ExtraArgs={'ContentType': 'application/pdf'}
-                )
-                print(f"  ✓ Success!")
-                uploaded_count += 1
+    print(f"\n🎉 SYNC COMPLETE! Local: {stats['local']} | Remote: {stats['remote']} | Uploaded: {stats['uploaded']} | "
+          f"Unchanged: {stats['unchanged']} | Orphans: {stats['orphans']} (deleted {stats['deleted']}) | Failed: {stats['failed']}")
+    if not dry_run:
+        print(f"📒 Manifest: {law_sync_service.manifest_path()}")
 
-    print(f"\n🎉 SYNC COMPLETE! Uploaded: {uploaded_count} new file(s) | Skipped: {skipped_count} existing file(s).")
 
 if __name__ == '__main__':
-    upload_new_laws_only()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Sync local law PDFs to Backblaze B2")
+    parser.add_argument("--source", help="Local directory (default: data/laws)")
+    parser.add_argument("--prefix", default="laws/", help="Bucket key prefix")
+    parser.add_argument("--delete-orphans", action="store_true", help="Delete bucket objects under the prefix that no longer exist locally")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=law_sync_service.UPLOAD_CONCURRENCY)
+    args = parser.parse_args()
+    sync_laws(args.source, args.prefix, args.delete_orphans, args.dry_run, args.concurrency)
@@ -0,0 +1,89 @@
+# FILE: backend/scripts/worker_smoke_test.py
+# PHOENIX PROTOCOL - CELERY WORKER SMOKE TEST
+#
+# Usage:
+#   python scripts/worker_smoke_test.py            # import every task module, check registrations
+#   python scripts/worker_smoke_test.py --connect  # also bootstrap a WorkerContext and ping Mongo/Redis
+#
+# Catches the class of bugs where a task module imports a name that does not exist and the
+# worker dies at boot (or silently never registers the task). Exit code 1 on any failure.
+
+import os
+import sys
+import argparse
+import importlib
+import traceback
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+except ImportError:
+    pass
+
+EXPECTED_TASKS = {
+    "process_document_task",
+    "run_document_stage",
+    "reap_stale_document_pipelines",
+    "extract_deadlines_from_document",
+    "process_socratic_query_task",
+    "process_drafting_job",
+    "send_outbox_batch",
+    "delete_case_task",
+    "reap_stale_case_deletions",
+}
+
+
+def check_imports() -> bool:
+    from app.celery_app import celery_app, TASK_MODULES
+    from app import celery_config
+
+    ok = True
+    for module in sorted(set(TASK_MODULES) | set(celery_config.include)):
+        try:
+            importlib.import_module(module)
+            print(f"✅ import {module}")
+        except Exception:
+            ok = False
+            print(f"❌ import {module}")
+            traceback.print_exc()
+
+    registered = {name for name in celery_app.tasks if not name.startswith("celery.")}
+    missing = EXPECTED_TASKS - registered
+    if missing:
+        ok = False
+        print(f"❌ tasks not registered: {sorted(missing)}")
+    else:
+        print(f"✅ {len(EXPECTED_TASKS)} expected tasks registered")
+    return ok
+
+
+def check_context() -> bool:
+    from app.core.worker_context import _init_worker_process, get_worker_context
+
+    try:
+        _init_worker_process()
+        ctx = get_worker_context()
+        ctx.db.command("ping")
+        ctx.redis.ping()
+        print(f"✅ worker context ready in pid {ctx.pid} (Mongo + Redis reachable)")
+        ctx.close()
+        return True
+    except Exception:
+        print("❌ worker context bootstrap failed")
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import every Celery task module and verify the worker bootstrap")
+    parser.add_argument("--connect", action="store_true", help="Also open Mongo/Redis connections through WorkerContext")
+    args = parser.parse_args()
+
+    passed = check_imports()
+    if args.connect:
+        passed = check_context() and passed
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,37 @@
+import pytest
+
+from app.services import email_outbox
+
+fakeredis = pytest.importorskip("fakeredis")
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+def test_earlier_retry_behind_a_later_one(redis_client):
+    assert email_outbox.reserve_wakeup(redis_client, NOW + 3600, NOW)
+    # A 30 s retry must not wait for the 3600 s backoff already scheduled
+    assert email_outbox.reserve_wakeup(redis_client, NOW + 30, NOW)
+    assert float(redis_client.get(email_outbox.SCHEDULE_KEY)) == NOW + 30
+
+
+def test_later_due_time_is_not_scheduled_twice(redis_client):
+    assert email_outbox.reserve_wakeup(redis_client, NOW + 30, NOW)
+    assert not email_outbox.reserve_wakeup(redis_client, NOW + 600, NOW)
+    assert not email_outbox.reserve_wakeup(redis_client, NOW + 30, NOW + 5)
+
+
+def test_leftover_batch_runs_now(redis_client):
+    # Due messages left after a full batch are due immediately, ahead of a scheduled backoff
+    assert email_outbox.reserve_wakeup(redis_client, NOW + 3600, NOW)
+    assert email_outbox.reserve_wakeup(redis_client, NOW, NOW)
+
+
+def test_reserved_time_already_due(redis_client):
+    # The scheduled batch is running; the retries it leaves behind get their own wake-up
+    assert email_outbox.reserve_wakeup(redis_client, NOW + 30, NOW)
+    assert email_outbox.reserve_wakeup(redis_client, NOW + 600, NOW + 30)
@@ -0,0 +1,42 @@
+from app.api.endpoints.laws_pkg import laws_search_service
+from app.services import lexical_index_service
+from app.services.lexical_index_service import LexicalIndex, build
+
+CHUNKS = [
+    {"_id": "c1", "source": "AKADEMIA_Case_Law.pdf", "law_title": "AKADEMIA Case Law", "category": "caselaw",
+     "article_number": "7", "chunk_index": 0, "text": "LËNDA NR. 123\nPaditësi kërkon kompensimin e dëmit."},
+    {"_id": "c2", "source": "AKADEMIA_Case_Law.pdf", "law_title": "AKADEMIA Case Law", "category": "caselaw",
+     "article_number": "8", "chunk_index": 1, "text": "LËNDA NR. 12\nGjykata e refuzon padinë."},
+]
+
+
+class FakeCursor(list):
+    def close(self):
+        pass
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def limit(self, n):
+        return FakeCursor(self[:n])
+
+
+class FakeCollection:
+    def find(self, query=None, projection=None, **kwargs):
+        ids = ((query or {}).get("_id") or {}).get("$in")
+        return FakeCursor(dict(c) for c in CHUNKS if ids is None or c["_id"] in ids)
+
+
+class FakeDb:
+    legal_knowledge_base = FakeCollection()
+
+
+def test_case_number_found_in_text(tmp_path, monkeypatch):
+    # 'LËNDA NR. 123' is only in the chunk text; its article_number is unrelated
+    path = tmp_path / "lexical_index.sqlite"
+    build(FakeDb(), path)
+    monkeypatch.setattr(lexical_index_service, "get_index", lambda: LexicalIndex(path))
+
+    docs, _, metadata = laws_search_service.find_law_documents(FakeDb(), "AKADEMIA Case Law", "123")
+    assert [d["_id"] for d in docs] == ["c1"]
+    assert metadata["strategy_used"] == "academic_case_number_match"
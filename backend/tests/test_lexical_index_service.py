@@ -0,0 +1,74 @@
+import pytest
+
+from app.services.lexical_index_service import LexicalIndex, analyze, build, fold, match_expression, stem
+
+CHUNKS = [
+    {"_id": "c1", "source": "AKADEMIA_Case_Law.pdf", "law_title": "AKADEMIA Case Law", "category": "caselaw",
+     "article_number": "1", "chunk_index": 0, "text": "LËNDA NR. 123\nPaditësi kërkon kompensimin e dëmit."},
+    {"_id": "c2", "source": "AKADEMIA_Case_Law.pdf", "law_title": "AKADEMIA Case Law", "category": "caselaw",
+     "article_number": "2", "chunk_index": 1, "text": "LËNDA 45\nGjykata e refuzon padinë si të pabazuar."},
+    {"_id": "c3", "source": "ligji_03_L_006.pdf", "law_title": "Ligji Nr. 03/L-006 për procedurën kontestimore",
+     "category": "statute", "article_number": "123", "chunk_index": 0, "text": "Neni 123 Afatet për ankesë."},
+]
+
+
+class FakeCursor(list):
+    def close(self):
+        pass
+
+
+class FakeDb:
+    class legal_knowledge_base:
+        @staticmethod
+        def find(*args, **kwargs):
+            return FakeCursor(dict(c) for c in CHUNKS)
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "lexical_index.sqlite"
+    build(FakeDb(), path)
+    return LexicalIndex(path)
+
+
+def _stem(word: str) -> str:
+    return stem(fold(word))
+
+
+@pytest.mark.parametrize("forms", [
+    ("procedura", "procedurës", "procedurë", "procedurën", "procedurat", "procedurave"),
+    ("familja", "familjes", "familje", "familjen", "familjet"),
+    ("puna", "punës", "punë", "punën"),
+    ("ligji", "ligjit", "ligjin", "ligjet", "ligjeve"),
+    ("kompania", "kompanisë", "kompaninë", "kompani", "kompanive"),
+    ("gjykata", "gjykatës", "gjykatat", "gjykatave"),
+    ("vendim", "vendimi", "vendimit", "vendimet"),
+])
+def test_nominative_and_genitive_share_a_stem(forms):
+    assert len({_stem(form) for form in forms}) == 1, {form: _stem(form) for form in forms}
+
+
+def test_short_and_numeric_tokens_are_kept():
+    assert stem("ligj") == "ligj"
+    assert stem("2004") == "2004"
+    assert stem("pun") == "pun"
+
+
+def test_title_query_matches_title_tokens():
+    title = set(analyze("Ligji për procedurën kontestimore"))
+    assert set(analyze("procedura kontestimore")) <= title
+    assert match_expression("procedura kontestimore", mode="all") == '"procedur" AND "kontestimor"'
+
+
+def test_law_code_token_stays_in_place():
+    assert analyze("Ligji Nr. 03/L-006 për", keep_stop_words=True) == ["ligj", "nr", "03l006", "03", "l", "006", "per"]
+
+
+def test_phrase_with_stop_word_matches(index):
+    assert [h["chunk_id"] for h in index.search('"lënda nr 123"')] == ["c1"]
+    assert [h["chunk_id"] for h in index.search('"lënda 45"')] == ["c2"]
+    assert index.search('"lënda nr 45"') == []
+
+
+def test_phrase_with_law_code_matches(index):
+    assert [h["source"] for h in index.find_titles('"ligji nr 03/L-006 për procedurën"')] == ["ligji_03_L_006.pdf"]
@@ -0,0 +1,36 @@
+from app.services.spreadsheet_text_service import _csv_sheets, iter_records, sniff_delimiter
+
+
+def _records(path):
+    (_, rows), = list(_csv_sheets(str(path)))
+    return list(iter_records(rows))
+
+
+def test_semicolon_csv_with_caption_and_decimal_commas(tmp_path):
+    path = tmp_path / "fatura.csv"
+    path.write_text(
+        "Raporti i shpenzimeve, janar 2024\n"
+        "Artikulli;Sasia;Çmimi\n"
+        "Letër A4;120;50,5\n"
+        "Toner;2;89,90\n",
+        encoding="utf-8",
+    )
+    assert _records(path) == [
+        (1, "Raporti i shpenzimeve, janar 2024"),
+        (3, "Artikulli: Letër A4; Sasia: 120; Çmimi: 50,5"),
+        (4, "Artikulli: Toner; Sasia: 2; Çmimi: 89,90"),
+    ]
+
+
+def test_comma_csv_with_quoted_fields():
+    lines = ['Emri,Adresa,Shuma', '"Berisha, Arben","Rr. Nëna Terezë 5",100', 'Krasniqi,Prishtinë,250']
+    assert sniff_delimiter(lines) == ","
+
+
+def test_tab_and_pipe_delimiters():
+    assert sniff_delimiter(["a\tb\tc", "1\t2,5\t3"]) == "\t"
+    assert sniff_delimiter(["a|b", "1|2"]) == "|"
+
+
+def test_single_column_falls_back_to_comma():
+    assert sniff_delimiter(["vetëm një kolonë", "rresht tjetër"]) == ","
@@ -0,0 +1,76 @@
+import pytest
+
+pytest.importorskip("fitz")
+
+from app.services import spreadsheet_text_service
+from app.services.text_extraction_service import classify_page, extract_text
+
+A4 = (0.0, 0.0, 595.0, 842.0)
+BODY = "Neni 1. Ky ligj rregullon procedurën kontestimore para gjykatave të Republikës së Kosovës. " * 3
+
+
+class FakePage:
+    """Just the parts of a fitz.Page that classify_page reads."""
+
+    def __init__(self, text_blocks, image_rects, number=0):
+        self.rect = A4
+        self.number = number
+        self._blocks = text_blocks
+        self._images = image_rects
+
+    def get_text(self, kind, flags=0):
+        assert kind == "dict"
+        return {"blocks": [
+            {"type": 0, "bbox": bbox, "lines": [{"spans": [{"text": text, "bbox": bbox}]}]}
+            for bbox, text in self._blocks
+        ]}
+
+    def get_image_info(self):
+        return [{"bbox": rect} for rect in self._images]
+
+
+def test_searchable_scan_is_text():
+    # Full-page scan with an invisible OCR layer in the middle of it: the margins are not unread regions
+    page = FakePage([((72.0, 100.0, 523.0, 700.0), BODY)], [A4])
+    method, text, provenance = classify_page(page)
+    assert method == "text"
+    assert provenance["image_coverage"] == 1.0
+    assert provenance["uncovered_image"] == 0.0
+    assert "procedurën kontestimore" in text
+
+
+def test_typed_page_with_pasted_scan_is_mixed():
+    page = FakePage([((72.0, 60.0, 523.0, 200.0), BODY)], [(72.0, 300.0, 523.0, 800.0)])
+    method, _, provenance = classify_page(page)
+    assert method == "mixed"
+    assert provenance["uncovered_image"] > 0.25
+
+
+def test_image_only_page_goes_to_ocr():
+    method, _, _ = classify_page(FakePage([], [A4]))
+    assert method == "ocr"
+
+
+def test_plain_text_page():
+    method, _, provenance = classify_page(FakePage([((72.0, 100.0, 523.0, 700.0), BODY)], []))
+    assert method == "text"
+    assert provenance["image_coverage"] == 0.0
+
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def test_xlsx_mime_goes_to_the_spreadsheet_reader(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Faturat"
+    sheet.append(["Klienti", "Shuma"])
+    sheet.append(["Arben Berisha", 120])
+    # Stored uploads have no extension: only the MIME type says this is a workbook
+    path = tmp_path / "upload"
+    workbook.save(path)
+
+    text = extract_text(str(path), XLSX_MIME)
+    assert "Klienti: Arben Berisha; Shuma: 120" in text
+    assert [meta["sheet"] for _, meta in spreadsheet_text_service.split_blocks(text)] == ["Faturat"]